@@ -28,17 +28,20 @@ from __future__ import annotations
 import hashlib
 import inspect
 import json
-import optuna
 import pickle
 import numpy as np
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Optional, Type
+from typing import TYPE_CHECKING, Any, Optional, Type
 
 from simtradelab.backtest.runner import BacktestRunner
 from simtradelab.backtest.config import BacktestConfig
 from simtradelab.i18n import t
 
+if TYPE_CHECKING:
+    # optuna 只在优化时才导入，避免拖慢 import simtradelab
+    import optuna
+
 
 class _NoFileLock:
     """No-op file lock — safe when n_jobs=1 and only one optimizer runs at a time.
@@ -603,6 +606,8 @@ class StrategyOptimizer:
 
     def objective(self, trial: optuna.Trial) -> float:
         """Optuna优化目标函数（支持Walk-Forward + 中间剪枝）"""
+        import optuna
+
         # 生成参数
         params = self.parameter_space.suggest_parameters(trial)
 
@@ -691,6 +696,7 @@ class StrategyOptimizer:
         # 使用 no-op lock：优化器单线程运行 (n_jobs=1)，同时只有一个优化任务，
         # 不存在并发访问，无需文件锁。使用 JournalFileOpenLock 会导致第二次运行
         # 时因前一次的锁对象未被 GC 而陷入 while not acquire(): sleep(0.1) 死循环。
+        import optuna
         from optuna.storages.journal import JournalFileBackend
 
         journal_path = self.results_dir / "optuna_journal.log"
@@ -890,6 +896,8 @@ class StrategyOptimizer:
 
     def _print_performance_report(self, study: optuna.Study):
         """输出性能评分报告"""
+        import optuna
+
         completed_trials = len([t for t in study.trials if t.state == optuna.trial.TrialState.COMPLETE])
         pruned_trials = len([t for t in study.trials if t.state == optuna.trial.TrialState.PRUNED])
         failed_trials = len([t for t in study.trials if t.state == optuna.trial.TrialState.FAIL])
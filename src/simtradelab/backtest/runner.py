@@ -25,6 +25,7 @@ from simtradelab.ptrade.config_manager import config as ptrade_config
 from simtradelab.backtest.stats import generate_backtest_report, generate_backtest_charts, print_backtest_report
 from simtradelab.ptrade.api import PtradeAPI, _build_date_index
 from simtradelab.service.data_server import DataServer
+from simtradelab.service.data_service import DataServiceClient, connect_data_service
 from simtradelab.backtest.config import BacktestConfig
 from simtradelab.ptrade.market_profile import get_market_profile
 from simtradelab.backtest.backtest_stats import StatsCollector, BacktestStats
@@ -55,6 +56,7 @@ class BacktestRunner:
         self.adj_pre_cache = None
         self.adj_post_cache = None
         self.dividend_cache = None
+        self.corporate_action_calendar = None
         self.trade_days = None
 
         # 优化模式：跨 trial 共享日期索引缓存
@@ -100,7 +102,9 @@ class BacktestRunner:
             print(t("bt.analyzing_deps"))
             from simtradelab.ptrade.strategy_data_analyzer import (
                 analyze_strategy_data_requirements,
-                print_dependencies
+                history_window,
+                print_dependencies,
+                required_columns,
             )
             deps = analyze_strategy_data_requirements(config.strategy_path)
             print_dependencies(deps)
@@ -110,7 +114,11 @@ class BacktestRunner:
         if config.optimization_mode:
             # 优化模式：数据已加载，跳过依赖分析
             required_data = None
+            columns = None
+            date_range = None
         else:
+            columns = required_columns(deps)
+            date_range = history_window(deps, config.start_date, config.end_date)
             required_data = set()
             if deps.needs_price_data:
                 required_data.add('price')
@@ -135,6 +143,8 @@ class BacktestRunner:
                 enable_multiprocessing=config.enable_multiprocessing,
                 num_workers=config.num_workers,
                 use_data_server=config.use_data_server,
+                columns=columns,
+                date_range=date_range,
             )
 
             if self._cancel_event and self._cancel_event.is_set():
@@ -215,6 +225,8 @@ class BacktestRunner:
         enable_multiprocessing: bool = True,
         num_workers: int | None = None,
         use_data_server: bool = True,
+        columns=None,
+        date_range=None,
     ) -> pd.DataFrame:
         """加载数据
 
@@ -224,6 +236,8 @@ class BacktestRunner:
             enable_multiprocessing: 是否启用多进程预加载
             num_workers: 预加载进程数，None表示自动
             use_data_server: 是否复用DataServer和runner缓存
+            columns: {数据类型: 列集合}，只读取策略用到的列，None 表示全部列
+            date_range: 行情日期窗口 (start, stop)，None 表示全部历史
 
         Returns:
             基准数据DataFrame
@@ -239,17 +253,29 @@ class BacktestRunner:
         if not use_data_server:
             if DataServer._initialized and DataServer._instance is not None:
                 DataServer._instance._clear_all_caches()
+            DataServer._drop_datasets()
             DataServer._instance = None
             DataServer._initialized = False
             self._data_loaded = False
-        elif self._data_loaded:
-            # 数据已加载，直接返回
+        elif self._data_loaded and columns is None and date_range is None:
+            # 数据已加载，直接返回（指定了列或日期窗口时交由 DataServer 判断是否需要补载）
             print(t("bt.data_cached"))
             # 从 benchmark_data 获取默认基准(会在后续根据 context.benchmark 重新选择)
             return next(iter(self.benchmark_data.values())) # type: ignore
 
-        # 使用多进程安全的DataServer
-        data_server = DataServer(required_data, frequency, data_path, market=market)
+        # 本地数据服务在运行时直接挂载其数据，否则使用进程内的DataServer
+        data_server = None
+        if use_data_server and not DataServer._initialized:
+            previous = getattr(self, "_data_server", None)
+            if isinstance(previous, DataServiceClient):
+                previous.close()
+            data_server = connect_data_service(
+                data_path, market, required_data, frequency, columns=columns, date_range=date_range
+            )
+        if data_server is None:
+            data_server = DataServer(
+                required_data, frequency, data_path, market=market, columns=columns, date_range=date_range
+            )
         self._data_server = data_server
 
         # 绑定到runner实例
@@ -265,6 +291,7 @@ class BacktestRunner:
         self.adj_pre_cache = data_server.adj_pre_cache
         self.adj_post_cache = data_server.adj_post_cache
         self.dividend_cache = data_server.dividend_cache
+        self.corporate_action_calendar = getattr(data_server, 'corporate_action_calendar', None)
         self.trade_days = getattr(data_server, 'trade_days', None)
         self._data_loaded = True
         return data_server.get_benchmark_data()
@@ -364,6 +391,7 @@ class BacktestRunner:
             trade_days=self.trade_days,
             stock_data_dict_1m=self.stock_data_dict_1m,
             data_server=getattr(self, "_data_server", None),
+            corporate_action_calendar=getattr(self, "corporate_action_calendar", None),
         )
 
         # 创建API
@@ -387,8 +415,14 @@ class BacktestRunner:
         )
         if config.frequency == '1m':
             execution_date_index = {}
+            # 分钟线滑动窗口推进后行位置改变，按窗口代数失效
+            index_generation = [None]
 
             def get_execution_stock_date_index(stock):
+                generation = getattr(execution_stock_data, 'generation', None)
+                if generation != index_generation[0]:
+                    execution_date_index.clear()
+                    index_generation[0] = generation
                 if stock not in execution_date_index:
                     stock_df = execution_stock_data.get(stock)
                     if isinstance(stock_df, pd.DataFrame) and isinstance(stock_df.index, pd.DatetimeIndex):
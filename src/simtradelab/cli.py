@@ -6,9 +6,95 @@ import argparse
 
 from simtradelab import __version__
 
+_CONSOLIDATE_DATASETS = ("stocks", "stocks_1m", "valuation", "fundamentals")
+
+
+def _consolidate(data_dir: str, datasets: list[str] | None) -> int:
+    from pathlib import Path
+
+    from simtradelab.ptrade.storage import build_consolidated_store
+
+    targets = datasets or [name for name in _CONSOLIDATE_DATASETS if (Path(data_dir) / name).is_dir()]
+    if not targets:
+        print("No per-symbol datasets found under %s" % data_dir)
+        return 1
+    for dataset in targets:
+        count = build_consolidated_store(data_dir, dataset)
+        print("Consolidated %s: %d symbols" % (dataset, count))
+    return 0
+
+
+def _partition_minute(data_dir: str) -> int:
+    from simtradelab.ptrade.storage import MINUTE_PARTITION_DIR, build_minute_partitions
+
+    count = build_minute_partitions(data_dir)
+    if not count:
+        print("No minute data found under %s/stocks_1m" % data_dir)
+        return 1
+    print("Partitioned stocks_1m into %s: %d symbols" % (MINUTE_PARTITION_DIR, count))
+    return 0
+
+
+def _publish_panel(data_dir: str, market: str) -> int:
+    from simtradelab.service.data_server import DataServer
+
+    server = DataServer({"price", "valuation", "exrights"}, data_path=data_dir, market=market)
+    server.publish_shared()
+    return 0
+
+
+def _serve(data_dir: str | None, market: str, socket_path: str | None) -> int:
+    from simtradelab.service.data_service import DataService
+
+    service = DataService(data_dir, market=market, socket_path=socket_path)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
 
 def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(prog="simtradelab", description="SimTradeLab backtesting framework")
     parser.add_argument("--version", action="version", version=__version__)
-    parser.parse_args(argv)
+    subparsers = parser.add_subparsers(dest="command")
+
+    consolidate = subparsers.add_parser(
+        "consolidate", help="merge per-symbol parquet files into a single consolidated dataset"
+    )
+    consolidate.add_argument("data_dir", help="market data directory, e.g. data/cn")
+    consolidate.add_argument(
+        "--dataset",
+        action="append",
+        choices=_CONSOLIDATE_DATASETS,
+        help="dataset to convert (repeatable, default: all present)",
+    )
+
+    partition = subparsers.add_parser(
+        "partition-minute", help="split per-symbol minute files into monthly partitions for windowed loading"
+    )
+    partition.add_argument("data_dir", help="market data directory, e.g. data/cn")
+
+    publish = subparsers.add_parser(
+        "publish-panel", help="load market data once and publish it as a memory-mapped panel for other processes"
+    )
+    publish.add_argument("data_dir", help="data directory, e.g. data or data/cn")
+    publish.add_argument("--market", default="CN", help="market code (default: CN)")
+
+    serve = subparsers.add_parser(
+        "serve", help="run a local data service that keeps market data loaded for other processes"
+    )
+    serve.add_argument("data_dir", nargs="?", help="data directory, e.g. data or data/cn (default: configured path)")
+    serve.add_argument("--market", default="CN", help="market code (default: CN)")
+    serve.add_argument("--socket", help="unix socket path (default: $SIMTRADELAB_DATA_SERVICE_SOCKET or a per-user temp file)")
+
+    args = parser.parse_args(argv)
+    if args.command == "consolidate":
+        return _consolidate(args.data_dir, args.dataset)
+    if args.command == "partition-minute":
+        return _partition_minute(args.data_dir)
+    if args.command == "publish-panel":
+        return _publish_panel(args.data_dir, args.market)
+    if args.command == "serve":
+        return _serve(args.data_dir, args.market, args.socket)
     return 0
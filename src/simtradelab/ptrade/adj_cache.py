@@ -10,13 +10,27 @@
 
 前复权公式：前复权价 = adj_a * 未复权价 + adj_b  (adj_a=ef_a, adj_b=ef_b)
 后复权公式：后复权价 = adj_a * 未复权价 + adj_b  (adj_a/adj_b 从除权事件累积)
+
+缓存文件记录每只股票行情、除权源文件的 (mtime, size)，加载时只重算来源发生变化的股票
 """
 
-import pandas as pd
-import numpy as np
+import json
+import logging
 import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from . import manifest
 from ..utils.perf import timer
-from joblib import Parallel, delayed
+
+_KIND_LABELS = {"pre": "前复权", "post": "后复权"}
+# 缓存文件 schema 元数据中记录各股票来源文件戳的键
+_STAMPS_KEY = b"simtradelab.adj_stamps"
+_ADJ_COLUMNS = frozenset({"symbol", "date", "adj_a", "adj_b"})
 
 
 def _adj_cache_path(data_dir: str, kind: str) -> str:
@@ -24,378 +38,265 @@ def _adj_cache_path(data_dir: str, kind: str) -> str:
     return os.path.join(data_dir, f"ptrade_adj_{kind}.parquet")
 
 
-def _calculate_adj_factors_from_events(stock, stock_df, exrights_events):
-    """从平台预计算因子构建前复权因子
+def _full_price_frames(stock_data_dict, stocks):
+    """复权因子缓存按完整历史生成并落盘；行情按日期窗口加载时从存储重新读取"""
+    if getattr(stock_data_dict, 'date_range', None) is None:
+        return {s: stock_data_dict.get(s) for s in stocks}
+    from . import storage
+    return {s: storage.load_stock(stock_data_dict.data_dir, s, columns={'close'}) for s in stocks}
+
+
+def _source_stamps(data_dir, stocks):
+    """各股票行情、除权源文件的 [[mtime_ns, size], [mtime_ns, size]]
 
-    平台公式: P_adj = ef_a * P + ef_b
-    直接存储 ef_a/ef_b 作为 adj_a/adj_b，避免中间除法的精度损失
+    行情以合并数据集存储（无单独文件）时使用合并文件的戳
     """
-    if stock_df is None or stock_df.empty:
-        return None
+    from .storage import CONSOLIDATED_DIR
 
-    if exrights_events is None or exrights_events.empty:
-        adj_factors = pd.DataFrame(
-            index=stock_df.index, columns=["adj_a", "adj_b"], dtype="float64"
+    consolidated = None
+    stamps = {}
+    for stock in stocks:
+        price, exrights = manifest.source_stamp(
+            data_dir, (f"stocks/{stock}.parquet", f"exrights/{stock}.parquet")
         )
-        adj_factors["adj_a"] = 1.0
-        adj_factors["adj_b"] = 0.0
-        return adj_factors
+        if price[1:] == (0, 0):
+            if consolidated is None:
+                consolidated = manifest.source_stamp(data_dir, (f"{CONSOLIDATED_DIR}/stocks.parquet",))[0]
+            price = consolidated
+        stamps[stock] = [list(price[1:]), list(exrights[1:])]
+    return stamps
 
-    try:
-        ex_dates_dt = pd.to_datetime(exrights_events.index.tolist(), format="%Y%m%d")
-        n_events = len(ex_dates_dt)
 
-        ef_a = exrights_events['exer_forward_a'].values
-        ef_b = exrights_events['exer_forward_b'].values
+def _adj_frames_to_table(adj_factors_cache):
+    """将 dict[str, DataFrame] 转为带 symbol 列的长表"""
+    rows = []
+    for stock, df in adj_factors_cache.items():
+        if df is not None and not df.empty:
+            df_copy = df.rename_axis("date").reset_index()
+            df_copy["symbol"] = stock
+            rows.append(df_copy)
+    if not rows:
+        return pd.DataFrame(columns=["date", "adj_a", "adj_b", "symbol"])
+    return pd.concat(rows, ignore_index=True)
 
-        # 向量化转换：[n_events] 个除权区间 + 最新区间(1.0, 0.0)
-        forward_a = np.ones(n_events + 1, dtype="float64")
-        forward_b = np.zeros(n_events + 1, dtype="float64")
-        forward_a[:n_events] = ef_a
-        forward_b[:n_events] = ef_b
 
-        # searchsorted 将每个交易日映射到对应的除权区间
-        factor_idx = np.searchsorted(ex_dates_dt.values, stock_df.index.values, side="right")
+def _write_adj_table(combined, cache_path, stamps=None):
+    """原子写入缓存长表，stamps 记录在 schema 元数据中
 
-        return pd.DataFrame(
-            index=stock_df.index,
-            data={"adj_a": forward_a[factor_idx], "adj_b": forward_b[factor_idx]},
-        )
-
-    except (ValueError, KeyError, IndexError, pd.errors.EmptyDataError) as e:
-        import logging
-        logging.getLogger(__name__).error(f"计算 {stock} 前复权因子失败: {e}")
-        return None
+    Returns:
+        写入的 pyarrow Table
+    """
+    table = pa.Table.from_pandas(combined, preserve_index=False)
+    if stamps is not None:
+        metadata = dict(table.schema.metadata or {})
+        metadata[_STAMPS_KEY] = json.dumps(stamps).encode()
+        table = table.replace_schema_metadata(metadata)
+    tmp_path = f"{cache_path}.tmp-{os.getpid()}"
+    try:
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, cache_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return table
 
 
-def _adj_cache_to_parquet(adj_factors_cache, cache_path):
+def _adj_cache_to_parquet(adj_factors_cache, cache_path, stamps=None):
     """将复权因子缓存保存为Parquet格式
 
     将 dict[str, DataFrame] 转为单个长表格式存储
     """
     if not adj_factors_cache:
         return
+    _write_adj_table(_adj_frames_to_table(adj_factors_cache), cache_path, stamps)
 
-    rows = []
-    for stock, df in adj_factors_cache.items():
-        if df is not None and not df.empty:
-            df_copy = df.reset_index()
-            df_copy['symbol'] = stock
-            rows.append(df_copy)
 
-    if rows:
-        combined = pd.concat(rows, ignore_index=True)
-        combined.to_parquet(cache_path, index=False)
+def _read_adj_table(cache_path):
+    """读取缓存长表（pyarrow Table）及来源文件戳；旧版缓存未记录戳时戳为 None"""
+    table = pq.read_table(cache_path)
+    raw = (table.schema.metadata or {}).get(_STAMPS_KEY)
+    if "date" not in table.column_names and "index" in table.column_names:
+        table = table.rename_columns(["date" if name == "index" else name for name in table.column_names])
+    missing = _ADJ_COLUMNS - set(table.column_names)
+    if missing:
+        raise ValueError(f"缺少列: {sorted(missing)}")
+    return table, (json.loads(raw) if raw is not None else None)
+
+
+def _table_to_adj_cache(table):
+    """长表转为数组化缓存：adj_a/adj_b 各一条连续数组 + 股票行区间
+
+    Returns:
+        ColumnarFrameMap: {stock: adj_factors_df} 映射接口，get_arrays 直接返回数组切片
+    """
+    from .columnar_store import ColumnarFrameMap, ColumnarStore
+
+    if table.num_rows == 0:
+        return ColumnarFrameMap(ColumnarStore())
+
+    encoded = table["symbol"].combine_chunks().cast(pa.string()).dictionary_encode()
+    codes = encoded.indices.to_numpy()
+    names = encoded.dictionary.to_pylist()
+    dates = table["date"].cast(pa.timestamp("ns")).to_numpy().view("i8")
+    adj_a = table["adj_a"].to_numpy().astype("float64", copy=False)
+    adj_b = table["adj_b"].to_numpy().astype("float64", copy=False)
+
+    # 缓存按 (股票, 日期) 分块写入；外部或旧版文件顺序不符时整体排序一次
+    boundaries = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+    ordered = np.all((np.diff(dates) > 0) | (np.diff(codes) != 0))
+    if len(boundaries) + 1 != len(names) or not ordered:
+        order = np.lexsort((dates, codes))
+        codes, dates, adj_a, adj_b = codes[order], dates[order], adj_a[order], adj_b[order]
+        boundaries = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+
+    bounds = np.concatenate(([0], boundaries, [len(codes)]))
+    symbols = [names[code] for code in codes[bounds[:-1]]]
+    store = ColumnarStore.from_blocks(
+        symbols, bounds, dates, {"adj_a": adj_a, "adj_b": adj_b}, index_name="date"
+    )
+    return ColumnarFrameMap(store)
 
 
 def _parquet_to_adj_cache(cache_path):
-    """从Parquet格式加载复权因子缓存
+    """从Parquet格式加载复权因子缓存（单次读取，不按股票拆分 DataFrame）
 
     Returns:
-        dict[str, DataFrame]: {stock: adj_factors_df}
+        ColumnarFrameMap: {stock: adj_factors_df}
     """
     if not os.path.exists(cache_path):
         return None
+    return _table_to_adj_cache(_read_adj_table(cache_path)[0])
 
-    combined = pd.read_parquet(cache_path)
-    adj_factors_cache = {}
-
-    for symbol, group in combined.groupby('symbol'):
-        df = group.drop(columns=['symbol']).copy()
-        if 'date' in df.columns:
-            df.set_index('date', inplace=True)
-        elif 'index' in df.columns:
-            df.set_index('index', inplace=True)
-        adj_factors_cache[symbol] = df
 
-    return adj_factors_cache
+def _compute_adj_factors(data_context, stocks, kind):
+    """计算给定股票的复权因子（除权事件经 CorporateActions 共享读取）
 
+    Returns:
+        dict[str, DataFrame | None]: 无价格数据或计算失败的股票为 None
+    """
+    from .corporate_actions import get_corporate_actions
 
-@timer(threshold=0.1, name="perf.name.adj_pre_create")
-def create_adj_pre_cache(data_context):
-    """创建并保存所有股票的前复权因子缓存"""
-    import logging
     logger = logging.getLogger(__name__)
 
-    logger.info("正在创建前复权因子缓存...")
-    all_stocks = list(data_context.stock_data_dict.keys())
-    total_stocks = len(all_stocks)
-
     logger.info("  预加载股票价格数据...")
-    stock_data_cache = {s: data_context.stock_data_dict.get(s) for s in all_stocks}
+    stock_data_cache = _full_price_frames(data_context.stock_data_dict, stocks)
 
     logger.info("  加载除权事件数据...")
-    from . import storage
-    data_dir = data_context.stock_data_dict.data_dir
-    num_workers = int(os.getenv("PTRADE_NUM_WORKERS", "-1"))
-
-    try:
-        exrights_results = Parallel(n_jobs=num_workers, backend="loky", verbose=0)(
-            delayed(storage.load_exrights)(data_dir, stock) for stock in all_stocks
-        )
-
-        exrights_cache = {}
-        for stock, exrights_full in zip(all_stocks, exrights_results):
-            if exrights_full and "exrights_events" in exrights_full:
-                ex_df = exrights_full["exrights_events"]
-                if not ex_df.empty:
-                    exrights_cache[stock] = ex_df
+    actions = get_corporate_actions(data_context.stock_data_dict.data_dir)
+    loaded = actions.ensure(stocks)
+    logger.info(f"    已读取 {loaded} 个除权文件")
 
-        logger.info(f"    已加载 {len(exrights_cache)} 只股票的除权数据")
+    logger.info(f"  计算{_KIND_LABELS[kind]}因子...")
+    return {stock: actions.factors(kind, stock, stock_data_cache.get(stock)) for stock in stocks}
 
-        logger.info(f"  并行计算前复权因子({num_workers if num_workers > 0 else 'auto'} 进程)...")
 
-        results = Parallel(n_jobs=num_workers, backend="loky", verbose=0)(
-            delayed(_calculate_adj_factors_from_events)(
-                stock, stock_data_cache.get(stock), exrights_cache.get(stock)
-            )
-            for stock in all_stocks
-        )
-
-        logger.info("  正在保存到Parquet文件...")
-        adj_factors_cache = {}
-        saved_count = 0
-        failed_stocks = []
+def _update_adj_cache(data_context, kind, full=False):
+    """按来源文件戳增量更新复权因子缓存，只重算新增或来源变化的股票
 
-        for stock, adj_factors in zip(all_stocks, results):
-            if adj_factors is not None:
-                adj_factors_cache[stock] = adj_factors
-                saved_count += 1
-            else:
-                failed_stocks.append(stock)
+    Args:
+        kind: 'pre' 前复权 / 'post' 后复权
+        full: True 时忽略已有缓存，全部重算
 
-        cache_path = _adj_cache_path(data_dir, "pre")
-        _adj_cache_to_parquet(adj_factors_cache, cache_path)
-
-        file_size = os.path.getsize(cache_path) / 1024 / 1024
-
-        logger.info("✓ 前复权因子缓存创建完成！")
-        logger.info(f"  处理: {total_stocks} 只股票")
-        logger.info(f"  保存: {saved_count} 只（有除权数据或价格数据）")
-        if failed_stocks:
-            logger.warning(f"  失败股票: {len(failed_stocks)} 只")
-        logger.info(f"  文件: {cache_path} ({file_size:.1f}MB)")
-
-    except OSError as e:
-        logger.error(f"创建前复权因子缓存失败: {e}")
-        raise
-    except Exception as e:
-        logger.error(f"创建前复权因子缓存时发生未预期错误: {e}")
-        import traceback
-        logger.debug(traceback.format_exc())
-        raise
-
-
-@timer(threshold=0.1, name="perf.name.adj_pre_load")
-def load_adj_pre_cache(data_context):
-    """加载前复权因子缓存
-
-    前复权价 = adj_a * 未复权价 + adj_b
+    Returns:
+        ColumnarFrameMap: {stock: adj_factors_df}
     """
-    import logging
     logger = logging.getLogger(__name__)
+    label = _KIND_LABELS[kind]
+    data_dir = data_context.stock_data_dict.data_dir
+    cache_path = _adj_cache_path(data_dir, kind)
+    all_stocks = list(data_context.stock_data_dict.keys())
+    stamps = _source_stamps(data_dir, all_stocks)
 
-    cache_path = _adj_cache_path(data_context.stock_data_dict.data_dir, "pre")
-
-    if not os.path.exists(cache_path):
+    table = None
+    cached_stamps = {}
+    migrate = False
+    if not full and os.path.exists(cache_path):
         try:
-            create_adj_pre_cache(data_context)
+            table, cached_stamps = _read_adj_table(cache_path)
         except Exception as e:
-            logger.error(f"创建前复权因子缓存失败: {e}")
-            raise
-
-    logger.info("正在加载前复权因子缓存...")
-
+            logger.error(f"缓存文件损坏或格式错误: {e}")
+            table, cached_stamps = None, {}
+        if cached_stamps is None:
+            # 旧版缓存未记录来源戳：沿用"存在即有效"的语义，已缓存的股票视为最新
+            cached = set(pc.unique(table["symbol"]).to_pylist())
+            cached_stamps = {s: stamps[s] for s in all_stocks if s in cached}
+            migrate = True
+
+    stale = [s for s in all_stocks if cached_stamps.get(s) != stamps[s]]
+    if table is not None:
+        keep = pa.array(sorted(set(all_stocks) - set(stale)), type=pa.string())
+        kept = pc.is_in(table["symbol"].cast(pa.string()), value_set=keep)
+        if not stale and not migrate and pc.sum(kept).as_py() == table.num_rows:
+            return _table_to_adj_cache(table)
+
+    action = "创建" if table is None else "更新"
+    logger.info(f"正在{action}{label}因子缓存（重算 {len(stale)}/{len(all_stocks)} 只股票）...")
     try:
-        adj_factors_cache = _parquet_to_adj_cache(cache_path)
-
-        if adj_factors_cache is None:
-            raise FileNotFoundError("缓存文件为空")
+        results = _compute_adj_factors(data_context, stale, kind) if stale else {}
+        failed_stocks = [stock for stock, adj in results.items() if adj is None]
+        combined = _adj_frames_to_table(results)
+        if table is not None:
+            unchanged = table.filter(kept).to_pandas()
+            combined = pd.concat([unchanged, combined], ignore_index=True) if not combined.empty else unchanged
 
-        logger.info(f"✓ 前复权因子缓存加载完成！共 {len(adj_factors_cache)} 只股票")
-        return adj_factors_cache
-
-    except FileNotFoundError:
-        logger.error(f"缓存文件不存在: {cache_path}")
-        create_adj_pre_cache(data_context)
-        return load_adj_pre_cache(data_context)
-    except Exception as e:
-        logger.error(f"缓存文件损坏或格式错误: {e}")
-        try:
-            os.remove(cache_path)
-            logger.info("已删除损坏的缓存文件，重新创建...")
-            create_adj_pre_cache(data_context)
-            return load_adj_pre_cache(data_context)
-        except OSError as remove_error:
-            logger.error(f"删除损坏的缓存文件失败: {remove_error}")
-            raise
-
-
-def _calculate_adj_post_factors_from_events(stock, stock_df, exrights_events):
-    """从除权除息事件计算后复权因子
+        logger.info("  正在保存到Parquet文件...")
+        # 计算失败的股票同样记录戳，来源不变时不再重试
+        table = _write_adj_table(combined, cache_path, stamps)
+    except OSError as e:
+        logger.error(f"{action}{label}因子缓存失败: {e}")
+        raise
 
-    后复权公式: P_adj = adj_a * P + adj_b
-    从历史往最新累积，上市首日 adj_a=1, adj_b=0
-    """
-    if stock_df is None or stock_df.empty:
-        return None
+    file_size = os.path.getsize(cache_path) / 1024 / 1024
+    logger.info(f"✓ {label}因子缓存{action}完成！")
+    logger.info(f"  处理: {len(stale)} 只股票")
+    logger.info(f"  保存: {len(stale) - len(failed_stocks)} 只（有除权数据或价格数据）")
+    if failed_stocks:
+        logger.warning(f"  失败股票: {len(failed_stocks)} 只")
+    logger.info(f"  文件: {cache_path} ({file_size:.1f}MB)")
+    return _table_to_adj_cache(table)
 
-    if exrights_events is None or exrights_events.empty:
-        adj_factors = pd.DataFrame(
-            index=stock_df.index, columns=["adj_a", "adj_b"], dtype="float64"
-        )
-        adj_factors["adj_a"] = 1.0
-        adj_factors["adj_b"] = 0.0
-        return adj_factors
 
+def _load_adj_cache(data_context, kind):
+    """加载复权因子缓存，缓存缺失、损坏或来源变化时增量重建"""
+    logger = logging.getLogger(__name__)
+    label = _KIND_LABELS[kind]
     try:
-        ex_dates_dt = pd.to_datetime(exrights_events.index.tolist(), format="%Y%m%d")
-
-        allotted_ps = exrights_events["allotted_ps"].values
-        bonus_ps = exrights_events["bonus_ps"].values
-        rationed_ps = exrights_events["rationed_ps"].values
-        rationed_px = exrights_events["rationed_px"].values
+        adj_factors_cache = _update_adj_cache(data_context, kind)
+    except Exception as e:
+        logger.error(f"创建{label}因子缓存失败: {e}")
+        raise
+    logger.info(f"✓ {label}因子缓存加载完成！共 {len(adj_factors_cache)} 只股票")
+    return adj_factors_cache
 
-        n_events = len(allotted_ps)
-        backward_a = np.ones(n_events + 1, dtype="float64")
-        backward_b = np.zeros(n_events + 1, dtype="float64")
 
-        for i in range(n_events):
-            m = 1.0 + allotted_ps[i] + rationed_ps[i]
-            backward_a[i + 1] = backward_a[i] * m
-            backward_b[i + 1] = backward_b[i] * m + bonus_ps[i] - rationed_ps[i] * rationed_px[i]
+@timer(threshold=0.1, name="perf.name.adj_pre_create")
+def create_adj_pre_cache(data_context):
+    """重新计算并保存所有股票的前复权因子缓存"""
+    return _update_adj_cache(data_context, "pre", full=True)
 
-        factor_idx = np.searchsorted(ex_dates_dt.values, stock_df.index.values, side="right")
 
-        return pd.DataFrame(
-            index=stock_df.index,
-            data={"adj_a": backward_a[factor_idx], "adj_b": backward_b[factor_idx]},
-        )
+@timer(threshold=0.1, name="perf.name.adj_pre_load")
+def load_adj_pre_cache(data_context):
+    """加载前复权因子缓存，只重算行情或除权文件发生变化的股票
 
-    except (ValueError, KeyError, IndexError, pd.errors.EmptyDataError) as e:
-        import logging
-        logging.getLogger(__name__).error(f"计算 {stock} 后复权因子失败: {e}")
-        return None
+    前复权价 = adj_a * 未复权价 + adj_b
+    """
+    return _load_adj_cache(data_context, "pre")
 
 
 @timer(threshold=0.1, name="perf.name.adj_post_create")
 def create_adj_post_cache(data_context):
-    """创建并保存所有股票的后复权因子缓存"""
-    import logging
-    logger = logging.getLogger(__name__)
-
-    logger.info("正在创建后复权因子缓存...")
-    all_stocks = list(data_context.stock_data_dict.keys())
-    total_stocks = len(all_stocks)
-
-    logger.info("  预加载股票价格数据...")
-    stock_data_cache = {s: data_context.stock_data_dict.get(s) for s in all_stocks}
-
-    logger.info("  加载除权事件数据...")
-    from . import storage
-    data_dir = data_context.stock_data_dict.data_dir
-    num_workers = int(os.getenv("PTRADE_NUM_WORKERS", "-1"))
-
-    try:
-        exrights_results = Parallel(n_jobs=num_workers, backend="loky", verbose=0)(
-            delayed(storage.load_exrights)(data_dir, stock) for stock in all_stocks
-        )
-
-        exrights_cache = {}
-        for stock, exrights_full in zip(all_stocks, exrights_results):
-            if exrights_full and "exrights_events" in exrights_full:
-                ex_df = exrights_full["exrights_events"]
-                if not ex_df.empty:
-                    exrights_cache[stock] = ex_df
-
-        logger.info(f"    已加载 {len(exrights_cache)} 只股票的除权数据")
-
-        logger.info(f"  并行计算后复权因子({num_workers if num_workers > 0 else 'auto'} 进程)...")
-
-        results = Parallel(n_jobs=num_workers, backend="loky", verbose=0)(
-            delayed(_calculate_adj_post_factors_from_events)(
-                stock, stock_data_cache.get(stock), exrights_cache.get(stock)
-            )
-            for stock in all_stocks
-        )
-
-        logger.info("  正在保存到Parquet文件...")
-        adj_factors_cache = {}
-        saved_count = 0
-        failed_stocks = []
-
-        for stock, adj_factors in zip(all_stocks, results):
-            if adj_factors is not None:
-                adj_factors_cache[stock] = adj_factors
-                saved_count += 1
-            else:
-                failed_stocks.append(stock)
-
-        cache_path = _adj_cache_path(data_dir, "post")
-        _adj_cache_to_parquet(adj_factors_cache, cache_path)
-
-        file_size = os.path.getsize(cache_path) / 1024 / 1024
-
-        logger.info("✓ 后复权因子缓存创建完成！")
-        logger.info(f"  处理: {total_stocks} 只股票")
-        logger.info(f"  保存: {saved_count} 只（有除权数据或价格数据）")
-        if failed_stocks:
-            logger.warning(f"  失败股票: {len(failed_stocks)} 只")
-        logger.info(f"  文件: {cache_path} ({file_size:.1f}MB)")
-
-    except OSError as e:
-        logger.error(f"创建后复权因子缓存失败: {e}")
-        raise
-    except Exception as e:
-        logger.error(f"创建后复权因子缓存时发生未预期错误: {e}")
-        import traceback
-        logger.debug(traceback.format_exc())
-        raise
+    """重新计算并保存所有股票的后复权因子缓存"""
+    return _update_adj_cache(data_context, "post", full=True)
 
 
 @timer(threshold=0.1, name="perf.name.adj_post_load")
 def load_adj_post_cache(data_context):
-    """加载后复权因子缓存
+    """加载后复权因子缓存，只重算行情或除权文件发生变化的股票
 
     后复权价 = adj_a * 未复权价 + adj_b
     """
-    import logging
-    logger = logging.getLogger(__name__)
-
-    cache_path = _adj_cache_path(data_context.stock_data_dict.data_dir, "post")
-
-    if not os.path.exists(cache_path):
-        try:
-            create_adj_post_cache(data_context)
-        except Exception as e:
-            logger.error(f"创建后复权因子缓存失败: {e}")
-            raise
-
-    logger.info("正在加载后复权因子缓存...")
-
-    try:
-        adj_factors_cache = _parquet_to_adj_cache(cache_path)
-
-        if adj_factors_cache is None:
-            raise FileNotFoundError("缓存文件为空")
-
-        logger.info(f"✓ 后复权因子缓存加载完成！共 {len(adj_factors_cache)} 只股票")
-        return adj_factors_cache
-
-    except FileNotFoundError:
-        logger.error(f"缓存文件不存在: {cache_path}")
-        create_adj_post_cache(data_context)
-        return load_adj_post_cache(data_context)
-    except Exception as e:
-        logger.error(f"缓存文件损坏或格式错误: {e}")
-        try:
-            os.remove(cache_path)
-            logger.info("已删除损坏的缓存文件，重新创建...")
-            create_adj_post_cache(data_context)
-            return load_adj_post_cache(data_context)
-        except OSError as remove_error:
-            logger.error(f"删除损坏的缓存文件失败: {remove_error}")
-            raise
+    return _load_adj_cache(data_context, "post")
 
 
 def create_dividend_cache(data_context):
@@ -407,7 +308,7 @@ def create_dividend_cache(data_context):
 
 
 class DividendLazyLoader:
-    """延迟加载分红数据 - 按股票代码按需加载"""
+    """延迟加载分红数据 - 按股票代码按需加载，与复权因子构建共享已读取的除权事件"""
 
     def __init__(self, data_dir):
         self.data_dir = data_dir
@@ -418,24 +319,8 @@ class DividendLazyLoader:
         if stock_code in self._cache:
             return self._cache[stock_code]
 
-        from . import storage
-        exrights_data = storage.load_exrights(self.data_dir, stock_code)
-
-        if not exrights_data or "dividends" not in exrights_data:
-            self._cache[stock_code] = default
-            return default
-
-        dividends_list = exrights_data["dividends"]
-        if not dividends_list:
-            self._cache[stock_code] = default
-            return default
-
-        result = {}
-        for event in dividends_list:
-            date_str = event["date"].replace("-", "")
-            dividend = event["dividend"]
-            if dividend > 0:
-                result[date_str] = dividend
+        from .corporate_actions import get_corporate_actions
+        result = get_corporate_actions(self.data_dir).dividends(stock_code)
 
         self._cache[stock_code] = result if result else default
         return self._cache[stock_code]
@@ -13,7 +13,6 @@ ptrade API 模拟层
 
 from __future__ import annotations
 
-import bisect
 import calendar
 import json
 import traceback
@@ -34,15 +33,27 @@ from simtradelab.utils.perf import timer
 
 from ..utils.paths import get_strategies_path
 from .cache_manager import cache_manager
+from .columnar_store import (
+    SymbolArrays,
+    column_value,
+    column_values,
+    get_frames,
+    get_symbol_source,
+    get_symbol_sources,
+    index_ns,
+)
 from .broker_profile import (
     is_api_supported_for_broker,
     needs_broker_support_guard,
     normalize_broker_profile,
 )
 from .config_manager import config
+from .index_constituents import IndexConstituents
 from .lifecycle_config import _ALL_PHASES_FROZENSET, API_ALLOWED_PHASES_LOOKUP
 from .lifecycle_controller import PTradeLifecycleError
+from .memory_budget import SizedLRUCache
 from .order_processor import OrderProcessor
+from .stock_status import StockStatusStore
 
 # PTrade suffix -> SimTradeData suffix mapping
 _PTRADE_SUFFIX_MAP = {
@@ -74,6 +85,9 @@ _API_OPTIONAL_DROP_KWARGS = {
     "run_interval": frozenset(["interval_timer_ranges"]),
 }
 
+# set_universe/get_index_stocks 后在后台预热的数据字典（仅按需加载模式的字典实际预取）
+_PREFETCH_DICTS = ("stock_data_dict", "stock_data_dict_1m", "valuation_dict", "fundamentals_dict", "exrights_dict")
+
 _FREQ_ALIASES = {
     "daily": "1d",
     "weekly": "1w",
@@ -99,6 +113,7 @@ _PERIOD_FREQ_RULE = {
 }
 
 _VALID_PRICE_FREQUENCIES = frozenset(["1d", *_MINUTE_FREQ_MINUTES, *_PERIOD_FREQ_RULE])
+_ADJ_PRICE_FIELDS = frozenset(["open", "high", "low", "close"])
 
 
 class _TradeDaysArray(np.ndarray):
@@ -200,7 +215,9 @@ def _round2(values: np.ndarray) -> np.ndarray:
     diff = np.abs(values - result)
     boundary_indices = np.flatnonzero((diff > 0.00499) & (diff < 0.0050000000001))
     for i in boundary_indices:
-        result[i] = _round2_scalar(float(values[i]))
+        # 兼容 get_history 面板路径的二维数组
+        position = np.unravel_index(i, values.shape)
+        result[position] = _round2_scalar(float(values[position]))
     return result
 
 
@@ -246,12 +263,269 @@ def _datetime_index_ns(index: pd.DatetimeIndex) -> np.ndarray:
     return index.to_numpy(dtype="datetime64[ns]").view("i8")
 
 
+def _adj_alignment(factor_ns: np.ndarray, source_ns: np.ndarray) -> int | np.ndarray:
+    """Map price rows onto adjustment-factor rows.
+
+    Returns an int offset when the price dates are a contiguous run of the factor dates
+    (rows are then plain slices), otherwise per-row factor positions equivalent to
+    ``factors.reindex(price_index).ffill()``, with -1 where no factor applies.
+    """
+    n = len(source_ns)
+    k = int(factor_ns.searchsorted(source_ns[0])) if n else 0
+    if k + n <= len(factor_ns) and np.array_equal(factor_ns[k:k + n], source_ns):
+        return k
+    if len(factor_ns) == 0:
+        return np.full(n, -1, dtype=np.int64)
+    pos = np.minimum(factor_ns.searchsorted(source_ns), len(factor_ns) - 1)
+    matched = factor_ns[pos] == source_ns
+    rows = np.maximum.accumulate(np.where(matched, np.arange(n), -1))
+    return np.where(rows >= 0, pos[np.maximum(rows, 0)], -1)
+
+
+def _adj_window(
+    factors: Any, alignment: int | np.ndarray, start: int, end: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Slice adj_a/adj_b for price rows [start, end) using an _adj_alignment result."""
+    adj_a = column_values(factors, "adj_a")
+    adj_b = column_values(factors, "adj_b")
+    if isinstance(alignment, int):
+        return adj_a[alignment + start:alignment + end], adj_b[alignment + start:alignment + end]
+    rows = alignment[start:end]
+    window_a = adj_a[rows].astype(float)
+    window_b = adj_b[rows].astype(float)
+    missing = rows < 0
+    window_a[missing] = np.nan
+    window_b[missing] = np.nan
+    return window_a, window_b
+
+
+def _adjust_prices(raw: np.ndarray, adj_a: np.ndarray, adj_b: np.ndarray, fq: str) -> np.ndarray:
+    """Apply pre/post adjustment factors: ``adj_a * raw + adj_b``, rounded to 2dp for pre."""
+    if fq == "post":
+        return adj_a * raw + adj_b
+    return _round2(adj_a * raw + adj_b)
+
+
+def _typeab_rows(values: np.ndarray) -> np.ndarray:
+    """Per-element mask of values where _round2 differs from round() (TypeA/anti-TypeA fires)."""
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, 2)
+    diff = np.abs(values - rounded)
+    mask = np.zeros(values.shape, dtype=bool)
+    for i in np.flatnonzero((diff > 0.00499) & (diff < 0.0050000000001)):
+        fv = float(values[i])
+        mask[i] = _round2_scalar(fv) != round(fv, 2)
+    return mask
+
+
+class _AdjustedPrices:
+    """单只股票全序列的前/后复权价
+
+    复权价只随行情与除权数据变化，按 (股票, 复权类型, 数据版本) 物化一次，之后每次调用只做切片：
+    dypre 在前复权价上按基准行的因子缩放；前复权 high/low 的 float64 取舍（_compute_hl_adj）
+    在物化时预先算出逐行判据，调用时只检查窗口内的判据与区间。
+    """
+
+    __slots__ = ("adj_a", "adj_b", "columns", "dates", "exact", "frame", "hl_rows", "unrounded")
+
+    def __init__(self, source: Any, adj_factors: Any, alignment: int | np.ndarray, fq: str):
+        """
+        Args:
+            source: 日线数据源（SymbolArrays 或 DataFrame）
+            adj_factors: 该股票的复权因子（adj_a/adj_b）
+            alignment: _adj_alignment(因子日期, 行情日期) 的结果
+            fq: 'pre' 或 'post'
+        """
+        self.dates = index_ns(source)
+        # 行情行恰为因子行的连续一段：每行都有同日因子，与按日期取交集的复权口径一致
+        self.exact = isinstance(alignment, int)
+        self.adj_a, self.adj_b = _adj_window(adj_factors, alignment, 0, len(self.dates))
+        self.columns = {
+            name: _adjust_prices(column_values(source, name), self.adj_a, self.adj_b, fq)
+            for name in _ADJ_PRICE_FIELDS
+            if name in source.columns
+        }
+        # 周/月线聚合用的整段复权日线 DataFrame，由 PtradeAPI 首次聚合时填充
+        self.frame = None
+        self.hl_rows = self.unrounded = None
+        # 只有因子为 1 的行可能走 float64 取舍，没有这样的行时不保留未舍入值
+        if fq == "pre" and "high" in self.columns and "low" in self.columns and np.any(self.adj_a == 1.0):
+            adj_h = column_values(source, "high") + self.adj_b
+            adj_l = column_values(source, "low") + self.adj_b
+            self.unrounded = (adj_h, adj_l)
+            # _compute_hl_adj 的逐行条件：因子为 1、float64 值不低于舍入值、不触发 TypeA/anti-TypeA
+            self.hl_rows = (
+                (self.adj_a == 1.0)
+                & (adj_h >= self.columns["high"])
+                & (adj_l >= self.columns["low"])
+                & ~_typeab_rows(adj_h)
+                & ~_typeab_rows(adj_l)
+            )
+
+    def rows(self, frame: pd.DataFrame) -> tuple[int, int] | None:
+        """frame 各行在全序列中的区间 [start, end)，不是连续的一段时返回 None"""
+        if not isinstance(frame.index, pd.DatetimeIndex):
+            return None
+        frame_ns = _datetime_index_ns(frame.index)
+        start = int(self.dates.searchsorted(frame_ns[0])) if len(frame_ns) else 0
+        end = start + len(frame_ns)
+        if not len(frame_ns) or not np.array_equal(self.dates[start:end], frame_ns):
+            return None
+        return start, end
+
+    def base(self, row: int) -> tuple[Any, Any]:
+        """dypre 以第 row 行的因子为基准"""
+        return self.adj_a[row], self.adj_b[row]
+
+    def window(self, name: str, start: int, end: int, base: tuple[Any, Any] | None = None) -> np.ndarray:
+        """name 列 [start, end) 行的复权价，给定 base 时为 dypre"""
+        values = self.columns[name][start:end]
+        if base is None:
+            return values
+        return (values - base[1]) / base[0]
+
+    def hl_window(self, start: int, end: int) -> tuple[np.ndarray, np.ndarray] | None:
+        """前复权 high/low 在 [start, end) 的取值，与对窗口调用 _compute_hl_adj 一致
+
+        窗口内因子不全为 1 时返回 None（按常规前复权）。
+        """
+        if self.unrounded is None or not np.all(self.adj_a[start:end] == 1.0):
+            return None
+        high = self.columns["high"][start:end]
+        low = self.columns["low"][start:end]
+        if self.hl_rows[start:end].all():
+            adj_h = self.unrounded[0][start:end]
+            adj_l = self.unrounded[1][start:end]
+            range_f = float(adj_h.max() - adj_l.min())
+            range_r = float(high.max() - low.min())
+            if range_f != range_r:
+                adj_b_bias = abs(float(self.adj_b[end - 1]) - round(float(self.adj_b[end - 1]), 2))
+                if adj_b_bias > 0.003:
+                    return adj_h, adj_l  # float64 bypass
+        return high, low
+
+
+def _history_values(
+    source: Any,
+    fields: list[str],
+    start: int,
+    end: int,
+    adjusted: _AdjustedPrices | None = None,
+    base: tuple[Any, Any] | None = None,
+    overrides: dict[str, np.ndarray] | None = None,
+) -> dict[str, np.ndarray]:
+    """取单只股票 [start, end) 行的各字段值，价格字段取自物化的复权价"""
+    values = {}
+    for field_name in fields:
+        if field_name not in source.columns:
+            continue
+        if adjusted is not None and field_name in adjusted.columns:
+            if base is not None and not (overrides and field_name in overrides):
+                values[field_name] = adjusted.window(field_name, start, end, base)
+                continue
+            if overrides and field_name in overrides:
+                window = overrides[field_name]
+            else:
+                window = adjusted.window(field_name, start, end)
+            # 切片是物化复权价的视图，复制一份，调用方（如 is_dict 结果）修改时不影响缓存
+            values[field_name] = window.copy()
+        else:
+            values[field_name] = column_values(source, field_name, start, end)
+    return values
+
+
+class _HistoryPanel:
+    """get_history 日线多股票结果的面板化拼装
+
+    行情窗口与交易日历逐日对齐的股票只登记数据源与行区间；取数时按字段把各股票窗口
+    切入预分配的 (count × 股票数) 数组，dypre 的基准缩放在整块数组上一次算完。需要补齐日期的
+    股票（停牌、新上市）仍由 get_history 逐只算好，取数时按股票顺序并入。各股票结果都已对齐到
+    同一组交易日，拼装时不再逐股票 reindex，结果与逐股票拼装逐位一致。
+    """
+
+    def __init__(self, n_rows: int):
+        self.n_rows = n_rows
+        # {stock: (数据源, start, end, 物化的复权价或 None, dypre 基准或 None, 覆盖列)}
+        self._windows: dict[str, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def add_window(
+        self,
+        stock: str,
+        source: Any,
+        start: int,
+        end: int,
+        adjusted: _AdjustedPrices | None = None,
+        base: tuple[Any, Any] | None = None,
+        overrides: dict[str, np.ndarray] | None = None,
+    ) -> None:
+        self._windows[stock] = (source, start, end, adjusted, base, overrides or {})
+
+    def columns(self, field_name: str, stocks: list[str], result: dict) -> tuple[list[str], list[np.ndarray]]:
+        """按股票顺序返回 field_name 的列名与列值，逐只计算的股票从 result 取"""
+        names = []
+        values = []
+        rescaled = []
+        for stock in stocks:
+            window = self._windows.get(stock)
+            if window is None:
+                stock_result = result.get(stock)
+                if stock_result is not None and field_name in stock_result:
+                    names.append(stock)
+                    values.append(stock_result[field_name])
+                continue
+            source, start, end, adjusted, base, overrides = window
+            if field_name not in source.columns:
+                continue
+            names.append(stock)
+            if field_name in overrides:
+                values.append(overrides[field_name])
+            elif adjusted is not None and field_name in adjusted.columns:
+                values.append(adjusted.window(field_name, start, end))
+                if base is not None:
+                    rescaled.append((len(values) - 1, base))
+            else:
+                values.append(column_values(source, field_name, start, end))
+        if rescaled:
+            block = np.stack([values[pos] for pos, _ in rescaled], axis=1)
+            adj_a_base = np.array([base[0] for _, base in rescaled])
+            adj_b_base = np.array([base[1] for _, base in rescaled])
+            block = (block - adj_b_base) / adj_a_base
+            for column, (pos, _) in enumerate(rescaled):
+                values[pos] = block[:, column]
+        return names, values
+
+    def frame(self, names: list[str], values: list[np.ndarray], index: Any) -> pd.DataFrame:
+        """columns() 结果的 (日期 × 股票) DataFrame；各列 dtype 一致时由预分配数组一次构造"""
+        if values and all(v.dtype == values[0].dtype for v in values):
+            block = np.empty((self.n_rows, len(values)), dtype=values[0].dtype)
+            for column, v in enumerate(values):
+                block[:, column] = v
+            return _PTradeDataFrame(block, index=index, columns=names)
+        return _PTradeDataFrame(dict(zip(names, values)), index=index)
+
+
 def _build_date_index(index: pd.DatetimeIndex) -> tuple[dict[int, int], np.ndarray]:
     """Build the shared fast date lookup contract used by all daily data paths."""
-    idx_i8 = _datetime_index_ns(index)
+    return _build_date_index_ns(_datetime_index_ns(index))
+
+
+def _build_date_index_ns(idx_i8: np.ndarray) -> tuple[dict[int, int], np.ndarray]:
+    """Same contract as _build_date_index, from an int64 nanosecond array."""
     return {int(date_value): idx for idx, date_value in enumerate(idx_i8)}, idx_i8
 
 
+def _source_date_index(source: Any) -> Optional[tuple[dict[int, int], np.ndarray]]:
+    """Date lookup for a DataFrame or columnar view; None for unsupported sources."""
+    if isinstance(source, SymbolArrays):
+        return _build_date_index_ns(source.dates)
+    if isinstance(source, pd.DataFrame) and isinstance(source.index, pd.DatetimeIndex):
+        return _build_date_index(source.index)
+    return None
+
+
 def validate_lifecycle(func: Callable) -> Callable:
     """生命周期验证装饰器
 
@@ -327,13 +601,17 @@ class PtradeAPI:
         self._stock_status_cache = LRUCache(maxsize=50000)
         self._stock_date_index: dict[str, tuple[dict[int, int], np.ndarray]] = {}
         self._prebuilt_index: bool = False
-        self._sorted_status_dates: Optional[list[str]] = None
+        self._stock_status: Optional[StockStatusStore] = None
         self._daily_tasks: list[tuple[Callable, str]] = []  # (func, time_str)
-        self._history_cache = LRUCache(maxsize=config.cache.history_cache_size)
+        self._history_cache = SizedLRUCache('PtradeAPI.history', maxsize=config.cache.history_cache_size)
         self._history_cache_date: Optional[pd.Timestamp] = None
+        # get_history 日线滚动窗口：{键: (数据版本, 窗口交易日, {股票: 行情行终点}, {字段: {股票: 值}})}，跨交易日保留
+        self._history_windows = SizedLRUCache('PtradeAPI.history_windows', maxsize=config.cache.history_cache_size)
         self._fundamentals_cache = LRUCache(maxsize=500)
-        self._sorted_index_dates: Optional[list[str]] = None
-        self._adj_alignment_cache: dict[tuple[object, ...], bool] = {}
+        self._index_constituents: Optional[IndexConstituents] = None
+        self._adj_alignment_cache: dict[tuple[object, ...], int | np.ndarray] = {}
+        # 物化的复权价：{(股票, 'pre'/'post', 数据版本): _AdjustedPrices}，跨交易日保留
+        self._adjusted_cache = SizedLRUCache('PtradeAPI.adjusted', maxsize=config.cache.history_cache_size)
         getattr(self.data_context, "register_api", lambda _: None)(self)
         # 实盘模拟: 订单/成交回调队列
         self._pending_order_callbacks: list[dict] = []
@@ -373,9 +651,9 @@ class PtradeAPI:
             if (i + 1) % 1000 == 0:
                 print(t("api.prebuild_progress", done=i + 1, total=len(target_stocks)))
             try:
-                stock_df = self.data_context.stock_data_dict[stock]
-                if isinstance(stock_df, pd.DataFrame) and isinstance(stock_df.index, pd.DatetimeIndex):
-                    self._stock_date_index[stock] = _build_date_index(stock_df.index)
+                date_index = _source_date_index(get_symbol_source(self.data_context.stock_data_dict, stock))
+                if date_index is not None:
+                    self._stock_date_index[stock] = date_index
             except Exception:
                 pass
 
@@ -392,19 +670,15 @@ class PtradeAPI:
         if stock not in self._stock_date_index:
             stock_df = None
             if stock in self.data_context.stock_data_dict:
-                stock_df = self.data_context.stock_data_dict[stock]
+                stock_df = get_symbol_source(self.data_context.stock_data_dict, stock)
             elif stock in self.data_context.benchmark_data:
                 stock_df = self.data_context.benchmark_data[stock]
 
-            if (
-                stock_df is not None
-                and isinstance(stock_df, pd.DataFrame)
-                and isinstance(stock_df.index, pd.DatetimeIndex)
-            ):
-                # int64 nanoseconds 作为 dict key，避免 pd.Timestamp 构造开销
-                self._stock_date_index[stock] = _build_date_index(stock_df.index)
-            else:
-                self._stock_date_index[stock] = ({}, np.array([], dtype="i8"))
+            # int64 nanoseconds 作为 dict key，避免 pd.Timestamp 构造开销
+            date_index = _source_date_index(stock_df)
+            if date_index is None:
+                date_index = ({}, np.array([], dtype="i8"))
+            self._stock_date_index[stock] = date_index
         return self._stock_date_index[stock]
 
     def _resolve_daily_index(self, stock: str, stock_df: pd.DataFrame, query_dt: pd.Timestamp) -> Optional[int]:
@@ -432,6 +706,46 @@ class PtradeAPI:
             return None
         return int(pos)
 
+    def _adjusted_prices(self, stock: str, fq: str, data_source: Any = None) -> Optional[_AdjustedPrices]:
+        """股票日线全序列的复权价（fq 为 'pre'/'dypre'/'post'），无复权因子时返回 None
+
+        按 (股票, 复权类型, 数据版本) 缓存，dypre 与前复权共用一份。
+        """
+        kind = "post" if fq == "post" else "pre"
+        adj_cache = self.data_context.adj_post_cache if kind == "post" else self.data_context.adj_pre_cache
+        if not adj_cache:
+            return None
+        data_version = getattr(self.data_context, "data_version", None)
+        key = (stock, kind, data_version)
+        adjusted = self._adjusted_cache.get(key)
+        if adjusted is not None:
+            return adjusted
+        adj_factors = get_symbol_source(adj_cache, stock)
+        if adj_factors is None:
+            return None
+        if data_source is None:
+            data_source = self._get_daily_source(stock)
+            if data_source is None:
+                return None
+        # 因子行与行情行的对齐关系同样按数据版本缓存
+        alignment = self._adj_alignment_cache.get(key)
+        if alignment is None:
+            alignment = _adj_alignment(index_ns(adj_factors), index_ns(data_source))
+            self._adj_alignment_cache[key] = alignment
+        adjusted = _AdjustedPrices(data_source, adj_factors, alignment, kind)
+        self._adjusted_cache[key] = adjusted
+        return adjusted
+
+    @staticmethod
+    def _adjusted_rows(adjusted: Optional[_AdjustedPrices], stock_df: pd.DataFrame) -> Optional[tuple[int, int]]:
+        """stock_df 可直接取物化复权价时返回其行区间 [start, end)，否则返回 None（按原逻辑逐次复权）"""
+        if adjusted is None or not adjusted.exact:
+            return None
+        price_cols = _ADJ_PRICE_FIELDS.intersection(stock_df.columns)
+        if not price_cols.issubset(adjusted.columns) or any(stock_df[col].dtype != np.float64 for col in price_cols):
+            return None
+        return adjusted.rows(stock_df)
+
     def _apply_adj_factors(self, stock_df: pd.DataFrame, stock: str, fq: str) -> pd.DataFrame:
         """对DataFrame应用复权因子（向量化）
 
@@ -453,6 +767,22 @@ class PtradeAPI:
         if not adj_cache or stock not in adj_cache:
             return stock_df
 
+        adjusted = self._adjusted_prices(stock, fq)
+        rows = self._adjusted_rows(adjusted, stock_df)
+        if rows is not None:
+            # 行情行均有同日因子：直接取物化的复权价，不再逐次计算
+            start, end = rows
+            adjusted_df = stock_df.copy()
+            hl_window = None
+            if fq == "pre" and "high" in adjusted_df.columns and "low" in adjusted_df.columns:
+                hl_window = adjusted.hl_window(start, end)
+            for col in _ADJ_PRICE_FIELDS.intersection(adjusted_df.columns):
+                if hl_window is not None and col in ("high", "low"):
+                    adjusted_df.loc[:, col] = hl_window[0] if col == "high" else hl_window[1]
+                else:
+                    adjusted_df.loc[:, col] = adjusted.window(col, start, end)
+            return adjusted_df
+
         adj_factors = adj_cache[stock]
         common_idx = stock_df.index.intersection(adj_factors.index)
         if len(common_idx) == 0:
@@ -885,11 +1215,13 @@ class PtradeAPI:
 
         # 只为缓存中不存在的股票计算索引（增量更新）
         stocks_to_index = [s for s in stocks if s not in date_indices and s in data_dict]
+        # 批量取出（按需加载模式下缓存未命中的股票并行读取）
+        frames = get_frames(data_dict, stocks_to_index)
 
         if stocks_to_index:
             for stock in stocks_to_index:
                 try:
-                    df = data_dict[stock]
+                    df = frames.get(stock)
                     if df is None or len(df) == 0:
                         continue
 
@@ -946,18 +1278,19 @@ class PtradeAPI:
             for stock in stocks:
                 if stock in close_prices:
                     continue
-                stock_df = self.data_context.stock_data_dict.get(stock)
-                if stock_df is not None and isinstance(stock_df, pd.DataFrame) and not stock_df.empty:
-                    idx = _datetime_index_ns(stock_df.index).searchsorted(query_ts.value, side="right")
-                    if idx > 0 and stock_df["volume"].values[idx - 1] > 0:
-                        close_prices[stock] = stock_df["close"].values[idx - 1]
+                stock_df = get_symbol_source(self.data_context.stock_data_dict, stock)
+                if isinstance(stock_df, (pd.DataFrame, SymbolArrays)) and not stock_df.empty:
+                    idx = index_ns(stock_df).searchsorted(query_ts.value, side="right")
+                    if idx > 0 and column_value(stock_df, "volume", idx - 1) > 0:
+                        close_prices[stock] = column_value(stock_df, "close", idx - 1)
 
+        frames.update(get_frames(data_dict, [s for s in stocks if s in date_indices and s not in frames]))
         for stock in stocks:
             if stock not in date_indices:
                 continue
 
             try:
-                df = data_dict[stock]
+                df = frames[stock] if stock in frames else data_dict[stock]
                 if df is None or len(df) == 0:
                     continue
 
@@ -1164,12 +1497,43 @@ class PtradeAPI:
             out["price"] = out["close"]
         return out
 
+    def _adjusted_daily_frame(self, daily_df: pd.DataFrame, stock: str, fq: str) -> pd.DataFrame:
+        """整段日线的前/后复权 DataFrame，随物化的复权价一起缓存，周/月线聚合不再每次复制复权"""
+        adjusted = self._adjusted_prices(stock, fq)
+        if adjusted is None or self._adjusted_rows(adjusted, daily_df) != (0, len(adjusted.dates)):
+            return self._apply_adj_factors(daily_df, stock, fq)
+        frame = adjusted.frame
+        if frame is None or not frame.index.equals(daily_df.index) or not frame.columns.equals(daily_df.columns):
+            frame = adjusted.frame = self._apply_adj_factors(daily_df, stock, fq)
+            # 重新登记以计入 DataFrame 的内存
+            key = (stock, "post" if fq == "post" else "pre", getattr(self.data_context, "data_version", None))
+            self._adjusted_cache[key] = adjusted
+        return frame
+
     def _apply_dypre_to_daily(
         self, stock_df: pd.DataFrame, stock: str, base_dt: pd.Timestamp | None = None
     ) -> pd.DataFrame:
         adj_cache = self.data_context.adj_pre_cache
         if not adj_cache or stock not in adj_cache:
             return stock_df
+
+        adjusted = self._adjusted_prices(stock, "dypre")
+        rows = self._adjusted_rows(adjusted, stock_df)
+        if rows is not None:
+            start, end = rows
+            if base_dt is None:
+                base_row = end - 1
+            else:
+                pos = stock_df.index.searchsorted(base_dt, side="right") - 1
+                if pos < 0:
+                    return stock_df
+                base_row = start + pos
+            base = (float(adjusted.adj_a[base_row]), float(adjusted.adj_b[base_row]))
+            adjusted_df = stock_df.copy()
+            for col in _ADJ_PRICE_FIELDS.intersection(adjusted_df.columns):
+                adjusted_df.loc[:, col] = adjusted.window(col, start, end, base)
+            return adjusted_df
+
         adj_factors = adj_cache[stock]
         common_idx = stock_df.index.intersection(adj_factors.index)
         if len(common_idx) == 0:
@@ -1197,14 +1561,30 @@ class PtradeAPI:
         return adjusted_df
 
     def _get_stock_df_by_frequency(
-        self, stock: str, frequency: str, fq: str | None = None, base_dt: pd.Timestamp | None = None
+        self,
+        stock: str,
+        frequency: str,
+        fq: str | None = None,
+        base_dt: pd.Timestamp | None = None,
+        count: int | None = None,
+        since: pd.Timestamp | None = None,
+        source: Optional[pd.DataFrame] = None,
     ) -> Optional[pd.DataFrame]:
-        """按频率获取单只标的数据，统一处理别名、聚合和money字段兼容。"""
+        """按频率获取单只标的数据，统一处理别名、聚合和money字段兼容。
+
+        count/since 为分钟频需要覆盖的 bar 数/起始时间，分钟线为滑动窗口时据此补足历史。
+        source 为已批量取出的数据字典条目（get_many 结果），None 时逐只查找。
+        """
         if frequency in _MINUTE_FREQ_MINUTES:
             base = self.data_context.stock_data_dict_1m
             if base is None or stock not in base:
                 return None
-            df = base[stock]
+            history = getattr(base, "history", None)
+            if history is not None:
+                bars = (count + 1) * _MINUTE_FREQ_MINUTES[frequency] if count is not None else None
+                df = history(stock, bars=bars, since=since)
+            else:
+                df = source if source is not None else base[stock]
             if frequency != "1m":
                 df = self._aggregate_intraday_kline(
                     df, _MINUTE_FREQ_MINUTES[frequency]
@@ -1213,21 +1593,25 @@ class PtradeAPI:
 
         if frequency in _PERIOD_FREQ_RULE:
             base = self.data_context.stock_data_dict
-            if stock in base:
+            if source is not None:
+                daily_df = source
+            elif stock in base:
                 daily_df = base[stock]
             elif stock in self.data_context.benchmark_data:
                 daily_df = self.data_context.benchmark_data[stock]
             else:
                 return None
             if fq in ("pre", "post"):
-                daily_df = self._apply_adj_factors(daily_df, stock, fq)
+                daily_df = self._adjusted_daily_frame(daily_df, stock, fq)
             elif fq == "dypre":
                 daily_df = self._apply_dypre_to_daily(daily_df, stock, base_dt)
             df = self._aggregate_kline(daily_df, _PERIOD_FREQ_RULE[frequency])
             return self._ensure_standard_columns(df)
 
         base = self.data_context.stock_data_dict
-        if stock in base:
+        if source is not None:
+            df = source
+        elif stock in base:
             df = base[stock]
         elif stock in self.data_context.benchmark_data:
             df = self.data_context.benchmark_data[stock]
@@ -1235,6 +1619,20 @@ class PtradeAPI:
             return None
         return self._ensure_standard_columns(df)
 
+    def _get_daily_source(self, stock: str, source: Any = None) -> Any:
+        """日线数据源：优先返回列式视图（不还原 DataFrame），否则同 _get_stock_df_by_frequency。
+
+        source 为已批量取出的 stock_data_dict 条目（get_symbol_sources 结果），None 时逐只查找。
+        """
+        if source is None:
+            get_arrays = getattr(self.data_context.stock_data_dict, "get_arrays", None)
+            source = get_arrays(stock) if get_arrays is not None else None
+        if isinstance(source, SymbolArrays):
+            return source.with_aliases({"money": "amount", "price": "close"})
+        if source is not None:
+            return self._ensure_standard_columns(source)
+        return self._get_stock_df_by_frequency(stock, "1d")
+
     @staticmethod
     def _fill_minute_gaps(df: pd.DataFrame, minutes: int, fill: str) -> pd.DataFrame:
         if df.empty:
@@ -1359,7 +1757,7 @@ class PtradeAPI:
             end_dt = pd.Timestamp(end_date) if end_date else pd.Timestamp(self.context.current_dt)
             result = {}
             for stock in stocks:
-                stock_df = self._get_stock_df_by_frequency(stock, frequency, fq=fq, base_dt=end_dt)
+                stock_df = self._get_stock_df_by_frequency(stock, frequency, fq=fq, base_dt=end_dt, count=count)
                 if not isinstance(stock_df, pd.DataFrame):
                     continue
 
@@ -1394,7 +1792,7 @@ class PtradeAPI:
 
             result = {}
             for stock in stocks:
-                stock_df = self._get_stock_df_by_frequency(stock, frequency, fq=fq, base_dt=end_dt)
+                stock_df = self._get_stock_df_by_frequency(stock, frequency, fq=fq, base_dt=end_dt, since=start_dt)
                 if not isinstance(stock_df, pd.DataFrame):
                     continue
 
@@ -1415,27 +1813,7 @@ class PtradeAPI:
                         result[stock] = self._apply_adj_factors(stock_df, stock, fq)
                     else:
                         # dypre: 以区间末端为基准做动态前复权
-                        adj_cache = self.data_context.adj_pre_cache
-                        if not adj_cache or stock not in adj_cache:
-                            continue
-                        adj_factors = adj_cache[stock]
-                        common_idx = stock_df.index.intersection(adj_factors.index)
-                        if len(common_idx) == 0:
-                            continue
-
-                        adj_a = adj_factors.loc[common_idx, "adj_a"]
-                        adj_b = adj_factors.loc[common_idx, "adj_b"]
-                        base_idx = common_idx[-1]
-                        adj_a_base = float(adj_factors.loc[base_idx, "adj_a"])
-                        adj_b_base = float(adj_factors.loc[base_idx, "adj_b"])
-
-                        adjusted_df = stock_df.copy()
-                        for col in ("open", "high", "low", "close"):
-                            if col in adjusted_df.columns:
-                                raw = adjusted_df.loc[common_idx, col].astype(float).values
-                                adj_val = _round2(adj_a.values * raw + adj_b.values)
-                                adjusted_df.loc[common_idx, col] = (adj_val - adj_b_base) / adj_a_base
-                        result[stock] = adjusted_df
+                        result[stock] = self._apply_dypre_to_daily(stock_df, stock)
 
         if not result:
             self.log.warning(t("api.get_price_empty", stocks=security, frequency=frequency, fq=fq))
@@ -1518,9 +1896,14 @@ class PtradeAPI:
         query_dt = pd.Timestamp(date) if date else self.context.current_dt
         result = OrderedDict()
 
-        if self.data_context.stock_data_dict_1m is not None:
+        minute_data = self.data_context.stock_data_dict_1m
+        if minute_data is not None:
+            history = getattr(minute_data, "history", None)
             for stock in stocks:
-                stock_df = self.data_context.stock_data_dict_1m.get(stock)
+                if history is not None:
+                    stock_df = history(stock, since=query_dt.normalize()) if stock in minute_data else None
+                else:
+                    stock_df = minute_data.get(stock)
                 if stock_df is None or not isinstance(stock_df, pd.DataFrame) or stock_df.empty:
                     continue
                 day_mask = stock_df.index.normalize() == query_dt.normalize()
@@ -1698,6 +2081,8 @@ class PtradeAPI:
         is_single_stock = isinstance(security_list, str)
         field_key = tuple(fields) if len(fields) > 1 else fields[0]
         data_version = getattr(self.data_context, "data_version", None)
+        # 补载数据会重读交易日历，窗口依赖日历的缓存随之失效
+        calendar_key = self._calendar_key()
         cache_key = (
             id(self.data_context),
             data_version,
@@ -1712,6 +2097,7 @@ class PtradeAPI:
             fill,
             is_dict,
             frequency,
+            calendar_key,
         )
 
         # 检查缓存
@@ -1719,17 +2105,35 @@ class PtradeAPI:
             return self._history_cache[cache_key]
 
         # 根据frequency选择数据源
-        # 优化1: 批量预加载股票数据（减少LazyDataDict的重复加载）
+        # 优化1: 批量预加载股票数据（按需加载模式下缓存未命中的股票并行读取）
+        daily_sources = {}
+        prefetched = {}
+        if frequency == "1d":
+            stock_data_dict = self.data_context.stock_data_dict
+            daily_sources = get_symbol_sources(stock_data_dict, [s for s in stocks if s in stock_data_dict])
+        else:
+            source_dict = (
+                self.data_context.stock_data_dict_1m
+                if frequency in _MINUTE_FREQ_MINUTES
+                else self.data_context.stock_data_dict
+            )
+            if hasattr(source_dict, "get_many"):
+                prefetched = source_dict.get_many(stocks)
         stock_dfs = {}
         for stock in stocks:
-            data_source = self._get_stock_df_by_frequency(stock, frequency, fq=fq, base_dt=current_dt)
+            if frequency == "1d":
+                data_source = self._get_daily_source(stock, daily_sources.get(stock))
+            else:
+                data_source = self._get_stock_df_by_frequency(
+                    stock, frequency, fq=fq, base_dt=current_dt, count=count, source=prefetched.get(stock)
+                )
             if data_source is not None:
                 stock_dfs[stock] = data_source
 
         # 优化2: 批量获取索引位置
         stock_info = {}
         for stock, data_source in stock_dfs.items():
-            if not isinstance(data_source, pd.DataFrame):
+            if not isinstance(data_source, (pd.DataFrame, SymbolArrays)):
                 continue
             try:
                 if frequency in _MINUTE_FREQ_MINUTES or frequency in _PERIOD_FREQ_RULE:
@@ -1764,7 +2168,6 @@ class PtradeAPI:
         needs_adj_pre = frequency == "1d" and fq == "pre" and self.data_context.adj_pre_cache
         needs_adj_dypre = frequency == "1d" and fq == "dypre" and self.data_context.adj_pre_cache
         needs_adj_post = frequency == "1d" and fq == "post" and self.data_context.adj_post_cache
-        price_fields = {"open", "high", "low", "close"}
         daily_target_dates = None
         calendar = None
         if frequency == "1d" and self.data_context.trade_days is not None:
@@ -1773,6 +2176,32 @@ class PtradeAPI:
             valid_dates = calendar[calendar <= cutoff] if include else calendar[calendar < cutoff]
             daily_target_dates = valid_dates[-count:]
 
+        # 日线多股票 DataFrame/PanelLike：窗口与交易日历对齐的股票交给面板整块切片与复权
+        panel = None
+        rolling_key = rolling = None
+        ends = {}
+        if daily_target_dates is not None and not is_dict and not is_single_stock:
+            panel = _HistoryPanel(len(daily_target_dates))
+            target_ns = _datetime_index_ns(daily_target_dates)
+            # 滚动窗口：逐日调用时上一交易日的窗口去掉最早一行、补上最新一行即为当日窗口。
+            # dypre 整窗按当日基准重算，前复权 high/low 的取舍依赖整窗区间，fill="pre" 的
+            # bfill 依赖窗口内后续行，这些情况逐日完整重建
+            if (
+                count > 1
+                and len(daily_target_dates) == count
+                and fill == "nan"
+                and fq != "dypre"
+                and not (fq == "pre" and "high" in fields and "low" in fields)
+            ):
+                rolling_key = (id(self.data_context), profile, tuple(stocks), field_key, fq, count, frequency, include)
+                state = self._history_windows.get(rolling_key)
+                if (
+                    state is not None
+                    and state[0] == data_version
+                    and np.array_equal(state[1][1:], target_ns[:-1])
+                ):
+                    rolling = state
+
         for stock, (data_source, current_idx) in stock_info.items():
             if include:
                 start_idx = max(0, current_idx - count + 1)
@@ -1784,64 +2213,54 @@ class PtradeAPI:
                 if end_idx == 0 and current_idx == 0:
                     end_idx = 1
 
-            adj_factors = None
-            adj_a = adj_b = None
-
-            if (needs_adj_pre or needs_adj_dypre) and stock in self.data_context.adj_pre_cache:
-                adj_factors = self.data_context.adj_pre_cache[stock]
-            elif needs_adj_post and stock in self.data_context.adj_post_cache:
-                adj_factors = self.data_context.adj_post_cache[stock]
-
-            if adj_factors is not None:
-                alignment_key = (stock, fq, data_version)
-                indexes_aligned = self._adj_alignment_cache.get(alignment_key)
-                if indexes_aligned is None:
-                    indexes_aligned = adj_factors.index.equals(data_source.index)
-                    self._adj_alignment_cache[alignment_key] = indexes_aligned
-                if indexes_aligned:
-                    aligned_factors = adj_factors
-                else:
-                    aligned_factors = adj_factors.reindex(data_source.index).ffill()
-                adj_a = aligned_factors["adj_a"].values[start_idx:end_idx]
-                adj_b = aligned_factors["adj_b"].values[start_idx:end_idx]
-
-            if needs_adj_dypre and adj_a is not None:
-                adj_a_base = aligned_factors["adj_a"].values[current_idx]
-                adj_b_base = aligned_factors["adj_b"].values[current_idx]
+            adjusted = None
+            if needs_adj_pre or needs_adj_dypre or needs_adj_post:
+                adjusted = self._adjusted_prices(stock, fq, data_source)
 
-            stock_result = {}
-            hl_adj = {}
+            ends[stock] = end_idx
+            previous_end = rolling[2].get(stock) if rolling is not None else None
             if (
-                needs_adj_pre
-                and adj_a is not None
-                and np.all(adj_a == 1.0)
-                and "high" in fields
-                and "low" in fields
-                and "high" in data_source.columns
-                and "low" in data_source.columns
+                previous_end is not None
+                and end_idx == previous_end + 1
+                and self.get_stock_date_index(stock)[1][end_idx - 1] == target_ns[-1]
             ):
-                hl_adj["high"], hl_adj["low"] = _compute_hl_adj(
-                    adj_b,
-                    data_source["high"].values[start_idx:end_idx],
-                    data_source["low"].values[start_idx:end_idx],
-                )
+                # 相对上一窗口只多出恰好落在最新交易日的一根 bar：只算这一行，其余行沿用上一窗口
+                row = _history_values(data_source, fields, end_idx - 1, end_idx, adjusted)
+                previous_values = {
+                    field_name: columns[stock] for field_name, columns in rolling[3].items() if stock in columns
+                }
+                if row.keys() == previous_values.keys() and all(
+                    values.dtype == previous_values[field_name].dtype for field_name, values in row.items()
+                ):
+                    if row:
+                        result[stock] = {
+                            field_name: np.concatenate((previous_values[field_name][1:], values))
+                            for field_name, values in row.items()
+                        }
+                    continue
+
+            base = None
+            if needs_adj_dypre and adjusted is not None:
+                base = adjusted.base(current_idx)
 
-            for field_name in fields:
-                if field_name not in data_source.columns:
+            hl_adj = {}
+            if needs_adj_pre and adjusted is not None and "high" in fields and "low" in fields:
+                hl_window = adjusted.hl_window(start_idx, end_idx)
+                if hl_window is not None:
+                    hl_adj["high"], hl_adj["low"] = hl_window
+
+            if panel is not None:
+                source_ns = (
+                    data_source.dates[start_idx:end_idx]
+                    if isinstance(data_source, SymbolArrays)
+                    else _datetime_index_ns(data_source.index[start_idx:end_idx])
+                )
+                if np.array_equal(source_ns, target_ns):
+                    if any(field_name in data_source.columns for field_name in fields):
+                        panel.add_window(stock, data_source, start_idx, end_idx, adjusted, base, hl_adj)
                     continue
-                raw = data_source[field_name].values[start_idx:end_idx]
-
-                if adj_a is not None and field_name in price_fields:
-                    if needs_adj_post:
-                        stock_result[field_name] = adj_a * raw + adj_b
-                    elif needs_adj_dypre:
-                        stock_result[field_name] = (_round2(adj_a * raw + adj_b) - adj_b_base) / adj_a_base
-                    elif field_name in hl_adj:
-                        stock_result[field_name] = hl_adj[field_name]
-                    else:
-                        stock_result[field_name] = _round2(adj_a * raw + adj_b)
-                else:
-                    stock_result[field_name] = raw
+
+            stock_result = _history_values(data_source, fields, start_idx, end_idx, adjusted, base, hl_adj)
 
             if stock_result and daily_target_dates is not None:
                 source_dates = data_source.index[start_idx:end_idx]
@@ -1910,9 +2329,44 @@ class PtradeAPI:
                 result[stock] = stock_result
 
         # ── 转换为返回格式（与 ptrade 对齐）──
-        if not result:
+        if not result and not panel:
             self.log.warning(t("api.get_history_empty", stocks=security_list, count=count, frequency=frequency, fq=fq))
             final_result = {} if is_dict else _PTradeDataFrame()
+        elif panel is not None:
+            # 各股票结果均已对齐到 daily_target_dates，按字段整块构造，无需逐股票 reindex
+            stocks_list = list(dict.fromkeys(stocks))
+            ref_index = daily_target_dates.to_pydatetime()
+            panel_columns = {field_name: panel.columns(field_name, stocks_list, result) for field_name in fields}
+            if rolling_key is not None:
+                self._history_windows[rolling_key] = (
+                    data_version,
+                    target_ns,
+                    ends,
+                    {field_name: dict(zip(names, values)) for field_name, (names, values) in panel_columns.items()},
+                    calendar_key,
+                )
+            if profile == "shanxi":
+                # 山西证券：MultiIndex(field, stock) + datetime 行索引
+                col_data = {}
+                for field_name, (names, values) in panel_columns.items():
+                    col_data.update(((field_name, stock), vals) for stock, vals in zip(names, values))
+                final_result = _PTradeDataFrame(col_data, index=ref_index)
+                final_result.columns = pd.MultiIndex.from_tuples(
+                    final_result.columns, names=["field", "code"]
+                )
+            else:
+                panel_data = {}
+                for field_name, (names, values) in panel_columns.items():
+                    frame = panel.frame(names, values, ref_index)
+                    if fill == "pre":
+                        frame = frame.ffill().bfill()
+                    panel_data[field_name] = frame
+                if len(fields) == 1:
+                    final_result = panel_data[fields[0]]
+                    if fields[0] == "unlimited":
+                        final_result = final_result.astype("float64", copy=False)
+                else:
+                    final_result = self.PanelLike(panel_data)
         elif is_dict:
             # 兼容历史测试契约：{stock: {field: ndarray}}
             final_result = OrderedDict()
@@ -2068,7 +2522,7 @@ class PtradeAPI:
                 else:
                     final_result[col] = final_result[col].astype("float64", copy=False)
 
-        # 缓存结果 (LRUCache自动管理大小)
+        # 缓存结果 (SizedLRUCache按条目数与内存预算自动淘汰)
         self._history_cache[cache_key] = final_result
 
         return final_result
@@ -2139,7 +2593,7 @@ class PtradeAPI:
     ) -> dict[str, bool | None] | None:
         """获取股票状态（ST/HALT/DELISTING）
 
-        基于日频 stock_status_history 数据，用 bisect 查找当日快照。
+        基于日频股票状态位图，整批股票一次查出当日快照中的状态。
         """
         if not isinstance(stocks, (str, list)):
             return None
@@ -2147,58 +2601,55 @@ class PtradeAPI:
         if isinstance(stocks, str):
             stocks = [stocks]
 
-        if query_date is None:
-            query_dt = self.context.current_dt if self.context else pd.Timestamp.now()
-        else:
-            query_dt = pd.Timestamp(query_date)
-
-        dt_value = query_dt.value
-
-        # 查找当日快照
-        status_dict = None
-        if self.data_context.stock_status_history:
-            if self._sorted_status_dates is None:
-                self._sorted_status_dates = sorted(self.data_context.stock_status_history.keys())
-            query_date_str = query_dt.strftime("%Y%m%d")
-            pos = bisect.bisect_right(self._sorted_status_dates, query_date_str)
-            if pos > 0:
-                history = self.data_context.stock_status_history[self._sorted_status_dates[pos - 1]]
-                status_dict = history.get(query_type)
-
-        result = {}
-        for stock in stocks:
-            cache_key = (dt_value, stock, query_type)
-            if cache_key in self._stock_status_cache:
-                result[stock] = self._stock_status_cache[cache_key]
-                continue
-
-            has_stock_data = (
-                stock in self.data_context.stock_data_dict
-                or (
-                    not self.data_context.stock_metadata.empty
-                    and stock in self.data_context.stock_metadata.index
-                )
-            )
-            is_match = None
-
-            # 快照路径
-            if status_dict is not None:
-                if stock in status_dict:
-                    is_match = status_dict.get(stock) is True
-                elif has_stock_data:
-                    is_match = False
-            # fallback: 无快照数据时用 volume=0 判停牌
-            elif query_type == "HALT":
-                stock_df = self.data_context.stock_data_dict.get(stock)
-                if stock_df is not None:
-                    is_match = query_dt in stock_df.index and stock_df.loc[query_dt, "volume"] == 0
-            elif has_stock_data:
-                is_match = False
+        query_dt = self._status_query_dt(query_date)
+        flags = self._status_flags(stocks, query_type, query_dt)
+        if flags is not None:
+            has_data = self._has_stock_data(stocks)
+            return {
+                stock: True if flag else (False if known else None)
+                for stock, flag, known in zip(stocks, flags, has_data, strict=True)
+            }
 
-            self._stock_status_cache[cache_key] = is_match
-            result[stock] = is_match
+        # fallback: 无快照数据时用 volume=0 判停牌
+        if query_type == "HALT":
+            return {stock: self._halted_by_volume(stock, query_dt) for stock in stocks}
+        has_data = self._has_stock_data(stocks)
+        return {stock: False if known else None for stock, known in zip(stocks, has_data, strict=True)}
 
-        return result
+    def _status_query_dt(self, query_date: str | None) -> pd.Timestamp:
+        if query_date is None:
+            return self.context.current_dt if self.context else pd.Timestamp.now()
+        return pd.Timestamp(query_date)
+
+    def _status_flags(self, stocks: list[str], query_type: str, query_dt: pd.Timestamp) -> Optional[np.ndarray]:
+        """当日快照中的状态位；无快照时返回 None"""
+        if self._stock_status is None:
+            self._stock_status = StockStatusStore.coerce(self.data_context.stock_status_history)
+            if self._stock_status is None:
+                return None
+        date = query_dt.year * 10000 + query_dt.month * 100 + query_dt.day
+        return self._stock_status.flags(stocks, query_type, date)
+
+    def _has_stock_data(self, stocks: list[str]) -> np.ndarray:
+        """股票是否有行情或元数据"""
+        stock_data_dict = self.data_context.stock_data_dict
+        has_data = np.fromiter((stock in stock_data_dict for stock in stocks), dtype=bool, count=len(stocks))
+        metadata = self.data_context.stock_metadata
+        if not metadata.empty:
+            has_data |= pd.Index(stocks).isin(metadata.index)
+        return has_data
+
+    def _halted_by_volume(self, stock: str, query_dt: pd.Timestamp) -> bool | None:
+        """按当日成交量为 0 判断停牌；无行情时返回 None"""
+        cache_key = (query_dt.value, stock)
+        if cache_key in self._stock_status_cache:
+            return self._stock_status_cache[cache_key]
+        is_halted = None
+        stock_df = self.data_context.stock_data_dict.get(stock)
+        if stock_df is not None:
+            is_halted = bool(query_dt in stock_df.index and stock_df.loc[query_dt, "volume"] == 0)
+        self._stock_status_cache[cache_key] = is_halted
+        return is_halted
 
     def get_stock_exrights(self, stock_code: str, date: str | int | datetime_date | None = None) -> Optional[pd.DataFrame]:
         """获取股票除权除息信息"""
@@ -2252,13 +2703,10 @@ class PtradeAPI:
         """获取指数成份股（支持向前回溯查找）"""
         original_code = index_code
         index_code_norm = _normalize_code(index_code)
-        if not self.data_context.index_constituents:
-            return []
-
-        # 缓存排序后的日期列表（避免每次调用重排序）
-        if self._sorted_index_dates is None:
-            self._sorted_index_dates = sorted(self.data_context.index_constituents.keys())
-        available_dates = self._sorted_index_dates
+        if self._index_constituents is None:
+            self._index_constituents = IndexConstituents.coerce(self.data_context.index_constituents)
+            if self._index_constituents is None:
+                return []
 
         # 如果未指定日期，使用回测当前日期
         if date is None:
@@ -2276,25 +2724,17 @@ class PtradeAPI:
                 last_day = calendar.monthrange(year, month)[1]
                 query_date = "%04d%02d%02d" % (year, month, last_day)
 
-        # 使用 bisect 找到小于等于 date 的最近日期
-        idx = bisect.bisect_right(available_dates, query_date)
-
         # 兼容多种后缀写法：优先原始，再试归一化（如 XSHG->SS）
         index_candidates = [original_code]
         if index_code_norm != original_code:
             index_candidates.append(index_code_norm)
 
-        if idx > 0:
-            # 向前查找包含该指数数据的最近日期
-            for i in range(idx - 1, -1, -1):
-                nearest_date = available_dates[i]
-                constituents = self.data_context.index_constituents[nearest_date]
-                for code in index_candidates:
-                    if code in constituents:
-                        result = constituents[code]
-                        return list(result) if hasattr(result, "__iter__") else []
-
-        return []
+        # 各指数有独立的快照日数组，直接二分到包含该指数的最近快照
+        members = self._index_constituents.members(index_candidates, int(query_date))
+        if members is None:
+            return []
+        self._prefetch(members)
+        return members
 
     @validate_lifecycle
     def get_instruments(self, contract: str | None = None) -> pd.DataFrame:
@@ -2367,16 +2807,18 @@ class PtradeAPI:
         else:
             query_dt = pd.Timestamp(query_date)
 
+        stock_data_dict = self.data_context.stock_data_dict
+        sources = get_symbol_sources(stock_data_dict, [s for s in securities if s in stock_data_dict])
         result = {}
         for stock in securities:
             status = 0
 
-            if stock not in self.data_context.stock_data_dict:
+            if stock not in sources:
                 result[stock] = status
                 continue
 
-            stock_df = self.data_context.stock_data_dict[stock]
-            if not isinstance(stock_df, pd.DataFrame):
+            stock_df = sources[stock]
+            if not isinstance(stock_df, (pd.DataFrame, SymbolArrays)):
                 result[stock] = status
                 continue
 
@@ -2390,9 +2832,9 @@ class PtradeAPI:
                     result[stock] = status
                     continue
 
-                current_high = stock_df["high"].values[idx]
-                current_low = stock_df["low"].values[idx]
-                prev_close = stock_df["close"].values[idx - 1]
+                current_high = column_value(stock_df, "high", idx)
+                current_low = column_value(stock_df, "low", idx)
+                prev_close = column_value(stock_df, "close", idx - 1)
 
                 if np.isnan(prev_close) or prev_close <= 0:  # type: ignore
                     result[stock] = status
@@ -2404,7 +2846,7 @@ class PtradeAPI:
 
                 # 回测中不能使用当天收盘价判断涨停（会产生未来数据泄露）
                 # 只检查一字涨停（开盘=最高=最低=涨停价）
-                current_open = stock_df["open"].values[idx]
+                current_open = column_value(stock_df, "open", idx)
 
                 # 涨停判断：一字涨停（无法买入）
                 is_one_word_up_limit = (
@@ -2441,13 +2883,22 @@ class PtradeAPI:
         if filter_type is None:
             filter_type = ["ST", "HALT", "DELISTING"]
 
-        filtered = list(stocks)
+        stocks = list(stocks)
+        query_dt = self._status_query_dt(query_date)
+        excluded = np.zeros(len(stocks), dtype=bool)
         for status_type in filter_type:
-            status_map = self.get_stock_status(filtered, query_type=status_type, query_date=query_date)
-            filtered = [s for s in filtered if not status_map.get(s, False)]
-            if not filtered:
-                break
-        return filtered
+            flags = self._status_flags(stocks, status_type, query_dt)
+            if flags is None:
+                if status_type != "HALT":
+                    continue
+                # 无快照数据时用 volume=0 判停牌
+                flags = np.fromiter(
+                    (not excluded[i] and self._halted_by_volume(stock, query_dt) is True
+                     for i, stock in enumerate(stocks)),
+                    dtype=bool, count=len(stocks),
+                )
+            excluded |= flags
+        return [stock for stock, drop in zip(stocks, excluded, strict=True) if not drop]
 
     @validate_lifecycle
     def get_current_kline_count(self) -> int:
@@ -3252,6 +3703,15 @@ class PtradeAPI:
         # 都不存在，警告
         self.log.warning(t("api.benchmark_not_found", benchmark=benchmark))
 
+    def _prefetch(self, stocks) -> None:
+        """通知按需加载的数据字典在后台预热即将访问的标的"""
+        if not config.cache.prefetch_lazy_data:
+            return
+        for name in _PREFETCH_DICTS:
+            prefetch = getattr(getattr(self.data_context, name, None), 'prefetch', None)
+            if prefetch is not None:
+                prefetch(stocks)
+
     @validate_lifecycle
     def set_universe(self, security_list: str | list[str]) -> None:
         """设置股票池并预加载数据"""
@@ -3263,13 +3723,14 @@ class PtradeAPI:
                 self.log.debug(f"预加载 {len(to_preload)} 只新股票数据")
                 for stock in to_preload:
                     if stock in self.data_context.stock_data_dict:
-                        _ = self.data_context.stock_data_dict[stock]
+                        _ = get_symbol_source(self.data_context.stock_data_dict, stock)
+                self._prefetch(sorted(to_preload))
             self.active_universe = new_stocks
             self.log.debug(f"股票池更新: {len(self.active_universe)} 只")
         else:
             self.active_universe = set([stocks])
             if stocks in self.data_context.stock_data_dict:
-                _ = self.data_context.stock_data_dict[stocks]
+                _ = get_symbol_source(self.data_context.stock_data_dict, stocks)
             self.log.debug(f"设置股票池: {stocks}")
 
     def is_trade(self) -> bool:
@@ -3738,14 +4199,81 @@ class PtradeAPI:
 
         return cci
 
-    def _clear_data_caches(self) -> None:
-        """Clear instance caches derived from the active data source."""
+    def _calendar_key(self) -> Optional[tuple[int, int]]:
+        """Identify the trade calendar (length and last day); changes when appended data reloads it."""
+        trade_days = self.data_context.trade_days
+        if trade_days is None or not len(trade_days):
+            return None
+        return len(trade_days), pd.Timestamp(trade_days[-1]).value
+
+    def _clear_data_caches(self, symbols: Optional[set[str]] = None, previous_version: Optional[int] = None) -> None:
+        """Clear instance caches derived from the active data source.
+
+        With symbols given (data appended in place), only entries of those symbols are dropped;
+        version-keyed entries of other symbols move from previous_version to the current version.
+        History results and rolling windows built on a different trade calendar are dropped as well.
+        """
+        if symbols is not None:
+            self._invalidate_symbols(set(symbols), previous_version)
+            return
         self._stock_status_cache.clear()
         self._stock_date_index.clear()
         self._prebuilt_index = False
-        self._sorted_status_dates = None
+        self._stock_status = None
         self._history_cache.clear()
         self._history_cache_date = None
+        self._history_windows.clear()
         self._fundamentals_cache.clear()
-        self._sorted_index_dates = None
+        self._index_constituents = None
         self._adj_alignment_cache.clear()
+        self._adjusted_cache.clear()
+
+    def _invalidate_symbols(self, symbols: set[str], previous_version: Optional[int]) -> None:
+        """Drop cache entries of symbols whose data was appended; keep the rest valid."""
+        version = getattr(self.data_context, "data_version", None)
+        for key in [key for key in self._stock_status_cache if key[1] in symbols]:
+            del self._stock_status_cache[key]
+        for symbol in symbols:
+            self._stock_date_index.pop(symbol, None)
+        # 预构建只补齐缺失的股票
+        self._prebuilt_index = False
+        # 元数据已重新读取
+        self._stock_status = None
+        self._index_constituents = None
+        for indices in self._fundamentals_cache.values():
+            for symbol in symbols:
+                indices.pop(symbol, None)
+        self._adj_alignment_cache = {
+            (stock, fq, version): alignment
+            for (stock, fq, data_version), alignment in self._adj_alignment_cache.items()
+            if data_version == previous_version and stock not in symbols
+        }
+        adjusted = [
+            (key, self._adjusted_cache.peek(key))
+            for key in list(self._adjusted_cache)
+            if key[2] == previous_version and key[0] not in symbols
+        ]
+        self._adjusted_cache.clear()
+        self._adjusted_cache.update(((stock, kind, version), value) for (stock, kind, _), value in adjusted)
+        # 历史结果与滚动窗口按交易日历取窗口：日历已变（补载了新交易日）的条目全部丢弃
+        calendar_key = self._calendar_key()
+        kept = [
+            (key, self._history_cache.peek(key))
+            for key in list(self._history_cache)
+            if key[1] == previous_version and symbols.isdisjoint(key[4]) and key[-1] == calendar_key
+        ]
+        self._history_cache.clear()
+        self._history_cache.update(((key[0], version, *key[2:]), value) for key, value in kept)
+        # 滚动窗口去掉更新过的股票（下次完整计算），其余股票沿用
+        windows = [
+            (key, self._history_windows.peek(key))
+            for key in list(self._history_windows)
+            if self._history_windows.peek(key)[0] == previous_version
+            and self._history_windows.peek(key)[4] == calendar_key
+        ]
+        self._history_windows.clear()
+        self._history_windows.update(
+            (key, (version, target_ns, {stock: end for stock, end in ends.items() if stock not in symbols}, values,
+                   calendar_key))
+            for key, (_, target_ns, ends, values, _) in windows
+        )
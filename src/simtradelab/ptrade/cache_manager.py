@@ -9,7 +9,7 @@
 PTrade统一缓存管理器
 
 统一管理所有缓存，提供LRU策略和统一清理接口
-使用cachetools提供高性能LRU缓存实现
+底层为带字节记账的 SizedLRUCache，按条目数上限淘汰，并受进程级内存预算约束
 """
 
 
@@ -17,19 +17,26 @@ from __future__ import annotations
 
 from typing import Any, Optional
 from datetime import datetime
-from cachetools import LRUCache
+
+from .memory_budget import SizedLRUCache, memory_budget
 
 
 class CacheNamespace:
     """缓存命名空间
 
     为不同类型的数据提供独立的缓存空间
-    使用cachetools.LRUCache作为底层实现
+    使用SizedLRUCache作为底层实现，字节数计入进程级内存预算
     """
 
-    def __init__(self, name: str, max_size: int):
+    def __init__(self, name: str, max_size: int, account: Optional[str] = None):
+        """
+        Args:
+            name: 显示名称
+            max_size: 最大缓存数量
+            account: 内存记账使用的命名空间，默认同 name
+        """
         self.name = name
-        self._cache = LRUCache(maxsize=max_size)
+        self._cache = SizedLRUCache(account or name, maxsize=max_size)
         self._stats = {
             'hits': 0,
             'misses': 0,
@@ -40,7 +47,7 @@ class CacheNamespace:
     def get(self, key: Any) -> Optional[Any]:
         """获取值
 
-        cachetools.LRUCache会自动更新访问顺序
+        SizedLRUCache会自动更新访问顺序
         """
         try:
             value = self._cache[key]
@@ -53,7 +60,7 @@ class CacheNamespace:
     def put(self, key: Any, value: Any) -> None:
         """存入值
 
-        cachetools.LRUCache会自动淘汰最旧项
+        超过条目数上限或内存预算时自动淘汰最旧项
         """
         self._cache[key] = value
         self._stats['puts'] += 1
@@ -71,6 +78,10 @@ class CacheNamespace:
         """最大缓存数量"""
         return self._cache.maxsize
 
+    def nbytes(self) -> int:
+        """当前缓存占用的估算字节数"""
+        return self._cache.nbytes
+
     def get_stats(self) -> dict[str, Any]:
         """获取统计信息"""
         total_requests = self._stats['hits'] + self._stats['misses']
@@ -79,6 +90,8 @@ class CacheNamespace:
             'name': self.name,
             'size': self.size(),
             'maxsize': self.maxsize(),
+            'bytes': self.nbytes(),
+            'evictions': self._cache.evictions,
             'hits': self._stats['hits'],
             'misses': self._stats['misses'],
             'puts': self._stats['puts'],
@@ -94,7 +107,7 @@ class UnifiedCacheManager:
     """统一缓存管理器
 
     单例模式，管理所有命名空间的缓存
-    使用cachetools.LRUCache提供高性能缓存
+    各命名空间与 LazyDataDict、历史数据缓存共享进程级内存预算
     """
     _instance = None
 
@@ -112,13 +125,13 @@ class UnifiedCacheManager:
 
         # 创建各个缓存命名空间，使用cachetools.LRUCache
         self._namespaces: dict[str, CacheNamespace] = {
-            'ma_cache': CacheNamespace('MA计算', config.cache.global_ma_vwap_cache_size),
-            'vwap_cache': CacheNamespace('VWAP计算', config.cache.global_ma_vwap_cache_size),
-            'history': CacheNamespace('历史数据', config.cache.history_cache_size),
-            'stock_status': CacheNamespace('股票状态', config.cache.data_cache_size),
-            'date_index': CacheNamespace('日期索引', config.cache.data_cache_size),
-            'fundamentals': CacheNamespace('基本面数据', config.cache.fundamentals_cache_size),
-            'exrights': CacheNamespace('复权数据', config.cache.exrights_cache_size),
+            'ma_cache': CacheNamespace('MA计算', config.cache.global_ma_vwap_cache_size, 'cache_manager.ma_cache'),
+            'vwap_cache': CacheNamespace('VWAP计算', config.cache.global_ma_vwap_cache_size, 'cache_manager.vwap_cache'),
+            'history': CacheNamespace('历史数据', config.cache.history_cache_size, 'cache_manager.history'),
+            'stock_status': CacheNamespace('股票状态', config.cache.data_cache_size, 'cache_manager.stock_status'),
+            'date_index': CacheNamespace('日期索引', config.cache.data_cache_size, 'cache_manager.date_index'),
+            'fundamentals': CacheNamespace('基本面数据', config.cache.fundamentals_cache_size, 'cache_manager.fundamentals'),
+            'exrights': CacheNamespace('复权数据', config.cache.exrights_cache_size, 'cache_manager.exrights'),
         }
 
         # 当前日期（用于日缓存清理）
@@ -150,6 +163,10 @@ class UnifiedCacheManager:
         for ns in self._namespaces.values():
             ns.clear()
 
+    def memory_usage(self) -> dict[str, int]:
+        """进程内全部缓存按命名空间的字节数（含 LazyDataDict 与历史数据缓存）"""
+        return memory_budget.usage()
+
     def clear_daily_cache(self, current_date: Optional[datetime] = None) -> None:
         """清理日级缓存
 
@@ -0,0 +1,655 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (c) 2025 Kay
+#
+# This file is part of SimTradeLab, dual-licensed under AGPL-3.0 and a
+# commercial license. See LICENSE-COMMERCIAL.md or contact kayou@duck.com
+#
+"""
+列式行情存储
+
+全部标的共享一条交易日历，每只标的只记录 [start, stop) 行区间和每行在
+日历中的位置；各字段按列拼接为连续的 numpy 缓冲区。热路径通过 SymbolArrays
+直接做数组下标访问，只有在调用方需要 DataFrame 时才按需还原。
+"""
+
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from cachetools import LRUCache
+
+from .compact import COMPACT_COLUMNS_ATTR, compact_values, compacted_columns, restore_values
+
+
+class SymbolArrays:
+    """单只标的的列视图（切片自共享缓冲区，不复制数据）
+
+    提供与 DataFrame 相同的 index / columns / 列访问入口，
+    列访问直接返回 ndarray；压缩过的列返回还原后的 float64/int64 副本。
+    只需要一段行或一个值时用 column()/value()，只还原所需部分。
+    """
+
+    __slots__ = ('_columns', '_compact', 'dates')
+
+    def __init__(self, dates: np.ndarray, columns: dict[str, np.ndarray], compact: frozenset[str] = frozenset()):
+        """
+        Args:
+            dates: 行日期（int64 纳秒）
+            columns: {列名: ndarray}
+            compact: 经 compact_values 压缩、访问时需要还原的列
+        """
+        self.dates = dates
+        self._columns = columns
+        self._compact = compact
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self.dates.view('datetime64[ns]'))
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return tuple(self._columns)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.dates) == 0 or not self._columns
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        values = self._columns[name]
+        return restore_values(values) if name in self._compact else values
+
+    def column(self, name: str, start: Optional[int] = None, stop: Optional[int] = None) -> np.ndarray:
+        """name 列 [start, stop) 行，先切片再还原"""
+        values = self._columns[name][start:stop]
+        return restore_values(values) if name in self._compact else values
+
+    def value(self, name: str, i: int) -> Any:
+        """name 列第 i 行的值（支持负下标），只还原这一个值"""
+        values = self._columns[name]
+        if name in self._compact:
+            return restore_values(values[[i]])[0]
+        return values[i]
+
+    def with_aliases(self, aliases: dict[str, str]) -> SymbolArrays:
+        """追加别名列（如 money->amount），已存在的列不覆盖"""
+        extra = {
+            alias: self._columns[source]
+            for alias, source in aliases.items()
+            if alias not in self._columns and source in self._columns
+        }
+        if not extra:
+            return self
+        compact = self._compact | {alias for alias in extra if aliases[alias] in self._compact}
+        return SymbolArrays(self.dates, {**self._columns, **extra}, frozenset(compact))
+
+
+def _unified_dtype(dtypes: set[np.dtype]) -> np.dtype:
+    if len(dtypes) == 1:
+        return next(iter(dtypes))
+    if all(np.issubdtype(dt, np.number) or dt == np.bool_ for dt in dtypes):
+        return np.dtype('float64')
+    return np.dtype(object)
+
+
+def _is_columnar_frame(df: Any) -> bool:
+    return (
+        isinstance(df, pd.DataFrame)
+        and not df.empty
+        and isinstance(df.index, pd.DatetimeIndex)
+        and df.index.tz is None
+        and df.columns.is_unique
+    )
+
+
+class ColumnarStore:
+    """不规则（ragged）列式行情存储
+
+    - calendar: 全部标的日期并集，int64 纳秒
+    - _offsets: {symbol: (start, stop)} 指向拼接后缓冲区的行区间
+    - _date_pos: 每行在 calendar 中的位置（int32）
+    - _buffers: {column: ndarray} 连续列缓冲区
+
+    空表、非 DatetimeIndex 等无法列式化的 DataFrame 原样保留。
+    通过 save/open 落盘为 .npy 目录，open 以只读内存映射方式挂载，
+    多个进程共享同一份页缓存。compact 为 True 时可压缩的缓冲区为紧凑 dtype，
+    _compact_columns 记录实际压缩过的列，只有这些列在访问时还原（见 compact 模块）。
+    """
+
+    _META_FILE = 'meta.json'
+
+    def __init__(self):
+        self.calendar = np.array([], dtype=np.int64)
+        self.index_name = None
+        self.read_only = False
+        self.compact = False
+        self._compact_columns: frozenset[str] = frozenset()
+        self._offsets: dict[str, tuple[int, int]] = {}
+        self._date_pos = np.array([], dtype=np.int32)
+        self._buffers: dict[str, np.ndarray] = {}
+        self._symbol_columns: dict[str, tuple[str, ...]] = {}
+        self._symbol_dtypes: dict[str, dict[str, np.dtype]] = {}
+        self._passthrough: dict[str, pd.DataFrame] = {}
+        self._arrays: dict[str, SymbolArrays] = {}
+
+    @classmethod
+    def from_frames(cls, frames: dict[str, Any], compact: bool = False) -> ColumnarStore:
+        """由 {symbol: DataFrame} 构建，构建过程中逐个释放输入 DataFrame
+
+        Args:
+            frames: 标的数据字典（会被清空）
+            compact: 输入可能含紧凑列（记录在 attrs 中）；先还原，再按整列重新判定紧凑 dtype
+
+        Returns:
+            ColumnarStore
+        """
+        store = cls()
+        layout = []
+        column_dtypes: dict[str, set[np.dtype]] = {}
+        date_chunks = []
+        for symbol, df in frames.items():
+            if not _is_columnar_frame(df):
+                store._passthrough[symbol] = df
+                continue
+            layout.append((symbol, len(df)))
+            compacted = compacted_columns(df) if compact else ()
+            for name, dtype in df.dtypes.items():
+                if name in compacted:
+                    dtype = restore_values(np.empty(0, dtype=dtype)).dtype
+                column_dtypes.setdefault(name, set()).add(np.dtype(dtype))
+            date_chunks.append(df.index.to_numpy(dtype='datetime64[ns]').view('i8'))
+            if store.index_name is None:
+                store.index_name = df.index.name
+
+        store.calendar = np.unique(np.concatenate(date_chunks)) if date_chunks else store.calendar
+        del date_chunks
+
+        total = sum(n for _, n in layout)
+        dtypes = {name: _unified_dtype(types) for name, types in column_dtypes.items()}
+        for name, dtype in dtypes.items():
+            if dtype.kind == 'f':
+                store._buffers[name] = np.full(total, np.nan, dtype=dtype)
+            else:
+                store._buffers[name] = np.zeros(total, dtype=dtype)
+        store._date_pos = np.empty(total, dtype=np.int32)
+
+        column_sets: dict[tuple[str, ...], tuple[str, ...]] = {}
+        offset = 0
+        for symbol, n in layout:
+            df = frames[symbol]
+            stop = offset + n
+            store._offsets[symbol] = (offset, stop)
+            dates = df.index.to_numpy(dtype='datetime64[ns]').view('i8')
+            store._date_pos[offset:stop] = np.searchsorted(store.calendar, dates)
+            columns = tuple(df.columns)
+            store._symbol_columns[symbol] = column_sets.setdefault(columns, columns)
+            deviations = {}
+            compacted = compacted_columns(df) if compact else ()
+            for name in columns:
+                values = df[name].to_numpy()
+                if name in compacted:
+                    # 紧凑列先还原，整列统一压缩；避免 float32 的二进制误差写入 float64
+                    values = restore_values(values)
+                if values.dtype != dtypes[name]:
+                    deviations[name] = values.dtype
+                store._buffers[name][offset:stop] = values
+            if deviations:
+                store._symbol_dtypes[symbol] = deviations
+            frames[symbol] = None
+            offset = stop
+
+        frames.clear()
+        if compact:
+            store._compact_buffers()
+        return store
+
+    def _compact_buffers(self) -> None:
+        """压缩可无损压缩的缓冲区，记录压缩过的列"""
+        compacted = set()
+        for name, buf in self._buffers.items():
+            narrow = compact_values(buf)
+            if narrow is not buf:
+                self._buffers[name] = narrow
+                compacted.add(name)
+        self._compact_columns = frozenset(compacted)
+        self.compact = True
+
+    @classmethod
+    def from_blocks(
+        cls,
+        symbols: list[str],
+        bounds: np.ndarray,
+        dates: np.ndarray,
+        columns: dict[str, np.ndarray],
+        index_name: Optional[str] = None,
+    ) -> ColumnarStore:
+        """由按标的分块拼接的长表数组直接构建，不经过逐标的 DataFrame
+
+        Args:
+            symbols: 标的代码，按块顺序排列
+            bounds: 长度 len(symbols)+1 的行边界，第 i 个标的占 [bounds[i], bounds[i+1])
+            dates: 每行日期（int64 纳秒），块内升序
+            columns: {列名: ndarray}，与 dates 等长，直接作为列缓冲区
+            index_name: 还原 DataFrame 时的索引名
+
+        Returns:
+            ColumnarStore
+        """
+        store = cls()
+        store.index_name = index_name
+        store.calendar = np.sort(pd.unique(dates)).astype(np.int64)
+        store._date_pos = np.searchsorted(store.calendar, dates).astype(np.int32)
+        store._buffers = dict(columns)
+        names = tuple(columns)
+        for symbol, start, stop in zip(symbols, bounds[:-1], bounds[1:], strict=True):
+            store._offsets[symbol] = (int(start), int(stop))
+            store._symbol_columns[symbol] = names
+        return store
+
+    def append(self, frames: dict[str, Any]) -> ColumnarStore:
+        """返回在各标的末尾追加新行后的存储，自身不变（只读挂载的存储同样适用）
+
+        已常驻的标的只追加其最后日期之后的行，新标的整段加入；
+        只复制缓冲区，不经过逐标的 DataFrame。
+
+        Args:
+            frames: {symbol: DataFrame}，可包含已常驻的行（被忽略）
+
+        Returns:
+            ColumnarStore；没有新行时返回自身
+        """
+        tails = {}
+        for symbol, df in frames.items():
+            last = self.last_date(symbol)
+            if last is None:
+                tails[symbol] = df
+            elif _is_columnar_frame(df):
+                df = df.iloc[df.index.searchsorted(pd.Timestamp(last), side='right'):]
+                if len(df):
+                    tails[symbol] = df
+        if not tails:
+            return self
+        return self._merged(ColumnarStore.from_frames(tails, compact=self.compact))
+
+    def _merged(self, tail: ColumnarStore) -> ColumnarStore:
+        """合并 tail：同一标的的行接在自身行之后"""
+        store = ColumnarStore()
+        store.index_name = self.index_name if self.index_name is not None else tail.index_name
+        store.compact = self.compact
+        compacted = set()
+        store.calendar = np.union1d(self.calendar, tail.calendar).astype(np.int64)
+        n, m = len(self._date_pos), len(tail._date_pos)
+
+        # 两个存储的行依次拼接为 [自身 n 行, tail m 行]，order 给出合并后各行的来源位置
+        symbols = list(self._offsets) + [symbol for symbol in tail._offsets if symbol not in self._offsets]
+        pieces = []
+        column_sets: dict[tuple[str, ...], tuple[str, ...]] = {}
+        offset = 0
+        for symbol in symbols:
+            start = offset
+            columns = ()
+            for source, base in ((self, 0), (tail, n)):
+                if symbol in source._offsets:
+                    lo, hi = source._offsets[symbol]
+                    pieces.append(np.arange(base + lo, base + hi))
+                    offset += hi - lo
+                    columns += tuple(name for name in source._symbol_columns[symbol] if name not in columns)
+            store._offsets[symbol] = (start, offset)
+            store._symbol_columns[symbol] = column_sets.setdefault(columns, columns)
+        order = np.concatenate(pieces) if pieces else np.array([], dtype=np.int64)
+
+        date_pos = np.concatenate([
+            np.searchsorted(store.calendar, self.calendar)[self._date_pos],
+            np.searchsorted(store.calendar, tail.calendar)[tail._date_pos],
+        ])
+        store._date_pos = date_pos[order].astype(np.int32)
+
+        deviations = {symbol: dict(dtypes) for symbol, dtypes in self._symbol_dtypes.items()}
+        for symbol, dtypes in tail._symbol_dtypes.items():
+            deviations.setdefault(symbol, dict(dtypes))
+        for name in dict.fromkeys([*self._buffers, *tail._buffers]):
+            parts = [(self, self._buffers.get(name), n), (tail, tail._buffers.get(name), m)]
+            if (
+                all(buf is not None for _, buf, _ in parts)
+                and len({buf.dtype for _, buf, _ in parts}) == 1
+                and (name in self._compact_columns) == (name in tail._compact_columns)
+            ):
+                store._buffers[name] = np.concatenate([buf for _, buf, _ in parts])[order]
+                if name in self._compact_columns:
+                    compacted.add(name)
+                continue
+            # dtype 或压缩状态不一致、一侧缺列：还原压缩过的列后按统一 dtype 合并，缺列的行按 from_frames 的规则填充
+            parts = [
+                (source, restore_values(buf) if name in source._compact_columns else buf, size)
+                for source, buf, size in parts
+            ]
+            dtype = _unified_dtype({buf.dtype for _, buf, _ in parts if buf is not None})
+            merged = []
+            for source, buf, size in parts:
+                if buf is None:
+                    merged.append(np.full(size, np.nan, dtype=dtype) if dtype.kind == 'f' else np.zeros(size, dtype=dtype))
+                    continue
+                if buf.dtype != dtype:
+                    for symbol, columns in source._symbol_columns.items():
+                        if name in columns:
+                            deviations.setdefault(symbol, {}).setdefault(name, buf.dtype)
+                merged.append(buf.astype(dtype, copy=False))
+            buf = np.concatenate(merged)[order]
+            store._buffers[name] = compact_values(buf) if self.compact else buf
+            if store._buffers[name] is not buf:
+                compacted.add(name)
+        store._compact_columns = frozenset(compacted)
+        store._symbol_dtypes = {symbol: dtypes for symbol, dtypes in deviations.items() if dtypes}
+
+        store._passthrough = {
+            **{symbol: df for symbol, df in self._passthrough.items() if symbol not in tail._offsets},
+            **{symbol: df for symbol, df in tail._passthrough.items() if symbol not in self._offsets},
+        }
+        return store
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._offsets or symbol in self._passthrough
+
+    def __len__(self) -> int:
+        return len(self._offsets) + len(self._passthrough)
+
+    def symbols(self) -> list[str]:
+        return list(self._offsets) + list(self._passthrough)
+
+    @property
+    def nbytes(self) -> int:
+        """列缓冲区、日历和行位置占用的字节数（不含原样保留的 DataFrame）"""
+        return (
+            self.calendar.nbytes
+            + self._date_pos.nbytes
+            + sum(buf.nbytes for buf in self._buffers.values())
+        )
+
+    def dates(self, symbol: str) -> np.ndarray:
+        """标的日期（int64 纳秒）；行在日历上连续时直接返回日历切片视图"""
+        start, stop = self._offsets[symbol]
+        if stop == start:
+            return self.calendar[:0]
+        pos = self._date_pos[start:stop]
+        first, last = int(pos[0]), int(pos[-1])
+        if last - first == stop - start - 1 and np.all(np.diff(pos) == 1):
+            return self.calendar[first:last + 1]
+        return self.calendar[pos]
+
+    def last_date(self, symbol: str) -> Optional[int]:
+        """标的最后一行的日期（int64 纳秒），没有列式数据时返回 None"""
+        start, stop = self._offsets.get(symbol, (0, 0))
+        return int(self.calendar[self._date_pos[stop - 1]]) if stop > start else None
+
+    def arrays(self, symbol: str) -> Optional[SymbolArrays]:
+        """返回标的列视图，不存在或未列式化时返回 None"""
+        arrays = self._arrays.get(symbol)
+        if arrays is None:
+            if symbol not in self._offsets:
+                return None
+            start, stop = self._offsets[symbol]
+            columns = {name: self._buffers[name][start:stop] for name in self._symbol_columns[symbol]}
+            deviations = self._symbol_dtypes.get(symbol, {})
+            # 与统一 dtype 不同的列还原为原始 dtype，保证下游结果与 DataFrame 路径一致
+            for name, dtype in deviations.items():
+                columns[name] = self._restored(name, columns[name]).astype(dtype)
+            compact = frozenset(name for name in columns if name in self._compact_columns and name not in deviations)
+            arrays = SymbolArrays(self.dates(symbol), columns, compact)
+            self._arrays[symbol] = arrays
+        return arrays
+
+    def frame(self, symbol: str, copy: bool = True) -> pd.DataFrame:
+        """还原为与逐文件加载一致的 DataFrame
+
+        Args:
+            symbol: 标的代码
+            copy: True 返回独立副本；False 直接包装底层缓冲区（只读挂载时零拷贝）
+        """
+        if symbol in self._passthrough:
+            frame = self._passthrough[symbol]
+            return frame.copy() if copy else frame
+        start, stop = self._offsets[symbol]
+        deviations = self._symbol_dtypes.get(symbol, {})
+        data = {}
+        for name in self._symbol_columns[symbol]:
+            values = self._buffers[name][start:stop]
+            if name in deviations:
+                values = self._restored(name, values).astype(deviations[name])
+            data[name] = values
+        index = pd.DatetimeIndex(self.dates(symbol).view('datetime64[ns]'), name=self.index_name)
+        frame = pd.DataFrame(data, index=index, copy=copy)
+        compacted = tuple(name for name in data if name in self._compact_columns and name not in deviations)
+        if compacted:
+            # 压缩过的列保持紧凑 dtype，由 restore_frame 按此记录还原
+            frame.attrs[COMPACT_COLUMNS_ATTR] = compacted
+        return frame
+
+    def _restored(self, name: str, values: np.ndarray) -> np.ndarray:
+        return restore_values(values) if name in self._compact_columns else values
+
+    def save(self, directory: str | Path) -> Path:
+        """落盘为 .npy 目录（先写临时目录再整体替换，已挂载的读者不受影响）
+
+        对象列和非列式 DataFrame 写为 Parquet：目录可能与其他用户共享，不写入 pickle。
+
+        Returns:
+            目标目录
+
+        Raises:
+            TypeError: 对象列含 Arrow 无法表示的混合类型，或非列式数据不是 DataFrame
+        """
+        directory = Path(directory)
+        directory.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = directory.with_name(f'{directory.name}.tmp-{os.getpid()}')
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir()
+
+        np.save(tmp_dir / 'calendar.npy', self.calendar)
+        np.save(tmp_dir / 'date_pos.npy', self._date_pos)
+        buffers = []
+        for i, (name, buf) in enumerate(self._buffers.items()):
+            if buf.dtype.hasobject:
+                try:
+                    values = pa.array(buf, from_pandas=True)
+                except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                    raise TypeError(f"列 {name} 无法写为 Arrow: {e}") from e
+                pq.write_table(pa.table({'values': values}), tmp_dir / f'col_{i}.parquet')
+                buffers.append([name, '|O'])
+            else:
+                np.save(tmp_dir / f'col_{i}.npy', buf, allow_pickle=False)
+                buffers.append([name, buf.dtype.str])
+        passthrough = []
+        for i, (symbol, df) in enumerate(self._passthrough.items()):
+            if not isinstance(df, pd.DataFrame):
+                raise TypeError(f"{symbol} 的数据不是 DataFrame: {type(df).__name__}")
+            df.to_parquet(tmp_dir / f'passthrough_{i}.parquet')
+            passthrough.append(symbol)
+
+        column_sets = list(dict.fromkeys(self._symbol_columns.values()))
+        set_ids = {cols: i for i, cols in enumerate(column_sets)}
+        meta = {
+            'index_name': self.index_name,
+            'compact': self.compact,
+            'compact_columns': sorted(self._compact_columns),
+            'buffers': buffers,
+            'column_sets': [list(cols) for cols in column_sets],
+            'symbols': [
+                [symbol, start, stop, set_ids[self._symbol_columns[symbol]]]
+                for symbol, (start, stop) in self._offsets.items()
+            ],
+            'symbol_dtypes': {
+                symbol: {name: dtype.str for name, dtype in deviations.items()}
+                for symbol, deviations in self._symbol_dtypes.items()
+            },
+            'passthrough': passthrough,
+        }
+        with open(tmp_dir / self._META_FILE, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+        # POSIX 下被替换目录中的文件在已有映射关闭前仍然有效
+        old_dir = directory.with_name(f'{directory.name}.old-{os.getpid()}')
+        if directory.exists():
+            directory.rename(old_dir)
+        tmp_dir.rename(directory)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        return directory
+
+    @classmethod
+    def open(cls, directory: str | Path, mmap: bool = True) -> ColumnarStore:
+        """挂载 save 写出的目录
+
+        Args:
+            directory: 存储目录
+            mmap: True 时数值列以只读内存映射方式打开（零拷贝）
+        """
+        directory = Path(directory)
+        with open(directory / cls._META_FILE, encoding='utf-8') as f:
+            meta = json.load(f)
+        mmap_mode = 'r' if mmap else None
+
+        store = cls()
+        store.read_only = mmap
+        store.index_name = meta['index_name']
+        store.compact = meta.get('compact', False)
+        store.calendar = np.load(directory / 'calendar.npy', mmap_mode=mmap_mode)
+        store._date_pos = np.load(directory / 'date_pos.npy', mmap_mode=mmap_mode)
+        for i, (name, dtype) in enumerate(meta['buffers']):
+            if dtype == '|O':
+                values = pq.read_table(directory / f'col_{i}.parquet').column('values')
+                store._buffers[name] = np.asarray(values.to_numpy(zero_copy_only=False), dtype=object)
+            else:
+                store._buffers[name] = np.load(directory / f'col_{i}.npy', mmap_mode=mmap_mode, allow_pickle=False)
+
+        compact_columns = meta.get('compact_columns')
+        if compact_columns is None and store.compact:
+            # 旧版目录未记录压缩过的列：按紧凑 dtype 判定
+            compact_columns = [name for name, buf in store._buffers.items() if buf.dtype in (np.float32, np.int32)]
+        store._compact_columns = frozenset(compact_columns or ())
+
+        column_sets = [tuple(cols) for cols in meta['column_sets']]
+        for symbol, start, stop, set_id in meta['symbols']:
+            store._offsets[symbol] = (start, stop)
+            store._symbol_columns[symbol] = column_sets[set_id]
+        store._symbol_dtypes = {
+            symbol: {name: np.dtype(dtype) for name, dtype in deviations.items()}
+            for symbol, deviations in meta['symbol_dtypes'].items()
+        }
+        store._passthrough = {
+            symbol: pd.read_parquet(directory / f'passthrough_{i}.parquet')
+            for i, symbol in enumerate(meta.get('passthrough', ()))
+        }
+        return store
+
+
+class ColumnarFrameMap(Mapping):
+    """以 {symbol: DataFrame} 字典接口暴露 ColumnarStore
+
+    用于只读挂载的复权因子等数据：DataFrame 直接包装底层缓冲区，
+    只缓存包装对象本身。
+    """
+
+    def __init__(self, store: ColumnarStore, max_cache_size: int = 6000):
+        self.store = store
+        self._frames = LRUCache(maxsize=max_cache_size)
+
+    def __getitem__(self, symbol: str) -> pd.DataFrame:
+        frame = self._frames.get(symbol)
+        if frame is None:
+            if symbol not in self.store:
+                raise KeyError(symbol)
+            frame = self.store.frame(symbol, copy=not self.store.read_only)
+            self._frames[symbol] = frame
+        return frame
+
+    def get_arrays(self, symbol: str) -> Optional[SymbolArrays]:
+        """返回标的列视图（数组切片，不构造 DataFrame）"""
+        return self.store.arrays(symbol)
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self.store
+
+    def __iter__(self):
+        return iter(self.store.symbols())
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+
+def get_symbol_source(data_dict: Any, key: str) -> Any:
+    """优先返回列式视图，否则返回字典中的原始对象（通常为 DataFrame）"""
+    get_arrays = getattr(data_dict, 'get_arrays', None)
+    if get_arrays is not None:
+        arrays = get_arrays(key)
+        if arrays is not None:
+            return arrays
+    if data_dict is None or key not in data_dict:
+        return None
+    return data_dict[key]
+
+
+def get_frames(data_dict: Any, keys: list[str]) -> dict[str, Any]:
+    """批量取字典中的原始对象；支持 get_many 的字典（LazyDataDict）并行读取缓存未命中的 key
+
+    Returns:
+        {key: 原始对象}，不存在的 key 被忽略
+    """
+    if data_dict is None:
+        return {}
+    get_many = getattr(data_dict, 'get_many', None)
+    if get_many is not None:
+        return get_many(keys)
+    return {key: data_dict[key] for key in keys if key in data_dict}
+
+
+def get_symbol_sources(data_dict: Any, keys: list[str]) -> dict[str, Any]:
+    """批量版 get_symbol_source：有列式视图的直接返回视图，其余通过 get_frames 一次取出"""
+    sources = {}
+    rest = []
+    get_arrays = getattr(data_dict, 'get_arrays', None)
+    for key in keys:
+        arrays = get_arrays(key) if get_arrays is not None else None
+        if arrays is not None:
+            sources[key] = arrays
+        else:
+            rest.append(key)
+    if rest:
+        sources.update(get_frames(data_dict, rest))
+    return sources
+
+
+def column_values(source: Any, name: str, start: Optional[int] = None, stop: Optional[int] = None) -> np.ndarray:
+    """取一列 [start, stop) 行的 ndarray，兼容 SymbolArrays 与 DataFrame"""
+    if isinstance(source, SymbolArrays):
+        return source.column(name, start, stop)
+    values = source[name]
+    values = values if isinstance(values, np.ndarray) else values.values
+    return values if start is None and stop is None else values[start:stop]
+
+
+def column_value(source: Any, name: str, i: int) -> Any:
+    """取一列第 i 行的值，兼容 SymbolArrays 与 DataFrame"""
+    if isinstance(source, SymbolArrays):
+        return source.value(name, i)
+    return column_values(source, name)[i]
+
+
+def index_ns(source: Any) -> np.ndarray:
+    """取行索引的 int64 纳秒数组，兼容 SymbolArrays 与 DataFrame"""
+    if isinstance(source, SymbolArrays):
+        return source.dates
+    return source.index.to_numpy(dtype='datetime64[ns]').view('i8')
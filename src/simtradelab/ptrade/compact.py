@@ -0,0 +1,93 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (c) 2025 Kay
+#
+# This file is part of SimTradeLab, dual-licensed under AGPL-3.0 and a
+# commercial license. See LICENSE-COMMERCIAL.md or contact kayou@duck.com
+#
+"""
+紧凑 dtype 模式
+
+常驻内存的行情/估值按较窄的 dtype 存放，交给 API 计算前再还原为 float64/int64：
+
+- float64 列：只有当 float32 往返后按 2 位小数取整能逐值还原原始 float64 时才存为 float32
+  （A 股两位小数价格满足；估值等多位小数的列保持 float64）
+- int64 列：取值在 int32 范围内时存为 int32
+
+还原结果与原始值逐位相同，因此 _round2 等 PTrade 取整规则的结果不受影响。
+
+只有经 compact_values 压缩过的列才会还原：DataFrame 在 attrs[COMPACT_COLUMNS_ATTR] 中记录
+这些列名，ColumnarStore 按存储记录；数据文件中原本就是 float32/int32 的列保持原值。
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# float32 存储对应的小数位数（还原时按此位数取整）
+COMPACT_DECIMALS = 2
+
+# DataFrame.attrs 中记录紧凑列名的键
+COMPACT_COLUMNS_ATTR = 'compact_columns'
+
+_INT32_MIN = np.iinfo(np.int32).min
+_INT32_MAX = np.iinfo(np.int32).max
+
+
+def compact_values(values: np.ndarray) -> np.ndarray:
+    """把一列转为紧凑 dtype；不能无损还原时原样返回"""
+    if values.dtype == np.float64:
+        narrow = values.astype(np.float32)
+        if np.array_equal(np.round(narrow.astype(np.float64), COMPACT_DECIMALS), values, equal_nan=True):
+            return narrow
+    elif values.dtype == np.int64 and len(values):
+        if values.min() >= _INT32_MIN and values.max() <= _INT32_MAX:
+            return values.astype(np.int32)
+    return values
+
+
+def restore_values(values: np.ndarray) -> np.ndarray:
+    """compact_values 压缩过的列还原为 float64/int64（只应传入压缩过的列），其他 dtype 原样返回"""
+    if values.dtype == np.float32:
+        return np.round(values.astype(np.float64), COMPACT_DECIMALS)
+    if values.dtype == np.int32:
+        return values.astype(np.int64)
+    return values
+
+
+def compacted_columns(df: pd.DataFrame) -> tuple[str, ...]:
+    """df 中经 compact_frame 压缩过的列"""
+    return tuple(name for name in df.attrs.get(COMPACT_COLUMNS_ATTR, ()) if name in df.columns)
+
+
+def mark_compacted(df: pd.DataFrame, names) -> pd.DataFrame:
+    """在 df.attrs 中记录压缩过的列（原地修改，返回同一对象）"""
+    names = tuple(name for name in names if name in df.columns)
+    if names:
+        df.attrs[COMPACT_COLUMNS_ATTR] = names
+    else:
+        df.attrs.pop(COMPACT_COLUMNS_ATTR, None)
+    return df
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """DataFrame 各列转为紧凑 dtype（原地替换列，返回同一对象），压缩过的列记录在 attrs 中"""
+    compacted = list(compacted_columns(df))
+    for name in df.columns[(df.dtypes == np.float64) | (df.dtypes == np.int64)]:
+        values = df[name].to_numpy()
+        narrow = compact_values(values)
+        if narrow is not values:
+            df[name] = narrow
+            compacted.append(name)
+    return mark_compacted(df, compacted)
+
+
+def restore_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """还原压缩过的列；没有时返回原对象，否则返回新 DataFrame"""
+    if not isinstance(df, pd.DataFrame):
+        return df
+    narrow = compacted_columns(df)
+    if not narrow:
+        return df
+    restored = df.assign(**{name: restore_values(df[name].to_numpy()) for name in narrow})
+    return mark_compacted(restored, ())
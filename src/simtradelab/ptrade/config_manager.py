@@ -84,6 +84,11 @@ class CacheConfig(BaseModel):
         gt=0,
         description="LazyDataDict缓存大小"
     )
+    columnar_frame_cache_size: int = Field(
+        default=500,
+        gt=0,
+        description="列式行情按需还原DataFrame的缓存大小"
+    )
     fundamentals_cache_size: int = Field(
         default=800,
         gt=0,
@@ -104,6 +109,34 @@ class CacheConfig(BaseModel):
         gt=0,
         description="历史数据缓存大小（单股票粒度，约10000只×25天×8字节≈2MB）"
     )
+    minute_window_days: int = Field(
+        default=5,
+        ge=0,
+        description="分钟回测常驻的分钟线交易日数（按月分块，含当前交易日），0 表示全量预加载"
+    )
+    memory_budget_mb: int = Field(
+        default=2048,
+        ge=0,
+        description="可淘汰缓存（按需加载的行情、统一缓存、历史数据缓存）共享的内存预算（MB），0 表示不限"
+    )
+    prefetch_lazy_data: bool = Field(
+        default=True,
+        description="set_universe/get_index_stocks 后在后台预热按需加载的数据（财务、除权、分钟线等）"
+    )
+    compact_dtypes: bool = Field(
+        default=False,
+        description="行情与估值以 float32/int32 常驻内存，交给 API 前还原为 float64/int64（结果不变）"
+    )
+    resident_datasets: int = Field(
+        default=2,
+        ge=1,
+        description="DataServer 同时常驻的数据集数（按数据目录和市场区分，含当前数据集），超出时淘汰最久未使用的"
+    )
+    resident_datasets_mb: int = Field(
+        default=0,
+        ge=0,
+        description="非当前的常驻数据集合计内存上限（MB），超出时淘汰最久未使用的，0 表示不限"
+    )
 
     model_config = {"frozen": True}
 
@@ -0,0 +1,288 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (c) 2025 Kay
+#
+# This file is part of SimTradeLab, dual-licensed under AGPL-3.0 and a
+# commercial license. See LICENSE-COMMERCIAL.md or contact kayou@duck.com
+#
+"""
+公司行动（除权除息）流水线
+
+exrights/*.parquet 在进程内只读取一次：一次批量读取的文件拼接为按股票分块的事件长表，
+前复权因子、后复权因子和分红表都在这张表上向量化派生。复权因子缓存构建、
+exrights_dict 和分红缓存共享同一实例；文件按 (mtime, size) 校验，变化后重新读取。
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from ..utils.io_pool import get_io_pool
+from . import manifest, storage
+
+_PRE_COLUMNS = ('exer_forward_a', 'exer_forward_b')
+_POST_COLUMNS = ('allotted_ps', 'rationed_ps', 'rationed_px', 'bonus_ps')
+# 少于该数量的文件在调用线程中逐个读取
+_PARALLEL_MIN_FILES = 64
+
+logger = logging.getLogger(__name__)
+
+
+def _read_events(path: Path) -> pd.DataFrame:
+    """读取单个除权文件，不存在时返回空表"""
+    if not path.exists():
+        return pd.DataFrame()
+    return pd.read_parquet(path)
+
+
+def _float_column(frame: pd.DataFrame, name: str) -> np.ndarray:
+    return frame[name].to_numpy(dtype='float64')
+
+
+def _cumulate_post(bounds: np.ndarray, m: np.ndarray, bonus: np.ndarray, cost: np.ndarray):
+    """逐事件累积后复权因子：a_i = a_{i-1}*m_i，b_i = b_{i-1}*m_i + bonus_i - cost_i，首个事件前为 (1, 0)
+
+    按"各股票第 k 个事件"跨股票向量化，逐元素的运算顺序与逐股票循环相同，结果逐位一致。
+    """
+    starts = bounds[:-1]
+    counts = np.diff(bounds)
+    post_a = np.empty(len(m), dtype='float64')
+    post_b = np.empty(len(m), dtype='float64')
+    for k in range(int(counts.max(initial=0))):
+        rows = starts[counts > k] + k
+        prev_a = post_a[rows - 1] if k else np.ones(len(rows))
+        prev_b = post_b[rows - 1] if k else np.zeros(len(rows))
+        post_a[rows] = prev_a * m[rows]
+        post_b[rows] = prev_b * m[rows] + bonus[rows] - cost[rows]
+    return post_a, post_b
+
+
+class _EventBlock:
+    """一次批量读取得到的事件长表及其派生数组"""
+
+    def __init__(self, frames: list[pd.DataFrame]):
+        self.bounds = np.cumsum([0] + [len(frame) for frame in frames])
+        self.columns = [tuple(frame.columns) for frame in frames]
+        nonempty = [frame for frame in frames if len(frame)]
+        frame = pd.concat(nonempty, ignore_index=True) if nonempty else pd.DataFrame()
+        if 'date' in frame.columns:
+            frame['date'] = storage._date_to_int(frame['date'])
+            self.event_ns = pd.to_datetime(frame['date'].astype(str), format='%Y%m%d').to_numpy(
+                dtype='datetime64[ns]'
+            ).view('i8')
+        else:
+            self.event_ns = None
+        self.frame = frame
+
+        self.pre = None
+        if all(name in frame.columns for name in _PRE_COLUMNS):
+            self.pre = tuple(_float_column(frame, name) for name in _PRE_COLUMNS)
+
+        self.post = None
+        if all(name in frame.columns for name in _POST_COLUMNS):
+            allotted, rationed, rationed_px, bonus = (_float_column(frame, name) for name in _POST_COLUMNS)
+            m = 1.0 + allotted + rationed
+            self.post = _cumulate_post(self.bounds, m, bonus, rationed * rationed_px)
+
+        self.dividend_mask = None
+        if 'dividend' in frame.columns and 'date' in frame.columns:
+            self.dividends = _float_column(frame, 'dividend')
+            self.dividend_mask = self.dividends > 0
+
+    def _rows(self, i: int) -> tuple[int, int]:
+        return int(self.bounds[i]), int(self.bounds[i + 1])
+
+    def events(self, i: int) -> pd.DataFrame:
+        start, stop = self._rows(i)
+        if start == stop:
+            return pd.DataFrame()
+        ex_df = self.frame.iloc[start:stop][list(self.columns[i])].reset_index(drop=True)
+        if 'date' in ex_df.columns:
+            ex_df.set_index('date', inplace=True)
+        return ex_df
+
+    def dividends_of(self, i: int) -> dict[str, float]:
+        start, stop = self._rows(i)
+        if self.dividend_mask is None or 'dividend' not in self.columns[i]:
+            return {}
+        mask = self.dividend_mask[start:stop]
+        dates = self.frame['date'].to_numpy()[start:stop][mask]
+        return {str(date): value for date, value in zip(dates, self.dividends[start:stop][mask], strict=True)}
+
+    def action_rows(self, members: list[tuple[int, str]], allotments: bool):
+        """逐条产出 (YYYYMMDD, 股票, 每股送转, 每股分红)，只含送转或分红大于 0 的事件"""
+        if 'date' not in self.frame.columns:
+            return
+        owner = np.full(len(self.frame), -1, dtype=np.int64)
+        for j, (i, _) in enumerate(members):
+            start, stop = self._rows(i)
+            owner[start:stop] = j
+        allotted = np.zeros(len(self.frame))
+        if allotments and 'allotted_ps' in self.frame.columns:
+            allotted = np.nan_to_num(_float_column(self.frame, 'allotted_ps'), nan=0.0)
+        dividends = np.zeros(len(self.frame))
+        if self.dividend_mask is not None:
+            dividends = np.where(self.dividend_mask, self.dividends, 0.0)
+
+        dates = self.frame['date'].to_numpy()
+        for row in np.flatnonzero((owner >= 0) & ((allotted > 0) | (dividends > 0))):
+            yield (
+                int(dates[row]), members[owner[row]][1],
+                max(float(allotted[row]), 0.0), max(float(dividends[row]), 0.0),
+            )
+
+    def factors(self, kind: str, i: int, symbol: str, index: pd.DatetimeIndex) -> Optional[pd.DataFrame]:
+        start, stop = self._rows(i)
+        if start == stop:
+            return pd.DataFrame(index=index, data={'adj_a': 1.0, 'adj_b': 0.0}, dtype='float64')
+
+        table = self.pre if kind == 'pre' else self.post
+        if table is None or self.event_ns is None:
+            logger.error(f"计算 {symbol} {'前' if kind == 'pre' else '后'}复权因子失败: 除权数据缺少所需列")
+            return None
+        adj_a, adj_b = (values[start:stop] for values in table)
+        if kind == 'pre':
+            # 第 i 个除权区间取 ef_a/ef_b，最新区间为 (1, 0)
+            adj_a, adj_b = np.append(adj_a, 1.0), np.append(adj_b, 0.0)
+        else:
+            # 首个除权日之前为 (1, 0)，之后取累积值
+            adj_a, adj_b = np.concatenate(([1.0], adj_a)), np.concatenate(([0.0], adj_b))
+
+        day_ns = index.to_numpy(dtype='datetime64[ns]').view('i8')
+        factor_idx = np.searchsorted(self.event_ns[start:stop], day_ns, side='right')
+        return pd.DataFrame(index=index, data={'adj_a': adj_a[factor_idx], 'adj_b': adj_b[factor_idx]})
+
+
+class CorporateActions:
+    """单个数据目录的除权除息事件（线程安全）"""
+
+    def __init__(self, data_dir):
+        self.data_dir = str(data_dir)
+        self._lock = threading.Lock()
+        # {symbol: (事件块, 块内序号, 文件戳)}
+        self._located: dict[str, tuple[_EventBlock, int, tuple]] = {}
+
+    def _stamp(self, symbol: str) -> tuple:
+        return manifest.source_stamp(self.data_dir, (f'exrights/{symbol}.parquet',))[0][1:]
+
+    def ensure(self, symbols) -> int:
+        """读取尚未读取或文件已变化的股票，同一批读取拼接为一个事件块
+
+        Returns:
+            本次读取的文件数
+        """
+        stamps = {symbol: self._stamp(symbol) for symbol in symbols}
+        with self._lock:
+            pending = [
+                symbol for symbol, stamp in stamps.items()
+                if symbol not in self._located or self._located[symbol][2] != stamp
+            ]
+        if not pending:
+            return 0
+
+        base = Path(self.data_dir) / 'exrights'
+        paths = [base / f'{symbol}.parquet' for symbol in pending]
+        if len(paths) >= _PARALLEL_MIN_FILES:
+            frames = list(get_io_pool().map(_read_events, paths))
+        else:
+            frames = [_read_events(path) for path in paths]
+        block = _EventBlock(frames)
+        with self._lock:
+            for i, symbol in enumerate(pending):
+                self._located[symbol] = (block, i, stamps[symbol])
+        return len(pending)
+
+    def _locate(self, symbol: str) -> tuple[_EventBlock, int]:
+        self.ensure((symbol,))
+        with self._lock:
+            block, i, _ = self._located[symbol]
+        return block, i
+
+    def events(self, symbol: str) -> pd.DataFrame:
+        """除权事件表（YYYYMMDD 整数索引），与 storage.load_exrights 的 exrights_events 一致"""
+        block, i = self._locate(symbol)
+        return block.events(i)
+
+    def dividends(self, symbol: str) -> dict[str, float]:
+        """{YYYYMMDD: 每股分红}，只含分红大于 0 的事件"""
+        block, i = self._locate(symbol)
+        return block.dividends_of(i)
+
+    def factors(self, kind: str, symbol: str, stock_df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+        """按行情交易日计算复权因子
+
+        Args:
+            kind: 'pre' 前复权（平台 ef_a/ef_b） / 'post' 后复权（从除权事件累积）
+            stock_df: 未复权行情，None 或空表时返回 None
+
+        Returns:
+            index 同 stock_df 的 DataFrame[adj_a, adj_b]；除权数据缺列时返回 None
+        """
+        if stock_df is None or stock_df.empty:
+            return None
+        block, i = self._locate(symbol)
+        return block.factors(kind, i, symbol, stock_df.index)
+
+    def calendar(self, symbols, allotments: bool = True) -> dict[int, dict[str, tuple[float, float]]]:
+        """除权除息日历
+
+        Args:
+            symbols: 收录的股票
+            allotments: False 时不收录送转（只含现金分红）
+
+        Returns:
+            {YYYYMMDD 整数: {股票: (每股送转, 每股税前分红)}}，同一天同一股票多条事件时后者覆盖前者
+        """
+        symbols = list(symbols)
+        self.ensure(symbols)
+        blocks: dict[int, tuple[_EventBlock, list[tuple[int, str]]]] = {}
+        with self._lock:
+            for symbol in symbols:
+                block, i, _ = self._located[symbol]
+                blocks.setdefault(id(block), (block, []))[1].append((i, symbol))
+
+        calendar: dict[int, dict[str, tuple[float, float]]] = {}
+        for block, members in blocks.values():
+            for date, symbol, allotted, dividend in block.action_rows(members, allotments):
+                calendar.setdefault(date, {})[symbol] = (allotted, dividend)
+        return calendar
+
+
+_registry: dict[str, CorporateActions] = {}
+_registry_lock = threading.Lock()
+
+
+def get_corporate_actions(data_dir) -> CorporateActions:
+    """获取数据目录共享的 CorporateActions 实例"""
+    key = str(Path(data_dir).resolve())
+    with _registry_lock:
+        actions = _registry.get(key)
+        if actions is None:
+            actions = CorporateActions(data_dir)
+            _registry[key] = actions
+        return actions
+
+
+def build_action_calendar(data_dir, symbols, allotments: bool = True) -> dict[int, dict[str, tuple[float, float]]]:
+    """构建除权除息日历，按各除权文件的 (mtime, size) 缓存在数据集清单中
+
+    热启动命中清单时无需读取任何除权文件。参数与返回值见 CorporateActions.calendar。
+    """
+    symbols = list(symbols)
+    return manifest.cached(
+        data_dir,
+        f'action_calendar:{int(allotments)}',
+        [f'exrights/{symbol}.parquet' for symbol in symbols],
+        lambda: get_corporate_actions(data_dir).calendar(symbols, allotments),
+    )
+
+
+def clear_corporate_actions() -> None:
+    """丢弃全部已读取的事件"""
+    with _registry_lock:
+        _registry.clear()
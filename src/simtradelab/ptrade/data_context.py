@@ -28,14 +28,15 @@ class DataContext:
         exrights_dict,
         benchmark_data,
         stock_metadata,
-        index_constituents: dict,
-        stock_status_history: dict,
+        index_constituents,
+        stock_status_history,
         adj_pre_cache,
         adj_post_cache=None,
         dividend_cache=None,
         trade_days=None,
         stock_data_dict_1m=None,
         data_server=None,
+        corporate_action_calendar=None,
     ):
         """初始化数据上下文
 
@@ -46,14 +47,16 @@ class DataContext:
             exrights_dict: 除权数据字典
             benchmark_data: 基准数据字典
             stock_metadata: 股票元数据DataFrame
-            index_constituents: 指数成份股字典
-            stock_status_history: 股票状态历史字典
+            index_constituents: 指数成份股（IndexConstituents，或 {日期: {指数代码: 成份股}} 字典）
+            stock_status_history: 股票状态（StockStatusStore，或 {日期: {状态: {股票: True}}} 字典）
             adj_pre_cache: 前复权因子缓存
             adj_post_cache: 后复权因子缓存
             dividend_cache: 分红事件缓存
             trade_days: 交易日历（DatetimeIndex）
             stock_data_dict_1m: 分钟数据字典（LazyDataDict）
             data_server: 可选的数据服务器，用于同步增量补载和数据源替换
+            corporate_action_calendar: 除权除息日历 {YYYYMMDD: {股票: (每股送转, 每股分红)}}，
+                None 时逐持仓查询 exrights_dict/dividend_cache
         """
         self.stock_data_dict = stock_data_dict
         self.valuation_dict = valuation_dict
@@ -68,6 +71,7 @@ class DataContext:
         self.dividend_cache = dividend_cache if dividend_cache is not None else {}
         self.trade_days = trade_days
         self.stock_data_dict_1m = stock_data_dict_1m
+        self.corporate_action_calendar = corporate_action_calendar
         self.data_version = 0
         self._apis = weakref.WeakSet()
 
@@ -98,8 +102,14 @@ class DataContext:
         # 预建行业索引（优化 get_industry_stocks 性能）
         self._industry_index = None
 
-    def _sync_from_data_server(self, data_server):
-        """Synchronize data objects replaced by a live DataServer."""
+    def _sync_from_data_server(self, data_server, symbols=None):
+        """Synchronize data objects replaced by a live DataServer.
+
+        Args:
+            symbols: symbols whose data changed in place (DataServer.append_data);
+                None invalidates every derived API cache
+        """
+        previous_version = self.data_version
         for name in (
             "stock_data_dict",
             "stock_data_dict_1m",
@@ -113,10 +123,14 @@ class DataContext:
             "adj_pre_cache",
             "adj_post_cache",
             "dividend_cache",
+            "corporate_action_calendar",
             "trade_days",
         ):
             setattr(self, name, getattr(data_server, name))
         self.data_version = data_server.data_version
         self._refresh_metadata_indices()
         for api in self._apis:
-            api._clear_data_caches()
+            if symbols is None:
+                api._clear_data_caches()
+            else:
+                api._clear_data_caches(symbols, previous_version)
@@ -0,0 +1,161 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (c) 2025 Kay
+#
+# This file is part of SimTradeLab, dual-licensed under AGPL-3.0 and a
+# commercial license. See LICENSE-COMMERCIAL.md or contact kayou@duck.com
+#
+"""
+指数成份股历史的紧凑存储
+
+每个指数只保留成份股发生变化的快照（版本），成份股按共享代码池的 int32 序号
+拼接在一个平铺数组中；每个指数有自己的版本生效日数组，时点查询为一次二分。
+内存与成份变化次数成正比，而不是与 快照日数×成份股数 成正比。
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .stock_status import _to_int_dates
+
+
+class IndexConstituents:
+    """按指数存储的成份股版本（只读，可 pickle）"""
+
+    __slots__ = ('_codes', '_indexes', '_offsets', '_symbols')
+
+    def __init__(self, symbols: np.ndarray, codes: np.ndarray, offsets: np.ndarray, indexes: dict[str, tuple]):
+        """
+        Args:
+            symbols: 代码池（object 数组）
+            codes: 各版本成份股在代码池中的序号，按版本拼接
+            offsets: 版本 v 的成份股为 codes[offsets[v]:offsets[v + 1]]
+            indexes: {指数代码: (版本生效日数组, 首个版本序号)}，同一指数的版本连续存放
+        """
+        self._symbols = symbols
+        self._codes = codes
+        self._offsets = offsets
+        self._indexes = indexes
+
+    @classmethod
+    def from_records(cls, dates, index_codes, symbols) -> IndexConstituents:
+        """由预聚合记录构建，每条记录为 (日期, 指数代码, 当日成份股列表)
+
+        同一日期同一指数出现多条记录时以最后一条为准；与上一快照相同的快照不保存。
+        """
+        records = pd.DataFrame({
+            'date': _to_int_dates(dates),
+            'index_code': np.asarray(index_codes, dtype=object),
+            'symbols': [tuple(members) if members is not None else () for members in symbols],
+        }).drop_duplicates(['date', 'index_code'], keep='last').sort_values(
+            ['index_code', 'date'], kind='stable'
+        )
+
+        pool: dict[str, int] = {}
+        codes: list[int] = []
+        offsets = [0]
+        indexes: dict[str, tuple] = {}
+        for index_code, group in records.groupby('index_code', sort=True):
+            first_version = len(offsets) - 1
+            version_dates = []
+            previous = None
+            for date, members in zip(group['date'], group['symbols'], strict=True):
+                if members == previous:
+                    continue
+                previous = members
+                version_dates.append(date)
+                codes.extend(pool.setdefault(symbol, len(pool)) for symbol in members)
+                offsets.append(len(codes))
+            indexes[index_code] = (np.asarray(version_dates, dtype=np.int64), first_version)
+
+        return cls(
+            np.asarray(list(pool), dtype=object),
+            np.asarray(codes, dtype=np.int32),
+            np.asarray(offsets, dtype=np.int64),
+            indexes,
+        )
+
+    @classmethod
+    def from_snapshots(cls, history: dict) -> IndexConstituents:
+        """由旧格式 {日期: {指数代码: 成份股列表}} 构建"""
+        records = [
+            (date, index_code, list(members) if hasattr(members, '__iter__') else [])
+            for date, snapshot in history.items()
+            for index_code, members in snapshot.items()
+        ]
+        if not records:
+            return cls.from_records([], [], [])
+        return cls.from_records(*zip(*records, strict=True))
+
+    @classmethod
+    def coerce(cls, history) -> Optional[IndexConstituents]:
+        """数据上下文中的成份股数据 -> IndexConstituents；无数据时返回 None"""
+        if isinstance(history, cls):
+            return history if history._indexes else None
+        if not history:
+            return None
+        return cls.from_snapshots(history)
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """导出为不含 object 的数组（可用 np.savez 免 pickle 保存），from_arrays 的逆过程"""
+        index_codes = list(self._indexes)
+        version_dates = [self._indexes[code][0] for code in index_codes]
+        return {
+            'symbols': self._symbols.astype(str),
+            'codes': self._codes,
+            'offsets': self._offsets,
+            'index_codes': np.asarray(index_codes, dtype=str),
+            'first_versions': np.asarray([self._indexes[code][1] for code in index_codes], dtype=np.int64),
+            'version_counts': np.asarray([len(dates) for dates in version_dates], dtype=np.int64),
+            'version_dates': np.concatenate(version_dates) if version_dates else np.empty(0, dtype=np.int64),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays) -> IndexConstituents:
+        """由 to_arrays 的结果还原"""
+        version_dates = np.split(arrays['version_dates'], np.cumsum(arrays['version_counts'])[:-1])
+        indexes = {
+            str(code): (dates.astype(np.int64), int(first))
+            for code, first, dates in zip(arrays['index_codes'], arrays['first_versions'], version_dates, strict=True)
+        } if len(arrays['index_codes']) else {}
+        return cls(
+            np.asarray(arrays['symbols'].tolist(), dtype=object),
+            arrays['codes'].astype(np.int32),
+            arrays['offsets'].astype(np.int64),
+            indexes,
+        )
+
+    def __len__(self) -> int:
+        """版本总数"""
+        return len(self._offsets) - 1
+
+    def codes(self) -> list[str]:
+        """全部指数代码"""
+        return list(self._indexes)
+
+    def members(self, index_codes: list[str], date: int) -> Optional[list[str]]:
+        """指数在某日的成份股
+
+        Args:
+            index_codes: 指数代码的候选写法；取快照日最近的一个，同日按候选顺序
+            date: 查询日（YYYYMMDD），取不晚于该日的最近快照
+
+        Returns:
+            成份股列表（新列表）；指数不存在或该日之前没有快照时返回 None
+        """
+        best_date, best_version = None, None
+        for index_code in index_codes:
+            entry = self._indexes.get(index_code)
+            if entry is None:
+                continue
+            version_dates, first_version = entry
+            pos = int(np.searchsorted(version_dates, date, side='right'))
+            if pos and (best_date is None or version_dates[pos - 1] > best_date):
+                best_date, best_version = version_dates[pos - 1], first_version + pos - 1
+        if best_version is None:
+            return None
+        start, stop = self._offsets[best_version], self._offsets[best_version + 1]
+        return self._symbols[self._codes[start:stop]].tolist()
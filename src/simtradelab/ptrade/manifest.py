@@ -0,0 +1,217 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (c) 2025 Kay
+#
+# This file is part of SimTradeLab, dual-licensed under AGPL-3.0 and a
+# commercial license. See LICENSE-COMMERCIAL.md or contact kayou@duck.com
+#
+"""
+数据集清单缓存
+
+将代码列表、解码后的元数据等启动期结果缓存在数据目录下，按源目录/文件的
+(mtime, size) 校验。热启动时命中缓存即可跳过目录 glob 和元数据的 groupby 聚合；
+任一来源变化时该条目重建。
+
+数据目录可能位于多人共用的网络存储上，清单为 JSON（不使用 pickle）：
+DataFrame 以 Parquet、数值数组以原始字节经 base64 内嵌，元组、非字符串键的
+dict、时间戳和 IndexConstituents/StockStatusStore 用带类型标记的对象表示。
+"""
+
+from __future__ import annotations
+
+import base64
+import datetime as dt
+import io
+import json
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_FILE = '.simtradelab_manifest.json'
+MANIFEST_ENV = 'SIMTRADELAB_MANIFEST'
+# 缓存值格式变化时递增（2: 股票状态改为 StockStatusStore；3: 指数成份股改为 IndexConstituents；4: 改为 JSON）
+_MANIFEST_VERSION = 4
+
+_lock = threading.Lock()
+# {manifest 路径: (文件 mtime_ns, {key: [stamp, 编码后的值]})}
+_manifests: dict[str, tuple[int, dict[str, list]]] = {}
+
+
+def manifest_enabled() -> bool:
+    """环境变量 SIMTRADELAB_MANIFEST=0 时禁用清单缓存"""
+    return os.environ.get(MANIFEST_ENV, '1') != '0'
+
+
+def source_stamp(data_dir, sources) -> tuple:
+    """来源目录/文件的 (名称, mtime_ns, size) 元组；不存在的来源记为 (名称, 0, 0)"""
+    stamp = []
+    for name in sources:
+        try:
+            st = (Path(data_dir) / name).stat()
+            stamp.append((name, st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamp.append((name, 0, 0))
+    return tuple(stamp)
+
+
+def _encode(value: Any) -> Any:
+    """编码为可 JSON 序列化的结构；不支持的类型抛出 TypeError"""
+    from .index_constituents import IndexConstituents
+    from .stock_status import StockStatusStore
+
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, tuple):
+        return {'__tuple__': [_encode(item) for item in value]}
+    if isinstance(value, dict):
+        if all(isinstance(key, str) for key in value):
+            return {'__map__': {key: _encode(item) for key, item in value.items()}}
+        return {'__items__': [[_encode(key), _encode(item)] for key, item in value.items()]}
+    if value is pd.NaT:
+        return {'__nat__': None}
+    if isinstance(value, dt.datetime):
+        return {'__timestamp__': pd.Timestamp(value).isoformat()}
+    if isinstance(value, dt.date):
+        return {'__date__': value.isoformat()}
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == 'U':
+            return {'__strings__': value.tolist()}
+        if value.dtype.kind in 'biufMm':
+            return {
+                '__ndarray__': base64.b64encode(np.ascontiguousarray(value).tobytes()).decode('ascii'),
+                'dtype': value.dtype.str,
+                'shape': list(value.shape),
+            }
+    if isinstance(value, pd.DataFrame):
+        buf = io.BytesIO()
+        value.to_parquet(buf)
+        return {'__frame__': base64.b64encode(buf.getvalue()).decode('ascii')}
+    if isinstance(value, IndexConstituents):
+        return {'__index_constituents__': _encode(value.to_arrays())}
+    if isinstance(value, StockStatusStore):
+        return {'__stock_status__': _encode(value.to_arrays())}
+    raise TypeError(f'manifest cannot store {type(value).__name__}')
+
+
+def _decode(value: Any) -> Any:
+    """_encode 的逆过程，每次返回新对象"""
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    (tag, payload), *_ = value.items()
+    if tag == '__tuple__':
+        return tuple(_decode(item) for item in payload)
+    if tag == '__map__':
+        return {key: _decode(item) for key, item in payload.items()}
+    if tag == '__items__':
+        return {_decode(key): _decode(item) for key, item in payload}
+    if tag == '__nat__':
+        return pd.NaT
+    if tag == '__timestamp__':
+        return pd.Timestamp(payload)
+    if tag == '__date__':
+        return dt.date.fromisoformat(payload)
+    if tag == '__strings__':
+        return np.asarray(payload, dtype=str)
+    if tag == '__ndarray__':
+        data = bytearray(base64.b64decode(payload))
+        return np.frombuffer(data, dtype=np.dtype(value['dtype'])).reshape(value['shape'])
+    if tag == '__frame__':
+        return pd.read_parquet(io.BytesIO(base64.b64decode(payload)))
+    if tag == '__index_constituents__':
+        from .index_constituents import IndexConstituents
+        return IndexConstituents.from_arrays(_decode(payload))
+    if tag == '__stock_status__':
+        from .stock_status import StockStatusStore
+        return StockStatusStore.from_arrays(_decode(payload))
+    raise ValueError(f'unknown manifest tag {tag}')
+
+
+def _entries(path: Path) -> dict[str, list]:
+    """读取清单文件（进程内按文件 mtime 缓存）"""
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return {}
+    cached = _manifests.get(str(path))
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    try:
+        with open(path, encoding='utf-8') as f:
+            payload = json.load(f)
+        entries = payload['entries'] if payload.get('version') == _MANIFEST_VERSION else {}
+    except (OSError, ValueError, KeyError, AttributeError):
+        entries = {}
+    _manifests[str(path)] = (mtime, entries)
+    return entries
+
+
+def _write(path: Path, entries: dict[str, list]) -> None:
+    """原子写入清单；数据目录只读时静默跳过"""
+    tmp_path = path.with_name(f'{path.name}.tmp-{os.getpid()}')
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': _MANIFEST_VERSION, 'entries': entries}, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        _manifests[str(path)] = (path.stat().st_mtime_ns, entries)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+
+
+def cached(data_dir, key: str, sources, build: Callable[[], Any]) -> Any:
+    """返回清单中的缓存值，来源变化或不存在时调用 build 重建并写回
+
+    Args:
+        data_dir: 数据根目录（清单文件所在目录）
+        key: 条目名
+        sources: 决定条目有效性的相对路径列表
+        build: 重建函数
+
+    Returns:
+        build() 的结果；每次调用返回独立的对象，调用方可以修改
+    """
+    if not manifest_enabled():
+        return build()
+
+    path = Path(data_dir) / MANIFEST_FILE
+    stamp = source_stamp(data_dir, sources)
+    # JSON 中的戳为嵌套列表
+    recorded = [list(item) for item in stamp]
+    with _lock:
+        entry = _entries(path).get(key)
+    if entry is not None and entry[0] == recorded:
+        try:
+            return _decode(entry[1])
+        except (ValueError, TypeError, KeyError, OSError):
+            pass
+
+    value = build()
+    # 重建期间来源发生变化时不写入，避免记录与内容不符的戳
+    if source_stamp(data_dir, sources) != stamp:
+        return value
+    try:
+        encoded = _encode(value)
+    except TypeError:
+        return value
+    with _lock:
+        entries = dict(_entries(path))
+        entries[key] = [recorded, encoded]
+        _write(path, entries)
+    return value
+
+
+def clear_manifest(data_dir) -> None:
+    """删除清单文件"""
+    path = Path(data_dir) / MANIFEST_FILE
+    with _lock:
+        _manifests.pop(str(path), None)
+        path.unlink(missing_ok=True)
@@ -0,0 +1,258 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (c) 2025 Kay
+#
+# This file is part of SimTradeLab, dual-licensed under AGPL-3.0 and a
+# commercial license. See LICENSE-COMMERCIAL.md or contact kayou@duck.com
+#
+"""
+缓存内存记账
+
+LazyDataDict、统一缓存管理器与 get_history 结果缓存原先各自按条目数淘汰，
+一条 5000 行的日线与一条 20 行的切片占同样的“名额”。这里为每个缓存条目估算字节数，
+所有可淘汰缓存共享一个进程级内存预算（config.cache.memory_budget_mb）：
+超出预算时跨缓存淘汰全局最久未访问的条目，并可按命名空间报告占用字节。
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Iterator, MutableMapping
+from itertools import count
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+# 容器元素较多时按前 N 个元素的平均大小外推
+_SAMPLE_SIZE = 64
+_MAX_DEPTH = 3
+
+
+def estimate_nbytes(value: Any, _depth: int = 0) -> int:
+    """估算对象占用的字节数
+
+    DataFrame/Series/ndarray 按底层缓冲区计（object 列只计指针），容器递归累加，
+    其余对象取 sys.getsizeof。只用于淘汰决策，不追求精确。
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(index=True) if isinstance(value, pd.Series) else value.memory_usage())
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    size = sys.getsizeof(value)
+    if _depth >= _MAX_DEPTH or isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return size
+    if isinstance(value, dict):
+        items = [item for pair in _sample(value.items(), len(value)) for item in pair]
+        return size + _scaled(items, len(value), _depth)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + _scaled(list(_sample(value, len(value))), len(value), _depth)
+    slots = getattr(type(value), '__slots__', None)
+    if slots is not None:
+        return size + sum(estimate_nbytes(getattr(value, name, None), _depth + 1) for name in slots)
+    if hasattr(value, '__dict__'):
+        return size + estimate_nbytes(vars(value), _depth + 1)
+    return size
+
+
+def _sample(iterable, length: int):
+    if length <= _SAMPLE_SIZE:
+        return iterable
+    return (item for _, item in zip(range(_SAMPLE_SIZE), iterable, strict=False))
+
+
+def _scaled(items: list, length: int, depth: int) -> int:
+    total = sum(estimate_nbytes(item, depth + 1) for item in items)
+    sampled = min(length, _SAMPLE_SIZE)
+    return total * length // sampled if sampled else 0
+
+
+class MemoryBudget:
+    """进程级缓存内存预算
+
+    登记所有 SizedLRUCache（弱引用，缓存随所属对象释放）。可淘汰缓存的总字节数超出
+    预算时，反复淘汰各缓存最旧条目中访问时刻最早的一条，直到回到预算以内。
+    """
+
+    def __init__(self, limit_bytes: Optional[int] = None):
+        """
+        Args:
+            limit_bytes: 预算字节数；None 表示读取 config.cache.memory_budget_mb，0 表示不限
+        """
+        self._limit = limit_bytes
+        self._caches: weakref.WeakSet[SizedLRUCache] = weakref.WeakSet()
+        self._clock = count()
+        self.lock = threading.RLock()
+        self.evictions = 0
+
+    @property
+    def limit(self) -> int:
+        """当前预算（字节），0 表示不限"""
+        if self._limit is not None:
+            return self._limit
+        from .config_manager import config
+        return config.cache.memory_budget_mb * 1024 * 1024
+
+    def set_limit(self, limit_bytes: Optional[int]) -> None:
+        """覆盖预算（None 恢复读取配置），并立即按新预算淘汰"""
+        self._limit = limit_bytes
+        self.enforce()
+
+    def tick(self) -> int:
+        """全局访问时刻，用于跨缓存比较新旧"""
+        return next(self._clock)
+
+    def register(self, cache: SizedLRUCache) -> None:
+        self._caches.add(cache)
+
+    def total_bytes(self) -> int:
+        """计入预算的字节数（只含可淘汰缓存）"""
+        return sum(cache.nbytes for cache in list(self._caches) if cache.evictable)
+
+    def enforce(self, keep: Optional[SizedLRUCache] = None) -> None:
+        """超出预算时跨缓存淘汰最久未访问的条目
+
+        Args:
+            keep: 刚写入的缓存；其最新条目不参与淘汰，避免单条超出预算时写入即丢失
+        """
+        limit = self.limit
+        if not limit:
+            return
+        with self.lock:
+            caches = [cache for cache in list(self._caches) if cache.evictable]
+            total = sum(cache.nbytes for cache in caches)
+            while total > limit:
+                candidates = [
+                    cache for cache in caches
+                    if len(cache) > (1 if cache is keep else 0)
+                ]
+                if not candidates:
+                    return
+                victim = min(candidates, key=lambda cache: cache.oldest_tick())
+                total -= victim.evict_oldest()
+                self.evictions += 1
+
+    def usage(self) -> dict[str, int]:
+        """按命名空间汇总的缓存字节数（含不可淘汰的预加载数据）"""
+        report: dict[str, int] = {}
+        for cache in list(self._caches):
+            report[cache.name] = report.get(cache.name, 0) + cache.nbytes
+        return dict(sorted(report.items()))
+
+
+class SizedLRUCache(MutableMapping):
+    """带字节记账的 LRU 缓存
+
+    与 cachetools.LRUCache 一样按条目数上限淘汰（maxsize=None 表示不限条目数），
+    同时向进程级 MemoryBudget 报告字节数，由预算统一做跨缓存的按大小淘汰。
+    evictable=False 的缓存（如全量预加载的数据）只记账、不被预算淘汰。
+    """
+
+    # 按身份比较与哈希（Mapping 默认按内容比较），以便登记到 WeakSet
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def __init__(self, name: str, maxsize: Optional[int] = None, evictable: bool = True,
+                 budget: Optional[MemoryBudget] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.evictable = evictable
+        self.nbytes = 0
+        self.evictions = 0
+        self._budget = budget if budget is not None else memory_budget
+        # {key: value}，按访问先后排列；{key: (字节数, 访问时刻)}
+        self._data: OrderedDict = OrderedDict()
+        self._meta: dict[Any, tuple[int, int]] = {}
+        self._budget.register(self)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator:
+        return iter(list(self._data))
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        self.touch(key)
+        return value
+
+    def peek(self, key):
+        """取值但不更新访问顺序"""
+        return self._data[key]
+
+    def touch(self, key) -> None:
+        """标记为最近访问"""
+        meta = self._meta.get(key)
+        if meta is not None:
+            self._data.move_to_end(key)
+            self._meta[key] = (meta[0], self._budget.tick())
+
+    def __setitem__(self, key, value) -> None:
+        nbytes = estimate_nbytes(value)
+        with self._budget.lock:
+            previous = self._meta.get(key)
+            if previous is not None:
+                self.nbytes -= previous[0]
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._meta[key] = (nbytes, self._budget.tick())
+            self.nbytes += nbytes
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self.evict_oldest()
+        if self.evictable:
+            self._budget.enforce(keep=self)
+
+    def __delitem__(self, key) -> None:
+        with self._budget.lock:
+            del self._data[key]
+            self.nbytes -= self._meta.pop(key)[0]
+
+    def update(self, *args, **kwargs) -> None:
+        """批量写入：逐条记账，最后统一检查一次预算"""
+        items = dict(*args, **kwargs)
+        with self._budget.lock:
+            for key, value in items.items():
+                nbytes = estimate_nbytes(value)
+                previous = self._meta.get(key)
+                if previous is not None:
+                    self.nbytes -= previous[0]
+                self._data[key] = value
+                self._data.move_to_end(key)
+                self._meta[key] = (nbytes, self._budget.tick())
+                self.nbytes += nbytes
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self.evict_oldest()
+        if self.evictable:
+            self._budget.enforce(keep=self)
+
+    def clear(self) -> None:
+        with self._budget.lock:
+            self._data.clear()
+            self._meta.clear()
+            self.nbytes = 0
+
+    def oldest_tick(self) -> int:
+        """最久未访问条目的访问时刻"""
+        return self._meta[next(iter(self._data))][1]
+
+    def evict_oldest(self) -> int:
+        """淘汰最久未访问的条目，返回释放的字节数"""
+        with self._budget.lock:
+            key, _ = self._data.popitem(last=False)
+            nbytes = self._meta.pop(key)[0]
+            self.nbytes -= nbytes
+            self.evictions += 1
+            return nbytes
+
+
+# 全局单例实例
+memory_budget = MemoryBudget()
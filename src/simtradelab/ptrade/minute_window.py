@@ -0,0 +1,295 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (c) 2025 Kay
+#
+# This file is part of SimTradeLab, dual-licensed under AGPL-3.0 and a
+# commercial license. See LICENSE-COMMERCIAL.md or contact kayou@duck.com
+#
+"""
+分钟线滑动窗口
+
+分钟回测不再把全部代码的整段分钟历史预加载进内存：只保留覆盖
+[当前交易日往前 lookback 个交易日, 当前交易日] 的月度分块，回测推进到新交易日时
+淘汰窗口外的分块；下一交易日所在月份尚未常驻时，在 I/O 线程池中后台预取
+当前工作集（窗口内访问过的代码）的下一个月。
+"""
+
+from __future__ import annotations
+
+import math
+from concurrent.futures import Future
+from typing import Optional
+
+import pandas as pd
+
+from ..utils.io_pool import get_io_pool
+from . import storage
+
+# A股每个交易日的分钟 bar 数
+BARS_PER_DAY = 240
+
+
+def _month_start(month: int) -> pd.Timestamp:
+    return pd.Timestamp(year=month // 100, month=month % 100, day=1)
+
+
+def _next_month(month: int) -> int:
+    return month + 89 if month % 100 == 12 else month + 1
+
+
+class MinuteWindowDict:
+    """按月分块常驻的分钟线字典
+
+    接口与 LazyDataDict 兼容（__contains__/__getitem__/get/keys）。__getitem__ 返回回看窗口内
+    各月分块拼接的 DataFrame，行位置只在 advance() 换月时变化（generation 加 1）；
+    需要更长历史时用 history()，它另行常驻更早的月份，不影响 __getitem__ 的结果。
+    """
+
+    def __init__(self, data_dir, all_keys_list, columns=None, date_range=None, trade_days=None, lookback_days=5):
+        """
+        Args:
+            data_dir: 数据根目录
+            all_keys_list: 所有可用的代码
+            columns: 只读取这些列（时间列始终保留），None 表示全部
+            date_range: 数据日期窗口 (start, stop)，None 表示不限
+            trade_days: 交易日历，用于按交易日计算回看起点；None 时按工作日近似
+            lookback_days: 常驻的交易日数（含当前交易日）
+        """
+        self.data_dir = data_dir
+        self.data_type = 'stock_1m'
+        self.columns = frozenset(columns) if columns is not None else None
+        self.date_range = date_range
+        self._all_keys = list(all_keys_list)
+        self._all_keys_set = set(self._all_keys)
+        self._trade_days = pd.DatetimeIndex(trade_days).normalize() if trade_days is not None else None
+        self._lookback = max(int(lookback_days), 1)
+        # history() 需要的回看交易日数，只增不减
+        self._history_lookback = self._lookback
+
+        self._day: Optional[pd.Timestamp] = None
+        # __getitem__ 覆盖的月份 / history() 覆盖的月份（后者包含前者）
+        self._months: tuple[int, ...] = ()
+        self._history_months: tuple[int, ...] = ()
+        # {月份 YYYYMM: {代码: 当月分钟线}}
+        self._chunks: dict[int, dict[str, pd.DataFrame]] = {}
+        # 各月拼接结果，对应月份变化时清空
+        self._frames: dict[str, pd.DataFrame] = {}
+        self._history_frames: dict[str, pd.DataFrame] = {}
+        self._prefetch: Optional[tuple[int, dict[str, Future]]] = None
+        # {代码: 最近访问的交易日}，回看窗口内访问过的代码构成预取工作集
+        self._last_access: dict[str, pd.Timestamp] = {}
+        # __getitem__ 的月份每变化一次加 1，按行位置缓存的调用方据此失效
+        self.generation = 0
+
+    # ---------- 窗口推进 ----------
+
+    def _shift_days(self, day: pd.Timestamp, offset: int) -> Optional[pd.Timestamp]:
+        """day 之后第 offset 个交易日（负数为之前，0 为 day 本身）；超出日历末尾时返回 None"""
+        if not offset:
+            return day
+        if self._trade_days is None or not len(self._trade_days):
+            return day + pd.offsets.BDay(offset)
+        if offset > 0:
+            pos = int(self._trade_days.searchsorted(day, side='right')) + offset - 1
+            return self._trade_days[pos] if pos < len(self._trade_days) else None
+        pos = int(self._trade_days.searchsorted(day, side='right')) - 1
+        return self._trade_days[pos + offset] if pos + offset >= 0 else min(day, self._trade_days[0])
+
+    def _window_months(self, lookback: int) -> tuple[int, ...]:
+        """覆盖 [当前交易日往前 lookback 个交易日, 当前交易日] 的月份"""
+        month = storage.month_key(self._shift_days(self._day, 1 - lookback))
+        last = storage.month_key(self._day)
+        months = []
+        while month <= last:
+            months.append(month)
+            month = _next_month(month)
+        return tuple(months)
+
+    def _month_range(self, month: int) -> Optional[tuple]:
+        """月份与数据日期窗口的交集 [start, stop)，不相交时返回 None"""
+        start, stop = _month_start(month), _month_start(_next_month(month))
+        if self.date_range is not None:
+            lo, hi = self.date_range
+            if lo is not None:
+                start = max(start, pd.Timestamp(lo))
+            if hi is not None:
+                stop = min(stop, pd.Timestamp(hi))
+        return (start, stop) if start < stop else None
+
+    def _read(self, symbol: str, window: Optional[tuple]) -> pd.DataFrame:
+        if window is None:
+            return pd.DataFrame()
+        try:
+            return storage.load_stock_1m(self.data_dir, symbol, self.columns, window)
+        except KeyError:
+            return pd.DataFrame()
+
+    def _submit(self, month: int, symbols) -> dict[str, Future]:
+        window = self._month_range(month)
+        pool = get_io_pool()
+        return {symbol: pool.submit(self._read, symbol, window) for symbol in symbols}
+
+    def _working_set(self) -> set[str]:
+        """当前交易日及之前 lookback 个交易日内访问过的代码"""
+        cutoff = self._shift_days(self._day, -self._lookback)
+        for symbol in [symbol for symbol, day in self._last_access.items() if day < cutoff]:
+            del self._last_access[symbol]
+        return set(self._last_access)
+
+    def advance(self, day) -> None:
+        """推进到交易日 day：淘汰窗口外的月份，补齐窗口内缺失的月份，并预取下一交易日所在月份"""
+        day = pd.Timestamp(day).normalize()
+        if day == self._day:
+            return
+        self._day = day
+        self._refresh()
+
+        next_day = self._shift_days(day, 1)
+        if next_day is None:
+            return
+        month = storage.month_key(next_day)
+        if month in self._chunks or (self._prefetch is not None and self._prefetch[0] == month):
+            return
+        symbols = self._working_set()
+        if symbols:
+            self._prefetch = (month, self._submit(month, symbols))
+
+    def _refresh(self) -> None:
+        """按当前交易日与回看长度调整常驻月份"""
+        months = self._window_months(self._lookback)
+        history_months = self._window_months(self._history_lookback)
+        symbols = self._working_set()
+        for month in history_months:
+            if month in self._chunks:
+                continue
+            if self._prefetch is not None and self._prefetch[0] == month:
+                futures = self._prefetch[1]
+                self._prefetch = None
+            else:
+                futures = self._submit(month, symbols)
+            chunk = {symbol: future.result() for symbol, future in futures.items()}
+            for symbol in symbols - chunk.keys():
+                chunk[symbol] = self._read(symbol, self._month_range(month))
+            self._chunks[month] = chunk
+        for month in list(self._chunks):
+            if month not in history_months:
+                del self._chunks[month]
+
+        if months != self._months:
+            self._months = months
+            self._frames.clear()
+            self.generation += 1
+        if history_months != self._history_months:
+            self._history_months = history_months
+            self._history_frames.clear()
+
+    def _concat(self, key, months, cache: dict[str, pd.DataFrame]) -> pd.DataFrame:
+        frame = cache.get(key)
+        if frame is not None:
+            return frame
+        pieces = []
+        for month in months:
+            chunk = self._chunks[month]
+            if key not in chunk:
+                chunk[key] = self._read(key, self._month_range(month))
+            if not chunk[key].empty:
+                pieces.append(chunk[key])
+        frame = pd.concat(pieces) if len(pieces) > 1 else (pieces[0] if pieces else pd.DataFrame())
+        cache[key] = frame
+        return frame
+
+    # ---------- 字典接口 ----------
+
+    def __contains__(self, key):
+        return key in self._all_keys_set
+
+    def __getitem__(self, key):
+        if key not in self._all_keys_set:
+            raise KeyError(f'Stock {key} not found')
+        if self._day is None:
+            # 尚未开始推进（如 initialize 阶段）：一次性读取，不常驻
+            return self._read(key, self.date_range or (None, None))
+        self._last_access[key] = self._day
+        return self._concat(key, self._months, self._frames)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def get_arrays(self, key):
+        """分钟线不提供列式视图"""
+        return None
+
+    def keys(self):
+        return self._all_keys
+
+    def append(self, keys, trade_days=None):
+        """数据更新后丢弃 keys 的常驻分块（下次访问时重读），不在代码列表中的 key 作为新代码加入
+
+        Args:
+            trade_days: 更新后的交易日历，None 表示不变
+
+        Returns:
+            list: 刷新的 key
+        """
+        keys = list(dict.fromkeys(keys))
+        added = [key for key in keys if key not in self._all_keys_set]
+        if added:
+            self._all_keys = self._all_keys + added
+            self._all_keys_set.update(added)
+        if trade_days is not None:
+            self._trade_days = pd.DatetimeIndex(trade_days).normalize()
+        for key in keys:
+            for chunk in self._chunks.values():
+                chunk.pop(key, None)
+            self._frames.pop(key, None)
+            self._history_frames.pop(key, None)
+            if self._prefetch is not None:
+                self._prefetch[1].pop(key, None)
+        return keys
+
+    def clear_cache(self):
+        """丢弃全部常驻分块与未完成的预取"""
+        self._chunks.clear()
+        self._frames.clear()
+        self._history_frames.clear()
+        self._prefetch = None
+        self._last_access.clear()
+        self._months = ()
+        self._history_months = ()
+        self._day = None
+        self.generation += 1
+
+    # ---------- 长历史 ----------
+
+    def history(self, key, bars: Optional[int] = None, since=None) -> pd.DataFrame:
+        """取包含足够历史的分钟线
+
+        Args:
+            bars: 需要截至当前交易日的 1 分钟 bar 数；超出回看窗口时常驻更早的月份
+            since: 需要从该时间开始的数据；早于常驻月份时一次性读取之前的部分（不常驻）
+        """
+        if key not in self._all_keys_set:
+            raise KeyError(f'Stock {key} not found')
+        if self._day is None:
+            return self[key]
+        if bars is not None:
+            days = math.ceil(bars / BARS_PER_DAY) + 1
+            if days > self._history_lookback:
+                self._history_lookback = days
+                self._refresh()
+        self._last_access[key] = self._day
+        frame = self._concat(key, self._history_months, self._history_frames)
+        if since is None:
+            return frame
+
+        window_start = _month_start(self._history_months[0])
+        lo = pd.Timestamp(since)
+        if self.date_range is not None and self.date_range[0] is not None:
+            lo = max(lo, pd.Timestamp(self.date_range[0]))
+        if lo >= window_start:
+            return frame
+        earlier = self._read(key, (lo, window_start))
+        pieces = [piece for piece in (earlier, frame) if not piece.empty]
+        return pd.concat(pieces) if len(pieces) > 1 else (pieces[0] if pieces else frame)
@@ -14,42 +14,47 @@
 
 from __future__ import annotations
 
+import time
 from collections import OrderedDict
+from concurrent.futures import Future, wait
 from datetime import datetime
 from functools import wraps
 from typing import Any, Optional
 
 import numpy as np
 import pandas as pd
-from joblib import Parallel, delayed
 from pydantic import BaseModel, Field
-from tqdm import tqdm
 
 from ..utils.performance_config import get_performance_config
 from .cache_manager import cache_manager
+from .columnar_store import SymbolArrays, column_value, column_values, get_symbol_source
+from .compact import restore_frame
 from .lifecycle_controller import LifecyclePhase
+from .memory_budget import SizedLRUCache
 
 
 def _get_load_map():
     """获取数据类型到加载函数的映射（延迟导入避免循环依赖）"""
     from . import storage
+    from .corporate_actions import get_corporate_actions
     return {
         'stock': storage.load_stock,
         'stock_1m': storage.load_stock_1m,
         'valuation': storage.load_valuation,
         'fundamentals': storage.load_fundamentals,
-        'exrights': lambda data_dir, k: storage.load_exrights(data_dir, k).get('exrights_events', pd.DataFrame())
+        'exrights': lambda data_dir, k, columns=None: get_corporate_actions(data_dir).events(k)
     }
 
 
 # ==================== 多进程worker函数 ====================
-def _load_data_chunk(data_dir, data_type, keys_chunk) -> dict[str, Any]:
+def _load_data_chunk(data_dir, data_type, keys_chunk, load_kwargs=None) -> dict[str, Any]:
     """多进程worker：加载一批数据
 
     Args:
         data_dir: 数据目录路径
         data_type: 数据类型（'stock', 'valuation', 'fundamentals', 'exrights'）
         keys_chunk: 要加载的key列表
+        load_kwargs: 传给加载函数的参数（columns/date_range）
 
     Returns:
         dict: {key: dataframe}
@@ -59,7 +64,7 @@ def _load_data_chunk(data_dir, data_type, keys_chunk) -> dict[str, Any]:
 
     for key in keys_chunk:
         try:
-            df = load_func(data_dir, key)
+            df = load_func(data_dir, key, **(load_kwargs or {}))
             if not df.empty:
                 result[key] = df
         except Exception:
@@ -89,8 +94,20 @@ class BacktestContext:
         self.data_context = data_context
 
 class LazyDataDict:
-    """延迟加载数据字典（可选全量加载，支持多进程加速）"""
-    def __init__(self, data_dir, data_type, all_keys_list, max_cache_size=6000, preload=False, use_multiprocessing=True):
+    """延迟加载数据字典（可选全量加载，支持多进程加速）
+
+    日线行情全量加载后转存为列式存储（ColumnarStore），热路径通过
+    get_arrays 直接读取数组；__getitem__ 按需还原 DataFrame 并做有界缓存。
+    紧凑模式下可无损压缩的列常驻为 float32/int32，__getitem__ 交出前还原为 float64/int64，
+    get_arrays 的列视图在取列时还原。
+    按需加载模式下可通过 prefetch 在 I/O 线程池中预热即将访问的 key，
+    get_many 并行读取一批缓存未命中的 key。
+    """
+    _COLUMNAR_TYPES = frozenset({'stock'})
+    _COMPACT_TYPES = frozenset({'stock', 'valuation'})
+
+    def __init__(self, data_dir, data_type, all_keys_list, max_cache_size=6000, preload=False, use_multiprocessing=True,
+                 columns=None, date_range=None, compact=False):
         """初始化延迟加载数据字典
 
         Args:
@@ -100,94 +117,358 @@ class LazyDataDict:
             max_cache_size: 最大缓存数量
             preload: 是否预加载所有数据
             use_multiprocessing: 是否使用多进程加载
+            columns: 只读取这些列（时间列始终保留），None 表示全部
+            date_range: 只读取日期窗口 (start, stop) 内的行（仅行情数据），None 表示全部历史
+            compact: 紧凑 dtype 模式（仅行情与估值数据）
         """
         self.data_dir = data_dir
         self.data_type = data_type
+        self.columns = frozenset(columns) if columns is not None else None
+        self.date_range = date_range
+        self._load_kwargs = {'columns': self.columns}
+        if date_range is not None:
+            self._load_kwargs['date_range'] = date_range
+        self._compact = bool(compact) and data_type in self._COMPACT_TYPES
+        if self._compact:
+            self._load_kwargs['compact'] = True
 
         # 使用公共加载映射
         self._load_map = _get_load_map()
-        self._cache = OrderedDict()  # 使用OrderedDict实现LRU
+        # 按需加载的条目按数量与进程级内存预算淘汰；预加载的全量数据只记账、不淘汰
+        self._cache = SizedLRUCache(f'LazyDataDict.{data_type}', maxsize=None if preload else max_cache_size,
+                                    evictable=not preload)
         self._all_keys = all_keys_list
         self._all_keys_set = set(all_keys_list)  # O(1) 查找
-        self._max_cache_size = max_cache_size  # 最大缓存数量
         self._preload = preload
         self._access_count = 0  # 访问计数器
         self._lru_update_interval = 100  # 每N次访问才重新排序
+        # 后台预取中的 key -> 所在批次的 Future（结果为 {key: data}），首次访问时取出写入缓存
+        self._pending: dict[str, Future] = {}
+        # hits: 访问时预取已完成；stalls/stall_seconds: 访问时预取未完成而等待；misses: 未预取而同步读取
+        self.prefetch_stats = {'submitted': 0, 'hits': 0, 'stalls': 0, 'stall_seconds': 0.0, 'misses': 0}
+
+        # 合并数据集（存在时替代逐文件读取）
+        from . import storage
+        dataset = storage.DATASET_DIRS.get(data_type)
+        self._store = storage.open_consolidated_store(data_dir, dataset) if dataset else None
 
         # 如果启用预加载，一次性加载所有数据到内存
         if preload:
-            config = get_performance_config()
-
-            # 判断是否使用多进程
-            enable_mp = (use_multiprocessing and
-                        config.enable_multiprocessing and
-                        len(all_keys_list) >= config.min_batch_size)
-
-            if enable_mp:
-                # 多进程并行加载
-                num_workers = config.num_workers
-                chunk_size = max(50, len(all_keys_list) // (num_workers * 2))
-                chunks = [all_keys_list[i:i+chunk_size]
-                         for i in range(0, len(all_keys_list), chunk_size)]
-
-                from simtradelab.i18n import t
-                print(t("data.parallel_loading", workers=num_workers, count=len(all_keys_list)))
-                import time
-                start_time = time.perf_counter()
-
-                # 多进程加载
-                results = Parallel(n_jobs=num_workers, backend='loky', verbose=0)(
-                    delayed(_load_data_chunk)(self.data_dir, self.data_type, chunk)
-                    for chunk in chunks
-                )
-
-                # 合并结果
-                for chunk_result in results:
-                    self._cache.update(chunk_result)
-
-                elapsed = time.perf_counter() - start_time
-                print(t("data.parallel_done", time="{:.1f}".format(elapsed)))
-            else:
-                # 串行加载（带进度条）
-                load_func = self._load_map[self.data_type]
-                for key in tqdm(all_keys_list, desc='  加载', ncols=80, ascii=True,
-                              bar_format='{desc}: {percentage:3.0f}%|{bar}| {n:4d}/{total:4d} [{elapsed}<{remaining}]'):
-                    try:
-                        self._cache[key] = load_func(self.data_dir, key)
-                    except KeyError:
-                        pass
+            start_time = time.perf_counter()
+            mode = self._preload_all(all_keys_list, use_multiprocessing)
+            self._report_throughput(mode, all_keys_list, time.perf_counter() - start_time)
+
+        self._columnar = None
+        if preload and data_type in self._COLUMNAR_TYPES:
+            self._build_columnar()
+
+    def _preload_all(self, all_keys_list, use_multiprocessing):
+        """全量加载到 _cache，返回实际使用的加载方式"""
+        from simtradelab.i18n import t
+
+        if self._store is not None:
+            print(t("data.consolidated_loading", count=len(all_keys_list)))
+            loaded = self._store.load(all_keys_list, **self._load_kwargs)
+            self._cache.update((key, df) for key, df in loaded.items() if not df.empty)
+            return 'consolidated'
+
+        config = get_performance_config()
+
+        # 判断是否并行加载
+        enable_mp = (use_multiprocessing and
+                    config.enable_multiprocessing and
+                    len(all_keys_list) >= config.min_batch_size)
+
+        if not enable_mp:
+            # 串行加载（带进度条）
+            from tqdm import tqdm
+
+            load_func = self._load_map[self.data_type]
+            for key in tqdm(all_keys_list, desc='  加载', ncols=80, ascii=True,
+                          bar_format='{desc}: {percentage:3.0f}%|{bar}| {n:4d}/{total:4d} [{elapsed}<{remaining}]'):
+                try:
+                    self._cache[key] = load_func(self.data_dir, key, **self._load_kwargs)
+                except KeyError:
+                    pass
+            return 'serial'
+
+        num_workers = config.num_workers
+        chunk_size = max(50, len(all_keys_list) // (num_workers * 2))
+        chunks = [all_keys_list[i:i+chunk_size]
+                 for i in range(0, len(all_keys_list), chunk_size)]
+
+        if config.loader_backend == 'process':
+            # 多进程加载：worker 读取后 pickle 回传
+            from joblib import Parallel, delayed
+
+            print(t("data.parallel_loading", workers=num_workers, count=len(all_keys_list)))
+            results = Parallel(n_jobs=num_workers, backend='loky', verbose=0)(
+                delayed(_load_data_chunk)(self.data_dir, self.data_type, chunk, self._load_kwargs)
+                for chunk in chunks
+            )
+            mode = 'process'
+        else:
+            # 常驻线程池加载：pyarrow 解码释放 GIL，结果直接写入本进程
+            from ..utils.io_pool import get_io_pool
+            print(t("data.thread_loading", workers=num_workers, count=len(all_keys_list)))
+            pool = get_io_pool(num_workers)
+            results = pool.map(_load_data_chunk, [self.data_dir] * len(chunks),
+                               [self.data_type] * len(chunks), chunks, [self._load_kwargs] * len(chunks))
+            mode = 'thread'
+
+        # 合并结果
+        for chunk_result in results:
+            self._cache.update(chunk_result)
+        return mode
+
+    def _report_throughput(self, mode, all_keys_list, elapsed):
+        """输出加载耗时与吞吐（文件/秒、MB/秒），便于对比不同加载方式"""
+        from simtradelab.i18n import t
+
+        from . import storage
+        if mode == 'consolidated':
+            files = 1
+            size = storage.consolidated_size(self.data_dir, storage.DATASET_DIRS[self.data_type])
+        else:
+            files = len(all_keys_list)
+            size = storage.data_files_size(self.data_dir, self.data_type, all_keys_list)
+        elapsed = max(elapsed, 1e-9)
+        size_mb = size / 1024 / 1024
+        print(t("data.parallel_done", time="{:.1f}".format(elapsed)))
+        print(t("data.load_throughput", mode=mode, files=files,
+                files_per_sec="{:.0f}".format(files / elapsed),
+                size="{:.1f}".format(size_mb), mb_per_sec="{:.1f}".format(size_mb / elapsed)))
+
+    @classmethod
+    def from_columnar(cls, data_dir, data_type, store, max_cache_size=6000):
+        """包装已有的列式存储（如共享内存映射面板），不读取任何文件
+
+        只读挂载时按需还原的 DataFrame 为零拷贝包装，缓存上限可以放宽。
+        """
+        instance = cls(data_dir, data_type, [], max_cache_size=max_cache_size, preload=False)
+        instance._all_keys = store.symbols()
+        instance._all_keys_set = set(instance._all_keys)
+        instance._preload = True
+        instance._columnar = store
+        instance._compact = store.compact
+        return instance
+
+    def _build_columnar(self):
+        """全量数据转为列式存储，释放逐标的 DataFrame"""
+        from simtradelab.i18n import t
+
+        from .columnar_store import ColumnarStore
+        from .config_manager import config
+
+        frames = dict(self._cache.items())
+        self._cache.clear()
+        self._columnar = ColumnarStore.from_frames(frames, compact=self._compact)
+        # 按需还原的 DataFrame 可以随时从列式存储重建，改为可淘汰缓存
+        self._cache = SizedLRUCache(self._cache.name, maxsize=config.cache.columnar_frame_cache_size)
+        print(t("data.columnar_built", count=len(self._columnar),
+                size="{:.1f}".format(self._columnar.nbytes / 1024 / 1024)))
 
     def __contains__(self, key):
         return key in self._all_keys_set
 
     def __getitem__(self, key):
+        frame = self._lookup(key)
+        return restore_frame(frame) if self._compact else frame
+
+    def _lookup(self, key):
+        """缓存/列式存储/文件中取 key 对应的常驻数据（紧凑模式下未还原）"""
         if key in self._cache:
             # LRU优化：每N次访问才重新排序（减少move_to_end开销）
-            if not self._preload:
+            if not self._preload or self._columnar is not None:
                 self._access_count += 1
                 if self._access_count % self._lru_update_interval == 0:
-                    self._cache.move_to_end(key)
-            return self._cache[key]
+                    self._cache.touch(key)
+            return self._cache.peek(key)
+
+        # 列式存储：按需还原 DataFrame
+        if self._columnar is not None:
+            if key not in self._columnar:
+                raise KeyError(f"Stock {key} not found")
+            return self._remember(key, self._columnar.frame(key, copy=not self._columnar.read_only))
 
         # 预加载模式下，缓存中没有说明数据不存在
         if self._preload:
             raise KeyError(f"Stock {key} not found")
 
-        # 延迟加载模式：缓存未命中，从存储加载
+        # 延迟加载模式：缓存未命中，优先取后台预取结果，否则从存储加载
+        future = self._pending.pop(key, None)
+        if future is not None:
+            value = self._take_prefetched(key, future)
+            if value is not None:
+                return self._remember(key, value)
+        else:
+            self.prefetch_stats['misses'] += 1
         try:
-            load_func = self._load_map[self.data_type]
-            value = load_func(self.data_dir, key)
+            return self._remember(key, self._load_one(key))
+        except KeyError:
+            raise KeyError(f'Stock {key} not found')
 
-            # 添加到缓存
-            self._cache[key] = value
+    def _take_prefetched(self, key, future):
+        """取预取结果，未完成时等待并计入停顿；读取失败或 key 不存在时返回 None（由调用方同步读取）"""
+        if future.done():
+            self.prefetch_stats['hits'] += 1
+        else:
+            start = time.perf_counter()
+            wait([future])
+            self.prefetch_stats['stalls'] += 1
+            self.prefetch_stats['stall_seconds'] += time.perf_counter() - start
+        if future.cancelled() or future.exception() is not None:
+            return None
+        return future.result().get(key)
 
-            # LRU淘汰：如果超过最大缓存，删除最旧的
-            if len(self._cache) > self._max_cache_size:
-                self._cache.popitem(last=False)  # 删除最早的项
+    def prefetch(self, keys):
+        """在 I/O 线程池中后台预热一批 key（仅按需加载模式）
 
-            return value
-        except KeyError:
-            raise KeyError(f'Stock {key} not found')
+        已缓存、正在预取或不存在的 key 被跳过，同时在途的数量不超过缓存容量。
+
+        Returns:
+            int: 提交预取的 key 数量
+        """
+        if self._preload or self._columnar is not None:
+            return 0
+        wanted = [key for key in dict.fromkeys(keys)
+                  if key in self._all_keys_set and key not in self._cache and key not in self._pending]
+        if self._cache.maxsize is not None:
+            wanted = wanted[:max(self._cache.maxsize - len(self._pending), 0)]
+        if not wanted:
+            return 0
+
+        for chunk, future in self._submit_batches(wanted):
+            self._pending.update(dict.fromkeys(chunk, future))
+        self.prefetch_stats['submitted'] += len(wanted)
+        return len(wanted)
+
+    def get_many(self, keys):
+        """批量取多个 key，缓存未命中的 key 在 I/O 线程池中并行读取后一次写入缓存
+
+        合并数据集存在时未命中的 key 由一次 ConsolidatedStore.load 读取。
+
+        Returns:
+            dict: {key: data}，不存在的 key 被忽略
+        """
+        keys = [key for key in dict.fromkeys(keys) if key in self._all_keys_set]
+        loaded = {}
+        if not self._preload and self._columnar is None:
+            misses = [key for key in keys if key not in self._cache and key not in self._pending]
+            if len(misses) > 1:
+                self.prefetch_stats['misses'] += len(misses)
+                for _, future in self._submit_batches(misses):
+                    loaded.update(future.result())
+                self._cache.update(loaded)
+
+        result = {}
+        for key in keys:
+            if key in loaded:
+                value = loaded[key]
+            else:
+                try:
+                    value = self._lookup(key)
+                except KeyError:
+                    continue
+            result[key] = restore_frame(value) if self._compact else value
+        return result
+
+    def _submit_batches(self, keys):
+        """把 keys 分批提交到 I/O 线程池，返回 [(批次, Future)]"""
+        from ..utils.io_pool import get_io_pool
+        if self._store is not None:
+            # 合并数据集按行组批量读取，拆分反而重复读取相同行组
+            chunks = [keys]
+            pool = get_io_pool()
+        else:
+            workers = get_performance_config().num_workers
+            pool = get_io_pool(workers)
+            chunk_size = max(1, -(-len(keys) // (workers * 2)))
+            chunks = [keys[i:i + chunk_size] for i in range(0, len(keys), chunk_size)]
+        return [(chunk, pool.submit(self._load_batch, chunk)) for chunk in chunks]
+
+    def _load_batch(self, keys, load_kwargs=None):
+        """读取一批 key（I/O 线程中执行），返回 {key: data}；每个 key 的结果与 _load_one 一致，不存在的 key 被忽略
+
+        Args:
+            load_kwargs: 替代 self._load_kwargs 的加载参数（如只读新增行的日期窗口）
+        """
+        load_kwargs = self._load_kwargs if load_kwargs is None else load_kwargs
+        if self._store is not None:
+            loaded = self._store.load(keys, **load_kwargs)
+            return {key: loaded.get(key, pd.DataFrame()) for key in keys}
+        load_func = self._load_map[self.data_type]
+        result = {}
+        for key in keys:
+            try:
+                result[key] = load_func(self.data_dir, key, **load_kwargs)
+            except KeyError:
+                pass
+        return result
+
+    def _remember(self, key, value):
+        """写入缓存，超过最大缓存数量或内存预算时淘汰最旧项"""
+        self._cache[key] = value
+        return value
+
+    def get_arrays(self, key):
+        """返回列式视图（SymbolArrays），未启用列式存储或不存在时返回 None"""
+        if self._columnar is None:
+            return None
+        return self._columnar.arrays(key)
+
+    def _load_one(self, key):
+        """从合并数据集或单个文件读取一个key"""
+        if self._store is not None:
+            return self._store.load([key], **self._load_kwargs).get(key, pd.DataFrame())
+        return self._load_map[self.data_type](self.data_dir, key, **self._load_kwargs)
+
+    def append(self, keys):
+        """数据更新后刷新 keys 的常驻数据，其余 key 不受影响
+
+        列式行情只读取各 key 常驻数据最后日期之后的行并追加到列式存储；其他预加载数据整段重读这些 key；
+        按需加载模式只丢弃这些 key 的缓存，下次访问时重新读取。不在代码列表中的 key 作为新代码加入。
+
+        Returns:
+            list: 刷新的 key
+        """
+        from . import storage
+
+        keys = list(dict.fromkeys(keys))
+        added = [key for key in keys if key not in self._all_keys_set]
+        if added:
+            self._all_keys = list(self._all_keys) + added
+            self._all_keys_set.update(added)
+        for key in keys:
+            future = self._pending.pop(key, None)
+            if future is not None:
+                future.cancel()
+            self._cache.pop(key, None)
+        if not keys or not self._preload:
+            return keys
+
+        # 合并数据集可能已被重建或因源目录变化而失效
+        dataset = storage.DATASET_DIRS.get(self.data_type)
+        self._store = storage.open_consolidated_store(self.data_dir, dataset) if dataset else None
+        if self._columnar is None:
+            self._cache.update((key, df) for key, df in self._load_batch(keys).items() if not df.empty)
+            return keys
+
+        lasts = [self._columnar.last_date(key) for key in keys]
+        known = [last for last in lasts if last is not None]
+        frames = self._load_batch([key for key, last in zip(keys, lasts, strict=True) if last is None])
+        if known:
+            # 只读最早的最后日期之后的行，ColumnarStore.append 再按各 key 自己的最后日期截取
+            start = pd.Timestamp(min(known)) + pd.Timedelta(1)
+            if self.date_range is not None and self.date_range[0] is not None:
+                start = max(start, pd.Timestamp(self.date_range[0]))
+            stop = self.date_range[1] if self.date_range is not None else None
+            tail_kwargs = {**self._load_kwargs, 'date_range': (start, stop)}
+            frames.update(self._load_batch(
+                [key for key, last in zip(keys, lasts, strict=True) if last is not None], tail_kwargs
+            ))
+        self._columnar = self._columnar.append(frames)
+        return keys
 
     def get(self, key, default=None):
         try:
@@ -203,8 +484,12 @@ class LazyDataDict:
             yield key, self[key]
 
     def clear_cache(self):
-        """手动清空缓存"""
+        """手动清空缓存，丢弃未完成的预取"""
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
         self._cache.clear()
+        self._columnar = None
 
 
 
@@ -227,7 +512,7 @@ class StockData:
         self._cached_idx = None  # 缓存的idx,用于判断是否需要重新加载
 
         if bt_ctx and bt_ctx.stock_data_dict and stock in bt_ctx.stock_data_dict:
-            self._stock_df = bt_ctx.stock_data_dict[stock]
+            self._stock_df = get_symbol_source(bt_ctx.stock_data_dict, stock)
 
     def _ensure_data_loaded(self):
         """确保数据已加载（延迟加载）"""
@@ -236,7 +521,7 @@ class StockData:
         # 需要判断当前phase,如果phase变化则重新加载
 
         # 首次访问时才计算_current_idx（此时phase已正确设置）
-        if self._stock_df is not None and isinstance(self._stock_df, pd.DataFrame):
+        if self._stock_df is not None and isinstance(self._stock_df, (pd.DataFrame, SymbolArrays)):
             if self._bt_ctx and self._bt_ctx.get_stock_date_index:
                 date_dict, sorted_i8 = self._bt_ctx.get_stock_date_index(self.stock)
                 if self._bt_ctx.context and self._bt_ctx.context.frequency == '1m':
@@ -278,6 +563,12 @@ class StockData:
         if self._current_idx is None or self._stock_df is None:
             raise ValueError(f"股票 {self.stock} 在 {self.current_date} 数据加载失败")
 
+        if isinstance(self._stock_df, SymbolArrays):
+            # 与 DataFrame.iloc 取行一致：各字段提升为同一 dtype
+            fields = ('close', 'open', 'high', 'low', 'volume')
+            row = np.asarray([self._stock_df.value(f, self._current_idx) for f in fields])
+            return dict(zip(fields, row, strict=True))
+
         row = self._stock_df.iloc[self._current_idx]
         data = {
             'close': row['close'],
@@ -356,7 +647,7 @@ class StockData:
             raise ValueError(f"股票 {self.stock} 无法计算mavg({window})")
 
         start_idx = max(0, self._current_idx - window + 1)
-        close_prices = self._stock_df.iloc[start_idx:self._current_idx + 1]['close'].values
+        close_prices = column_values(self._stock_df, 'close', start_idx, self._current_idx + 1)
         result = np.nanmean(close_prices)
 
         # 更新全局缓存
@@ -378,9 +669,8 @@ class StockData:
             raise ValueError(f"股票 {self.stock} 无法计算vwap({window})")
 
         start_idx = max(0, self._current_idx - window + 1)
-        slice_df = self._stock_df.iloc[start_idx:self._current_idx + 1]
-        volumes = slice_df['volume'].values
-        closes = slice_df['close'].values
+        volumes = column_values(self._stock_df, 'volume', start_idx, self._current_idx + 1)
+        closes = column_values(self._stock_df, 'close', start_idx, self._current_idx + 1)
         total_volume = np.sum(volumes)
 
         if total_volume == 0:
@@ -636,8 +926,8 @@ class Portfolio:
             else:
                 current_price = position.cost_basis
                 if self._bt_ctx and self._bt_ctx.get_stock_date_index:
-                    stock_df = self._bt_ctx.stock_data_dict.get(stock)
-                    if stock_df is not None and isinstance(stock_df, pd.DataFrame) and self._context:
+                    stock_df = get_symbol_source(self._bt_ctx.stock_data_dict, stock)
+                    if isinstance(stock_df, (pd.DataFrame, SymbolArrays)) and self._context:
                         date_dict, _ = self._bt_ctx.get_stock_date_index(stock)
                         lookup_dt = pd.Timestamp(self._context.current_dt)
                         if getattr(self._context, 'frequency', '1d') != '1m':
@@ -648,7 +938,7 @@ class Portfolio:
                             if candidate >= 0:
                                 idx = candidate
                         if idx is not None:
-                            price = stock_df['close'].values[idx]
+                            price = column_value(stock_df, 'close', idx)
                             if not np.isnan(price) and price > 0:
                                 current_price = price
                 self._close_price_cache[stock] = current_price
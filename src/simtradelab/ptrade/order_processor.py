@@ -18,6 +18,7 @@ from typing import Optional
 import uuid
 import pandas as pd
 
+from .columnar_store import SymbolArrays, column_value, get_symbol_source
 from .config_manager import config
 from .object import Order
 from simtradelab.i18n import t
@@ -75,8 +76,8 @@ class OrderProcessor:
                 self.log.warning(t("order.price_no_data", stock=stock))
                 return None
 
-            stock_df = data_source[stock]
-            if not isinstance(stock_df, pd.DataFrame):
+            stock_df = get_symbol_source(data_source, stock)
+            if not isinstance(stock_df, (pd.DataFrame, SymbolArrays)):
                 return None
 
             try:
@@ -95,12 +96,12 @@ class OrderProcessor:
                         idx = stock_df.index.get_loc(normalized_dt)
 
                 # 成交量检查：volume=0 表示停牌，Ptrade会拒绝订单
-                volume = stock_df['volume'].values[idx]
+                volume = column_value(stock_df, 'volume', idx)
                 if volume == 0:
                     self.log.warning(t("order.volume_zero", stock=stock))
                     return None
 
-                price = stock_df['close'].values[idx]
+                price = column_value(stock_df, 'close', idx)
                 base_price = float(price)
 
                 if pd.isna(base_price) or base_price <= 0:
@@ -144,8 +145,8 @@ class OrderProcessor:
             else:
                 data_source = self.data_context.stock_data_dict
 
-            stock_df = data_source[stock]
-            if not isinstance(stock_df, pd.DataFrame) or "volume" not in stock_df:
+            stock_df = get_symbol_source(data_source, stock)
+            if not isinstance(stock_df, (pd.DataFrame, SymbolArrays)) or "volume" not in stock_df:
                 return None
             if frequency == "1m":
                 idx = stock_df.index.searchsorted(self.context.current_dt, side="right") - 1
@@ -157,7 +158,7 @@ class OrderProcessor:
                 idx = date_dict.get(normalized_dt.value)
                 if idx is None:
                     idx = stock_df.index.get_loc(normalized_dt)
-            return int(stock_df["volume"].values[idx])
+            return int(column_value(stock_df, "volume", idx))
         except (KeyError, IndexError, TypeError, ValueError):
             return None
 
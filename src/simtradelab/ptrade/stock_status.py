@@ -0,0 +1,167 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (c) 2025 Kay
+#
+# This file is part of SimTradeLab, dual-licensed under AGPL-3.0 and a
+# commercial license. See LICENSE-COMMERCIAL.md or contact kayou@duck.com
+#
+"""
+股票状态（ST/HALT/DELISTING）紧凑存储
+
+每种状态保存一张 日期×股票 位图：每只股票占 1 bit，且只保留与上一快照不同的行
+（变化日），长历史下内存与状态变化次数成正比，而不是与 日期数×股票数 成正比。
+查询时先二分定位当日快照行，再一次性取出整批股票的状态位。
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+STATUS_TYPES = ('ST', 'HALT', 'DELISTING')
+
+
+def _to_int_dates(values) -> np.ndarray:
+    """YYYYMMDD 字符串/整数或日期 -> YYYYMMDD 整数数组"""
+    series = pd.Series(values)
+    if not pd.api.types.is_datetime64_any_dtype(series):
+        series = pd.to_datetime(series.astype(str))
+    return (series.dt.year * 10000 + series.dt.month * 100 + series.dt.day).to_numpy(dtype=np.int64)
+
+
+class StockStatusStore:
+    """按状态类型存储的股票状态位图（只读，可 pickle）"""
+
+    __slots__ = ('_bits', '_dates', '_first_date', '_symbols')
+
+    def __init__(self, symbols: pd.Index, first_date: int, dates: dict[str, np.ndarray], bits: dict[str, np.ndarray]):
+        """
+        Args:
+            symbols: 位序号对应的股票代码
+            first_date: 首个快照日（YYYYMMDD），此前没有快照
+            dates: {状态: 变化日数组}，首个元素为 first_date
+            bits: {状态: 与 dates 对齐的打包位图 uint8[变化日数, ceil(股票数/8)]}
+        """
+        self._symbols = symbols
+        self._first_date = first_date
+        self._dates = dates
+        self._bits = bits
+
+    @classmethod
+    def from_records(cls, dates, status_types, symbols) -> StockStatusStore:
+        """由预聚合记录构建，每条记录为 (日期, 状态, 当日处于该状态的股票列表)
+
+        同一日期同一状态出现多条记录时以最后一条为准。
+        """
+        records = pd.DataFrame({
+            'date': _to_int_dates(dates),
+            'status_type': np.asarray(status_types, dtype=object),
+            'symbols': list(symbols),
+        }).drop_duplicates(['date', 'status_type'], keep='last')
+
+        all_dates = np.unique(records['date'].to_numpy())
+        sizes = records['symbols'].map(len).to_numpy()
+        flat = np.concatenate([np.asarray(s, dtype=object) for s in records['symbols']]) if sizes.sum() else []
+        symbol_index = pd.Index(pd.unique(np.asarray(flat, dtype=object))).sort_values()
+
+        codes = symbol_index.get_indexer(flat) if len(flat) else np.empty(0, dtype=np.int64)
+        rows = np.repeat(np.searchsorted(all_dates, records['date'].to_numpy()), sizes)
+        owner = np.repeat(records['status_type'].to_numpy(), sizes)
+
+        types = list(STATUS_TYPES) + sorted(set(records['status_type']) - set(STATUS_TYPES))
+        dates_by_type, bits_by_type = {}, {}
+        for status_type in types:
+            dense = np.zeros((len(all_dates), len(symbol_index)), dtype=bool)
+            selected = owner == status_type
+            dense[rows[selected], codes[selected]] = True
+            packed = np.packbits(dense, axis=1)
+            changed = np.ones(len(packed), dtype=bool)
+            changed[1:] = (packed[1:] != packed[:-1]).any(axis=1)
+            dates_by_type[status_type] = all_dates[changed]
+            bits_by_type[status_type] = packed[changed]
+
+        first_date = int(all_dates[0]) if len(all_dates) else 0
+        return cls(symbol_index, first_date, dates_by_type, bits_by_type)
+
+    @classmethod
+    def from_snapshots(cls, history: dict) -> StockStatusStore:
+        """由旧格式 {日期: {状态: {股票: True}}} 构建"""
+        dates, status_types, symbols = [], [], []
+        for date, snapshot in history.items():
+            for status_type, flags in snapshot.items():
+                dates.append(date)
+                status_types.append(status_type)
+                symbols.append([stock for stock, flag in flags.items() if flag is True])
+        return cls.from_records(dates, status_types, symbols)
+
+    @classmethod
+    def coerce(cls, history) -> Optional[StockStatusStore]:
+        """数据上下文中的状态数据 -> StockStatusStore；无数据时返回 None"""
+        if isinstance(history, cls):
+            return history if len(history) else None
+        if not history:
+            return None
+        return cls.from_snapshots(history)
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """导出为不含 object 的数组（可用 np.savez 免 pickle 保存），from_arrays 的逆过程"""
+        types = list(self._dates)
+        width = (len(self._symbols) + 7) // 8
+        return {
+            'symbols': np.asarray(self._symbols, dtype=object).astype(str),
+            'first_date': np.asarray([self._first_date], dtype=np.int64),
+            'types': np.asarray(types, dtype=str),
+            'counts': np.asarray([len(self._dates[status_type]) for status_type in types], dtype=np.int64),
+            'dates': (
+                np.concatenate([self._dates[status_type] for status_type in types])
+                if types else np.empty(0, dtype=np.int64)
+            ),
+            'bits': (
+                np.concatenate([self._bits[status_type] for status_type in types])
+                if types else np.empty((0, width), dtype=np.uint8)
+            ),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays) -> StockStatusStore:
+        """由 to_arrays 的结果还原"""
+        bounds = np.cumsum(arrays['counts'])[:-1]
+        types = [str(status_type) for status_type in arrays['types']]
+        dates = np.split(arrays['dates'], bounds) if types else []
+        bits = np.split(arrays['bits'], bounds) if types else []
+        return cls(
+            pd.Index(arrays['symbols'].tolist(), dtype=object),
+            int(arrays['first_date'][0]),
+            dict(zip(types, dates, strict=True)),
+            dict(zip(types, bits, strict=True)),
+        )
+
+    def __len__(self) -> int:
+        """变化日总数（各状态之和）"""
+        return sum(len(dates) for dates in self._dates.values())
+
+    def flags(self, stocks: list[str], status_type: str, date: int) -> Optional[np.ndarray]:
+        """查询一批股票在某日快照中是否处于给定状态
+
+        Args:
+            stocks: 股票代码列表
+            status_type: 'ST' / 'HALT' / 'DELISTING'
+            date: 查询日（YYYYMMDD），取不晚于该日的最近快照
+
+        Returns:
+            与 stocks 对齐的布尔数组；该日之前没有快照或状态未知时返回 None
+        """
+        dates = self._dates.get(status_type)
+        if dates is None or not len(dates) or date < self._first_date:
+            return None
+        row = self._bits[status_type][np.searchsorted(dates, date, side='right') - 1]
+
+        result = np.zeros(len(stocks), dtype=bool)
+        if not len(self._symbols):
+            return result
+        codes = self._symbols.get_indexer(stocks)
+        known = codes >= 0
+        codes = codes[known]
+        result[known] = (row[codes >> 3] >> (7 - (codes & 7))) & 1
+        return result
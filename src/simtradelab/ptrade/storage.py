@@ -12,9 +12,18 @@
 """
 
 from __future__ import annotations
+import os
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pathlib import Path
 
+from . import manifest
+from .compact import compact_frame, compact_values, compacted_columns, mark_compacted, restore_values
+from .index_constituents import IndexConstituents
+from .stock_status import StockStatusStore
+
 
 def _ensure_datetime(series: pd.Series) -> pd.Series:
     """确保 Series 为 datetime 类型（兼容字符串/整数格式）"""
@@ -23,6 +32,74 @@ def _ensure_datetime(series: pd.Series) -> pd.Series:
     return series
 
 
+# 列裁剪时始终保留的时间/索引列
+_KEY_COLUMNS = frozenset({'date', 'datetime'})
+
+
+def _projected(names, columns):
+    """按文件实际列顺序筛选需要读取的列；columns 为 None 表示全部"""
+    if columns is None:
+        return None
+    return [name for name in names if name in columns or name in _KEY_COLUMNS]
+
+
+def _window_filters(time_column, date_range, field_type):
+    """日期窗口 [start, stop) 转为 pyarrow 行过滤条件；时间列类型不支持时返回 None"""
+    if pa.types.is_timestamp(field_type):
+        convert = pd.Timestamp
+    elif pa.types.is_date(field_type):
+        def convert(value):
+            return pd.Timestamp(value).date()
+    else:
+        return None
+    start, stop = date_range
+    filters = []
+    if start is not None:
+        filters.append((time_column, '>=', convert(start)))
+    if stop is not None:
+        filters.append((time_column, '<', convert(stop)))
+    return filters or None
+
+
+def _clip_window(df, date_range):
+    """按 DatetimeIndex 截取日期窗口 [start, stop)"""
+    if date_range is None or df.empty or not isinstance(df.index, pd.DatetimeIndex):
+        return df
+    start, stop = date_range
+    lo = df.index.searchsorted(pd.Timestamp(start)) if start is not None else 0
+    hi = df.index.searchsorted(pd.Timestamp(stop)) if stop is not None else len(df)
+    return df if lo == 0 and hi == len(df) else df.iloc[lo:hi]
+
+
+def _read_parquet(parquet_file, columns=None, date_range=None):
+    """读取 Parquet
+
+    columns 不为 None 时只解码其中存在的列；date_range 为 (start, stop) 时
+    下推为行过滤，借助行组统计信息跳过窗口外的行组（时间列为字符串等类型时
+    由调用方在设置索引后截取）。
+    """
+    if columns is None and date_range is None:
+        return pd.read_parquet(parquet_file)
+    parquet = pq.ParquetFile(parquet_file)
+    schema = parquet.schema_arrow
+    read_columns = _projected(schema.names, columns)
+    if date_range is not None:
+        time_column = _time_column(schema.names)
+        if time_column in schema.names:
+            filters = _window_filters(time_column, date_range, schema.field(time_column).type)
+            if filters:
+                return pq.read_table(parquet_file, columns=read_columns, filters=filters).to_pandas()
+    return parquet.read(columns=read_columns).to_pandas()
+
+
+def _load_from_consolidated(data_dir, dataset, symbol, columns=None, date_range=None, compact=False):
+    """单文件缺失时回退到合并数据集（源目录可在合并后删除）"""
+    store = open_consolidated_store(data_dir, dataset)
+    if store is None or symbol not in store:
+        return pd.DataFrame()
+    return store.load([symbol], columns=columns, date_range=date_range, compact=compact).get(symbol, pd.DataFrame())
+
+
 def _date_to_int(dt_series: pd.Series) -> pd.Series:
     """向量化将datetime转为YYYYMMDD整数"""
     dt_series = _ensure_datetime(dt_series)
@@ -43,40 +120,56 @@ def _date_to_iso(dt_series: pd.Series) -> pd.Series:
     )
 
 
-def load_stock(data_dir, symbol):
-    """加载股票价格数据"""
+def load_stock(data_dir, symbol, columns=None, date_range=None, compact=False):
+    """加载股票价格数据
+
+    Args:
+        columns: 需要的列集合，None 表示全部；date 列始终保留
+        date_range: 日期窗口 (start, stop)，左闭右开，任一端为 None 表示不限
+        compact: 数值列转为紧凑 dtype（见 compact 模块），由调用方在使用前还原
+    """
     parquet_file = Path(data_dir) / 'stocks' / f'{symbol}.parquet'
     if parquet_file.exists():
-        df = pd.read_parquet(parquet_file)
+        df = _read_parquet(parquet_file, columns, date_range)
         if not df.empty and 'date' in df.columns:
             df['date'] = pd.to_datetime(df['date'])
             df.set_index('date', inplace=True)
-        return df
-    return pd.DataFrame()
+        df = _clip_window(df, date_range)
+        return compact_frame(df) if compact else df
+    return _load_from_consolidated(data_dir, 'stocks', symbol, columns, date_range, compact)
+
 
+def load_valuation(data_dir, symbol, columns=None, compact=False):
+    """加载估值数据
 
-def load_valuation(data_dir, symbol):
-    """加载估值数据"""
+    Args:
+        columns: 需要的列集合，None 表示全部；date 列始终保留
+        compact: 数值列转为紧凑 dtype（见 compact 模块），由调用方在使用前还原
+    """
     parquet_file = Path(data_dir) / 'valuation' / f'{symbol}.parquet'
     if parquet_file.exists():
-        df = pd.read_parquet(parquet_file)
+        df = _read_parquet(parquet_file, columns)
         if not df.empty and 'date' in df.columns:
             df['date'] = pd.to_datetime(df['date'])
             df.set_index('date', inplace=True)
-        return df
-    return pd.DataFrame()
+        return compact_frame(df) if compact else df
+    return _load_from_consolidated(data_dir, 'valuation', symbol, columns, compact=compact)
+
 
+def load_fundamentals(data_dir, symbol, columns=None):
+    """加载财务数据
 
-def load_fundamentals(data_dir, symbol):
-    """加载财务数据"""
+    Args:
+        columns: 需要的列集合，None 表示全部；date 列始终保留
+    """
     parquet_file = Path(data_dir) / 'fundamentals' / f'{symbol}.parquet'
     if parquet_file.exists():
-        df = pd.read_parquet(parquet_file)
+        df = _read_parquet(parquet_file, columns)
         if not df.empty and 'date' in df.columns:
             df['date'] = pd.to_datetime(df['date'])
             df.set_index('date', inplace=True)
         return df
-    return pd.DataFrame()
+    return _load_from_consolidated(data_dir, 'fundamentals', symbol, columns)
 
 
 def load_exrights(data_dir, symbol):
@@ -142,17 +235,17 @@ def load_metadata(data_dir, filename):
 
     # metadata特殊处理：已拆分为index_constituents和stock_status
     if filename == 'metadata':
-        ic_file = data_path / 'index_constituents.parquet'
-        ss_file = data_path / 'stock_status.parquet'
-        if ic_file.exists() or ss_file.exists():
-            return _load_metadata_parquet(data_path, filename)
-
-    # 其他元数据
-    parquet_file = data_path / f'{filename}.parquet'
-    if parquet_file.exists():
-        return _load_metadata_parquet(data_path, filename)
+        sources = ['index_constituents.parquet', 'stock_status.parquet']
+    else:
+        sources = [f'{filename}.parquet']
+    if not any((data_path / name).exists() for name in sources):
+        return None
 
-    return None
+    # 解码结果按源文件 (mtime, size) 缓存在清单中，热启动跳过解析和聚合
+    return manifest.cached(
+        data_dir, f'metadata:{filename}', [f'metadata/{name}' for name in sources],
+        lambda: _load_metadata_parquet(data_path, filename),
+    )
 
 
 def _load_metadata_parquet(metadata_dir, base_name):
@@ -161,25 +254,21 @@ def _load_metadata_parquet(metadata_dir, base_name):
     if base_name == 'metadata':
         result = {}
 
-        # index_constituents (预聚合格式: date, index_code, symbols)
+        # index_constituents (预聚合格式: date, index_code, symbols)，只保留成份变化的版本
         ic_file = metadata_dir / 'index_constituents.parquet'
         if ic_file.exists():
             ic_df = pd.read_parquet(ic_file)
-            index_constituents = {}
-            for date, group in ic_df.groupby('date'):
-                index_constituents[date] = dict(zip(group['index_code'], group['symbols']))
-            result['index_constituents'] = index_constituents
+            result['index_constituents'] = IndexConstituents.from_records(
+                ic_df['date'], ic_df['index_code'], ic_df['symbols']
+            )
 
-        # stock_status_history (预聚合格式: date, status_type, symbols)
+        # stock_status_history (预聚合格式: date, status_type, symbols)，解码为紧凑位图
         ss_file = metadata_dir / 'stock_status.parquet'
         if ss_file.exists():
             ss_df = pd.read_parquet(ss_file)
-            stock_status_history = {}
-            for date, group in ss_df.groupby('date'):
-                stock_status_history[date] = {'ST': {}, 'HALT': {}, 'DELISTING': {}}
-                for st, syms in zip(group['status_type'], group['symbols']):
-                    stock_status_history[date][st] = dict.fromkeys(syms, True)
-            result['stock_status_history'] = stock_status_history
+            result['stock_status_history'] = StockStatusStore.from_records(
+                ss_df['date'], ss_df['status_type'], ss_df['symbols']
+            )
 
         return result if result else None
 
@@ -210,35 +299,584 @@ def _load_metadata_parquet(metadata_dir, base_name):
 
 def list_stocks(data_dir):
     """列出所有可用的股票代码"""
-    stocks_dir = Path(data_dir) / 'stocks'
-    if not stocks_dir.exists():
+    store = open_consolidated_store(data_dir, 'stocks')
+    if store is not None:
+        return store.symbols()
+
+    return _list_dataset(data_dir, 'stocks')
+
+
+def _list_dataset(data_dir, dataset):
+    """列出数据集目录下的代码；目录 mtime 未变时直接读取清单中的列表"""
+    dataset_dir = Path(data_dir) / dataset
+    if not dataset_dir.exists():
         return []
+    return manifest.cached(
+        data_dir, f'list:{dataset}', [dataset],
+        lambda: [f.stem for f in dataset_dir.glob('*.parquet')],
+    )
 
-    parquet_files = list(stocks_dir.glob('*.parquet'))
-    return [f.stem for f in parquet_files]
 
+def load_stock_1m(data_dir, symbol, columns=None, date_range=None):
+    """加载分钟线数据
 
-def load_stock_1m(data_dir, symbol):
-    """加载分钟线数据"""
+    存在月度分区（见 build_minute_partitions）时只读取与日期窗口相交的分区文件。
+
+    Args:
+        columns: 需要的列集合，None 表示全部；时间列始终保留
+        date_range: 日期窗口 (start, stop)，左闭右开，任一端为 None 表示不限
+    """
     parquet_file = Path(data_dir) / 'stocks_1m' / (symbol + '.parquet')
+    partition_dir = _minute_partition_dir(data_dir, symbol)
+    if partition_dir.is_dir() and (
+        not parquet_file.exists() or partition_dir.stat().st_mtime_ns >= parquet_file.stat().st_mtime_ns
+    ):
+        frames = [
+            _read_parquet(path, columns, date_range)
+            for path in _minute_partition_files(partition_dir, date_range)
+        ]
+        frames = [df for df in frames if not df.empty]
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        return _clip_window(_minute_index(df), date_range)
     if parquet_file.exists():
-        df = pd.read_parquet(parquet_file)
-        if not df.empty:
-            if 'datetime' in df.columns:
-                df['datetime'] = pd.to_datetime(df['datetime'])
-                df.set_index('datetime', inplace=True)
-            elif 'date' in df.columns:
-                df['date'] = pd.to_datetime(df['date'])
-                df.set_index('date', inplace=True)
-        return df
-    return pd.DataFrame()
+        df = _read_parquet(parquet_file, columns, date_range)
+        return _clip_window(_minute_index(df), date_range)
+    return _load_from_consolidated(data_dir, 'stocks_1m', symbol, columns, date_range)
+
+
+def _minute_index(df):
+    """分钟线时间列转为 DatetimeIndex"""
+    if not df.empty:
+        if 'datetime' in df.columns:
+            df['datetime'] = pd.to_datetime(df['datetime'])
+            df.set_index('datetime', inplace=True)
+        elif 'date' in df.columns:
+            df['date'] = pd.to_datetime(df['date'])
+            df.set_index('date', inplace=True)
+    return df
+
+
+# ==================== 分钟线月度分区 ====================
+#
+# stocks_1m/{symbol}.parquet 拆分为 stocks_1m_parts/{symbol}/{YYYYMM}.parquet，
+# 分钟线滑动窗口按月读取单个小文件，不必对整段历史做行组过滤。
+# 分区目录的 mtime 早于源文件时视为过期，回退读取源文件。
+
+MINUTE_PARTITION_DIR = 'stocks_1m_parts'
+
+
+def _minute_partition_dir(data_dir, symbol):
+    return Path(data_dir) / MINUTE_PARTITION_DIR / symbol
+
+
+def month_key(ts):
+    """时间戳所在月份 YYYYMM"""
+    return ts.year * 100 + ts.month
+
+
+def _minute_partition_files(partition_dir, date_range):
+    """与日期窗口 [start, stop) 相交的分区文件（按月份排序）"""
+    start, stop = date_range if date_range is not None else (None, None)
+    first = month_key(pd.Timestamp(start)) if start is not None else None
+    last = month_key(pd.Timestamp(stop) - pd.Timedelta(1)) if stop is not None else None
+    files = []
+    for path in sorted(partition_dir.glob('*.parquet')):
+        month = int(path.stem)
+        if (first is None or month >= first) and (last is None or month <= last):
+            files.append(path)
+    return files
+
+
+def build_minute_partitions(data_dir, symbols=None):
+    """将 stocks_1m 下的逐代码分钟线拆分为按月分区
+
+    Args:
+        data_dir: 数据根目录
+        symbols: 只转换这些代码，None 表示全部
+
+    Returns:
+        写入的代码数量
+    """
+    import shutil
+
+    files = sorted((Path(data_dir) / 'stocks_1m').glob('*.parquet'))
+    if symbols is not None:
+        wanted = set(symbols)
+        files = [f for f in files if f.stem in wanted]
+
+    count = 0
+    for f in files:
+        df = pd.read_parquet(f)
+        if df.empty:
+            continue
+        time_col = _time_column(df.columns)
+        df[time_col] = pd.to_datetime(df[time_col])
+        months = month_key(df[time_col].dt)
+
+        target = _minute_partition_dir(data_dir, f.stem)
+        tmp_dir = target.with_name(f'{target.name}.tmp-{os.getpid()}')
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        for month, part in df.groupby(months.to_numpy(), sort=True):
+            part.to_parquet(tmp_dir / f'{month}.parquet', index=False)
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(tmp_dir, target)
+        count += 1
+    return count
 
 
 def list_stocks_1m(data_dir):
     """列出所有可用的分钟数据股票代码"""
-    stocks_dir = Path(data_dir) / 'stocks_1m'
-    if not stocks_dir.exists():
-        return []
+    store = open_consolidated_store(data_dir, 'stocks_1m')
+    if store is not None:
+        return store.symbols()
+
+    return _list_dataset(data_dir, 'stocks_1m')
+
+
+# ==================== 合并数据集 ====================
+#
+# 将 {dataset}/{symbol}.parquet 的数千个小文件合并为 consolidated/{dataset}.parquet，
+# 行按 (symbol, 日期) 排列，并在 consolidated/{dataset}.index.parquet 中记录
+# 每个代码的行区间，加载任意代码子集只需一次文件打开和一次批量扫描。
+
+CONSOLIDATED_DIR = 'consolidated'
+
+# LazyDataDict 数据类型 -> 数据集目录
+DATASET_DIRS = {
+    'stock': 'stocks',
+    'stock_1m': 'stocks_1m',
+    'valuation': 'valuation',
+    'fundamentals': 'fundamentals',
+}
+
+_SOURCE_STAMP_KEY = b'simtradelab.source_stamp'
+_consolidated_stores = {}
+# {数据集目录: (目录 mtime, 状态戳)}
+_source_stamps = {}
+
+
+def _consolidated_paths(data_dir, dataset):
+    base = Path(data_dir) / CONSOLIDATED_DIR
+    return base / f'{dataset}.parquet', base / f'{dataset}.index.parquet'
+
+
+def _time_column(columns):
+    """时间列名：分钟线为 datetime，其余为 date"""
+    return 'datetime' if 'datetime' in columns else 'date'
+
+
+def source_mtime_ns(data_dir, name):
+    """数据目录或文件的 mtime（纳秒），不存在时返回 0"""
+    source = Path(data_dir) / name
+    return source.stat().st_mtime_ns if source.exists() else 0
+
+
+def source_stamp(data_dir, dataset):
+    """逐文件数据集目录的状态戳，目录不存在时返回空串
+
+    由目录 mtime（新增、删除或原子替换文件时变化）与各 parquet 文件的最大 mtime、
+    总字节数和文件数组成，原地改写单个文件同样会改变状态戳。
+    逐文件 stat 的结果按目录 mtime 在进程内缓存，目录 mtime 不变时只 stat 目录本身；
+    原地改写在 refresh_source_stamps 之后才会被发现（DataServer.append_data 会调用）。
+    """
+    base = Path(data_dir) / dataset
+    try:
+        dir_mtime = base.stat().st_mtime_ns
+    except FileNotFoundError:
+        return ''
+    if not base.is_dir():
+        return ''
+    key = str(base)
+    cached = _source_stamps.get(key)
+    if cached is not None and cached[0] == dir_mtime:
+        return cached[1]
+    latest = total = count = 0
+    with os.scandir(base) as entries:
+        for entry in entries:
+            if entry.name.endswith('.parquet'):
+                stat = entry.stat()
+                latest = max(latest, stat.st_mtime_ns)
+                total += stat.st_size
+                count += 1
+    stamp = f'{dir_mtime}:{latest}:{total}:{count}'
+    _source_stamps[key] = (dir_mtime, stamp)
+    return stamp
+
+
+def refresh_source_stamps(data_dir=None):
+    """丢弃 source_stamp 的进程内缓存，下次重新 stat 各文件
+
+    Args:
+        data_dir: 只丢弃该数据根目录下的数据集，None 表示全部
+    """
+    if data_dir is None:
+        _source_stamps.clear()
+        return
+    root = Path(data_dir)
+    for key in [key for key in _source_stamps if Path(key).parent == root]:
+        del _source_stamps[key]
+
+
+def data_files_size(data_dir, data_type, symbols):
+    """逐文件数据集中给定代码的文件总字节数（不存在的文件计 0）"""
+    base = Path(data_dir) / DATASET_DIRS.get(data_type, data_type)
+    total = 0
+    for symbol in symbols:
+        path = base / f'{symbol}.parquet'
+        if path.exists():
+            total += path.stat().st_size
+    return total
+
+
+def consolidated_size(data_dir, dataset):
+    """合并数据集文件字节数，不存在时返回 0"""
+    data_path, _ = _consolidated_paths(data_dir, dataset)
+    return data_path.stat().st_size if data_path.exists() else 0
+
+
+def changed_symbols(data_dir, data_type, since_ns):
+    """数据集中 since_ns 之后新增或改写过的代码（按文件 mtime 判断）
+
+    Args:
+        data_type: LazyDataDict 数据类型（'stock', 'valuation', 'exrights' 等）
+        since_ns: 时间点（纳秒，与 time.time_ns() 同基准）
+
+    Returns:
+        set[str]；生效中的合并数据集在此之后被改写时无法按代码区分，返回 None 表示全部代码
+    """
+    dataset = DATASET_DIRS.get(data_type, data_type)
+    if open_consolidated_store(data_dir, dataset) is not None:
+        data_path, _ = _consolidated_paths(data_dir, dataset)
+        if data_path.stat().st_mtime_ns >= since_ns:
+            return None
+    base = Path(data_dir) / dataset
+    if not base.exists():
+        return set()
+    changed = set()
+    with os.scandir(base) as entries:
+        for entry in entries:
+            if entry.name.endswith('.parquet') and entry.stat().st_mtime_ns >= since_ns:
+                changed.add(entry.name[:-len('.parquet')])
+    return changed
+
+
+def _unified_schema(files):
+    """合并各文件 schema：时间列统一为 timestamp[ns]，数值类型冲突时提升为 float64
+
+    被提升的列在索引中记录各代码的原始 dtype，读取时还原（见 ConsolidatedStore.load）。
+    """
+    field_types = {}
+    for f in files:
+        for field in pq.read_schema(f):
+            if field.name.startswith('__index_level_'):
+                continue
+            field_types.setdefault(field.name, set()).add(field.type)
+
+    fields = [pa.field('symbol', pa.string())]
+    for name, types in field_types.items():
+        if name in ('date', 'datetime'):
+            field_type = pa.timestamp('ns')
+        elif len(types) == 1:
+            field_type = next(iter(types))
+        elif all(pa.types.is_integer(tp) or pa.types.is_floating(tp) for tp in types):
+            field_type = pa.float64()
+        else:
+            field_type = pa.string()
+        fields.append(pa.field(name, field_type))
+    return pa.schema(fields)
+
+
+def build_consolidated_store(data_dir, dataset='stocks', row_group_size=262144):
+    """将按代码拆分的 Parquet 目录转换为合并数据集
 
-    parquet_files = list(stocks_dir.glob('*.parquet'))
-    return [f.stem for f in parquet_files]
+    Args:
+        data_dir: 数据根目录
+        dataset: 数据集目录名（stocks/stocks_1m/valuation/fundamentals）
+        row_group_size: 每个行组的目标行数
+
+    Returns:
+        写入的代码数量
+    """
+    # 构建前重新 stat 源文件，记录与本次读取一致的状态戳
+    _source_stamps.pop(str(Path(data_dir) / dataset), None)
+    stamp = source_stamp(data_dir, dataset)
+    files = sorted((Path(data_dir) / dataset).glob('*.parquet'))
+    data_path, index_path = _consolidated_paths(data_dir, dataset)
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+
+    schema = _unified_schema(files)
+    tmp_data_path = data_path.with_name(data_path.name + '.tmp')
+    index_rows = {'symbol': [], 'start': [], 'stop': [], 'columns': [], 'dtypes': []}
+    pending, pending_rows, total_rows = [], 0, 0
+
+    with pq.ParquetWriter(tmp_data_path, schema) as writer:
+        for f in files:
+            df = pd.read_parquet(f)
+            if df.empty:
+                continue
+            time_col = _time_column(df.columns)
+            if time_col in df.columns:
+                df[time_col] = pd.to_datetime(df[time_col])
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            n = table.num_rows
+            arrays = []
+            for field in schema:
+                if field.name == 'symbol':
+                    arrays.append(pa.array([f.stem] * n, pa.string()))
+                elif field.name in table.column_names:
+                    arrays.append(table.column(field.name).cast(field.type))
+                else:
+                    arrays.append(pa.nulls(n, field.type))
+            pending.append(pa.Table.from_arrays(arrays, schema=schema))
+
+            index_rows['symbol'].append(f.stem)
+            index_rows['start'].append(total_rows)
+            index_rows['stop'].append(total_rows + n)
+            index_rows['columns'].append(','.join(df.columns))
+            index_rows['dtypes'].append(','.join(dtype.name if dtype.kind in 'biuf' else '' for dtype in df.dtypes))
+            total_rows += n
+            pending_rows += n
+            if pending_rows >= row_group_size:
+                writer.write_table(pa.concat_tables(pending), row_group_size=row_group_size)
+                pending, pending_rows = [], 0
+        if pending:
+            writer.write_table(pa.concat_tables(pending), row_group_size=row_group_size)
+
+    index_table = pa.table({
+        'symbol': pa.array(index_rows['symbol'], pa.string()),
+        'start': pa.array(index_rows['start'], pa.int64()),
+        'stop': pa.array(index_rows['stop'], pa.int64()),
+        'columns': pa.array(index_rows['columns'], pa.string()),
+        'dtypes': pa.array(index_rows['dtypes'], pa.string()),
+    }).replace_schema_metadata({_SOURCE_STAMP_KEY: stamp.encode()})
+    tmp_index_path = index_path.with_name(index_path.name + '.tmp')
+    pq.write_table(index_table, tmp_index_path)
+
+    os.replace(tmp_data_path, data_path)
+    os.replace(tmp_index_path, index_path)
+    _consolidated_stores.pop(str(index_path), None)
+    return len(index_rows['symbol'])
+
+
+class ConsolidatedStore:
+    """合并数据集读取器
+
+    按 symbol -> [start, stop) 行区间定位所需行组，一次 read_row_groups 读取
+    任意代码子集，再按区间切分为与 load_stock 等函数同格式的 DataFrame。
+    """
+
+    def __init__(self, data_path, index_path):
+        self.data_path = Path(data_path)
+        index_table = pq.read_table(index_path)
+        symbols = index_table.column('symbol').to_pylist()
+        starts = index_table.column('start').to_numpy()
+        stops = index_table.column('stop').to_numpy()
+        columns = index_table.column('columns').to_pylist()
+        self._index = {
+            sym: (int(start), int(stop), cols.split(',') if cols else [])
+            for sym, start, stop, cols in zip(symbols, starts, stops, columns, strict=True)
+        }
+        # 各代码数值列在源文件中的 dtype（相同组合共享同一个 dict）
+        self._dtypes = {}
+        if 'dtypes' in index_table.column_names:
+            dtype_sets = {}
+            for sym, cols, dtypes in zip(symbols, columns, index_table.column('dtypes').to_pylist(), strict=True):
+                key = (cols, dtypes)
+                if key not in dtype_sets:
+                    dtype_sets[key] = {
+                        name: np.dtype(dtype)
+                        for name, dtype in zip(cols.split(',') if cols else [], dtypes.split(','), strict=True)
+                        if dtype
+                    }
+                self._dtypes[sym] = dtype_sets[key]
+        metadata = pq.read_metadata(self.data_path)
+        self._all_columns = [name for name in metadata.schema.names if name != 'symbol']
+        self._time_column = _time_column(self._all_columns)
+        rg_rows = np.array([metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)], dtype=np.int64)
+        self._rg_starts = np.concatenate([[0], np.cumsum(rg_rows)[:-1]]) if len(rg_rows) else np.array([], dtype=np.int64)
+        self._rg_rows = rg_rows
+        self._rg_time_bounds = self._time_bounds(metadata)
+
+    def _time_bounds(self, metadata):
+        """各行组时间列的 (min, max) 统计（纳秒）；缺失统计时为 None"""
+        names = metadata.schema.names
+        if self._time_column not in names:
+            return None
+        col = names.index(self._time_column)
+        bounds = []
+        for i in range(metadata.num_row_groups):
+            stats = metadata.row_group(i).column(col).statistics
+            if stats is None or not stats.has_min_max:
+                return None
+            bounds.append((pd.Timestamp(stats.min).value, pd.Timestamp(stats.max).value))
+        return bounds
+
+    def _overlaps(self, rg, date_range):
+        """行组时间范围是否与日期窗口相交"""
+        if date_range is None or self._rg_time_bounds is None:
+            return True
+        lo, hi = self._rg_time_bounds[rg]
+        start, stop = date_range
+        if start is not None and hi < pd.Timestamp(start).value:
+            return False
+        return stop is None or lo < pd.Timestamp(stop).value
+
+    def __contains__(self, symbol):
+        return symbol in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def symbols(self):
+        """按存储顺序返回全部代码"""
+        return list(self._index)
+
+    def _row_group_span(self, start, stop):
+        first = int(np.searchsorted(self._rg_starts, start, side='right')) - 1
+        last = int(np.searchsorted(self._rg_starts, stop - 1, side='right')) - 1
+        return first, last
+
+    def load(self, symbols=None, columns=None, date_range=None, compact=False):
+        """批量读取代码子集
+
+        Args:
+            symbols: 代码列表，None 表示全部
+            columns: 需要的列集合，None 表示全部；时间列始终保留
+            date_range: 日期窗口 (start, stop)，按行组时间统计跳过窗口外的行组
+            compact: 各代码的数值列转为紧凑 dtype
+
+        Returns:
+            {symbol: DataFrame}，时间列为 DatetimeIndex；不存在的代码被忽略
+        """
+        wanted = self.symbols() if symbols is None else [s for s in symbols if s in self._index]
+        if not wanted:
+            return {}
+
+        row_groups = set()
+        for symbol in wanted:
+            start, stop, _ = self._index[symbol]
+            if stop > start:
+                first, last = self._row_group_span(start, stop)
+                row_groups.update(rg for rg in range(first, last + 1) if self._overlaps(rg, date_range))
+        row_groups = sorted(row_groups)
+
+        # 选中行组在结果表中的起始行
+        local_starts = {}
+        offset = 0
+        for rg in row_groups:
+            local_starts[rg] = offset
+            offset += int(self._rg_rows[rg])
+
+        read_columns = _projected(self._all_columns, columns)
+        table = None
+        if row_groups:
+            table = pq.ParquetFile(self.data_path).read_row_groups(row_groups, columns=read_columns)
+        frame = None
+        compacted = ()
+        loaded_dtypes = {}
+        if table is not None:
+            if 'symbol' in table.column_names:
+                table = table.drop(['symbol'])
+            frame = table.to_pandas()
+            if self._time_column in frame.columns:
+                frame.set_index(self._time_column, inplace=True)
+            if compact:
+                compacted = compacted_columns(compact_frame(frame))
+            # 压缩过的列按还原后的 dtype 与源文件 dtype 比较
+            loaded_dtypes = {
+                name: restore_values(np.empty(0, dtype=dtype)).dtype if name in compacted else dtype
+                for name, dtype in frame.dtypes.items()
+            }
+
+        result = {}
+        for symbol in wanted:
+            start, stop, symbol_columns = self._index[symbol]
+            if frame is None or stop <= start:
+                result[symbol] = pd.DataFrame()
+                continue
+            symbol_frame = frame.iloc[self._local_positions(start, stop, local_starts)]
+            symbol_frame = _clip_window(symbol_frame, date_range)
+            value_columns = [c for c in symbol_columns if c != self._time_column and c in symbol_frame.columns]
+            if value_columns != list(symbol_frame.columns):
+                symbol_frame = symbol_frame[value_columns]
+            symbol_compacted = compacted
+            deviations = {
+                name: dtype for name, dtype in self._dtypes.get(symbol, {}).items()
+                if name in symbol_frame.columns and loaded_dtypes[name] != dtype
+            }
+            if deviations:
+                symbol_frame, symbol_compacted = self._restore_dtypes(symbol_frame, deviations, compacted, compact)
+            if symbol_compacted:
+                # 各代码的切片显式记录压缩过的列，不依赖 pandas 传递 attrs
+                mark_compacted(symbol_frame, symbol_compacted)
+            result[symbol] = symbol_frame
+        return result
+
+    @staticmethod
+    def _restore_dtypes(symbol_frame, deviations, compacted, compact):
+        """合并时被统一 schema 提升（或因其他代码缺列含空值而转为 float64）的列还原为源文件 dtype
+
+        Returns:
+            (还原后的 DataFrame, 压缩过的列)
+        """
+        compacted = set(compacted)
+        restored = {}
+        for name, dtype in deviations.items():
+            values = symbol_frame[name].to_numpy()
+            if name in compacted:
+                values = restore_values(values)
+                compacted.discard(name)
+            if dtype.kind in 'biu' and pd.isna(values).any():
+                # 本代码的行含空值时无法还原为整数
+                continue
+            values = values.astype(dtype)
+            if compact:
+                narrow = compact_values(values)
+                if narrow is not values:
+                    compacted.add(name)
+                values = narrow
+            restored[name] = values
+        return symbol_frame.assign(**restored), tuple(name for name in symbol_frame.columns if name in compacted)
+
+    def _local_positions(self, start, stop, local_starts):
+        """代码行区间 [start, stop) 在已读取行组中的位置（跳过未读取的行组）"""
+        first, last = self._row_group_span(start, stop)
+        if all(rg in local_starts for rg in range(first, last + 1)):
+            pos = local_starts[first] + (start - int(self._rg_starts[first]))
+            return slice(pos, pos + stop - start)
+        pieces = []
+        for rg in range(first, last + 1):
+            if rg not in local_starts:
+                continue
+            rg_start = int(self._rg_starts[rg])
+            lo = max(start, rg_start)
+            hi = min(stop, rg_start + int(self._rg_rows[rg]))
+            pieces.append(np.arange(lo, hi) - rg_start + local_starts[rg])
+        return np.concatenate(pieces) if pieces else slice(0, 0)
+
+
+def open_consolidated_store(data_dir, dataset):
+    """打开合并数据集，不存在或源目录已变更时返回 None
+
+    源目录的状态戳（见 source_stamp）在新增、删除、替换或原地改写文件时变化，
+    此时合并数据集视为过期，调用方回退到逐文件读取。
+    """
+    data_path, index_path = _consolidated_paths(data_dir, dataset)
+    if not data_path.exists() or not index_path.exists():
+        return None
+
+    key = str(index_path)
+    stamp = index_path.stat().st_mtime_ns
+    cached = _consolidated_stores.get(key)
+    if cached is None or cached[0] != stamp:
+        metadata = pq.read_schema(index_path).metadata or {}
+        recorded = metadata.get(_SOURCE_STAMP_KEY, b'').decode()
+        cached = (stamp, recorded, ConsolidatedStore(data_path, index_path))
+        _consolidated_stores[key] = cached
+
+    _, recorded, store = cached
+    current = source_stamp(data_dir, dataset)
+    if current and current != recorded:
+        return None
+    return store
@@ -15,10 +15,85 @@
 from __future__ import annotations
 
 import ast
+from typing import Optional
+
+import numpy as np
+import pandas as pd
 from pydantic import BaseModel, Field
 
 from simtradelab.i18n import t
 
+# 引擎自身读取的行情列（撮合、涨跌停判断、StockData、收益统计），列裁剪时始终保留
+ENGINE_PRICE_COLUMNS = frozenset({'open', 'high', 'low', 'close', 'volume', 'money', 'amount'})
+# get_fundamentals 定位记录所需的日期列
+FUNDAMENTAL_KEY_COLUMNS = frozenset({'date', 'publ_date', 'end_date'})
+# 估值表定位记录及实时计算 total_value/float_value 所需的列
+VALUATION_KEY_COLUMNS = frozenset({'date', 'trading_day', 'total_shares', 'a_floats'})
+# get_fundamentals(table='valuation') 未指定 fields 时的默认字段
+_VALUATION_DEFAULT_FIELDS = ('trading_day', 'total_value', 'secu_code')
+
+# 行情API -> (fields 参数位置, 关键字名)
+_PRICE_FIELD_ARGS = {
+    'get_history': (2, 'field'),
+    'get_price': (4, 'fields'),
+}
+
+# 每根K线折合的交易日数（分钟线按每日 240 分钟计）
+_BARS_TRADING_DAYS = {
+    '1d': 1, 'daily': 1,
+    '1w': 5, 'weekly': 5,
+    'mo': 23, 'monthly': 23,
+    '1q': 66, 'quarter': 66,
+    '1y': 250, 'yearly': 250,
+    '1m': 1 / 240, '5m': 5 / 240, '15m': 15 / 240, '30m': 30 / 240, '60m': 60 / 240, '120m': 120 / 240,
+}
+# 交易日折算自然日的系数，以及额外余量（长假、停牌、涨跌停判断的前一交易日等）
+_CALENDAR_DAYS_PER_TRADING_DAY = 1.5
+_WINDOW_MARGIN_DAYS = 30
+
+
+def _call_arg(node, position, keyword):
+    """取调用的位置参数或关键字参数，不存在时返回 None"""
+    if len(node.args) > position:
+        return node.args[position]
+    for kw in node.keywords:
+        if kw.arg == keyword:
+            return kw.value
+    return None
+
+
+def _literal_strings(node) -> Optional[set[str]]:
+    """解析字符串常量或字符串常量列表；无法静态确定时返回 None"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return {node.value}
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        values = set()
+        for elt in node.elts:
+            if not (isinstance(elt, ast.Constant) and isinstance(elt.value, str)):
+                return None
+            values.add(elt.value)
+        return values
+    return None
+
+
+def _literal(node, default=None):
+    """参数缺省时返回 default；常量返回其值；无法静态确定时返回 _DYNAMIC"""
+    if node is None:
+        return default
+    if isinstance(node, ast.Constant):
+        return node.value
+    return _DYNAMIC
+
+
+_DYNAMIC = object()
+
+
+def _union(current: Optional[set[str]], new: Optional[set[str]]) -> Optional[set[str]]:
+    """合并字段集合，任一方为 None（全部列）时结果为 None"""
+    if current is None or new is None:
+        return None
+    return current | new
+
 
 class DataDependencies(BaseModel):
     """策略数据依赖项"""
@@ -29,6 +104,16 @@ class DataDependencies(BaseModel):
 
     fundamental_tables: set[str] = Field(default_factory=set)
 
+    # 策略请求的字段（用于列裁剪）；None 表示存在无法静态解析的参数，需加载全部列
+    price_fields: Optional[set[str]] = Field(default_factory=set)
+    fundamental_fields: Optional[set[str]] = Field(default_factory=set)
+    valuation_fields: Optional[set[str]] = Field(default_factory=set)
+
+    # 行情最大回看交易日数；None 表示无法静态确定，需加载全部历史
+    history_lookback: Optional[int] = 0
+    # get_price 以字面量指定的最早日期
+    earliest_date: Optional[str] = None
+
     model_config = {"arbitrary_types_allowed": True}
 
 
@@ -39,6 +124,11 @@ class StrategyDataAnalyzer(ast.NodeVisitor):
         self.dependencies = DataDependencies()
         self.api_calls: set[str] = set()
         self.fundamental_tables: set[str] = set()
+        self.price_fields: Optional[set[str]] = set()
+        self.fundamental_fields: Optional[set[str]] = set()
+        self.valuation_fields: Optional[set[str]] = set()
+        self.history_lookback: Optional[float] = 0
+        self.earliest_date: Optional[str] = None
 
     def visit_Call(self, node):
         """访问函数调用节点"""
@@ -63,9 +153,73 @@ class StrategyDataAnalyzer(ast.NodeVisitor):
                             break
                 if table_arg is not None and isinstance(table_arg, ast.Constant) and isinstance(table_arg.value, str):
                     self.fundamental_tables.add(table_arg.value)
+                self._collect_fundamental_fields(node, table_arg)
+
+            elif func_name in _PRICE_FIELD_ARGS:
+                field_arg = _call_arg(node, *_PRICE_FIELD_ARGS[func_name])
+                if field_arg is not None and not (isinstance(field_arg, ast.Constant) and field_arg.value is None):
+                    self.price_fields = _union(self.price_fields, _literal_strings(field_arg))
+                self._collect_lookback(func_name, node)
+
+            elif func_name in ('mavg', 'vwap'):
+                self._add_lookback(_literal(_call_arg(node, 0, 'window')), '1d')
 
         self.generic_visit(node)
 
+    def _add_lookback(self, count, frequency):
+        """累计回看K线数；数量或频率无法解析时回看无界"""
+        if self.history_lookback is None:
+            return
+        if isinstance(count, bool) or not isinstance(count, int) or frequency not in _BARS_TRADING_DAYS:
+            self.history_lookback = None
+            return
+        self.history_lookback = max(self.history_lookback, count * _BARS_TRADING_DAYS[frequency])
+
+    def _collect_lookback(self, func_name, node):
+        """解析 get_history/get_price 的回看范围"""
+        if func_name == 'get_history':
+            count = _literal(_call_arg(node, 0, 'count'))
+            frequency = _literal(_call_arg(node, 1, 'frequency'), '1d')
+            self._add_lookback(count, frequency)
+            return
+
+        start_date = _literal(_call_arg(node, 1, 'start_date'))
+        end_date = _literal(_call_arg(node, 2, 'end_date'))
+        frequency = _literal(_call_arg(node, 3, 'frequency'), '1d')
+        count = _literal(_call_arg(node, 6, 'count'))
+        if start_date is _DYNAMIC:
+            self.history_lookback = None
+            return
+        # end_date 为表达式时通常取自 context（回测当前日期附近），按回看处理
+        for value in (start_date, end_date):
+            if isinstance(value, (str, int)) and not isinstance(value, bool):
+                date = str(value)
+                if self.earliest_date is None or pd.Timestamp(date) < pd.Timestamp(self.earliest_date):
+                    self.earliest_date = date
+        if count is not None:
+            self._add_lookback(count, frequency)
+
+    def _collect_fundamental_fields(self, node, table_arg):
+        """记录 get_fundamentals 调用请求的字段，未指定 fields 时取该表默认字段"""
+        table = table_arg.value if isinstance(table_arg, ast.Constant) and isinstance(table_arg.value, str) else None
+        fields_arg = _call_arg(node, 2, 'fields')
+        if fields_arg is None or (isinstance(fields_arg, ast.Constant) and fields_arg.value is None):
+            if table == 'valuation':
+                fields = set(_VALUATION_DEFAULT_FIELDS)
+            elif table is not None:
+                from .api import PtradeAPI
+                fields = set(PtradeAPI.FUNDAMENTAL_TABLES.get(table, PtradeAPI.FUNDAMENTAL_DEFAULT_FIELDS))
+            else:
+                fields = None
+        else:
+            fields = _literal_strings(fields_arg)
+
+        # 表名无法解析时两类数据都可能被读取
+        if table is None or table == 'valuation':
+            self.valuation_fields = _union(self.valuation_fields, fields)
+        if table != 'valuation':
+            self.fundamental_fields = _union(self.fundamental_fields, fields)
+
     def analyze(self):
         """分析API调用,转换为数据依赖"""
         # 价格数据依赖
@@ -74,6 +228,11 @@ class StrategyDataAnalyzer(ast.NodeVisitor):
             'order', 'order_target', 'order_value', 'order_target_value'
         ]):
             self.dependencies.needs_price_data = True
+        self.dependencies.price_fields = self.price_fields
+        self.dependencies.history_lookback = (
+            None if self.history_lookback is None else int(np.ceil(self.history_lookback))
+        )
+        self.dependencies.earliest_date = self.earliest_date
 
         # 除权数据依赖(只要用get_price或get_history就加载)
         if 'get_price' in self.api_calls or 'get_history' in self.api_calls:
@@ -84,6 +243,8 @@ class StrategyDataAnalyzer(ast.NodeVisitor):
             # 保守策略：默认加载财务数据（延迟加载，更常用）
             self.dependencies.needs_fundamentals = True
             self.dependencies.fundamental_tables = self.fundamental_tables
+            self.dependencies.fundamental_fields = self.fundamental_fields
+            self.dependencies.valuation_fields = self.valuation_fields
 
             # 明确使用valuation时才加载（全量预加载，占内存）
             if 'valuation' in self.fundamental_tables:
@@ -119,10 +280,30 @@ def analyze_strategy_data_requirements(strategy_path: str) -> DataDependencies:
             needs_price_data=True,
             needs_valuation=True,
             needs_fundamentals=True,
-            needs_exrights=True
+            needs_exrights=True,
+            price_fields=None,
+            fundamental_fields=None,
+            valuation_fields=None,
+            history_lookback=None,
         )
 
 
+def required_columns(deps: DataDependencies) -> dict[str, Optional[frozenset[str]]]:
+    """根据数据依赖计算各数据集需要读取的列
+
+    Returns:
+        {'price': 列集合, 'valuation': ..., 'fundamentals': ...}；None 表示全部列
+    """
+    def _with(keys, fields):
+        return None if fields is None else frozenset(keys | fields)
+
+    return {
+        'price': _with(ENGINE_PRICE_COLUMNS, deps.price_fields),
+        'valuation': _with(VALUATION_KEY_COLUMNS, deps.valuation_fields),
+        'fundamentals': _with(FUNDAMENTAL_KEY_COLUMNS, deps.fundamental_fields),
+    }
+
+
 def print_dependencies(deps: DataDependencies):
     """打印数据依赖摘要"""
     items = []
@@ -140,3 +321,19 @@ def print_dependencies(deps: DataDependencies):
         print(t("deps.result", items=' | '.join(items)))
     else:
         print(t("deps.none"))
+
+
+def history_window(deps: DataDependencies, start_date, end_date) -> Optional[tuple[pd.Timestamp, pd.Timestamp]]:
+    """根据回看范围计算需要加载的行情日期窗口
+
+    Returns:
+        (start, stop) 左闭右开；回看无法静态确定时返回 None（加载全部历史）
+    """
+    if deps.history_lookback is None:
+        return None
+    start = pd.Timestamp(start_date).normalize()
+    if deps.earliest_date is not None:
+        start = min(start, pd.Timestamp(deps.earliest_date).normalize())
+    margin = int(np.ceil(deps.history_lookback * _CALENDAR_DAYS_PER_TRADING_DAY)) + _WINDOW_MARGIN_DAYS
+    stop = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+    return start - pd.Timedelta(days=margin), stop
@@ -373,6 +373,11 @@ class StrategyExecutionEngine:
             # 清理全局缓存
             cache_manager.clear_daily_cache(current_date)
 
+            # 分钟线滑动窗口推进到当日（淘汰窗口外分块、预取下一交易日）
+            minute_data = getattr(self.api.data_context, 'stock_data_dict_1m', None)
+            if hasattr(minute_data, 'advance'):
+                minute_data.advance(current_date)
+
             # 收集交易前统计
             self.stats_collector.collect_pre_trading(self.context, current_date)
 
@@ -607,53 +612,74 @@ class StrategyExecutionEngine:
         处理逻辑：
         1. 送股/配股: 调整持仓数量
         2. 现金分红: 到账（预扣税20%）
+
+        有除权除息日历时只查一次当日事件；否则逐持仓查询 exrights_dict/dividend_cache。
         """
         try:
             date_str = current_date.strftime('%Y%m%d')
+            calendar = getattr(self.api.data_context, 'corporate_action_calendar', None)
+
+            if calendar is not None:
+                day_events = calendar.get(int(date_str))
+                if not day_events:
+                    return
+                for stock_code, position in self.context.portfolio.positions.items():
+                    event = day_events.get(stock_code)
+                    if event is not None and position.amount > 0:
+                        self._apply_corporate_action(stock_code, position, *event)
+                return
 
             for stock_code, position in self.context.portfolio.positions.items():
                 if position.amount <= 0:
                     continue
 
-                # 分红和送股都基于登记日（前一天）的持股数
-                original_amount = position.amount
-
                 # 检查除权事件（送股/配股）
+                allotted = 0.0
                 exrights_df = self.api.data_context.exrights_dict.get(stock_code)
                 if exrights_df is not None and not exrights_df.empty:
                     date_int = int(date_str)
                     if date_int in exrights_df.index:
                         event = exrights_df.loc[date_int]
                         allotted = float(event.get('allotted_ps', 0) or 0)
-                        if allotted > 0:
-                            new_amount = int(original_amount * (1 + allotted))
-                            position.amount = new_amount
-                            position.enable_amount = new_amount
-                            position.cost_basis /= (1 + allotted)
-                            self.context.portfolio._invalidate_cache()
-
-                # 现金分红（按登记日股数计算）
-                if stock_code not in self.api.data_context.dividend_cache:
-                    continue
-
-                stock_dividends = self.api.data_context.dividend_cache[stock_code]
-                if date_str not in stock_dividends:
-                    continue
 
-                dividend_per_share_before_tax = stock_dividends[date_str]
-                pre_tax_rate = 0.20
-                dividend_per_share_after_tax = dividend_per_share_before_tax * (1 - pre_tax_rate)
-                total_dividend_after_tax = dividend_per_share_after_tax * original_amount
+                # 现金分红
+                dividend = 0.0
+                if stock_code in self.api.data_context.dividend_cache:
+                    dividend = self.api.data_context.dividend_cache[stock_code].get(date_str, 0.0)
 
-                if total_dividend_after_tax > 0:
-                    self.context.portfolio._cash += total_dividend_after_tax
-                    self.context.portfolio._invalidate_cache()
-                    self.context.portfolio.add_dividend(stock_code, dividend_per_share_before_tax)
+                self._apply_corporate_action(stock_code, position, allotted, dividend)
 
         except Exception as e:
             self.log.warning(t("engine.dividend_failed", error=e))
             traceback.print_exc()
 
+    def _apply_corporate_action(self, stock_code, position, allotted, dividend_per_share_before_tax):
+        """执行单只持仓的送转和现金分红
+
+        Args:
+            allotted: 每股送转股数
+            dividend_per_share_before_tax: 每股税前分红
+        """
+        # 分红和送股都基于登记日（前一天）的持股数
+        original_amount = position.amount
+
+        if allotted > 0:
+            new_amount = int(original_amount * (1 + allotted))
+            position.amount = new_amount
+            position.enable_amount = new_amount
+            position.cost_basis /= (1 + allotted)
+            self.context.portfolio._invalidate_cache()
+
+        # 现金分红（按登记日股数计算）
+        pre_tax_rate = 0.20
+        dividend_per_share_after_tax = dividend_per_share_before_tax * (1 - pre_tax_rate)
+        total_dividend_after_tax = dividend_per_share_after_tax * original_amount
+
+        if total_dividend_after_tax > 0:
+            self.context.portfolio._cash += total_dividend_after_tax
+            self.context.portfolio._invalidate_cache()
+            self.context.portfolio.add_dividend(stock_code, dividend_per_share_before_tax)
+
     # ==========================================
     # 重置和清理接口
     # ==========================================
@@ -17,7 +17,11 @@
 
 import pandas as pd
 import atexit
+import time
 import weakref
+from collections import OrderedDict
+from ..ptrade.index_constituents import IndexConstituents
+from ..ptrade.memory_budget import memory_budget
 from ..ptrade.object import LazyDataDict
 from ..utils.config import config as global_config
 from ..i18n import t
@@ -25,6 +29,71 @@ from ..i18n import t
 
 _KNOWN_MARKET_DIRS = {"cn", "us"}
 
+# 支持列裁剪的数据类型（分钟线沿用 price 的列集合）
+_PROJECTED_TYPES = ('price', 'valuation', 'fundamentals')
+
+
+def _covers(loaded, requested):
+    """已加载的列集合是否覆盖所需列（None 表示全部列）"""
+    if loaded is None:
+        return True
+    return requested is not None and set(requested) <= set(loaded)
+
+
+def _merge_columns(loaded, requested):
+    """合并两次请求的列集合"""
+    if loaded is None or requested is None:
+        return None
+    return frozenset(loaded) | frozenset(requested)
+
+
+def _covers_range(loaded, requested):
+    """已加载的日期窗口 (start, stop) 是否覆盖所需窗口（None 表示全部历史）"""
+    if loaded is None:
+        return True
+    if requested is None:
+        return False
+    start_ok = loaded[0] is None or (requested[0] is not None and loaded[0] <= requested[0])
+    stop_ok = loaded[1] is None or (requested[1] is not None and loaded[1] >= requested[1])
+    return start_ok and stop_ok
+
+
+def _merge_ranges(loaded, requested):
+    """合并两个日期窗口，取最早起点和最晚终点"""
+    if loaded is None or requested is None:
+        return None
+    start = None if loaded[0] is None or requested[0] is None else min(loaded[0], requested[0])
+    stop = None if loaded[1] is None or requested[1] is None else max(loaded[1], requested[1])
+    return start, stop
+
+
+# 各数据集持有的数据字典
+_DATASET_DICTS = ('valuation_dict', 'fundamentals_dict', 'stock_data_dict', 'exrights_dict', 'stock_data_dict_1m')
+
+
+def _release_dataset(state):
+    """清空数据集各数据字典的缓存"""
+    for name in _DATASET_DICTS:
+        cache = state.get(name)
+        if cache is not None:
+            cache.clear_cache()
+
+
+def _dataset_nbytes(state):
+    """估算数据集常驻内存的字节数：列式存储（只读挂载的共享面板不计）与各数据字典缓存"""
+    total = 0
+    for name in _DATASET_DICTS:
+        data_dict = state.get(name)
+        columnar = getattr(data_dict, '_columnar', None)
+        if columnar is not None and not columnar.read_only:
+            total += columnar.nbytes
+        total += getattr(getattr(data_dict, '_cache', None), 'nbytes', 0)
+    for name in ('adj_pre_cache', 'adj_post_cache'):
+        store = getattr(state.get(name), 'store', None)
+        if store is not None and not store.read_only:
+            total += store.nbytes
+    return total
+
 
 def _migrate_legacy_data(data_path):
     """旧版扁平目录自动迁移到 data/cn/ 结构（一次性）"""
@@ -44,48 +113,78 @@ def _migrate_legacy_data(data_path):
         print(t("data.migrated", old=data_path, new=cn_path))
 
 
+def resolve_data_path(data_path=None, market="CN"):
+    """解析实际使用的市场数据目录（必要时先迁移旧版扁平目录）
+
+    Args:
+        data_path: 数据根目录或市场目录，None 表示全局配置的数据目录
+        market: 市场代码
+
+    Returns:
+        str: 市场数据目录的绝对路径
+    """
+    from pathlib import Path
+
+    from ..ptrade.market_profile import get_market_profile
+
+    profile = get_market_profile(market)
+    base_path = str(Path(data_path).expanduser().resolve()) if data_path else global_config.data_path
+
+    # 旧版扁平目录自动迁移到 data/cn/
+    _migrate_legacy_data(Path(base_path))
+
+    # 解析市场子目录：若 base_path 已是市场目录则不再追加
+    base = Path(base_path)
+    if base.name == profile.data_dir_name:
+        return str(base)
+    candidate = base / profile.data_dir_name
+    return str(candidate) if candidate.exists() else str(base)
+
+
 class DataServer:
-    """数据服务器单例"""
+    """数据服务器单例
+
+    同一时刻只有一个当前数据集（按数据目录和市场区分）。切换到其他数据集时，当前数据集
+    保留在常驻注册表中；切回最近使用过的数据集无需重新加载。注册表按最近使用顺序淘汰，
+    数据集个数与内存上限见 config.cache.resident_datasets / resident_datasets_mb。
+    """
     _instance = None
     _initialized = False
+    # {(数据目录, 市场): 数据集状态}，不含当前数据集，按最近使用排列
+    _datasets = OrderedDict()
+    # 在数据集之间共享、不随数据集切换的属性
+    _SHARED_ATTRS = frozenset({'_data_contexts', 'data_version'})
 
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self, required_data=None, frequency='1d', data_path: str | None = None, market: str = "CN"):
-        from pathlib import Path
-
+    def __init__(self, required_data=None, frequency='1d', data_path: str | None = None, market: str = "CN",
+                 columns=None, date_range=None):
         from ..ptrade.market_profile import get_market_profile
 
         profile = get_market_profile(market)
         if not hasattr(self, "_data_contexts"):
             self._data_contexts = weakref.WeakSet()
             self.data_version = 0
-        base_path = str(Path(data_path).expanduser().resolve()) if data_path else global_config.data_path
-
-        # 旧版扁平目录自动迁移到 data/cn/
-        _migrate_legacy_data(Path(base_path))
+        resolved_path = resolve_data_path(data_path, market)
 
-        # 解析市场子目录：若 base_path 已是市场目录则不再追加
-        base = Path(base_path)
-        if base.name == profile.data_dir_name:
-            resolved_path = str(base)
-        else:
-            candidate = base / profile.data_dir_name
-            resolved_path = str(candidate) if candidate.exists() else str(base)
-
-        # 路径变更时强制重新初始化
+        # 数据集变更时，当前数据集转入常驻注册表；目标数据集已常驻时直接切换，否则重新加载
         if DataServer._initialized:
-            if resolved_path != self.data_path:
-                self._clear_all_caches()
-                DataServer._initialized = False
-            else:
+            if (resolved_path, market) == self._dataset_key():
                 print(t("data.using_cached"))
                 if required_data is not None:
-                    self._ensure_data_loaded(required_data, frequency)
+                    self._ensure_data_loaded(required_data, frequency, columns, date_range)
                 return
+            self._stash_dataset()
+            if self._restore_dataset((resolved_path, market)):
+                print(t("data.dataset_switched", path=resolved_path, market=market))
+                self._publish_data_update()
+                if required_data is not None:
+                    self._ensure_data_loaded(required_data, frequency, columns, date_range)
+                return
+            DataServer._initialized = False
 
         print("=" * 70)
         print(t("data.first_load"))
@@ -107,14 +206,24 @@ class DataServer:
         self.adj_pre_cache = None
         self.adj_post_cache = None
         self.dividend_cache = None
+        # 除权除息日历 {YYYYMMDD: {股票: (每股送转, 每股分红)}}
+        self.corporate_action_calendar = None
 
         self.index_constituents = {}
         self.stock_status_history = {}
 
+        # 其他进程发布的共享面板（只读内存映射）
+        self._shared_panel = None
+
         # 记录已加载的数据类型
         self._loaded_data_types = set()
         self._frequency = frequency
 
+        # 各数据类型只读取的列 {'price'|'valuation'|'fundamentals': 列集合}，缺省表示全部列
+        self._columns = dict(columns or {})
+        # 行情（日线/分钟）只读取的日期窗口 (start, stop)，None 表示全部历史
+        self._date_range = date_range
+
         # 缓存keys避免重复读取
         self._stock_keys_cache = None
         self._stock_1m_keys_cache = None
@@ -136,18 +245,58 @@ class DataServer:
         self._data_contexts.add(data_context)
         data_context._sync_from_data_server(self)
 
-    def _publish_data_update(self):
-        """Propagate replaced data objects and a new cache version."""
+    def _publish_data_update(self, symbols=None):
+        """Propagate replaced data objects and a new cache version.
+
+        Args:
+            symbols: symbols whose data changed in place; None means every derived cache is stale
+        """
         self.data_version = getattr(self, "data_version", 0) + 1
         for data_context in getattr(self, "_data_contexts", ()):
-            data_context._sync_from_data_server(self)
+            data_context._sync_from_data_server(self, symbols)
 
     def _clear_all_caches(self):
         """清空所有缓存"""
-        for cache in [self.valuation_dict, self.fundamentals_dict,
-                      self.stock_data_dict, self.exrights_dict, self.stock_data_dict_1m]:
-            if cache is not None:
-                cache.clear_cache()
+        _release_dataset(vars(self))
+
+    def _dataset_key(self):
+        """当前数据集的 (数据目录, 市场)"""
+        return self.data_path, getattr(self, '_market', 'CN')
+
+    def _stash_dataset(self):
+        """把当前数据集转入常驻注册表，超出个数或内存上限时淘汰最久未使用的数据集"""
+        state = {name: value for name, value in vars(self).items() if name not in self._SHARED_ATTRS}
+        DataServer._datasets[self._dataset_key()] = state
+        DataServer._datasets.move_to_end(self._dataset_key())
+        self._evict_datasets()
+
+    def _restore_dataset(self, key):
+        """从常驻注册表切换到数据集 key，不在注册表中时返回 False"""
+        state = DataServer._datasets.pop(key, None)
+        if state is None:
+            return False
+        vars(self).update(state)
+        return True
+
+    @classmethod
+    def _evict_datasets(cls):
+        """按最近使用顺序淘汰注册表中的数据集，直到个数与内存都在上限以内"""
+        from ..ptrade.config_manager import config
+
+        limit = max(config.cache.resident_datasets - 1, 0)
+        budget = config.cache.resident_datasets_mb * 1024 * 1024
+        sizes = {key: _dataset_nbytes(state) for key, state in cls._datasets.items()} if budget else {}
+        while cls._datasets and (len(cls._datasets) > limit or (budget and sum(sizes.values()) > budget)):
+            (path, market), state = cls._datasets.popitem(last=False)
+            sizes.pop((path, market), None)
+            _release_dataset(state)
+            print(t("data.dataset_evicted", path=path, market=market))
+
+    @classmethod
+    def _drop_datasets(cls):
+        """释放注册表中的全部数据集"""
+        while cls._datasets:
+            _release_dataset(cls._datasets.popitem(last=False)[1])
 
     def _cleanup_on_exit(self):
         """进程退出时清理资源"""
@@ -166,6 +315,8 @@ class DataServer:
 
         # 记录需要加载的数据类型
         self._loaded_data_types = required_data
+        # append_data 以此为起点按文件修改时间检测变化
+        self._source_checked_ns = time.time_ns()
         self._frequency = frequency
         from ..ptrade import storage
 
@@ -178,7 +329,21 @@ class DataServer:
         self._fundamentals_keys_cache = self._stock_keys_cache
         self._exrights_keys_cache = self._stock_keys_cache
 
+        from .shared_panel import attach_shared_panel
+        self._shared_panel = attach_shared_panel(self.data_path)
+        if self._shared_panel is not None:
+            print(t("data.shared_attached", path=self._shared_panel.directory))
+
         print(t("data.reading_meta"))
+        self._load_metadata()
+        self._load_benchmark_data()
+
+        # 加载指定的数据类型
+        self._load_data_by_types(required_data)
+
+    def _load_metadata(self):
+        """读取元数据、交易日历和股票元数据（未变化的文件命中数据集清单缓存）"""
+        from ..ptrade import storage
 
         # 加载元数据
         metadata_all = storage.load_metadata(self.data_path, 'metadata')
@@ -205,6 +370,10 @@ class DataServer:
         else:
             self.stock_metadata = pd.DataFrame()
 
+    def _load_benchmark_data(self):
+        """读取基准数据，缺少基准文件时从日线文件读取默认基准"""
+        from ..ptrade import storage
+
         # 加载基准数据
         benchmark_data_raw = storage.load_metadata(self.data_path, 'benchmark')
         if benchmark_data_raw and 'data' in benchmark_data_raw:
@@ -221,9 +390,6 @@ class DataServer:
                 if default_benchmark is not None:
                     self.benchmark_data[self._default_benchmark] = default_benchmark
 
-        # 加载指定的数据类型
-        self._load_data_by_types(required_data)
-
     def _load_data_by_types(self, required_data):
         """加载数据类型"""
         from ..ptrade import storage
@@ -231,9 +397,10 @@ class DataServer:
         # 股票价格（日线）
         if 'price' in required_data:
             print(t("data.price_loading", count=len(self._stock_keys_cache)))
-            self.stock_data_dict = LazyDataDict(
+            self.stock_data_dict = self._attached_dict('price', 'stock') or LazyDataDict(
                 self.data_path, 'stock', self._stock_keys_cache,
-                preload=True
+                preload=True, columns=self._columns.get('price'),
+                date_range=self._date_range, compact=self._compact_dtypes()
             )
 
             # 立即填充 benchmark_data（确保默认基准可用）
@@ -251,16 +418,14 @@ class DataServer:
         # 分钟数据（按需加载）
         if 'price_1m' in required_data and self._stock_1m_keys_cache:
             print(t("data.minute_loading", count=len(self._stock_1m_keys_cache)))
-            self.stock_data_dict_1m = LazyDataDict(
-                self.data_path, 'stock_1m', self._stock_1m_keys_cache,
-                preload=True
-            )
+            self.stock_data_dict_1m = self._minute_data_dict()
         else:
             # 延迟加载模式
             if self._stock_1m_keys_cache:
                 self.stock_data_dict_1m = LazyDataDict(
                     self.data_path, 'stock_1m', self._stock_1m_keys_cache,
-                    preload=False
+                    preload=False, columns=self._columns.get('price'),
+                    date_range=self._date_range
                 )
             else:
                 self.stock_data_dict_1m = None
@@ -268,9 +433,9 @@ class DataServer:
         # 估值数据
         if 'valuation' in required_data:
             print(t("data.valuation_loading", count=len(self._valuation_keys_cache)))
-            self.valuation_dict = LazyDataDict(
+            self.valuation_dict = self._attached_dict('valuation', 'valuation') or LazyDataDict(
                 self.data_path, 'valuation', self._valuation_keys_cache,
-                preload=True
+                preload=True, columns=self._columns.get('valuation'), compact=self._compact_dtypes()
             )
         else:
             print(t("data.valuation_skip"))
@@ -283,7 +448,8 @@ class DataServer:
             self.fundamentals_dict = LazyDataDict(
                 self.data_path, 'fundamentals', self._fundamentals_keys_cache,
                 preload=False,
-                max_cache_size=config.cache.fundamentals_cache_size
+                max_cache_size=config.cache.fundamentals_cache_size,
+                columns=self._columns.get('fundamentals')
             )
         else:
             print(t("data.fundamentals_skip"))
@@ -304,11 +470,22 @@ class DataServer:
 
         print(t("data.loaded_types", types=' | '.join(sorted(required_data))))
 
+        self._link_benchmarks()
+
+        keys_list = list(self.benchmark_data.keys())
+        print(t("data.benchmarks", count=len(keys_list), list=', '.join(keys_list[:5])))
+
+        # 加载复权缓存
+        if 'price' in required_data or 'exrights' in required_data:
+            self._initialize_adjustment_caches(exrights_loaded='exrights' in required_data)
+
+        print(t("data.complete"))
+
+    def _link_benchmarks(self):
+        """把日线数据中存在的指数及默认基准加入 benchmark_data"""
         # 动态获取所有指数代码
-        index_codes = set()
-        if self.index_constituents:
-            for date_data in self.index_constituents.values():
-                index_codes.update(date_data.keys())
+        constituents = IndexConstituents.coerce(self.index_constituents)
+        index_codes = constituents.codes() if constituents is not None else []
 
         # 将存在的指数添加到 benchmark_data（从 stock_data_dict 获取）
         for code in index_codes:
@@ -319,18 +496,67 @@ class DataServer:
         if self._default_benchmark not in self.benchmark_data and self._default_benchmark in self.stock_data_dict:
             self.benchmark_data[self._default_benchmark] = self.stock_data_dict[self._default_benchmark]
 
-        keys_list = list(self.benchmark_data.keys())
-        print(t("data.benchmarks", count=len(keys_list), list=', '.join(keys_list[:5])))
+    @staticmethod
+    def _compact_dtypes():
+        """行情与估值是否以紧凑 dtype 常驻（config.cache.compact_dtypes）"""
+        from ..ptrade.config_manager import config
+        return config.cache.compact_dtypes
+
+    def _minute_data_dict(self):
+        """分钟回测的数据字典：默认为按月分块的滑动窗口，minute_window_days=0 时全量预加载"""
+        from ..ptrade.config_manager import config
+        from ..ptrade.minute_window import MinuteWindowDict
+        window_days = config.cache.minute_window_days
+        if window_days <= 0:
+            return LazyDataDict(
+                self.data_path, 'stock_1m', self._stock_1m_keys_cache,
+                preload=True, columns=self._columns.get('price'),
+                date_range=self._date_range
+            )
+        return MinuteWindowDict(
+            self.data_path, self._stock_1m_keys_cache,
+            columns=self._columns.get('price'), date_range=self._date_range,
+            trade_days=getattr(self, 'trade_days', None), lookback_days=window_days
+        )
 
-        # 加载复权缓存
-        if 'price' in required_data or 'exrights' in required_data:
-            self._initialize_adjustment_caches()
+    def _attached_dict(self, dataset, data_type):
+        """共享面板中存在该数据集且覆盖所需列时，返回挂载的 LazyDataDict，否则返回 None"""
+        panel = getattr(self, '_shared_panel', None)
+        store = panel.get(dataset) if panel is not None else None
+        if store is None:
+            return None
+        if not _covers(panel.columns.get(dataset), getattr(self, '_columns', {}).get(dataset)):
+            return None
+        if dataset == 'price' and not _covers_range(panel.date_ranges.get(dataset), getattr(self, '_date_range', None)):
+            return None
+        from ..ptrade.config_manager import config
+        return LazyDataDict.from_columnar(
+            self.data_path, data_type, store,
+            max_cache_size=config.cache.lazy_dict_cache_size
+        )
 
-        print(t("data.complete"))
+    def publish_shared(self, directory=None):
+        """将已加载的价格、估值和复权因子发布为共享面板，供其他进程只读挂载
 
-    def _initialize_adjustment_caches(self):
-        """根据当前价格和除权数据初始化复权、分红缓存。"""
+        Args:
+            directory: 面板目录，默认 {data_path}/shared_panel
+
+        Returns:
+            面板目录
+        """
+        from .shared_panel import publish_shared_panel
+        path = publish_shared_panel(self, directory)
+        print(t("data.shared_published", path=path))
+        return path
+
+    def _initialize_adjustment_caches(self, exrights_loaded=True):
+        """根据当前价格和除权数据初始化复权、分红缓存及除权除息日历。
+
+        Args:
+            exrights_loaded: 是否加载了除权数据（决定日历是否收录送转）
+        """
         from ..ptrade.adj_cache import create_dividend_cache, load_adj_post_cache, load_adj_pre_cache
+        from ..ptrade.corporate_actions import build_action_calendar
         from ..ptrade.data_context import DataContext
 
         temp_context = DataContext(
@@ -346,23 +572,61 @@ class DataServer:
             adj_post_cache=None,
             trade_days=self.trade_days
         )
-        self.adj_pre_cache = load_adj_pre_cache(temp_context)
-        self.adj_post_cache = load_adj_post_cache(temp_context)
+        panel = getattr(self, '_shared_panel', None)
+        if panel is not None and 'adj_pre' in panel and 'adj_post' in panel:
+            from ..ptrade.columnar_store import ColumnarFrameMap
+            self.adj_pre_cache = ColumnarFrameMap(panel.get('adj_pre'))
+            self.adj_post_cache = ColumnarFrameMap(panel.get('adj_post'))
+        else:
+            self.adj_pre_cache = load_adj_pre_cache(temp_context)
+            self.adj_post_cache = load_adj_post_cache(temp_context)
         self.dividend_cache = create_dividend_cache(temp_context)
+        # 送转只在加载了除权数据时处理，与逐持仓查询 exrights_dict 的行为一致
+        self.corporate_action_calendar = build_action_calendar(
+            self.data_path, getattr(self, '_stock_keys_cache', None) or [], allotments=exrights_loaded
+        )
 
-    def _ensure_data_loaded(self, required_data, frequency='1d'):
+    def _ensure_data_loaded(self, required_data, frequency='1d', columns=None, date_range=None):
         """确保所需数据已加载,动态补充缺失的数据
 
         Args:
             required_data: 需要的数据集合
             frequency: 回测频率 '1d'日线 '1m'分钟线
+            columns: {数据类型: 列集合}，缺省或 None 表示全部列
+            date_range: 行情日期窗口 (start, stop)，None 表示全部历史
         """
         if not hasattr(self, '_loaded_data_types'):
             self._loaded_data_types = set()
+        if not hasattr(self, '_columns'):
+            self._columns = {}
+        if not hasattr(self, '_date_range'):
+            self._date_range = None
+        columns = columns or {}
 
         # 计算缺失的数据类型
         missing = set(required_data) - self._loaded_data_types
 
+        # 已加载但列不足的数据类型：按并集放宽后重新加载
+        for data_type in set(required_data) & self._loaded_data_types & set(_PROJECTED_TYPES):
+            if not _covers(self._columns.get(data_type), columns.get(data_type)):
+                missing.add(data_type)
+        for data_type in set(required_data) & set(_PROJECTED_TYPES):
+            if data_type in self._loaded_data_types:
+                self._columns[data_type] = _merge_columns(self._columns.get(data_type), columns.get(data_type))
+            else:
+                self._columns[data_type] = columns.get(data_type)
+
+        # 行情窗口不足（如新回测起点更早）：放宽窗口后重新加载日线和分钟线
+        range_widened = False
+        if 'price' in required_data or 'price_1m' in required_data:
+            if 'price' in self._loaded_data_types:
+                if not _covers_range(self._date_range, date_range):
+                    self._date_range = _merge_ranges(self._date_range, date_range)
+                    missing.add('price')
+                    range_widened = True
+            else:
+                self._date_range = date_range
+
         # 复权缓存重建依赖日线价格；仅补载除权数据时也必须先补载价格。
         if 'exrights' in missing and 'price' not in self._loaded_data_types:
             missing.add('price')
@@ -379,14 +643,17 @@ class DataServer:
         # 使用缓存的keys加载缺失数据
         if 'price' in missing and self._stock_keys_cache is not None:
             print(t("data.supplement_price", count=len(self._stock_keys_cache)))
-            self.stock_data_dict = LazyDataDict(
-                self.data_path, 'stock', self._stock_keys_cache, preload=True
+            self.stock_data_dict = self._attached_dict('price', 'stock') or LazyDataDict(
+                self.data_path, 'stock', self._stock_keys_cache, preload=True,
+                columns=self._columns.get('price'), date_range=self._date_range,
+                compact=self._compact_dtypes()
             )
 
         if 'valuation' in missing and self._valuation_keys_cache is not None:
             print(t("data.supplement_valuation", count=len(self._valuation_keys_cache)))
-            self.valuation_dict = LazyDataDict(
-                self.data_path, 'valuation', self._valuation_keys_cache, preload=True
+            self.valuation_dict = self._attached_dict('valuation', 'valuation') or LazyDataDict(
+                self.data_path, 'valuation', self._valuation_keys_cache, preload=True,
+                columns=self._columns.get('valuation'), compact=self._compact_dtypes()
             )
 
         if 'fundamentals' in missing and self._fundamentals_keys_cache is not None:
@@ -395,7 +662,8 @@ class DataServer:
             self.fundamentals_dict = LazyDataDict(
                 self.data_path, 'fundamentals', self._fundamentals_keys_cache,
                 preload=False,
-                max_cache_size=config.cache.fundamentals_cache_size
+                max_cache_size=config.cache.fundamentals_cache_size,
+                columns=self._columns.get('fundamentals')
             )
 
         if 'exrights' in missing and self._exrights_keys_cache is not None:
@@ -409,18 +677,90 @@ class DataServer:
 
         if 'price_1m' in missing and self._stock_1m_keys_cache is not None:
             print(t("data.supplement_minute", count=len(self._stock_1m_keys_cache)))
-            self.stock_data_dict_1m = LazyDataDict(
-                self.data_path, 'stock_1m', self._stock_1m_keys_cache,
-                preload=True
-            )
+            self.stock_data_dict_1m = self._minute_data_dict()
+        elif range_widened and self.stock_data_dict_1m is not None:
+            if 'price_1m' in self._loaded_data_types:
+                self.stock_data_dict_1m = self._minute_data_dict()
+            else:
+                self.stock_data_dict_1m = LazyDataDict(
+                    self.data_path, 'stock_1m', self._stock_1m_keys_cache,
+                    preload=False, columns=self._columns.get('price'),
+                    date_range=self._date_range
+                )
 
         if {'price', 'exrights'} & missing:
-            self._initialize_adjustment_caches()
+            self._initialize_adjustment_caches(exrights_loaded='exrights' in self._loaded_data_types | missing)
 
         # 更新已加载记录
         self._loaded_data_types.update(missing)
         self._publish_data_update()
 
+    def append_data(self, symbols=None):
+        """收盘后的增量更新：只读取新增行和变化的文件，原地扩展常驻数据，无需 reset() 全量重载
+
+        - 日线行情只读取各代码常驻数据最后日期之后的行，追加到列式存储
+        - 预加载的估值整文件重读变化的代码；财务、除权和分钟线丢弃变化代码的缓存，下次访问时重读
+        - 交易日历、元数据和基准重新读取（未变化的文件命中数据集清单缓存）
+        - 复权因子和除权除息日历按来源文件戳只重算变化的股票
+        - 已注册的数据上下文只失效变化代码的派生缓存
+
+        Args:
+            symbols: 有更新的代码，None 时按上次加载以来的文件修改时间检测
+
+        Returns:
+            set: 刷新的代码
+        """
+        from ..ptrade import storage
+        from ..ptrade.minute_window import MinuteWindowDict
+
+        checked_ns = time.time_ns()
+        # 源文件可能被原地改写，重新判断合并数据集是否过期
+        storage.refresh_source_stamps(self.data_path)
+        since = getattr(self, '_source_checked_ns', 0)
+
+        self._load_metadata()
+        self._stock_keys_cache = storage.list_stocks(self.data_path)
+        self._valuation_keys_cache = self._stock_keys_cache
+        self._fundamentals_keys_cache = self._stock_keys_cache
+        self._exrights_keys_cache = self._stock_keys_cache
+        self._stock_1m_keys_cache = storage.list_stocks_1m(self.data_path)
+
+        refreshed = {}
+        for name, data_type, required, keys in (
+            ('stock_data_dict', 'stock', 'price', self._stock_keys_cache),
+            ('valuation_dict', 'valuation', 'valuation', self._valuation_keys_cache),
+            ('fundamentals_dict', 'fundamentals', 'fundamentals', self._fundamentals_keys_cache),
+            ('exrights_dict', 'exrights', 'exrights', self._exrights_keys_cache),
+            ('stock_data_dict_1m', 'stock_1m', None, self._stock_1m_keys_cache),
+        ):
+            data_dict = getattr(self, name)
+            if data_dict is None or (required is not None and required not in self._loaded_data_types):
+                continue
+            keys = set(keys)
+            changed = set(symbols) if symbols is not None else storage.changed_symbols(self.data_path, data_type, since)
+            # 合并数据集整体被改写时无法按代码区分
+            changed = keys if changed is None else changed & keys
+            changed = sorted(changed | (keys - set(data_dict.keys())))
+            if isinstance(data_dict, MinuteWindowDict):
+                data_dict.append(changed, trade_days=self.trade_days)
+            else:
+                data_dict.append(changed)
+            refreshed[data_type] = changed
+
+        self._load_benchmark_data()
+        self._link_benchmarks()
+        if refreshed.get('stock') or refreshed.get('exrights'):
+            # 常驻数据已与共享面板不同，之后不再挂载面板
+            self._shared_panel = None
+            self._initialize_adjustment_caches(exrights_loaded='exrights' in self._loaded_data_types)
+
+        self._source_checked_ns = checked_ns
+        changed = set().union(*refreshed.values())
+        self._publish_data_update(changed)
+        last_day = self.trade_days[-1].date() if self.trade_days is not None and len(self.trade_days) else '-'
+        print(t("data.appended", count=len(changed), last_day=last_day))
+        return changed
+
     def get_benchmark_data(self, benchmark_code=None) -> pd.DataFrame:
         """获取基准数据,支持动态从stock_data_dict获取
 
@@ -468,6 +808,7 @@ class DataServer:
 
         # 清空其他缓存
         cls._instance._clear_all_caches()
+        cls._drop_datasets()
 
         # 重置单例
         cls._instance = None
@@ -490,11 +831,22 @@ class DataServer:
         print(t("data.status_running"))
         if cls._instance.stock_data_dict is not None:
             print(t("data.status_stocks", count=len(cls._instance.stock_data_dict._all_keys)))
-            print(t("data.status_cached", count=len(cls._instance.stock_data_dict._cache)))
+            columnar = getattr(cls._instance.stock_data_dict, "_columnar", None)
+            cached = len(columnar) if columnar is not None else len(cls._instance.stock_data_dict._cache)
+            print(t("data.status_cached", count=cached))
         if cls._instance.exrights_dict is not None:
             print(t("data.status_exrights", count=len(cls._instance.exrights_dict._cache)))
         if cls._instance.valuation_dict is not None:
             print(t("data.status_mode", mode=t("data.preload_mode") if cls._instance.valuation_dict._preload else t("data.lazy_mode")))
+        for path, market in cls._datasets:
+            print(t("data.status_dataset", path=path, market=market,
+                    size="{:.1f}".format(_dataset_nbytes(cls._datasets[(path, market)]) / 1024 / 1024)))
+        budget = memory_budget.limit
+        print(t("data.status_cache_memory", size="{:.1f}".format(memory_budget.total_bytes() / 1024 / 1024),
+                budget="{:.0f}".format(budget / 1024 / 1024) if budget else "-"))
+        for name, nbytes in memory_budget.usage().items():
+            if nbytes:
+                print(t("data.status_cache_namespace", name=name, size="{:.1f}".format(nbytes / 1024 / 1024)))
 
     def __del__(self):
         """析构时清空缓存"""
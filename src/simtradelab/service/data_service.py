@@ -0,0 +1,662 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (c) 2025 Kay
+#
+# This file is part of SimTradeLab, dual-licensed under AGPL-3.0 and a
+# commercial license. See LICENSE-COMMERCIAL.md or contact kayou@duck.com
+#
+"""
+本地数据服务 - 常驻进程持有已加载的数据，经 Unix 域套接字供其他进程使用
+
+DataServer 是进程内单例，每个新进程（命令行回测、notebook、优化 worker）都要重新加载。
+`simtradelab serve` 启动的常驻进程持有一个 DataServer：
+
+- 价格、估值和复权因子发布为共享面板（shared_panel），客户端以只读内存映射挂载
+- 财务、除权等按需加载的数据按 {代码, 数据集} 请求，以 Arrow IPC 流应答
+- 元数据（交易日历、指数成份股、股票状态等）在 attach 时整体下发：DataFrame 为 Arrow IPC 流，
+  数组为 np.savez（不含 object），其余为 JSON；任何消息都不经 pickle 解码
+
+套接字默认放在只有当前用户可访问的目录（$XDG_RUNTIME_DIR 或临时目录下 0700 的子目录），
+客户端连接后核对对端进程（不支持 SO_PEERCRED 的平台核对套接字文件）属于当前用户。
+
+DataServiceClient 与 DataServer 接口一致，回测 runner 检测到服务在运行时直接使用它，
+冷启动不再读取行情文件。
+
+消息格式：!II（头部长度、负载长度）+ JSON 头部 + 负载。
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from ..i18n import t
+from ..ptrade.columnar_store import get_frames
+from ..ptrade.index_constituents import IndexConstituents
+from ..ptrade.memory_budget import SizedLRUCache
+from ..ptrade.stock_status import StockStatusStore
+
+SERVICE_SOCKET_ENV = 'SIMTRADELAB_DATA_SERVICE_SOCKET'
+
+_HEADER = struct.Struct('!II')
+
+# 按代码请求的数据集 -> DataServer 属性
+_REMOTE_DATASETS = {
+    'stock': 'stock_data_dict',
+    'valuation': 'valuation_dict',
+    'fundamentals': 'fundamentals_dict',
+    'exrights': 'exrights_dict',
+}
+
+# attach 时整体下发的 DataServer 属性
+_SNAPSHOT_ATTRS = (
+    'data_path',
+    'data_version',
+    'benchmark_data',
+    'stock_metadata',
+    'index_constituents',
+    'stock_status_history',
+    'trade_days',
+    'corporate_action_calendar',
+)
+
+
+def default_socket_path() -> Path:
+    """服务套接字路径：环境变量 SIMTRADELAB_DATA_SERVICE_SOCKET，默认为当前用户私有目录下的文件
+
+    私有目录为 $XDG_RUNTIME_DIR（由系统按用户创建，权限 0700），未设置时为临时目录下的
+    simtradelab-<uid>（由服务端以 0700 创建）。
+    """
+    env = os.environ.get(SERVICE_SOCKET_ENV)
+    if env:
+        return Path(env)
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return Path(runtime_dir) / 'simtradelab-data.sock'
+    return Path(tempfile.gettempdir()) / f'simtradelab-{os.getuid()}' / 'data.sock'
+
+
+def _ensure_private_dir(directory: Path) -> None:
+    """创建（或核对）只有当前用户可访问的套接字目录
+
+    Raises:
+        PermissionError: 目录不属于当前用户或其他用户可访问
+    """
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f'socket directory {directory} must be owned by the current user with mode 0700')
+
+
+def _peer_uid(sock: socket.socket, socket_path: Path) -> int:
+    """对端进程的 uid；不支持 SO_PEERCRED 的平台取套接字文件的属主"""
+    if hasattr(socket, 'SO_PEERCRED'):
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+        return struct.unpack('3i', creds)[1]
+    return os.stat(socket_path).st_uid
+
+
+# ==================== 消息编解码 ====================
+
+def _recv_exact(sock: socket.socket, size: int) -> bytearray:
+    buf = bytearray(size)
+    view = memoryview(buf)
+    pos = 0
+    while pos < size:
+        got = sock.recv_into(view[pos:], size - pos)
+        if not got:
+            raise ConnectionError('data service connection closed')
+        pos += got
+    return buf
+
+
+def send_message(sock: socket.socket, header: dict, payload: bytes = b'') -> None:
+    data = json.dumps(header).encode('utf-8')
+    sock.sendall(_HEADER.pack(len(data), len(payload)) + data)
+    if payload:
+        sock.sendall(payload)
+
+
+def recv_message(sock: socket.socket) -> tuple[dict, bytes]:
+    header_size, payload_size = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    header = json.loads(_recv_exact(sock, header_size).decode('utf-8'))
+    payload = bytes(_recv_exact(sock, payload_size)) if payload_size else b''
+    return header, payload
+
+
+def encode_frames(frames: dict[str, pd.DataFrame]) -> tuple[list[str], list[int], bytes]:
+    """{代码: DataFrame} 编码为首尾相接的 Arrow IPC 流，返回 (代码, 各流字节数, 负载)"""
+    import pyarrow as pa
+
+    sink = pa.BufferOutputStream()
+    sizes = []
+    for df in frames.values():
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        start = sink.tell()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        sizes.append(sink.tell() - start)
+    return list(frames), sizes, sink.getvalue().to_pybytes()
+
+
+def decode_frames(symbols: list[str], sizes: list[int], payload: bytes) -> dict[str, pd.DataFrame]:
+    """encode_frames 的逆过程（dtype、索引及索引名随 pandas 元数据还原）"""
+    import pyarrow as pa
+
+    buf = pa.py_buffer(payload)
+    frames = {}
+    offset = 0
+    for symbol, size in zip(symbols, sizes, strict=True):
+        frames[symbol] = pa.ipc.open_stream(buf.slice(offset, size)).read_all().to_pandas()
+        offset += size
+    return frames
+
+
+def _encode_date_range(date_range) -> Optional[list]:
+    if date_range is None:
+        return None
+    return [None if bound is None else str(bound) for bound in date_range]
+
+
+def _decode_date_range(bounds) -> Optional[tuple]:
+    if bounds is None:
+        return None
+    return tuple(None if bound is None else pd.Timestamp(bound) for bound in bounds)
+
+
+def encode_snapshot(snapshot: dict) -> tuple[dict, bytes]:
+    """attach 快照编码为 (JSON 头部, 负载)
+
+    benchmark_data 与 stock_metadata 为 Arrow IPC 流，交易日历、指数成份股与股票状态为
+    np.savez 数组，其余字段直接放在 JSON 头部。
+    """
+    header = {
+        name: snapshot[name]
+        for name in ('data_path', 'data_version', 'panel_dir', 'default_benchmark', 'loaded_data_types', 'keys')
+    }
+    header['columns'] = {
+        name: sorted(cols) if cols is not None else None for name, cols in snapshot['columns'].items()
+    }
+    header['date_range'] = _encode_date_range(snapshot['date_range'])
+    header['corporate_action_calendar'] = (
+        None if snapshot['corporate_action_calendar'] is None else {
+            str(date): {symbol: list(action) for symbol, action in actions.items()}
+            for date, actions in snapshot['corporate_action_calendar'].items()
+        }
+    )
+
+    frames = {'stock_metadata': snapshot['stock_metadata']} if snapshot['stock_metadata'] is not None else {}
+    benchmark_data = snapshot['benchmark_data']
+    header['benchmarks'] = None if benchmark_data is None else list(benchmark_data)
+    frames.update((f'benchmark:{code}', df) for code, df in (benchmark_data or {}).items())
+    header['frames'], header['frame_sizes'], frame_payload = encode_frames(frames)
+
+    arrays = {}
+    trade_days = snapshot['trade_days']
+    header['trade_days'] = None if trade_days is None else {'name': trade_days.name}
+    if trade_days is not None:
+        arrays['trade_days'] = trade_days.to_numpy(dtype='datetime64[ns]').view('i8')
+    for name, cls in (('index_constituents', IndexConstituents), ('stock_status_history', StockStatusStore)):
+        value = snapshot[name]
+        if not isinstance(value, cls):
+            # 无数据时为空 dict（DataServer 的默认值）
+            value = cls.coerce(value)
+        header[name] = value is not None
+        if value is not None:
+            arrays.update((f'{name}:{key}', array) for key, array in value.to_arrays().items())
+    buf = io.BytesIO()
+    np.savez(buf, **arrays)
+    header['frames_size'] = len(frame_payload)
+    return header, frame_payload + buf.getvalue()
+
+
+def decode_snapshot(header: dict, payload: bytes) -> dict:
+    """encode_snapshot 的逆过程"""
+    frames_size = header['frames_size']
+    frames = decode_frames(header['frames'], header['frame_sizes'], payload[:frames_size])
+    with np.load(io.BytesIO(payload[frames_size:]), allow_pickle=False) as npz:
+        arrays = {name: npz[name] for name in npz.files}
+
+    snapshot = {
+        name: header[name]
+        for name in ('data_path', 'data_version', 'panel_dir', 'default_benchmark', 'loaded_data_types', 'keys')
+    }
+    snapshot['columns'] = {
+        name: frozenset(cols) if cols is not None else None for name, cols in header['columns'].items()
+    }
+    snapshot['date_range'] = _decode_date_range(header['date_range'])
+    calendar = header['corporate_action_calendar']
+    snapshot['corporate_action_calendar'] = None if calendar is None else {
+        int(date): {symbol: tuple(action) for symbol, action in actions.items()}
+        for date, actions in calendar.items()
+    }
+    snapshot['stock_metadata'] = frames.get('stock_metadata')
+    snapshot['benchmark_data'] = None if header['benchmarks'] is None else {
+        code: frames[f'benchmark:{code}'] for code in header['benchmarks']
+    }
+    trade_days = header['trade_days']
+    snapshot['trade_days'] = None if trade_days is None else pd.DatetimeIndex(
+        arrays['trade_days'].view('datetime64[ns]'), name=trade_days['name']
+    )
+    for name, cls in (('index_constituents', IndexConstituents), ('stock_status_history', StockStatusStore)):
+        prefix = f'{name}:'
+        snapshot[name] = cls.from_arrays({
+            key[len(prefix):]: array for key, array in arrays.items() if key.startswith(prefix)
+        }) if header[name] else {}
+    return snapshot
+
+
+# ==================== 服务端 ====================
+
+if hasattr(socketserver, 'ThreadingUnixStreamServer'):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+class DataService:
+    """常驻数据服务：持有 DataServer，在 Unix 域套接字上应答 attach / frames 请求
+
+    请求串行执行（DataServer 与按需加载的字典不是线程安全的），多个连接由各自线程收发。
+    """
+
+    def __init__(self, data_path=None, market='CN', socket_path=None, required_data=None):
+        """
+        Args:
+            data_path: 数据目录，None 表示全局配置的数据目录
+            market: 市场代码
+            socket_path: 套接字路径，默认 default_socket_path()
+            required_data: 启动时加载的数据类型，None 表示全部
+        """
+        from .data_server import DataServer
+
+        self.market = market
+        self.socket_path = Path(socket_path) if socket_path else default_socket_path()
+        self.server = DataServer(required_data, data_path=data_path, market=market)
+        self._lock = threading.Lock()
+        self._published_version = None
+        self._panel_dir = None
+        self._socket_server = None
+        self._ensure_panel()
+
+    def _ensure_panel(self) -> None:
+        """数据有更新（首次加载或补载）时重新发布共享面板"""
+        if self._published_version != self.server.data_version:
+            self._panel_dir = str(self.server.publish_shared())
+            self._published_version = self.server.data_version
+
+    def handle(self, header: dict, payload: bytes) -> tuple[dict, bytes]:
+        """处理一条请求，返回 (应答头, 负载)"""
+        op = header.get('op')
+        if op == 'ping':
+            return {'ok': True, 'data_path': self.server.data_path, 'pid': os.getpid()}, b''
+        if op == 'attach':
+            return self._attach(header)
+        if op == 'frames':
+            return self._frames(header)
+        if op == 'shutdown':
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {'ok': True}, b''
+        return {'ok': False, 'error': f'unknown op: {op}'}, b''
+
+    def _attach(self, header: dict) -> tuple[dict, bytes]:
+        from .data_server import resolve_data_path
+
+        data_path = resolve_data_path(header.get('data_path'), header.get('market', self.market))
+        if data_path != self.server.data_path:
+            return {'ok': False, 'error': f'service holds {self.server.data_path}, not {data_path}'}, b''
+        with self._lock:
+            required_data = header.get('required_data')
+            if required_data is not None:
+                columns = {name: frozenset(cols) for name, cols in (header.get('columns') or {}).items()}
+                self.server._ensure_data_loaded(
+                    set(required_data), header.get('frequency', '1d'), columns,
+                    _decode_date_range(header.get('date_range'))
+                )
+            self._ensure_panel()
+            server = self.server
+            snapshot = {name: getattr(server, name, None) for name in _SNAPSHOT_ATTRS}
+            snapshot.update({
+                'data_path': str(server.data_path),
+                'panel_dir': self._panel_dir,
+                'default_benchmark': server._default_benchmark,
+                'loaded_data_types': sorted(server._loaded_data_types),
+                'columns': dict(server._columns),
+                'date_range': server._date_range,
+                'keys': {
+                    'stock': server._stock_keys_cache,
+                    'stock_1m': server._stock_1m_keys_cache,
+                    'valuation': server._valuation_keys_cache,
+                    'fundamentals': server._fundamentals_keys_cache,
+                    'exrights': server._exrights_keys_cache,
+                },
+            })
+            reply, body = encode_snapshot(snapshot)
+        return {'ok': True, **reply}, body
+
+    def _frames(self, header: dict) -> tuple[dict, bytes]:
+        attr = _REMOTE_DATASETS.get(header.get('dataset'))
+        if attr is None:
+            return {'ok': False, 'error': f"unknown dataset: {header.get('dataset')}"}, b''
+        with self._lock:
+            frames = get_frames(getattr(self.server, attr), header.get('symbols', []))
+        symbols, sizes, payload = encode_frames(frames)
+        return {'ok': True, 'symbols': symbols, 'sizes': sizes}, payload
+
+    def serve_forever(self) -> None:
+        """绑定套接字并持续服务，直到收到 shutdown 请求或进程被中断"""
+        service = self
+
+        class _Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        header, payload = recv_message(self.request)
+                    except (ConnectionError, OSError):
+                        return
+                    try:
+                        reply, body = service.handle(header, payload)
+                    except Exception as e:
+                        reply, body = {'ok': False, 'error': f'{type(e).__name__}: {e}'}, b''
+                    send_message(self.request, reply, body)
+
+        if self.socket_path.exists():
+            if _ping(self.socket_path) is not None:
+                raise RuntimeError(f'a data service is already listening on {self.socket_path}')
+            self.socket_path.unlink()
+        if self.socket_path == default_socket_path() and SERVICE_SOCKET_ENV not in os.environ:
+            _ensure_private_dir(self.socket_path.parent)
+        else:
+            self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        self._socket_server = _UnixServer(str(self.socket_path), _Handler)
+        os.chmod(self.socket_path, 0o600)
+        print(t("data.service_listening", path=self.socket_path, data_path=self.server.data_path))
+        try:
+            self._socket_server.serve_forever()
+        finally:
+            self._socket_server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+
+    def shutdown(self) -> None:
+        """停止 serve_forever（可在其他线程调用）"""
+        if self._socket_server is not None:
+            self._socket_server.shutdown()
+
+
+def _ping(socket_path: Path) -> Optional[dict]:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1.0)
+            sock.connect(str(socket_path))
+            send_message(sock, {'op': 'ping'})
+            return recv_message(sock)[0]
+    except (OSError, ConnectionError, ValueError):
+        return None
+
+
+# ==================== 客户端 ====================
+
+class RemoteDataDict:
+    """按代码向数据服务请求的只读字典，接口与按需加载的 LazyDataDict 兼容"""
+
+    def __init__(self, client: DataServiceClient, data_type: str, all_keys_list, max_cache_size=6000):
+        self.data_type = data_type
+        self._client = client
+        self._all_keys = list(all_keys_list or [])
+        self._all_keys_set = set(self._all_keys)
+        self._cache = SizedLRUCache(f'RemoteDataDict.{data_type}', maxsize=max_cache_size)
+
+    def __contains__(self, key):
+        return key in self._all_keys_set
+
+    def __getitem__(self, key):
+        if key in self._cache:
+            return self._cache[key]
+        if key not in self._all_keys_set:
+            raise KeyError(f'Stock {key} not found')
+        frames = self._client.fetch(self.data_type, [key])
+        if key not in frames:
+            raise KeyError(f'Stock {key} not found')
+        self._cache[key] = frames[key]
+        return frames[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def get_many(self, keys):
+        """批量取多个 key，缓存未命中的 key 合并为一次请求"""
+        keys = [key for key in dict.fromkeys(keys) if key in self._all_keys_set]
+        misses = [key for key in keys if key not in self._cache]
+        loaded = self._client.fetch(self.data_type, misses) if misses else {}
+        self._cache.update(loaded)
+        result = {}
+        for key in keys:
+            if key in loaded:
+                result[key] = loaded[key]
+            elif key in self._cache:
+                result[key] = self._cache[key]
+        return result
+
+    def get_arrays(self, key):
+        """远程数据不提供列式视图"""
+        return None
+
+    def keys(self):
+        return self._all_keys
+
+    def items(self):
+        for key in self._all_keys:
+            yield key, self[key]
+
+    def clear_cache(self):
+        self._cache.clear()
+
+
+class DataServiceClient:
+    """数据服务客户端，属性与 DataServer 一致，可直接作为 DataContext 的 data_server
+
+    价格、估值和复权因子挂载服务发布的共享面板；财务、除权经 RemoteDataDict 按需请求；
+    分钟线与分红在本进程按需读取（窗口随回测推进，不适合集中持有）。
+    """
+
+    def __init__(self, socket_path=None, timeout: Optional[float] = None):
+        """
+        Raises:
+            PermissionError: 监听该套接字的进程不属于当前用户
+        """
+        self.socket_path = Path(socket_path) if socket_path else default_socket_path()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        try:
+            self._sock.connect(str(self.socket_path))
+            # 只信任当前用户启动的服务：其他用户抢先绑定的套接字不能向本进程下发数据
+            if _peer_uid(self._sock, self.socket_path) != os.getuid():
+                raise PermissionError(f'data service socket {self.socket_path} is owned by another user')
+        except OSError:
+            self._sock.close()
+            raise
+        self._lock = threading.Lock()
+        self.data_version = 0
+        self._data_contexts = []
+
+    def request(self, header: dict, payload: bytes = b'') -> tuple[dict, bytes]:
+        """发送请求并等待应答
+
+        Raises:
+            RuntimeError: 服务端返回错误
+        """
+        with self._lock:
+            send_message(self._sock, header, payload)
+            reply, body = recv_message(self._sock)
+        if not reply.get('ok'):
+            raise RuntimeError(reply.get('error', 'data service request failed'))
+        return reply, body
+
+    def fetch(self, dataset: str, symbols: list[str]) -> dict[str, pd.DataFrame]:
+        """按代码取数据集中的 DataFrame，不存在的代码被忽略"""
+        reply, body = self.request({'op': 'frames', 'dataset': dataset, 'symbols': list(symbols)})
+        return decode_frames(reply['symbols'], reply['sizes'], body)
+
+    def attach(self, data_path=None, market='CN', required_data=None, frequency='1d',
+               columns=None, date_range=None) -> bool:
+        """请求服务补齐所需数据并挂载其共享面板
+
+        Returns:
+            bool: 是否挂载成功（源数据已变更导致面板失效时为 False）
+        """
+        from ..ptrade.adj_cache import DividendLazyLoader
+        from ..ptrade.columnar_store import ColumnarFrameMap
+        from ..ptrade.config_manager import config
+        from ..ptrade.object import LazyDataDict
+        from .shared_panel import attach_shared_panel
+
+        reply, body = self.request({
+            'op': 'attach',
+            'data_path': str(data_path) if data_path else None,
+            'market': market,
+            'required_data': sorted(required_data) if required_data is not None else None,
+            'frequency': frequency,
+            'columns': {name: sorted(cols) for name, cols in (columns or {}).items() if cols is not None},
+            'date_range': _encode_date_range(date_range),
+        })
+        snapshot = decode_snapshot(reply, body)
+        panel = attach_shared_panel(snapshot['data_path'], snapshot['panel_dir'])
+        if panel is None:
+            return False
+
+        for name in _SNAPSHOT_ATTRS:
+            setattr(self, name, snapshot[name])
+        self._default_benchmark = snapshot['default_benchmark']
+        self._loaded_data_types = set(snapshot['loaded_data_types'])
+        self._columns = snapshot['columns']
+        self._date_range = snapshot['date_range']
+        self._frequency = frequency
+        keys = snapshot['keys']
+        self._stock_1m_keys_cache = keys['stock_1m']
+
+        def dataset(name, data_type, max_cache_size):
+            if name in panel:
+                return LazyDataDict.from_columnar(self.data_path, data_type, panel.get(name),
+                                                  max_cache_size=config.cache.lazy_dict_cache_size)
+            return RemoteDataDict(self, data_type, keys[data_type] or [], max_cache_size)
+
+        self.stock_data_dict = dataset('price', 'stock', config.cache.lazy_dict_cache_size)
+        self.valuation_dict = dataset('valuation', 'valuation', config.cache.lazy_dict_cache_size)
+        self.fundamentals_dict = RemoteDataDict(self, 'fundamentals', keys['fundamentals'],
+                                                config.cache.fundamentals_cache_size)
+        self.exrights_dict = RemoteDataDict(self, 'exrights', keys['exrights'], config.cache.exrights_cache_size)
+        self.adj_pre_cache = ColumnarFrameMap(panel.get('adj_pre')) if 'adj_pre' in panel else None
+        self.adj_post_cache = ColumnarFrameMap(panel.get('adj_post')) if 'adj_post' in panel else None
+        self.dividend_cache = DividendLazyLoader(self.data_path)
+        self.stock_data_dict_1m = self._minute_data_dict() if frequency == '1m' and keys['stock_1m'] else None
+        self._shared_panel = panel
+        for data_context in self._data_contexts:
+            data_context._sync_from_data_server(self)
+        return True
+
+    def _minute_data_dict(self):
+        """分钟线在本进程按需读取：默认按月滑动窗口，minute_window_days=0 时逐代码按需加载"""
+        from ..ptrade.config_manager import config
+        from ..ptrade.minute_window import MinuteWindowDict
+        from ..ptrade.object import LazyDataDict
+
+        if config.cache.minute_window_days <= 0:
+            return LazyDataDict(self.data_path, 'stock_1m', self._stock_1m_keys_cache, preload=False,
+                                columns=self._columns.get('price'), date_range=self._date_range)
+        return MinuteWindowDict(
+            self.data_path, self._stock_1m_keys_cache,
+            columns=self._columns.get('price'), date_range=self._date_range,
+            trade_days=self.trade_days, lookback_days=config.cache.minute_window_days
+        )
+
+    def register_data_context(self, data_context):
+        """与 DataServer 相同：登记 DataContext 并同步数据对象"""
+        self._data_contexts.append(data_context)
+        data_context._sync_from_data_server(self)
+
+    def data_context(self):
+        """构建使用本客户端数据的 DataContext"""
+        from ..ptrade.data_context import DataContext
+
+        return DataContext(
+            stock_data_dict=self.stock_data_dict,
+            valuation_dict=self.valuation_dict,
+            fundamentals_dict=self.fundamentals_dict,
+            exrights_dict=self.exrights_dict,
+            benchmark_data=self.benchmark_data,
+            stock_metadata=self.stock_metadata,
+            index_constituents=self.index_constituents,
+            stock_status_history=self.stock_status_history,
+            adj_pre_cache=self.adj_pre_cache,
+            adj_post_cache=self.adj_post_cache,
+            dividend_cache=self.dividend_cache,
+            trade_days=self.trade_days,
+            stock_data_dict_1m=self.stock_data_dict_1m,
+            data_server=self,
+            corporate_action_calendar=self.corporate_action_calendar,
+        )
+
+    def get_benchmark_data(self, benchmark_code=None) -> pd.DataFrame:
+        """与 DataServer.get_benchmark_data 相同
+
+        Raises:
+            KeyError: 基准代码不存在于 benchmark_data 和 stock_data_dict 中
+        """
+        if benchmark_code is None:
+            benchmark_code = self._default_benchmark
+        if self.benchmark_data and benchmark_code in self.benchmark_data:
+            return self.benchmark_data[benchmark_code]
+        if self.stock_data_dict and benchmark_code in self.stock_data_dict:
+            if self.benchmark_data is None:
+                self.benchmark_data = {}
+            self.benchmark_data[benchmark_code] = self.stock_data_dict[benchmark_code]
+            return self.benchmark_data[benchmark_code]
+        raise KeyError(f"基准 {benchmark_code} 不存在。")
+
+    def close(self) -> None:
+        self._sock.close()
+
+
+def connect_data_service(data_path=None, market='CN', required_data=None, frequency='1d',
+                         columns=None, date_range=None, socket_path=None) -> Optional[DataServiceClient]:
+    """连接正在运行的数据服务并挂载所需数据
+
+    Returns:
+        DataServiceClient；平台不支持 Unix 域套接字、服务未运行、数据目录不一致或面板失效时返回 None
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    path = Path(socket_path) if socket_path else default_socket_path()
+    if not path.exists():
+        return None
+    try:
+        client = DataServiceClient(path)
+    except PermissionError as e:
+        print(t("data.service_unavailable", path=path, error=e))
+        return None
+    except OSError:
+        return None
+    try:
+        attached = client.attach(data_path, market, required_data, frequency, columns, date_range)
+    except (OSError, ConnectionError, RuntimeError) as e:
+        print(t("data.service_unavailable", path=path, error=e))
+        client.close()
+        return None
+    if not attached:
+        client.close()
+        return None
+    print(t("data.service_attached", path=path))
+    return client
@@ -0,0 +1,174 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (c) 2025 Kay
+#
+# This file is part of SimTradeLab, dual-licensed under AGPL-3.0 and a
+# commercial license. See LICENSE-COMMERCIAL.md or contact kayou@duck.com
+#
+"""
+共享行情面板 - 跨进程零拷贝复用已加载的数据
+
+DataServer 将价格、估值和复权因子的列式数组写成 .npy 目录；
+其他进程（包括 joblib/loky worker）以只读内存映射方式挂载，
+不再逐文件读取和解码，多个进程共享同一份页缓存，内存不随进程数增长。
+
+默认写在 {data_path}/shared_panel，可用环境变量 SIMTRADELAB_SHARED_PANEL_PATH
+指向 /dev/shm 等内存文件系统。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Optional
+
+import pandas as pd
+
+from ..ptrade import storage
+from ..ptrade.columnar_store import ColumnarStore
+
+SHARED_PANEL_ENV = 'SIMTRADELAB_SHARED_PANEL_PATH'
+_MANIFEST_FILE = 'panel.json'
+_MANIFEST_VERSION = 2
+
+# 面板内容依赖的源数据；任一 mtime 变化即视为过期
+_SOURCE_NAMES = (
+    'stocks',
+    'valuation',
+    storage.CONSOLIDATED_DIR,
+    'ptrade_adj_pre.parquet',
+    'ptrade_adj_post.parquet',
+)
+
+
+def shared_panel_dir(data_path: str | Path) -> Path:
+    """共享面板目录"""
+    env = os.environ.get(SHARED_PANEL_ENV)
+    if env:
+        return Path(env) / Path(data_path).name
+    return Path(data_path) / 'shared_panel'
+
+
+def _source_stamps(data_path: str | Path) -> dict[str, int]:
+    return {name: storage.source_mtime_ns(data_path, name) for name in _SOURCE_NAMES}
+
+
+def _as_store(data: Any) -> Optional[ColumnarStore]:
+    """从 LazyDataDict / 复权因子字典 / 已挂载映射中取得列式存储
+
+    Raises:
+        ValueError: 按需加载的 LazyDataDict 只缓存了部分代码，不能作为完整数据发布
+    """
+    if data is None:
+        return None
+    store = getattr(data, '_columnar', None) or getattr(data, 'store', None)
+    if isinstance(store, ColumnarStore):
+        return store
+    if not getattr(data, '_preload', True):
+        if not data.keys():
+            return None
+        raise ValueError(f"{data.data_type} 数据为按需加载模式，只缓存了部分代码，不能发布为共享面板")
+    frames = getattr(data, '_cache', data)
+    if not frames or not hasattr(frames, 'items'):
+        return None
+    return ColumnarStore.from_frames(dict(frames.items()))
+
+
+class SharedPanel:
+    """已挂载的共享面板：{数据集名: ColumnarStore}
+
+    columns / date_ranges 记录发布时各数据集的列裁剪范围和日期窗口（缺省表示全部）。
+    """
+
+    def __init__(self, directory: Path, stores: dict[str, ColumnarStore],
+                 columns: Optional[dict[str, Optional[frozenset[str]]]] = None,
+                 date_ranges: Optional[dict[str, tuple]] = None):
+        self.directory = directory
+        self.stores = stores
+        self.columns = columns or {}
+        self.date_ranges = date_ranges or {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.stores
+
+    def get(self, name: str) -> Optional[ColumnarStore]:
+        return self.stores.get(name)
+
+
+def publish_shared_panel(server: Any, directory: str | Path | None = None) -> Path:
+    """将 DataServer 已加载的数据写为共享面板
+
+    Args:
+        server: DataServer 实例
+        directory: 目标目录，默认 shared_panel_dir(server.data_path)
+
+    Returns:
+        面板目录
+    """
+    directory = Path(directory) if directory else shared_panel_dir(server.data_path)
+    datasets = {
+        'price': _as_store(server.stock_data_dict),
+        'valuation': _as_store(server.valuation_dict if getattr(server.valuation_dict, '_preload', True) else None),
+        'adj_pre': _as_store(server.adj_pre_cache),
+        'adj_post': _as_store(server.adj_post_cache),
+    }
+    datasets = {name: store for name, store in datasets.items() if store is not None}
+
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = directory.with_name(f'{directory.name}.tmp-{os.getpid()}')
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir()
+    for name, store in datasets.items():
+        store.save(tmp_dir / name)
+    projected = getattr(server, '_columns', None) or {}
+    date_range = getattr(server, '_date_range', None)
+    manifest = {
+        'version': _MANIFEST_VERSION,
+        'datasets': sorted(datasets),
+        'sources': _source_stamps(server.data_path),
+        'columns': {
+            name: sorted(projected[name]) for name in datasets if projected.get(name) is not None
+        },
+        'date_ranges': {
+            'price': [None if bound is None else str(bound) for bound in date_range]
+        } if date_range is not None and 'price' in datasets else {},
+    }
+    with open(tmp_dir / _MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+
+    # 已挂载的进程持有旧文件的映射，替换目录不会影响它们
+    old_dir = directory.with_name(f'{directory.name}.old-{os.getpid()}')
+    if directory.exists():
+        directory.rename(old_dir)
+    tmp_dir.rename(directory)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return directory
+
+
+def attach_shared_panel(data_path: str | Path, directory: str | Path | None = None) -> Optional[SharedPanel]:
+    """以只读内存映射方式挂载共享面板
+
+    Returns:
+        SharedPanel；面板不存在、版本不符或源数据已变更时返回 None
+    """
+    directory = Path(directory) if directory else shared_panel_dir(data_path)
+    manifest_path = directory / _MANIFEST_FILE
+    if not manifest_path.exists():
+        return None
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != _MANIFEST_VERSION:
+            return None
+        if manifest.get('sources') != _source_stamps(data_path):
+            return None
+        stores = {name: ColumnarStore.open(directory / name) for name in manifest['datasets']}
+        columns = {name: frozenset(cols) for name, cols in manifest.get('columns', {}).items()}
+        date_ranges = {
+            name: tuple(None if bound is None else pd.Timestamp(bound) for bound in bounds)
+            for name, bounds in manifest.get('date_ranges', {}).items()
+        }
+    except (OSError, ValueError, KeyError):
+        return None
+    return SharedPanel(directory, stores, columns, date_ranges)
@@ -0,0 +1,55 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (c) 2025 Kay
+#
+# This file is part of SimTradeLab, dual-licensed under AGPL-3.0 and a
+# commercial license. See LICENSE-COMMERCIAL.md or contact kayou@duck.com
+#
+"""
+共享 I/O 线程池
+
+pyarrow 解码 Parquet 时释放 GIL，线程池即可并行读取，结果直接落在本进程内存，
+无需像进程池那样序列化回传。线程池在进程内常驻，跨数据集、跨回测复用。
+"""
+
+from __future__ import annotations
+
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from .performance_config import get_performance_config
+
+_lock = threading.Lock()
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_size = 0
+
+
+def get_io_pool(max_workers: Optional[int] = None) -> ThreadPoolExecutor:
+    """获取常驻 I/O 线程池，worker 数量变化时重建
+
+    Args:
+        max_workers: 线程数，None 表示使用 PerformanceConfig.num_workers
+    """
+    global _pool, _pool_size
+    size = max_workers or get_performance_config().num_workers
+    with _lock:
+        if _pool is None or _pool_size != size:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ThreadPoolExecutor(max_workers=size, thread_name_prefix='simtradelab-io')
+            _pool_size = size
+        return _pool
+
+
+def shutdown_io_pool() -> None:
+    """关闭线程池（进程退出时自动调用）"""
+    global _pool, _pool_size
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        _pool = None
+        _pool_size = 0
+
+
+atexit.register(shutdown_io_pool)
@@ -15,6 +15,8 @@
 import os
 from multiprocessing import cpu_count
 
+LOADER_BACKENDS = ('thread', 'process')
+
 
 class PerformanceConfig:
     """性能优化配置单例"""
@@ -34,6 +36,8 @@ class PerformanceConfig:
         self.enable_multiprocessing = os.getenv('PTRADE_MULTIPROCESSING', 'true').lower() == 'true'
         self.num_workers = max(1, cpu_count() - 1)
         self.min_batch_size = 100  # 少于此数量不启用多进程
+        # 批量加载后端：thread 线程池（默认，无序列化开销）/ process loky进程池
+        self.loader_backend = os.getenv('PTRADE_LOADER_BACKEND', 'thread').lower()
 
         self._initialized = True
 
@@ -45,6 +49,16 @@ class PerformanceConfig:
         """
         self.enable_multiprocessing = enabled
 
+    def set_loader_backend(self, backend: str):
+        """设置批量加载后端
+
+        Args:
+            backend: 'thread' 线程池或 'process' 进程池
+        """
+        if backend not in LOADER_BACKENDS:
+            raise ValueError(f"加载后端必须是 {LOADER_BACKENDS} 之一")
+        self.loader_backend = backend
+
     def set_num_workers(self, num: int):
         """设置worker数量
 
@@ -12,9 +12,11 @@ from simtradelab.service.data_server import DataServer
 def reset_data_server_singleton():
     DataServer._instance = None
     DataServer._initialized = False
+    DataServer._datasets.clear()
     yield
     DataServer._instance = None
     DataServer._initialized = False
+    DataServer._datasets.clear()
 
 
 def test_incremental_price_and_exrights_loading_initializes_real_caches(tmp_path):
@@ -187,6 +189,39 @@ def test_live_api_cache_invalidates_when_data_server_replaces_data_path(
     assert updated is not first
 
 
+def test_switching_back_to_resident_dataset_skips_reload(tmp_path, monkeypatch):
+    from simtradelab.ptrade.config_manager import config
+
+    date = pd.Timestamp("2024-01-02")
+    paths = []
+    for i, close in enumerate([10.0, 20.0, 30.0]):
+        market_path = tmp_path / f"data{i}" / "cn"
+        (market_path / "stocks").mkdir(parents=True)
+        pd.DataFrame(
+            {"date": [date], "open": [close], "high": [close], "low": [close], "close": [close], "volume": [1000]}
+        ).to_parquet(market_path / "stocks" / "000001.SZ.parquet", index=False)
+        paths.append(str(tmp_path / f"data{i}"))
+
+    server = DataServer(required_data={"price"}, data_path=paths[0])
+    first_dict = server.stock_data_dict
+    DataServer(required_data={"price"}, data_path=paths[1])
+    assert list(DataServer._datasets) == [(first_dict.data_dir, "CN")]
+
+    loads = []
+    monkeypatch.setattr(DataServer, "_load_data", lambda self, *args: loads.append(args))
+    assert DataServer(required_data={"price"}, data_path=paths[0]) is server
+    assert not loads
+    assert server.stock_data_dict is first_dict
+    assert server.stock_data_dict["000001.SZ"].iloc[0]["close"] == 10.0
+    monkeypatch.undo()
+
+    # 只常驻一个数据集：切换时淘汰上一个
+    monkeypatch.setattr(config, "cache", config.cache.model_copy(update={"resident_datasets": 1}))
+    DataServer(required_data={"price"}, data_path=paths[2])
+    assert not DataServer._datasets
+    assert server.stock_data_dict["000001.SZ"].iloc[0]["close"] == 30.0
+
+
 def test_live_api_data_caches_invalidate_when_data_server_replaces_data_path(
     tmp_path, simple_log
 ):
@@ -282,7 +317,7 @@ def test_live_api_data_caches_invalidate_when_data_server_replaces_data_path(
         required_data={"price", "fundamentals"}, data_path=str(first_path)
     )
     assert same_server is server
-    assert len(api._stock_status_cache) == 1
+    assert api._stock_status is not None
     assert len(api._fundamentals_cache) == 1
 
     replaced = DataServer(
@@ -298,3 +333,56 @@ def test_live_api_data_caches_invalidate_when_data_server_replaces_data_path(
     assert replaced is server
     assert api.get_stock_status(symbol, query_type="ST") == {symbol: False}
     assert updated_fundamentals.loc[symbol, "roe"] == pytest.approx(0.22)
+
+
+def test_projected_price_is_widened_when_later_run_needs_more_columns(tmp_path):
+    market_path = tmp_path / "cn"
+    (market_path / "stocks").mkdir(parents=True)
+    pd.DataFrame(
+        {
+            "date": pd.to_datetime(["2024-01-02", "2024-01-03"]),
+            "open": [10.0, 10.5],
+            "close": [10.2, 10.8],
+            "volume": [1000, 1200],
+            "high_limit": [11.0, 11.2],
+        }
+    ).to_parquet(market_path / "stocks" / "000001.SZ.parquet", index=False)
+
+    server = DataServer(
+        required_data={"price"}, data_path=str(tmp_path), columns={"price": frozenset({"close", "volume"})}
+    )
+    assert list(server.stock_data_dict["000001.SZ"].columns) == ["close", "volume"]
+    version = server.data_version
+
+    DataServer(required_data={"price"}, data_path=str(tmp_path), columns={"price": frozenset({"close"})})
+    assert server.data_version == version
+
+    DataServer(required_data={"price"}, data_path=str(tmp_path), columns={"price": frozenset({"high_limit"})})
+    assert list(server.stock_data_dict["000001.SZ"].columns) == ["close", "volume", "high_limit"]
+    assert server.data_version > version
+
+    DataServer(required_data={"price"}, data_path=str(tmp_path))
+    assert "open" in server.stock_data_dict["000001.SZ"].columns
+
+
+def test_price_date_window_is_widened_for_earlier_backtest(tmp_path):
+    market_path = tmp_path / "cn"
+    (market_path / "stocks").mkdir(parents=True)
+    dates = pd.date_range("2024-01-01", periods=60, freq="D")
+    pd.DataFrame(
+        {"date": dates, "close": range(60), "volume": [100] * 60}
+    ).to_parquet(market_path / "stocks" / "000001.SZ.parquet", index=False)
+
+    late = (pd.Timestamp("2024-02-01"), pd.Timestamp("2024-02-11"))
+    server = DataServer(required_data={"price"}, data_path=str(tmp_path), date_range=late)
+    frame = server.stock_data_dict["000001.SZ"]
+    assert frame.index.min() == late[0] and frame.index.max() == pd.Timestamp("2024-02-10")
+
+    DataServer(required_data={"price"}, data_path=str(tmp_path), date_range=(late[0], pd.Timestamp("2024-02-05")))
+    assert server.stock_data_dict["000001.SZ"].index.min() == late[0]
+
+    early = (pd.Timestamp("2024-01-10"), pd.Timestamp("2024-01-20"))
+    DataServer(required_data={"price"}, data_path=str(tmp_path), date_range=early)
+    frame = server.stock_data_dict["000001.SZ"]
+    assert frame.index.min() == early[0] and frame.index.max() == pd.Timestamp("2024-02-10")
+    assert server._date_range == (early[0], late[1])
@@ -4,10 +4,14 @@ import tempfile
 import os
 import ast
 
+import pandas as pd
+
 from simtradelab.ptrade.strategy_data_analyzer import (
     StrategyDataAnalyzer,
     analyze_strategy_data_requirements,
     DataDependencies,
+    history_window,
+    required_columns,
 )
 
 
@@ -161,3 +165,71 @@ class TestStrategyDataAnalyzerDirect:
         deps = analyzer.analyze()
         assert deps.needs_fundamentals is True
         assert deps.fundamental_tables == set()
+
+
+class TestRequiredColumns:
+    """字段参数解析与列裁剪"""
+
+    def test_literal_fields_are_collected(self):
+        deps = _analyze_code(
+            "h = get_history(5, '1d', ['close', 'preclose'], stocks)\n"
+            "p = get_price(stocks, fields='high_limit')\n"
+            "f = get_fundamentals(stocks, 'profit_ability', ['roe'])\n"
+            "v = get_fundamentals(stocks, 'valuation', fields=['pe_ttm'])\n"
+        )
+        columns = required_columns(deps)
+
+        assert deps.price_fields == {"close", "preclose", "high_limit"}
+        assert {"open", "close", "volume", "preclose", "high_limit"} <= columns["price"]
+        assert columns["fundamentals"] == {"date", "publ_date", "end_date", "roe"}
+        assert {"pe_ttm", "total_shares", "date"} <= columns["valuation"]
+
+    def test_omitted_fields_use_table_defaults(self):
+        deps = _analyze_code("f = get_fundamentals(stocks, 'growth_ability', date='2024-01-01')")
+
+        assert "net_profit_grow_rate" in required_columns(deps)["fundamentals"]
+
+    def test_dynamic_fields_disable_projection(self):
+        deps = _analyze_code(
+            "h = get_history(5, '1d', FIELDS, stocks)\n"
+            "f = get_fundamentals(stocks, table_name, ['roe'])\n"
+        )
+        columns = required_columns(deps)
+
+        assert columns["price"] is None
+        assert columns["fundamentals"] == {"date", "publ_date", "end_date", "roe"}
+        assert columns["valuation"] == {"date", "trading_day", "total_shares", "a_floats", "roe"}
+
+    def test_analysis_failure_loads_all_columns(self):
+        deps = _analyze_code("def broken(:\n")
+
+        assert set(required_columns(deps).values()) == {None}
+
+
+class TestHistoryWindow:
+    """回看范围解析与日期窗口"""
+
+    def test_lookback_covers_longest_history_request(self):
+        deps = _analyze_code(
+            "h = get_history(20, '1d', 'close', stocks)\n"
+            "w = get_history(10, frequency='1w')\n"
+            "m = data[stock].mavg(60)\n"
+        )
+        start, stop = history_window(deps, "2024-03-01", "2024-05-31")
+
+        assert deps.history_lookback == 60
+        assert start <= pd.Timestamp("2024-03-01") - pd.Timedelta(days=90)
+        assert stop == pd.Timestamp("2024-06-01")
+
+    def test_literal_get_price_dates_extend_window(self):
+        deps = _analyze_code("p = get_price(stocks, start_date='2015-01-05', end_date='2015-02-01')")
+        start, _ = history_window(deps, "2024-03-01", "2024-05-31")
+
+        assert deps.earliest_date == "2015-01-05"
+        assert start < pd.Timestamp("2015-01-05")
+
+    def test_dynamic_count_loads_full_history(self):
+        deps = _analyze_code("h = get_history(g.window, '1d', 'close', stocks)")
+
+        assert deps.history_lookback is None
+        assert history_window(deps, "2024-03-01", "2024-05-31") is None
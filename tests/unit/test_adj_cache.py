@@ -0,0 +1,156 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from simtradelab.ptrade import adj_cache
+from simtradelab.ptrade.api import _adj_alignment, _adj_window
+from simtradelab.ptrade.corporate_actions import CorporateActions
+from simtradelab.ptrade.object import LazyDataDict
+
+SYMBOLS = ("000001.SZ", "600000.SH")
+DATES = pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04"])
+
+
+def _write_exrights(market_dir, symbol, forward_a):
+    path = market_dir / "exrights" / f"{symbol}.parquet"
+    pd.DataFrame(
+        {
+            "date": [DATES[1]],
+            "dividend": [0.1],
+            "exer_forward_a": [forward_a],
+            "exer_forward_b": [0.05],
+            "allotted_ps": [0.0],
+            "rationed_ps": [0.0],
+            "rationed_px": [0.0],
+            "bonus_ps": [0.1],
+        }
+    ).to_parquet(path, index=False)
+    # 保证重写后 mtime 一定变化
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def market_dir(tmp_path):
+    (tmp_path / "stocks").mkdir()
+    (tmp_path / "exrights").mkdir()
+    for symbol in SYMBOLS:
+        pd.DataFrame({"date": DATES, "close": [10.0, 10.5, 11.0]}).to_parquet(
+            tmp_path / "stocks" / f"{symbol}.parquet", index=False
+        )
+        _write_exrights(tmp_path, symbol, 0.9)
+    return tmp_path
+
+
+def _context(market_dir):
+    return SimpleNamespace(stock_data_dict=LazyDataDict(str(market_dir), "stock", list(SYMBOLS)))
+
+
+def _record_calls(monkeypatch):
+    calls = []
+    original = CorporateActions.factors
+    monkeypatch.setattr(
+        CorporateActions, "factors", lambda self, kind, stock, df: calls.append(stock) or original(self, kind, stock, df)
+    )
+    return calls
+
+
+def test_only_symbols_with_changed_sources_are_recomputed(market_dir, monkeypatch):
+    cold = adj_cache.load_adj_pre_cache(_context(market_dir))
+    assert cold["000001.SZ"]["adj_a"].tolist() == [0.9, 1.0, 1.0]
+
+    calls = _record_calls(monkeypatch)
+    warm = adj_cache.load_adj_pre_cache(_context(market_dir))
+    assert calls == []
+    pd.testing.assert_frame_equal(warm["600000.SH"], cold["600000.SH"])
+
+    _write_exrights(market_dir, "600000.SH", 0.8)
+    patched = adj_cache.load_adj_pre_cache(_context(market_dir))
+    assert calls == ["600000.SH"]
+    assert patched["600000.SH"]["adj_a"].tolist() == [0.8, 1.0, 1.0]
+    pd.testing.assert_frame_equal(patched["000001.SZ"], cold["000001.SZ"])
+
+
+def test_removed_symbols_are_dropped_and_full_rebuild_recomputes_all(market_dir, monkeypatch):
+    adj_cache.load_adj_post_cache(_context(market_dir))
+    context = SimpleNamespace(stock_data_dict=LazyDataDict(str(market_dir), "stock", ["000001.SZ"]))
+
+    assert list(adj_cache.load_adj_post_cache(context)) == ["000001.SZ"]
+
+    calls = _record_calls(monkeypatch)
+    rebuilt = adj_cache.create_adj_post_cache(_context(market_dir))
+    assert sorted(calls) == list(SYMBOLS)
+    assert rebuilt["000001.SZ"]["adj_b"].tolist() == [0.0, 0.1, 0.1]
+
+
+def test_legacy_cache_without_stamps_is_adopted(market_dir, monkeypatch):
+    cache_path = market_dir / "ptrade_adj_pre.parquet"
+    pd.DataFrame(
+        {"date": DATES, "adj_a": [0.5, 1.0, 1.0], "adj_b": [0.0, 0.0, 0.0], "symbol": "000001.SZ"}
+    ).to_parquet(cache_path, index=False)
+    calls = _record_calls(monkeypatch)
+
+    cache = adj_cache.load_adj_pre_cache(_context(market_dir))
+
+    assert calls == ["600000.SH"]
+    assert cache["000001.SZ"]["adj_a"].tolist() == [0.5, 1.0, 1.0]
+    assert adj_cache._STAMPS_KEY in pq.read_schema(cache_path).metadata
+
+
+def test_corrupt_cache_is_rebuilt(market_dir):
+    (market_dir / "ptrade_adj_pre.parquet").write_bytes(b"not parquet")
+
+    cache = adj_cache.load_adj_pre_cache(_context(market_dir))
+
+    assert sorted(cache) == list(SYMBOLS)
+
+
+def test_cache_is_loaded_as_flat_arrays_with_symbol_offsets(market_dir):
+    adj_cache.load_adj_pre_cache(_context(market_dir))
+
+    cache = adj_cache._parquet_to_adj_cache(market_dir / "ptrade_adj_pre.parquet")
+
+    buffer = cache.store._buffers["adj_a"]
+    assert len(buffer) == len(SYMBOLS) * len(DATES)
+    for symbol in SYMBOLS:
+        arrays = cache.get_arrays(symbol)
+        assert np.shares_memory(arrays["adj_a"], buffer)
+        assert arrays["adj_a"].tolist() == [0.9, 1.0, 1.0]
+    assert cache["600000.SH"].index.tolist() == list(DATES)
+
+
+def test_unsorted_long_table_is_grouped_by_symbol_and_date(tmp_path):
+    cache_path = tmp_path / "ptrade_adj_post.parquet"
+    pd.DataFrame(
+        {
+            "date": [DATES[1], DATES[0], DATES[0], DATES[1]],
+            "adj_a": [2.0, 1.0, 3.0, 4.0],
+            "adj_b": [0.0, 0.0, 0.0, 0.0],
+            "symbol": ["000001.SZ", "000001.SZ", "600000.SH", "600000.SH"],
+        }
+    ).iloc[[0, 2, 1, 3]].to_parquet(cache_path, index=False)
+
+    cache = adj_cache._parquet_to_adj_cache(cache_path)
+
+    assert cache["000001.SZ"]["adj_a"].tolist() == [1.0, 2.0]
+    assert cache["600000.SH"]["adj_a"].tolist() == [3.0, 4.0]
+
+
+@pytest.mark.parametrize(
+    "source_dates",
+    [DATES[1:], pd.to_datetime(["2024-01-01", "2024-01-03", "2024-01-05"])],
+    ids=["contiguous", "gaps"],
+)
+def test_adj_alignment_matches_reindex_ffill(source_dates):
+    factors = pd.DataFrame({"adj_a": [0.5, 0.8, 1.0], "adj_b": [0.1, 0.2, 0.0]}, index=DATES)
+    expected = factors.reindex(source_dates).ffill()
+
+    alignment = _adj_alignment(factors.index.asi8, pd.DatetimeIndex(source_dates).asi8)
+    adj_a, adj_b = _adj_window(factors, alignment, 0, len(source_dates))
+
+    np.testing.assert_array_equal(adj_a, expected["adj_a"].to_numpy())
+    np.testing.assert_array_equal(adj_b, expected["adj_b"].to_numpy())
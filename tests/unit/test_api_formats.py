@@ -7,6 +7,7 @@ API高级格式测试 - 提升覆盖率到71%
 
 import numpy as np
 import pandas as pd
+import pytest
 
 from simtradelab.ptrade import api as api_module
 from simtradelab.ptrade.api import _compute_hl_adj, _has_typeab, _round2
@@ -42,6 +43,14 @@ class TestPTradeRounding:
         assert api_module._has_typeab(values) is expected_has_typeab
         assert fallback_calls < len(values) // 100
 
+    def test_round2_block_matches_column_by_column(self):
+        values = np.linspace(1.001, 250.999, 3_000, dtype=np.float64).reshape(-1, 3)
+
+        actual = _round2(values)
+
+        for column in range(values.shape[1]):
+            np.testing.assert_array_equal(actual[:, column], _round2(values[:, column]))
+
     def test_compute_hl_adj_bypasses_xx4_range_pollution(self):
         """测试.XX4 high/low range污染时使用float64值"""
         adj_b = np.array([-1.506] * 20)
@@ -165,6 +174,126 @@ class TestAPIAdvancedFormats:
                 # 验证empty属性
                 assert isinstance(result.empty, bool)
 
+    @pytest.mark.parametrize("profile", ["auto", "guosheng", "shanxi"])
+    @pytest.mark.parametrize("fq", [None, "pre", "post", "dypre"])
+    def test_get_history_multi_stock_matches_single_stock(self, ptrade_api, data_context, test_dates, profile, fq):
+        """多股票面板拼装与逐只单股票结果逐位一致（含停牌补齐的股票）"""
+        stocks = ["600000.SH", "000001.SZ", "600519.SH"]
+        fields = ["open", "high", "low", "close", "volume"]
+        stock_data = data_context.stock_data_dict
+        stock_data["000001.SZ"] = stock_data["000001.SZ"].drop(test_dates[[8, 9]])
+        adj = {
+            stock: pd.DataFrame(
+                {"adj_a": np.linspace(0.8, 1.0, len(test_dates)), "adj_b": np.linspace(0.1, 0.0, len(test_dates))},
+                index=test_dates,
+            )
+            for stock in stocks[:2]
+        }
+        data_context.adj_pre_cache = adj
+        data_context.adj_post_cache = adj
+        ptrade_api.broker_profile = profile
+        ptrade_api.context.current_dt = test_dates[12]
+
+        result = ptrade_api.get_history(8, "1d", fields, stocks, fq=fq)
+        single = {stock: ptrade_api.get_history(8, "1d", fields, stock, fq=fq) for stock in stocks}
+
+        for field in fields:
+            for stock in stocks:
+                column = result[(field, stock)] if profile == "shanxi" else result[field][stock]
+                pd.testing.assert_series_equal(column, single[stock][field], check_names=False, check_freq=False)
+
+    @pytest.mark.parametrize("fq", [None, "pre", "post"])
+    def test_get_history_rolling_window_matches_full_rebuild(
+        self, ptrade_api, data_context, context, simple_log, test_dates, monkeypatch, fq
+    ):
+        """逐日调用只补算最新一行，结果与每日完整重建一致（含停牌、整数成交量的股票）"""
+        stocks = ["600000.SH", "000001.SZ", "600519.SH"]
+        fields = ["close", "volume"]
+        stock_data = data_context.stock_data_dict
+        stock_data["000001.SZ"] = stock_data["000001.SZ"].drop(test_dates[[10, 11]])
+        stock_data["600519.SH"]["volume"] = stock_data["600519.SH"]["volume"].astype("int64")
+        adj = {
+            stock: pd.DataFrame(
+                {"adj_a": np.linspace(0.8, 1.0, len(test_dates)), "adj_b": np.linspace(0.1, 0.0, len(test_dates))},
+                index=test_dates,
+            )
+            for stock in stocks
+        }
+        data_context.adj_pre_cache = adj
+        data_context.adj_post_cache = adj
+        rows = []
+        history_values = api_module._history_values
+
+        def recording_values(source, fields, start, end, *args, **kwargs):
+            rows.append(end - start)
+            return history_values(source, fields, start, end, *args, **kwargs)
+
+        monkeypatch.setattr(api_module, "_history_values", recording_values)
+
+        for day in test_dates[8:16]:
+            context.current_dt = day
+            rows.clear()
+            result = ptrade_api.get_history(5, "1d", fields, stocks, fq=fq)
+            expected = api_module.PtradeAPI(data_context, context, simple_log).get_history(5, "1d", fields, stocks, fq=fq)
+            for field in fields:
+                pd.testing.assert_frame_equal(result[field], expected[field])
+
+        # 最后一天三只股票都已连续交易，各只补算一行
+        assert rows[:3] == [1, 1, 1]
+
+    @pytest.mark.parametrize("fq", ["pre", "post", "dypre"])
+    def test_adjusted_prices_are_materialized_once(self, ptrade_api, data_context, test_dates, fq):
+        """复权价按股票物化一次，get_price/get_history/周线结果与按窗口逐次复权一致"""
+        stocks = ["600000.SH", "000001.SZ"]
+        columns = ["open", "high", "low", "close"]
+        adj = {
+            # 600000.SH 因子逐日变化；000001.SZ 因子恒为 1，前复权 high/low 走 float64 取舍
+            "600000.SH": pd.DataFrame(
+                {"adj_a": np.linspace(0.8, 1.0, len(test_dates)), "adj_b": np.linspace(0.1, 0.0, len(test_dates))},
+                index=test_dates,
+            ),
+            "000001.SZ": pd.DataFrame(
+                {"adj_a": [1.0] * len(test_dates), "adj_b": [-1.506] * len(test_dates)}, index=test_dates
+            ),
+        }
+        data_context.adj_pre_cache = adj
+        data_context.adj_post_cache = adj
+        ptrade_api.context.current_dt = test_dates[12]
+
+        def expected(stock, start, end, base_row):
+            raw = data_context.stock_data_dict[stock].iloc[start:end]
+            adj_a = adj[stock]["adj_a"].to_numpy()
+            adj_b = adj[stock]["adj_b"].to_numpy()
+            values = {col: adj_a[start:end] * raw[col].to_numpy() + adj_b[start:end] for col in columns}
+            if fq == "post":
+                return values
+            values = {col: _round2(v) for col, v in values.items()}
+            if fq == "pre" and np.all(adj_a[start:end] == 1.0):
+                values["high"], values["low"] = _compute_hl_adj(
+                    adj_b[start:end], raw["high"].to_numpy(), raw["low"].to_numpy()
+                )
+            if fq == "dypre":
+                values = {col: (v - adj_b[base_row]) / adj_a[base_row] for col, v in values.items()}
+            return values
+
+        weekly = None
+        for _ in range(2):
+            for stock in stocks:
+                price = ptrade_api.get_price(stock, end_date=test_dates[12], count=8, fields=columns, fq=fq)
+                history = ptrade_api.get_history(8, "1d", columns, stock, fq=fq)
+                for col in columns:
+                    np.testing.assert_array_equal(price[col].to_numpy(), expected(stock, 5, 13, 12)[col])
+                    np.testing.assert_array_equal(history[col].to_numpy(), expected(stock, 4, 12, 12)[col])
+            result = ptrade_api.get_price(stocks[0], end_date=test_dates[12], frequency="1w", fields=columns, fq=fq)
+            if weekly is not None:
+                pd.testing.assert_frame_equal(result, weekly)
+            weekly = result
+
+        kind = "post" if fq == "post" else "pre"
+        assert sorted(ptrade_api._adjusted_cache) == [(stock, kind, None) for stock in sorted(stocks)]
+        if fq != "dypre":
+            assert ptrade_api._adjusted_cache.peek((stocks[0], kind, None)).frame is not None
+
     def test_get_history_empty_result_with_is_dict(self, ptrade_api):
         """测试get_history空结果时is_dict=True返回空字典"""
         ptrade_api.context._lifecycle_controller.set_phase(LifecyclePhase.INITIALIZE)
@@ -310,7 +439,7 @@ class TestAPIFundamentals:
             "20240101": {"000001.XSHG": ["600000.SH", "000001.XSHE"]},
             "20240110": {"000001.XSHG": ["600000.SH", "000002.XSHE"]},
         }
-        ptrade_api._sorted_index_dates = None  # 清除缓存
+        ptrade_api._index_constituents = None  # 清除缓存
 
         # 查询中间日期，应返回最近的历史数据
         result = ptrade_api.get_index_stocks("000001.XSHG", date="2024-01-05")
@@ -327,7 +456,7 @@ class TestAPIFundamentals:
         data_context.index_constituents = {
             "20240110": {"000001.XSHG": ["600000.SH"]},
         }
-        ptrade_api._sorted_index_dates = None  # 清除缓存
+        ptrade_api._index_constituents = None  # 清除缓存
 
         # 查询早于所有数据的日期
         result = ptrade_api.get_index_stocks("000001.XSHG", date="2024-01-01")
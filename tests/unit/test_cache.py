@@ -5,6 +5,8 @@
 测试缓存管理器
 """
 
+import numpy as np
+import pandas as pd
 import pytest
 from datetime import datetime
 
@@ -13,6 +15,8 @@ from simtradelab.ptrade.cache_manager import (
     CacheNamespace,
     UnifiedCacheManager
 )
+from simtradelab.ptrade.memory_budget import MemoryBudget, SizedLRUCache, estimate_nbytes
+from simtradelab.ptrade.object import LazyDataDict
 
 
 class TestCacheNamespace:
@@ -147,3 +151,94 @@ class TestUnifiedCacheManager:
 
         # 非日级缓存应该保留
         assert cache_manager.get('history', 'key3') == 'value3'
+
+
+class TestMemoryBudget:
+    """测试按字节记账的跨缓存内存预算"""
+
+    def test_estimate_nbytes(self):
+        """DataFrame/ndarray 按缓冲区大小估算，容器递归累加"""
+        frame = pd.DataFrame({'close': np.zeros(1000)})
+        assert estimate_nbytes(np.zeros(1000)) == 8000
+        assert estimate_nbytes(frame) >= 8000
+        assert estimate_nbytes({'a': np.zeros(1000), 'b': np.zeros(1000)}) >= 16000
+        assert estimate_nbytes([np.zeros(10)] * 1000) >= 80000
+
+    def test_evicts_globally_oldest_by_size(self):
+        """超出预算时跨缓存淘汰最久未访问的条目"""
+        budget = MemoryBudget(limit_bytes=30000)
+        first = SizedLRUCache('first', budget=budget)
+        second = SizedLRUCache('second', budget=budget)
+
+        first['a'] = np.zeros(1000)
+        second['b'] = np.zeros(1000)
+        first['c'] = np.zeros(1000)
+        first['a']  # 访问后 b 成为最旧项
+        second['d'] = np.zeros(1000)
+
+        assert 'b' not in second and 'd' in second
+        assert list(first) == ['c', 'a']
+        assert budget.total_bytes() == 24000
+        assert budget.usage() == {'first': 16000, 'second': 8000}
+        assert budget.evictions == 1
+
+    def test_update_moves_existing_keys_to_newest(self):
+        """批量写入已有 key 时与逐条写入一样移到最新位置"""
+        budget = MemoryBudget(limit_bytes=30000)
+        cache = SizedLRUCache('cache', budget=budget)
+        other = SizedLRUCache('other', budget=budget)
+        cache['a'] = np.zeros(1000)
+        cache['c'] = np.zeros(1000)
+        other['b'] = np.zeros(1000)
+
+        cache.update({'a': np.zeros(1000)})
+        assert list(cache) == ['c', 'a']
+        other['d'] = np.zeros(1000)  # 超出预算：淘汰全局最旧的 c，而不是刚写入的 a 或较新的 b
+
+        assert list(cache) == ['a']
+        assert list(other) == ['b', 'd']
+
+    def test_count_limit_and_pinned_cache(self):
+        """条目数上限仍然生效；不可淘汰的缓存只记账"""
+        budget = MemoryBudget(limit_bytes=10000)
+        pinned = SizedLRUCache('pinned', evictable=False, budget=budget)
+        pinned.update({'x': np.zeros(5000), 'y': np.zeros(5000)})
+        small = SizedLRUCache('small', maxsize=2, budget=budget)
+        for key in 'abc':
+            small[key] = np.zeros(10)
+
+        assert len(pinned) == 2 and list(small) == ['b', 'c']
+        assert budget.total_bytes() == 160
+        assert budget.usage()['pinned'] == 80000
+
+        small['big'] = np.zeros(5000)  # 单条超出预算时保留最新写入
+        assert list(small) == ['big']
+        del small['big']
+        assert small.nbytes == 0
+
+    def test_namespace_reports_bytes(self):
+        """命名空间统计包含字节数"""
+        ns = CacheNamespace('test', max_size=10, account='test.bytes')
+        ns.put('key', np.zeros(100))
+        ns.put('key', np.zeros(200))
+
+        assert ns.get_stats()['bytes'] == 1600
+        assert cache_manager.memory_usage()['test.bytes'] == 1600
+        ns.clear()
+        assert ns.nbytes() == 0
+
+    def test_lazy_dict_cache_is_budgeted(self, tmp_path, monkeypatch):
+        """LazyDataDict 按需加载的条目计入预算并可被淘汰"""
+        from simtradelab.ptrade import object as object_module
+
+        frame = pd.DataFrame({'close': np.zeros(1000)})
+        monkeypatch.setattr(object_module, '_get_load_map', lambda: {'stock': lambda *args, **kwargs: frame.copy()})
+        lazy = LazyDataDict(str(tmp_path), 'stock', ['A', 'B', 'C'])
+        budget = MemoryBudget(limit_bytes=int(estimate_nbytes(frame) * 2.5))
+        lazy._cache = SizedLRUCache('lazy', maxsize=10, budget=budget)
+
+        for key in 'ABC':
+            lazy[key]
+
+        assert list(lazy._cache) == ['B', 'C']
+        assert budget.usage() == {'lazy': 2 * estimate_nbytes(frame)}
@@ -0,0 +1,205 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from simtradelab.ptrade.api import PtradeAPI
+from simtradelab.ptrade.columnar_store import ColumnarStore, SymbolArrays
+from simtradelab.ptrade.object import LazyDataDict
+
+
+def _frames():
+    dates = pd.date_range("2024-01-01", periods=6, freq="D", name="date")
+    return {
+        "600000.SH": pd.DataFrame(
+            {"close": np.arange(6, dtype=float), "volume": np.arange(6, dtype=np.int64)}, index=dates
+        ),
+        # 停牌缺行 + 成交量为 float，触发非连续日期和 dtype 回写
+        "000001.SZ": pd.DataFrame(
+            {"close": [1.0, 2.0, 3.0], "volume": [1.0, 0.0, 2.0]}, index=dates[[0, 2, 5]]
+        ),
+        "000002.SZ": pd.DataFrame(),
+    }
+
+
+def test_columnar_store_round_trips_frames():
+    expected = _frames()
+    store = ColumnarStore.from_frames(_frames())
+
+    assert len(store) == 3
+    assert len(store.calendar) == 6
+    for symbol, df in expected.items():
+        pd.testing.assert_frame_equal(store.frame(symbol), df, check_freq=False)
+
+
+def test_columnar_store_exposes_array_views():
+    store = ColumnarStore.from_frames(_frames())
+
+    dense = store.arrays("600000.SH")
+    sparse = store.arrays("000001.SZ")
+
+    assert isinstance(dense, SymbolArrays)
+    assert np.shares_memory(dense.dates, store.calendar)
+    assert sparse.dates.tolist() == list(pd.DatetimeIndex(["2024-01-01", "2024-01-03", "2024-01-06"]).asi8)
+    assert sparse["volume"].dtype == np.float64
+    assert dense["volume"].dtype == np.int64
+    assert store.arrays("000002.SZ") is None
+    assert dense.with_aliases({"price": "close"})["price"] is dense["close"]
+
+
+def test_columnar_store_from_blocks_matches_from_frames():
+    frames = {symbol: df for symbol, df in _frames().items() if not df.empty}
+    dates = np.concatenate([df.index.asi8 for df in frames.values()])
+    columns = {name: np.concatenate([df[name].to_numpy(dtype=float) for df in frames.values()]) for name in ("close", "volume")}
+    bounds = np.cumsum([0] + [len(df) for df in frames.values()])
+
+    store = ColumnarStore.from_blocks(list(frames), bounds, dates, columns, index_name="date")
+
+    assert len(store.calendar) == 6
+    assert np.shares_memory(store.arrays("000001.SZ")["close"], columns["close"])
+    for symbol, df in frames.items():
+        pd.testing.assert_frame_equal(store.frame(symbol), df.astype(float), check_freq=False)
+
+
+@pytest.fixture
+def columnar_dict(tmp_path, test_stock_data):
+    stocks_dir = tmp_path / "stocks"
+    stocks_dir.mkdir()
+    for symbol, df in test_stock_data.items():
+        df.rename_axis("date").reset_index().to_parquet(stocks_dir / f"{symbol}.parquet", index=False)
+    return LazyDataDict(
+        str(tmp_path), "stock", sorted(test_stock_data), preload=True, use_multiprocessing=False
+    )
+
+
+def test_lazy_data_dict_preload_builds_columnar_store(columnar_dict, test_stock_data):
+    assert columnar_dict._columnar is not None
+    assert not columnar_dict._cache
+    assert columnar_dict.get_arrays("600000.SH") is not None
+
+    frame = columnar_dict["600000.SH"]
+    pd.testing.assert_frame_equal(frame, test_stock_data["600000.SH"], check_names=False, check_freq=False)
+    frame.iloc[0, 0] = -1.0
+    assert columnar_dict.get_arrays("600000.SH")["open"][0] != -1.0
+
+    resident = sum(df.memory_usage(index=True, deep=True).sum() for df in test_stock_data.values())
+    assert columnar_dict._columnar.nbytes < resident
+
+
+@pytest.mark.parametrize("fq", [None, "pre", "post", "dypre"])
+@pytest.mark.parametrize("security_list", ["600000.SH", ["600000.SH", "000001.SZ"]])
+def test_get_history_reads_columnar_store_identically(
+    columnar_dict, data_context, context, simple_log, test_stock_data, test_dates, fq, security_list
+):
+    adj = {
+        stock: pd.DataFrame(
+            {"adj_a": np.linspace(0.8, 1.0, len(test_dates)), "adj_b": np.linspace(0.1, 0.0, len(test_dates))},
+            index=test_dates,
+        )
+        for stock in test_stock_data
+    }
+    data_context.adj_pre_cache = adj
+    data_context.adj_post_cache = adj
+    context.current_dt = test_dates[12]
+    baseline = PtradeAPI(data_context, context, simple_log)
+    expected = baseline.get_history(8, "1d", ["open", "high", "close", "volume", "money"], security_list, fq=fq)
+    limits = baseline.check_limit(["600000.SH", "600519.SH"])
+
+    data_context.stock_data_dict = columnar_dict
+    api = PtradeAPI(data_context, context, simple_log)
+    result = api.get_history(8, "1d", ["open", "high", "close", "volume", "money"], security_list, fq=fq)
+
+    if isinstance(expected, pd.DataFrame):
+        pd.testing.assert_frame_equal(result, expected)
+    else:
+        for field in ("open", "close", "money"):
+            pd.testing.assert_frame_equal(result[field], expected[field])
+    assert api.check_limit(["600000.SH", "600519.SH"]) == limits
+    assert not columnar_dict._cache
+
+
+def test_columnar_store_append_adds_tails_and_new_symbols():
+    frames = _frames()
+    dates = pd.date_range("2024-01-07", periods=2, freq="D", name="date")
+    updates = {
+        # 含已常驻的最后一行，只追加其后的行
+        "600000.SH": pd.concat([frames["600000.SH"].iloc[-1:], pd.DataFrame(
+            {"close": [6.0, 7.0], "volume": [6, 7]}, index=dates
+        )]),
+        # 成交量为 float：并入整数缓冲区后按原 dtype 还原
+        "000001.SZ": pd.DataFrame({"close": [4.0], "volume": [3.5]}, index=dates[1:]),
+        "000002.SZ": pd.DataFrame({"close": [9.0], "volume": [1]}, index=dates[:1]),
+        "600519.SH": pd.DataFrame({"close": [5.0], "volume": [2]}, index=dates[:1]),
+    }
+    store = ColumnarStore.from_frames(_frames())
+
+    appended = store.append({symbol: df.copy() for symbol, df in updates.items()})
+
+    assert appended is not store
+    assert store.frame("600000.SH").equals(frames["600000.SH"])
+    assert len(appended.calendar) == 8
+    expected = {
+        "600000.SH": pd.concat([frames["600000.SH"], updates["600000.SH"].iloc[1:]]),
+        "000001.SZ": pd.concat([frames["000001.SZ"], updates["000001.SZ"]]),
+        "000002.SZ": updates["000002.SZ"],
+        "600519.SH": updates["600519.SH"],
+    }
+    for symbol, df in expected.items():
+        pd.testing.assert_frame_equal(appended.frame(symbol), df, check_freq=False)
+    assert appended.append({"600000.SH": expected["600000.SH"]}) is appended
+
+
+def test_lazy_data_dict_append_reads_only_new_rows(columnar_dict, test_stock_data, monkeypatch):
+    from simtradelab.ptrade import storage
+
+    extra = test_stock_data["600000.SH"].iloc[-2:].copy()
+    extra.index = extra.index + pd.Timedelta(days=2)
+    updated = pd.concat([test_stock_data["600000.SH"], extra])
+    path = f"{columnar_dict.data_dir}/stocks/600000.SH.parquet"
+    updated.rename_axis("date").reset_index().to_parquet(path, index=False)
+    windows = []
+    load_stock = storage.load_stock
+    monkeypatch.setattr(
+        columnar_dict, "_load_map",
+        {"stock": lambda *args, **kwargs: windows.append(kwargs.get("date_range")) or load_stock(*args, **kwargs)},
+    )
+    before = columnar_dict["000001.SZ"]
+
+    assert columnar_dict.append(["600000.SH"]) == ["600000.SH"]
+
+    assert windows == [(test_stock_data["600000.SH"].index[-1] + pd.Timedelta(1), None)]
+    pd.testing.assert_frame_equal(columnar_dict["600000.SH"], updated, check_names=False, check_freq=False)
+    pd.testing.assert_frame_equal(columnar_dict["000001.SZ"], before)
+
+
+def test_partial_invalidation_keeps_unaffected_history(ptrade_api, data_context, context, test_dates):
+    data_context.data_version = 1
+    context.current_dt = test_dates[10]
+    kept = ptrade_api.get_history(5, "1d", "close", ["000001.SZ"])
+    dropped = ptrade_api.get_history(5, "1d", "close", ["600000.SH", "000001.SZ"])
+    ptrade_api.get_stock_date_index("600000.SH")
+    ptrade_api.get_stock_date_index("000001.SZ")
+
+    data_context.data_version = 2
+    ptrade_api._clear_data_caches({"600000.SH"}, previous_version=1)
+
+    assert ptrade_api.get_history(5, "1d", "close", ["000001.SZ"]) is kept
+    assert ptrade_api.get_history(5, "1d", "close", ["600000.SH", "000001.SZ"]) is not dropped
+    assert "000001.SZ" in ptrade_api._stock_date_index
+
+
+def test_partial_invalidation_drops_history_built_on_old_calendar(ptrade_api, data_context, context, test_dates):
+    data_context.data_version = 1
+    data_context.trade_days = test_dates[:10]
+    context.current_dt = test_dates[11]
+    stale = ptrade_api.get_history(5, "1d", "close", ["000001.SZ", "600519.SH"])
+
+    # 补载数据后交易日历多了一天，未改动股票的窗口也要按新日历重建
+    data_context.data_version = 2
+    data_context.trade_days = test_dates[:11]
+    ptrade_api._clear_data_caches({"600000.SH"}, previous_version=1)
+    fresh = ptrade_api.get_history(5, "1d", "close", ["000001.SZ", "600519.SH"])
+
+    assert fresh is not stale
+    assert pd.Timestamp(fresh.index[-1]) == test_dates[10]
+    windows = ptrade_api._history_windows
+    assert all(windows.peek(key)[4] == ptrade_api._calendar_key() for key in windows)
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from simtradelab.ptrade.columnar_store import ColumnarStore
+from simtradelab.ptrade.compact import compact_frame, compact_values, restore_frame, restore_values
+from simtradelab.ptrade.object import LazyDataDict
+
+STOCKS = ["600000.SH", "000001.SZ", "600519.SH"]
+DATES = pd.bdate_range("2024-01-01", periods=60)
+
+
+def _set_broker_profile(ptrade_api, profile):
+    ptrade_api.broker_profile = profile
+    ptrade_api.context.broker_profile = profile
+    ptrade_api.context.g.broker_profile = profile
+
+
+@pytest.fixture
+def market_dir(tmp_path):
+    (tmp_path / "stocks").mkdir()
+    rng = np.random.default_rng(7)
+    for i, stock in enumerate(STOCKS):
+        base = [10.0, 35.0, 1700.0][i]
+        close = np.round(base + rng.uniform(-2, 2, len(DATES)).cumsum() * 0.1, 2)
+        pd.DataFrame({
+            "date": DATES,
+            "open": np.round(close - 0.05, 2),
+            "high": np.round(close + 0.125, 2),
+            "low": np.round(close - 0.135, 2),
+            "close": close,
+            "volume": rng.integers(1_000_000, 50_000_000, len(DATES)),
+            "money": np.round(rng.uniform(1e8, 5e9, len(DATES)), 2),
+        }).to_parquet(tmp_path / "stocks" / f"{stock}.parquet", index=False)
+    return tmp_path
+
+
+def test_values_round_trip_bit_for_bit():
+    prices = np.array([0.01, 10.005, 20.205, 1799.99, 4321.45, np.nan])
+    prices[1:3] = np.round(prices[1:3], 2)
+    volume = np.array([0, 123, 2**31 - 1], dtype=np.int64)
+
+    assert compact_values(prices).dtype == np.float32
+    assert restore_values(compact_values(prices)).tobytes() == prices.tobytes()
+    assert compact_values(volume).dtype == np.int32
+    assert restore_values(compact_values(volume)).tobytes() == volume.tobytes()
+    # 多位小数、超出 float32 精度或 int32 范围的列保持原 dtype
+    assert compact_values(np.array([12.3456])).dtype == np.float64
+    assert compact_values(np.array([123456789.12])).dtype == np.float64
+    assert compact_values(np.array([2**31], dtype=np.int64)).dtype == np.int64
+
+
+def test_frame_round_trip(market_dir):
+    frame = pd.read_parquet(market_dir / "stocks" / "600519.SH.parquet").set_index("date")
+
+    compact = compact_frame(frame.copy())
+
+    assert compact.dtypes.to_dict() == {
+        "open": np.float32, "high": np.float32, "low": np.float32, "close": np.float32,
+        "volume": np.int32, "money": np.float64,
+    }
+    pd.testing.assert_frame_equal(restore_frame(compact), frame, check_exact=True)
+    assert restore_frame(frame) is frame
+
+
+def test_columnar_store_merges_mixed_widths_losslessly():
+    index = pd.bdate_range("2024-01-01", periods=3)
+    narrow = pd.DataFrame({"close": [10.01, 10.02, 10.03]}, index=index)
+    wide = pd.DataFrame({"close": [1.234, 1.235, 1.236]}, index=index)
+
+    store = ColumnarStore.from_frames({"A": compact_frame(narrow.copy()), "B": wide.copy()}, compact=True)
+
+    # B 的三位小数不能无损压缩，整列保持 float64；A 并入前已还原
+    assert store._buffers["close"].dtype == np.float64
+    assert store.arrays("A")["close"].tobytes() == narrow["close"].to_numpy().tobytes()
+    pd.testing.assert_frame_equal(restore_frame(store.frame("B")), wide, check_exact=True)
+
+
+def test_native_float32_columns_are_not_rounded():
+    index = pd.bdate_range("2024-01-01", periods=3)
+    frame = pd.DataFrame({
+        "close": [10.01, 10.02, 10.03],
+        "ratio": np.array([1.2345, 2.5, 3.75], dtype=np.float32),
+        "count": np.array([1, 2, 3], dtype=np.int32),
+    }, index=index)
+
+    compact = compact_frame(frame.copy())
+    pd.testing.assert_frame_equal(restore_frame(compact), frame, check_exact=True)
+
+    store = ColumnarStore.from_frames({"A": compact_frame(frame.copy())}, compact=True)
+
+    assert store._compact_columns == {"close"}
+    arrays = store.arrays("A")
+    assert arrays["ratio"].tobytes() == frame["ratio"].to_numpy().tobytes()
+    assert arrays["count"].dtype == np.int32
+    pd.testing.assert_frame_equal(restore_frame(store.frame("A")), frame, check_exact=True)
+
+
+def test_symbol_arrays_restore_only_requested_rows():
+    index = pd.bdate_range("2024-01-01", periods=5)
+    frame = pd.DataFrame({"close": [10.01, 10.02, 10.03, 10.04, 10.05]}, index=index)
+    arrays = ColumnarStore.from_frames({"A": frame.copy()}, compact=True).arrays("A")
+
+    full = arrays["close"]
+    assert full.dtype == np.float64
+    assert arrays.column("close", 1, 4).tobytes() == full[1:4].tobytes()
+    assert arrays.value("close", -1) == full[-1] == 10.05
+
+
+@pytest.mark.parametrize("preload", [True, False])
+def test_lazy_dict_stores_compact_and_hands_out_float64(market_dir, preload):
+    plain = LazyDataDict(str(market_dir), "stock", STOCKS, preload=preload, use_multiprocessing=False)
+    compact = LazyDataDict(str(market_dir), "stock", STOCKS, preload=preload, use_multiprocessing=False,
+                           compact=True)
+
+    for stock in STOCKS:
+        pd.testing.assert_frame_equal(compact[stock], plain[stock], check_exact=True)
+    if preload:
+        assert compact._columnar.nbytes < plain._columnar.nbytes * 0.75
+        assert compact.get_arrays("600000.SH")["close"].dtype == np.float64
+        assert compact.get_arrays("600000.SH")["volume"].tobytes() == plain.get_arrays("600000.SH")["volume"].tobytes()
+    else:
+        assert compact._cache.peek("600000.SH")["close"].dtype == np.float32
+
+
+@pytest.mark.parametrize("profile", ["auto", "guosheng", "dongguan", "shanxi"])
+def test_history_and_price_are_identical_in_compact_mode(market_dir, ptrade_api, profile):
+    plain = LazyDataDict(str(market_dir), "stock", STOCKS, preload=True, use_multiprocessing=False)
+    compact = LazyDataDict(str(market_dir), "stock", STOCKS, preload=True, use_multiprocessing=False,
+                           compact=True)
+    ptrade_api.data_context.trade_days = DATES
+    ptrade_api.context.current_dt = DATES[-1]
+    _set_broker_profile(ptrade_api, profile)
+
+    def results(stock_data):
+        ptrade_api.data_context.stock_data_dict = stock_data
+        ptrade_api._clear_data_caches()
+        return [
+            ptrade_api.get_history(20, "1d", ["open", "high", "low", "close", "volume"], STOCKS, fq=None),
+            ptrade_api.get_history(20, "1d", "close", STOCKS, fq="pre"),
+            ptrade_api.get_price(STOCKS, count=15, fields=["close", "volume"]),
+            ptrade_api.get_price("600519.SH", count=30, fields=["open", "high", "low", "close"]),
+        ]
+
+    for expected, actual in zip(results(plain), results(compact), strict=True):
+        if isinstance(expected, dict):
+            assert expected.keys() == actual.keys()
+            for key in expected:
+                pd.testing.assert_frame_equal(actual[key], expected[key], check_exact=True)
+        else:
+            pd.testing.assert_frame_equal(actual, expected, check_exact=True)
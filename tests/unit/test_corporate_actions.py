@@ -0,0 +1,119 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simtradelab.ptrade import corporate_actions, storage
+from simtradelab.ptrade.adj_cache import DividendLazyLoader
+from simtradelab.ptrade.corporate_actions import CorporateActions, get_corporate_actions
+from simtradelab.ptrade.object import LazyDataDict
+
+DATES = pd.date_range("2024-01-01", periods=8)
+
+
+def _events(dates, allotted, bonus, dividend):
+    n = len(dates)
+    return pd.DataFrame(
+        {
+            "date": pd.to_datetime(dates),
+            "dividend": dividend,
+            "exer_forward_a": np.linspace(0.5, 0.9, n),
+            "exer_forward_b": np.linspace(0.1, 0.3, n),
+            "allotted_ps": allotted,
+            "rationed_ps": [0.1] * n,
+            "rationed_px": [5.0] * n,
+            "bonus_ps": bonus,
+        }
+    )
+
+
+@pytest.fixture
+def exrights_dir(tmp_path):
+    (tmp_path / "exrights").mkdir()
+    _events(["2024-01-03", "2024-01-06"], [0.3, 0.0], [0.2, 0.5], [0.2, 0.0]).to_parquet(
+        tmp_path / "exrights" / "000001.SZ.parquet", index=False
+    )
+    _events(["2024-01-02", "2024-01-04", "2024-01-07"], [0.0, 0.5, 0.1], [0.1, 0.0, 0.3], [0.1, 0.4, 0.3]).to_parquet(
+        tmp_path / "exrights" / "600000.SH.parquet", index=False
+    )
+    return tmp_path
+
+
+def _reference_post(events, index):
+    """逐事件循环的后复权因子（向量化实现的参照）"""
+    m = 1.0 + events["allotted_ps"].values + events["rationed_ps"].values
+    a, b = [1.0], [0.0]
+    for i in range(len(events)):
+        a.append(a[-1] * m[i])
+        b.append(b[-1] * m[i] + events["bonus_ps"].values[i] - events["rationed_ps"].values[i] * events["rationed_px"].values[i])
+    idx = np.searchsorted(pd.to_datetime(events.index.astype(str), format="%Y%m%d").values, index.values, side="right")
+    return np.array(a)[idx], np.array(b)[idx]
+
+
+def test_factors_events_and_dividends_come_from_one_read(exrights_dir, monkeypatch):
+    reads = []
+    original = corporate_actions._read_events
+    monkeypatch.setattr(corporate_actions, "_read_events", lambda path: reads.append(path.stem) or original(path))
+    actions = CorporateActions(exrights_dir)
+    price = pd.DataFrame({"close": 1.0}, index=DATES)
+
+    assert actions.ensure(["000001.SZ", "600000.SH", "missing.SZ"]) == 3
+    pre = actions.factors("pre", "600000.SH", price)
+    post = actions.factors("post", "600000.SH", price)
+    events = actions.events("600000.SH")
+
+    assert sorted(reads) == ["000001.SZ", "600000.SH", "missing.SZ"]
+    pd.testing.assert_frame_equal(events, storage.load_exrights(exrights_dir, "600000.SH")["exrights_events"])
+    assert pre["adj_a"].tolist() == [0.5, 0.7, 0.7, 0.9, 0.9, 0.9, 1.0, 1.0]
+    expected_a, expected_b = _reference_post(events, DATES)
+    np.testing.assert_array_equal(post["adj_a"].values, expected_a)
+    np.testing.assert_array_equal(post["adj_b"].values, expected_b)
+    assert actions.dividends("000001.SZ") == {"20240103": pytest.approx(0.2)}
+    assert actions.events("missing.SZ").empty
+    assert actions.factors("post", "missing.SZ", price)["adj_a"].tolist() == [1.0] * len(DATES)
+
+
+def test_changed_file_is_read_again(exrights_dir):
+    actions = CorporateActions(exrights_dir)
+    assert actions.dividends("000001.SZ") == {"20240103": pytest.approx(0.2)}
+
+    path = exrights_dir / "exrights" / "000001.SZ.parquet"
+    _events(["2024-01-05"], [0.0], [0.0], [0.8]).to_parquet(path, index=False)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert actions.dividends("000001.SZ") == {"20240105": pytest.approx(0.8)}
+    assert actions.ensure(["000001.SZ"]) == 0
+
+
+def test_runtime_consumers_share_the_directory_instance(exrights_dir, monkeypatch):
+    actions = get_corporate_actions(exrights_dir)
+    actions.ensure(["000001.SZ", "600000.SH"])
+    monkeypatch.setattr(corporate_actions, "_read_events", lambda path: pytest.fail("exrights re-read"))
+
+    exrights_dict = LazyDataDict(str(exrights_dir), "exrights", ["000001.SZ", "600000.SH"])
+    dividends = DividendLazyLoader(str(exrights_dir))
+
+    assert exrights_dict["600000.SH"].index.tolist() == [20240102, 20240104, 20240107]
+    assert dividends["600000.SH"] == {
+        "20240102": pytest.approx(0.1), "20240104": pytest.approx(0.4), "20240107": pytest.approx(0.3)
+    }
+    assert get_corporate_actions(exrights_dir / ".") is actions
+
+
+def test_action_calendar_indexes_events_by_date_and_is_cached_in_manifest(exrights_dir, monkeypatch):
+    symbols = ["000001.SZ", "600000.SH"]
+
+    calendar = corporate_actions.build_action_calendar(exrights_dir, symbols)
+
+    assert calendar[20240103] == {"000001.SZ": (pytest.approx(0.3), pytest.approx(0.2))}
+    assert 20240106 not in calendar
+    assert calendar[20240104] == {"600000.SH": (pytest.approx(0.5), pytest.approx(0.4))}
+    assert set(calendar) == {20240102, 20240103, 20240104, 20240107}
+    cash_only = CorporateActions(exrights_dir).calendar(symbols, allotments=False)
+    assert cash_only[20240104] == {"600000.SH": (0.0, pytest.approx(0.4))}
+
+    corporate_actions.clear_corporate_actions()
+    monkeypatch.setattr(corporate_actions, "_read_events", lambda path: pytest.fail("exrights re-read"))
+    assert corporate_actions.build_action_calendar(exrights_dir, symbols) == calendar
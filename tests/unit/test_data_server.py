@@ -17,9 +17,11 @@ class FakeLazyDataDict:
 def reset_data_server():
     DataServer._instance = None
     DataServer._initialized = False
+    DataServer._datasets.clear()
     yield
     DataServer._instance = None
     DataServer._initialized = False
+    DataServer._datasets.clear()
 
 
 def test_data_path_expands_user_home_before_resolving(monkeypatch, tmp_path):
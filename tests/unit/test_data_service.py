@@ -0,0 +1,202 @@
+import json
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simtradelab.ptrade.columnar_store import ColumnarStore
+from simtradelab.ptrade.index_constituents import IndexConstituents
+from simtradelab.ptrade.object import LazyDataDict
+from simtradelab.ptrade.stock_status import StockStatusStore
+from simtradelab.service import data_service
+from simtradelab.service.data_service import (
+    DataService,
+    DataServiceClient,
+    RemoteDataDict,
+    connect_data_service,
+    decode_frames,
+    decode_snapshot,
+    encode_frames,
+    encode_snapshot,
+)
+from simtradelab.service.shared_panel import publish_shared_panel
+
+pytestmark = pytest.mark.skipif(not hasattr(__import__("socket"), "AF_UNIX"), reason="requires unix sockets")
+
+DATES = pd.date_range("2024-01-01", periods=5, freq="D", name="date")
+
+
+def _fundamentals():
+    return {
+        "600000.SH": pd.DataFrame(
+            {"publ_date": DATES, "roe": np.linspace(0.1, 0.5, 5), "secu_abbr": ["浦发银行"] * 5}, index=DATES
+        ),
+        "000001.SZ": pd.DataFrame({"roe": [0.2, 0.3]}, index=DATES[:2]),
+    }
+
+
+def _exrights():
+    return {"600000.SH": pd.DataFrame({"dividend": [0.3]}, index=pd.Index([20240102], name="date"))}
+
+
+def _fake_server(market_dir):
+    """持有与 DataServer 相同属性的替身，不读取任何文件"""
+    price = {
+        "600000.SH": pd.DataFrame({"close": np.arange(5.0) + 10, "volume": np.arange(5, dtype=np.int64)}, index=DATES),
+        "000001.SZ": pd.DataFrame({"close": np.arange(3.0) + 20, "volume": np.ones(3, dtype=np.int64)}, index=DATES[2:]),
+    }
+    keys = sorted(price)
+    server = SimpleNamespace(
+        data_path=str(market_dir.resolve()),
+        data_version=1,
+        stock_data_dict=LazyDataDict.from_columnar(str(market_dir), "stock", ColumnarStore.from_frames(price)),
+        valuation_dict=None,
+        fundamentals_dict=_fundamentals(),
+        exrights_dict=_exrights(),
+        adj_pre_cache=None,
+        adj_post_cache=None,
+        benchmark_data={"000300.SS": pd.DataFrame({"close": [1.0]}, index=DATES[:1])},
+        stock_metadata=pd.DataFrame(),
+        index_constituents={},
+        stock_status_history={},
+        trade_days=DATES,
+        corporate_action_calendar={20240102: {"600000.SH": (0.0, 0.3)}},
+        _default_benchmark="000300.SS",
+        _loaded_data_types={"price", "fundamentals", "exrights"},
+        _columns={},
+        _date_range=None,
+        _stock_keys_cache=keys,
+        _stock_1m_keys_cache=[],
+        _valuation_keys_cache=keys,
+        _fundamentals_keys_cache=keys,
+        _exrights_keys_cache=keys,
+    )
+    server.publish_shared = lambda: publish_shared_panel(server)
+    return server
+
+
+@pytest.fixture
+def service(tmp_path):
+    market_dir = tmp_path / "cn"
+    (market_dir / "stocks").mkdir(parents=True)
+    service = DataService.__new__(DataService)
+    service.market = "CN"
+    service.socket_path = tmp_path / "svc.sock"
+    service.server = _fake_server(market_dir)
+    service._lock = threading.Lock()
+    service._published_version = None
+    service._panel_dir = None
+    service._socket_server = None
+    service._ensure_panel()
+    thread = threading.Thread(target=service.serve_forever, daemon=True)
+    thread.start()
+    for _ in range(200):
+        if service._socket_server is not None and service.socket_path.exists():
+            break
+        threading.Event().wait(0.01)
+    yield service
+    service.shutdown()
+    thread.join(timeout=5)
+
+
+def test_frames_round_trip_through_arrow_ipc():
+    frames = {**_fundamentals(), "exrights": _exrights()["600000.SH"], "empty": pd.DataFrame()}
+
+    symbols, sizes, payload = encode_frames(frames)
+    decoded = decode_frames(symbols, sizes, payload)
+
+    assert list(decoded) == list(frames)
+    for symbol, frame in frames.items():
+        if frame.empty:
+            assert decoded[symbol].empty
+        else:
+            pd.testing.assert_frame_equal(decoded[symbol], frame, check_freq=False)
+
+
+def test_client_attaches_panel_and_fetches_lazy_datasets(service):
+    client = connect_data_service(service.server.data_path, socket_path=service.socket_path)
+    try:
+        assert client is not None
+        np.testing.assert_array_equal(client.stock_data_dict.get_arrays("000001.SZ")["close"], [20.0, 21.0, 22.0])
+        assert client.stock_data_dict._columnar.read_only  # 挂载服务发布的只读映射
+        assert client.corporate_action_calendar == {20240102: {"600000.SH": (0.0, 0.3)}}
+        assert list(client.trade_days) == list(DATES)
+
+        fundamentals = client.fundamentals_dict
+        assert isinstance(fundamentals, RemoteDataDict)
+        frames = fundamentals.get_many(["600000.SH", "000001.SZ", "999999.SH"])
+        for symbol, frame in _fundamentals().items():
+            pd.testing.assert_frame_equal(frames[symbol], frame, check_freq=False)
+        assert "600000.SH" in fundamentals._cache
+        pd.testing.assert_frame_equal(client.exrights_dict["600000.SH"], _exrights()["600000.SH"])
+        with pytest.raises(KeyError):
+            client.exrights_dict["000001.SZ"]
+
+        data_context = client.data_context()
+        assert data_context.fundamentals_dict is fundamentals
+        assert client.get_benchmark_data().iloc[0]["close"] == 1.0
+    finally:
+        client.close()
+
+
+def test_connect_returns_none_without_service_or_for_other_data_path(service, tmp_path):
+    assert connect_data_service(tmp_path, socket_path=tmp_path / "missing.sock") is None
+    other = tmp_path / "other"
+    other.mkdir()
+    assert connect_data_service(other, socket_path=service.socket_path) is None
+
+
+def test_snapshot_round_trip_without_pickle():
+    server = _fake_server(Path("/nonexistent"))
+    snapshot = {name: getattr(server, name) for name in data_service._SNAPSHOT_ATTRS}
+    snapshot.update({
+        "panel_dir": "/tmp/panel",
+        "default_benchmark": "000300.SS",
+        "loaded_data_types": ["price"],
+        "columns": {"price": frozenset({"close"}), "valuation": None},
+        "date_range": (pd.Timestamp("2024-01-01"), None),
+        "keys": {"stock": ["600000.SH"], "stock_1m": None},
+        "index_constituents": IndexConstituents.from_records(
+            ["20240101", "20240103"], ["000300.SS", "000300.SS"], [["600000.SH"], ["600000.SH", "000001.SZ"]]
+        ),
+        "stock_status_history": StockStatusStore.from_records(
+            ["20240101", "20240102"], ["ST", "HALT"], [["000001.SZ"], ["600000.SH"]]
+        ),
+    })
+
+    header, payload = encode_snapshot(snapshot)
+    decoded = decode_snapshot(json.loads(json.dumps(header)), payload)
+
+    assert decoded["corporate_action_calendar"] == snapshot["corporate_action_calendar"]
+    assert decoded["columns"] == snapshot["columns"]
+    assert decoded["date_range"] == snapshot["date_range"]
+    pd.testing.assert_index_equal(decoded["trade_days"], DATES)
+    pd.testing.assert_frame_equal(decoded["benchmark_data"]["000300.SS"], snapshot["benchmark_data"]["000300.SS"])
+    assert decoded["index_constituents"].members(["000300.SS"], 20240102) == ["600000.SH"]
+    assert decoded["index_constituents"].members(["000300.SS"], 20240105) == ["600000.SH", "000001.SZ"]
+    status = decoded["stock_status_history"]
+    np.testing.assert_array_equal(status.flags(["000001.SZ", "600000.SH"], "ST", 20240101), [True, False])
+    np.testing.assert_array_equal(status.flags(["000001.SZ", "600000.SH"], "HALT", 20240102), [False, True])
+
+
+def test_default_socket_lives_in_private_runtime_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv(data_service.SERVICE_SOCKET_ENV, raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert data_service.default_socket_path() == tmp_path / "simtradelab-data.sock"
+
+    shared = tmp_path / "shared"
+    shared.mkdir(mode=0o777)
+    shared.chmod(0o777)
+    with pytest.raises(PermissionError):
+        data_service._ensure_private_dir(shared)
+
+
+def test_client_rejects_service_owned_by_another_user(service, monkeypatch):
+    monkeypatch.setattr(data_service.os, "getuid", lambda: -1)
+
+    with pytest.raises(PermissionError):
+        DataServiceClient(service.socket_path)
+    assert connect_data_service(service.server.data_path, socket_path=service.socket_path) is None
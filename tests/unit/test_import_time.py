@@ -0,0 +1,41 @@
+import subprocess
+import sys
+
+import pytest
+
+# 只在绘图/优化/全量预加载时才需要的重依赖，不应出现在启动路径上
+HEAVY_MODULES = {"joblib", "tqdm", "matplotlib", "optuna"}
+
+# 冷启动 import simtradelab.backtest.runner 的累计耗时上限（微秒），留足慢机器余量
+RUNNER_IMPORT_BUDGET_US = 5_000_000
+
+
+def _import_times(module):
+    """在新进程中 import module，返回 {模块名: 累计导入耗时(微秒)}"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    ).stderr
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize(
+    "module", ["simtradelab", "simtradelab.cli", "simtradelab.backtest.runner", "simtradelab.backtest.optimizer_framework"]
+)
+def test_heavy_dependencies_are_imported_lazily(module):
+    times = _import_times(module)
+
+    assert module in times
+    assert not {name.split(".")[0] for name in times} & HEAVY_MODULES
+
+
+def test_runner_import_time_budget():
+    times = _import_times("simtradelab.backtest.runner")
+
+    assert times["simtradelab.backtest.runner"] < RUNNER_IMPORT_BUDGET_US
@@ -0,0 +1,51 @@
+import pickle
+
+import pytest
+
+from simtradelab.ptrade.index_constituents import IndexConstituents
+
+SNAPSHOTS = {
+    "20240102": {"000300.SS": ["600000.SH", "000001.SZ"], "000905.SS": ["000002.SZ"]},
+    "20240103": {"000300.SS": ["600000.SH", "000001.SZ"]},
+    "20240104": {"000300.SS": ["600000.SH", "000001.SZ"], "000905.SS": ["000002.SZ", "000004.SZ"]},
+    "20240108": {"000300.SS": ["000001.SZ", "600519.SH"], "000905.SS": []},
+}
+
+
+def _reference(index_code, date):
+    """旧实现：二分到不晚于查询日的最近快照后向前扫描，直到找到包含该指数的快照"""
+    for snapshot_date in sorted(SNAPSHOTS, reverse=True):
+        if snapshot_date <= date and index_code in SNAPSHOTS[snapshot_date]:
+            return SNAPSHOTS[snapshot_date][index_code]
+    return None
+
+
+@pytest.mark.parametrize("date", ["20240101", "20240102", "20240103", "20240105", "20240108", "20241231"])
+@pytest.mark.parametrize("index_code", ["000300.SS", "000905.SS", "399006.SZ"])
+def test_point_in_time_lookup_matches_snapshot_scan(index_code, date):
+    constituents = IndexConstituents.coerce(SNAPSHOTS)
+
+    assert constituents.members([index_code], int(date)) == _reference(index_code, date)
+
+
+def test_only_membership_changes_are_stored():
+    constituents = IndexConstituents.coerce(SNAPSHOTS)
+
+    assert len(constituents) == 5
+    assert constituents._indexes["000300.SS"][0].tolist() == [20240102, 20240108]
+    assert len(constituents._symbols) == 5
+    restored = pickle.loads(pickle.dumps(constituents))
+    assert restored.members(["000905.SS"], 20240105) == ["000002.SZ", "000004.SZ"]
+
+
+def test_lookup_returns_a_fresh_list_and_prefers_the_latest_candidate():
+    constituents = IndexConstituents.from_records(
+        ["20240102", "20240105"], ["000300.XSHG", "000300.SS"], [["600000.SH"], ["000001.SZ"]]
+    )
+
+    members = constituents.members(["000300.XSHG", "000300.SS"], 20240106)
+    assert members == ["000001.SZ"]
+    members.append("X")
+    assert constituents.members(["000300.XSHG", "000300.SS"], 20240103) == ["600000.SH"]
+    assert constituents.members(["000300.SS"], 20240106) == ["000001.SZ"]
+    assert IndexConstituents.coerce({}) is None
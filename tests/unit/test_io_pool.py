@@ -0,0 +1,152 @@
+import pandas as pd
+import pytest
+
+from simtradelab.ptrade.object import LazyDataDict
+from simtradelab.utils.io_pool import get_io_pool, shutdown_io_pool
+from simtradelab.utils.performance_config import get_performance_config
+
+
+@pytest.fixture
+def stock_dir(tmp_path, test_stock_data):
+    stocks_dir = tmp_path / "stocks"
+    stocks_dir.mkdir()
+    for symbol, df in test_stock_data.items():
+        df.rename_axis("date").reset_index().to_parquet(stocks_dir / f"{symbol}.parquet", index=False)
+    return tmp_path
+
+
+@pytest.fixture
+def parallel_config(monkeypatch):
+    config = get_performance_config()
+    monkeypatch.setattr(config, "enable_multiprocessing", True)
+    monkeypatch.setattr(config, "min_batch_size", 1)
+    monkeypatch.setattr(config, "num_workers", 2)
+    return config
+
+
+def test_io_pool_is_reused_until_size_changes():
+    pool = get_io_pool(2)
+
+    assert get_io_pool(2) is pool
+    resized = get_io_pool(3)
+    assert resized is not pool
+    assert resized.submit(sum, [1, 2]).result() == 3
+    shutdown_io_pool()
+    assert get_io_pool(3) is not resized
+
+
+def test_thread_preload_matches_serial_and_reports_throughput(stock_dir, test_stock_data, parallel_config, monkeypatch, capsys):
+    keys = sorted(test_stock_data)
+    monkeypatch.setattr(parallel_config, "loader_backend", "thread")
+
+    threaded = LazyDataDict(str(stock_dir), "stock", keys, preload=True)
+    out = capsys.readouterr().out
+    serial = LazyDataDict(str(stock_dir), "stock", keys, preload=True, use_multiprocessing=False)
+
+    assert "[thread]" in out
+    assert "MB/s" in out or "MB/秒" in out
+    for key in keys:
+        pd.testing.assert_frame_equal(threaded[key], serial[key])
+
+
+def test_set_loader_backend_rejects_unknown_backend(parallel_config, monkeypatch):
+    monkeypatch.setattr(parallel_config, "loader_backend", "thread")
+
+    parallel_config.set_loader_backend("process")
+    assert parallel_config.loader_backend == "process"
+    with pytest.raises(ValueError):
+        parallel_config.set_loader_backend("dask")
+
+
+def test_prefetch_warms_lazy_dict_in_background(stock_dir, test_stock_data, parallel_config):
+    keys = sorted(test_stock_data)
+    lazy = LazyDataDict(str(stock_dir), "stock", keys, preload=False)
+
+    assert lazy.prefetch(keys[:2] + ["999999.SH"]) == 2
+    assert lazy.prefetch(keys[:2]) == 0
+    for key in keys:
+        pd.testing.assert_frame_equal(lazy[key], test_stock_data[key].rename_axis("date"), check_freq=False)
+
+    stats = lazy.prefetch_stats
+    assert stats["submitted"] == 2
+    assert stats["hits"] + stats["stalls"] == 2
+    assert stats["misses"] == 1
+    assert lazy.prefetch(keys) == 0  # 已缓存
+
+
+def test_prefetch_is_a_no_op_for_preloaded_dicts(stock_dir, test_stock_data):
+    keys = sorted(test_stock_data)
+    preloaded = LazyDataDict(str(stock_dir), "stock", keys, preload=True, use_multiprocessing=False)
+
+    assert preloaded.prefetch(keys) == 0
+
+
+def test_get_many_loads_cold_misses_in_one_batch(stock_dir, test_stock_data, parallel_config, monkeypatch):
+    keys = sorted(test_stock_data)
+    lazy = LazyDataDict(str(stock_dir), "stock", keys, preload=False)
+    serial = LazyDataDict(str(stock_dir), "stock", keys, preload=False)
+    batches = []
+    load_batch = lazy._load_batch
+    monkeypatch.setattr(lazy, "_load_batch", lambda chunk: batches.append(chunk) or load_batch(chunk))
+
+    frames = lazy.get_many(keys + ["999999.SH"])
+
+    assert list(frames) == keys
+    assert sorted(key for chunk in batches for key in chunk) == keys
+    for key in keys:
+        pd.testing.assert_frame_equal(frames[key], serial[key])
+        assert key in lazy._cache
+    assert lazy.get_many(keys[:1]).keys() == {keys[0]}
+    assert len(batches) == len(set(map(tuple, batches)))  # 已缓存的 key 不再读取
+
+
+def test_get_fundamentals_reads_cold_lazy_cache_through_get_many(tmp_path, ptrade_api, data_context, parallel_config):
+    from simtradelab.ptrade.lifecycle_controller import LifecyclePhase
+
+    stocks = ["600000.SH", "000001.SZ", "600519.SH"]
+    (tmp_path / "fundamentals").mkdir()
+    for i, stock in enumerate(stocks):
+        pd.DataFrame({
+            "date": pd.to_datetime(["2023-12-31", "2024-03-31"]),
+            "publ_date": pd.to_datetime(["2024-03-20", "2024-04-25"]),
+            "end_date": pd.to_datetime(["2023-12-31", "2024-03-31"]),
+            "roe": [0.1 + i, 0.2 + i],
+        }).to_parquet(tmp_path / "fundamentals" / f"{stock}.parquet", index=False)
+    data_context.fundamentals_dict = LazyDataDict(str(tmp_path), "fundamentals", stocks, preload=False)
+    ptrade_api.context._lifecycle_controller.set_phase(LifecyclePhase.INITIALIZE)
+    ptrade_api.context._lifecycle_controller.set_phase(LifecyclePhase.HANDLE_DATA)
+    ptrade_api.context.current_dt = pd.Timestamp("2024-05-01")
+
+    result = ptrade_api.get_fundamentals(stocks, "profit_ability", fields="roe", date="2024-05-01")
+
+    assert result["roe"].to_dict() == {stock: 0.2 + i for i, stock in enumerate(stocks)}
+    assert data_context.fundamentals_dict.prefetch_stats["misses"] == len(stocks)
+
+
+def test_weekly_get_history_uses_get_many_result(stock_dir, test_stock_data, test_dates, ptrade_api, data_context, parallel_config, monkeypatch):
+    keys = sorted(test_stock_data)
+    lazy = LazyDataDict(str(stock_dir), "stock", keys, preload=False)
+    data_context.stock_data_dict = lazy
+    ptrade_api.context.current_dt = test_dates[-1]
+    lookups = []
+    lookup = lazy._lookup
+    monkeypatch.setattr(lazy, "_lookup", lambda key: lookups.append(key) or lookup(key))
+
+    result = ptrade_api.get_history(count=2, frequency="1w", field="close", security_list=keys)
+
+    assert not result.empty
+    assert lookups == []  # 批量读取的结果直接交给逐只处理，不再逐只查找
+
+
+def test_lazy_dict_item_access_after_get_many(stock_dir, test_stock_data, parallel_config):
+    keys = sorted(test_stock_data)
+    lazy = LazyDataDict(str(stock_dir), "stock", keys, preload=False)
+
+    frames = lazy.get_many(keys[:2])
+
+    for key in keys[:2]:
+        assert lazy[key] is frames[key]
+    # 未经 get_many 读取的 key 走逐个读取路径并写入缓存
+    assert not lazy[keys[2]].empty
+    assert keys[2] in lazy._cache
+    assert lazy.get_arrays(keys[0]) is None
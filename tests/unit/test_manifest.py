@@ -0,0 +1,96 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simtradelab.ptrade import manifest, storage
+
+
+@pytest.fixture
+def market_dir(tmp_path):
+    (tmp_path / "stocks").mkdir()
+    (tmp_path / "metadata").mkdir()
+    for symbol in ("000001.SZ", "600000.SH"):
+        pd.DataFrame({"date": pd.to_datetime(["2024-01-02"]), "close": [1.0]}).to_parquet(
+            tmp_path / "stocks" / f"{symbol}.parquet", index=False
+        )
+    pd.DataFrame(
+        {
+            "date": ["20240102", "20240102", "20240103"],
+            "index_code": ["000300.SS", "000905.SS", "000300.SS"],
+            "symbols": [["600000.SH"], ["000001.SZ"], ["600000.SH", "000001.SZ"]],
+        }
+    ).to_parquet(tmp_path / "metadata" / "index_constituents.parquet", index=False)
+    return tmp_path
+
+
+def test_symbol_list_is_served_from_manifest_until_directory_changes(market_dir, monkeypatch):
+    assert sorted(storage.list_stocks(market_dir)) == ["000001.SZ", "600000.SH"]
+    assert (market_dir / manifest.MANIFEST_FILE).exists()
+
+    monkeypatch.setattr(type(market_dir), "glob", lambda self, pattern: pytest.fail("directory was globbed"))
+    assert sorted(storage.list_stocks(market_dir)) == ["000001.SZ", "600000.SH"]
+    monkeypatch.undo()
+
+    (market_dir / "stocks" / "600000.SH.parquet").unlink()
+    assert storage.list_stocks(market_dir) == ["000001.SZ"]
+
+
+def test_decoded_metadata_is_cached_and_rebuilt_when_file_changes(market_dir, monkeypatch):
+    expected = storage.load_metadata(market_dir, "metadata")
+    calls = []
+    original = storage._load_metadata_parquet
+    monkeypatch.setattr(
+        storage, "_load_metadata_parquet", lambda *args: calls.append(args) or original(*args)
+    )
+
+    warm = storage.load_metadata(market_dir, "metadata")
+    assert calls == []
+    assert warm.keys() == expected.keys()
+    assert warm["index_constituents"].members(["000300.SS"], 20240103) == ["600000.SH", "000001.SZ"]
+    assert storage.load_metadata(market_dir, "metadata")["index_constituents"] is not warm["index_constituents"]
+
+    pd.DataFrame(
+        {"date": ["20240104"], "index_code": ["000300.SS"], "symbols": [["600000.SH"]]}
+    ).to_parquet(market_dir / "metadata" / "index_constituents.parquet", index=False)
+    rebuilt = storage.load_metadata(market_dir, "metadata")["index_constituents"]
+    assert rebuilt.codes() == ["000300.SS"]
+    assert rebuilt.members(["000300.SS"], 20240103) is None
+    assert len(calls) == 1
+
+
+def test_manifest_is_plain_json(market_dir):
+    storage.list_stocks(market_dir)
+    storage.load_metadata(market_dir, "metadata")
+
+    payload = json.loads((market_dir / manifest.MANIFEST_FILE).read_text(encoding="utf-8"))
+    assert payload["version"] == manifest._MANIFEST_VERSION
+    assert set(payload["entries"]) == {"list:stocks", "metadata:metadata"}
+
+
+def test_values_round_trip_through_json():
+    value = {
+        20240102: {"600000.SH": (0.5, 1.2)},
+        "records": [{"date": pd.Timestamp("2024-01-02"), "close": np.float64(1.5), "missing": None}],
+        "dates": np.array([20240102, 20240103], dtype=np.int64),
+        "names": np.array(["a", "bc"]),
+        "frame": pd.DataFrame({"close": [1.0, 2.0]}),
+    }
+
+    decoded = manifest._decode(json.loads(json.dumps(manifest._encode(value))))
+    assert decoded[20240102] == {"600000.SH": (0.5, 1.2)}
+    assert decoded["records"] == value["records"]
+    np.testing.assert_array_equal(decoded["dates"], value["dates"])
+    assert decoded["dates"].dtype == np.int64
+    assert decoded["names"].tolist() == ["a", "bc"]
+    pd.testing.assert_frame_equal(decoded["frame"], value["frame"])
+    with pytest.raises(TypeError):
+        manifest._encode(object())
+
+
+def test_manifest_can_be_disabled(market_dir, monkeypatch):
+    monkeypatch.setenv(manifest.MANIFEST_ENV, "0")
+
+    assert sorted(storage.list_stocks(market_dir)) == ["000001.SZ", "600000.SH"]
+    assert not (market_dir / manifest.MANIFEST_FILE).exists()
@@ -539,6 +539,44 @@ def test_engine_applies_dividend_to_cash_and_position_lot(ptrade_api, simple_log
     assert portfolio._position_lots[stock][0]["dividends_total"] == 100.0
 
 
+def test_engine_corporate_action_calendar_matches_per_position_lookup(ptrade_api, simple_log):
+    stock = "600000.SH"
+    event_date = pd.Timestamp("2024-01-03")
+    portfolio = ptrade_api.context.portfolio
+    engine = StrategyExecutionEngine(ptrade_api.context, ptrade_api, stats_collector=StatsCollector(), log=simple_log)
+
+    def run(**data):
+        portfolio.positions.clear()
+        portfolio._position_lots.clear()
+        portfolio._cash = 100000.0
+        portfolio.add_position(stock, 100, 10.0, event_date - pd.Timedelta(days=1))
+        for name, value in data.items():
+            setattr(ptrade_api.data_context, name, value)
+        engine._process_dividend_events(event_date)
+        position = portfolio.positions[stock]
+        return portfolio.cash, position.amount, position.cost_basis
+
+    per_position = run(
+        corporate_action_calendar=None,
+        exrights_dict={stock: pd.DataFrame({"allotted_ps": [0.5]}, index=[20240103])},
+        dividend_cache={stock: {"20240103": 1.0}},
+    )
+
+    class Unreachable(dict):
+        def get(self, *args):
+            raise AssertionError("per-position lookup")
+
+        __contains__ = get
+
+    calendar = run(
+        corporate_action_calendar={20240103: {stock: (0.5, 1.0)}, 20240104: {"000001.SZ": (0.0, 2.0)}},
+        exrights_dict=Unreachable(),
+        dividend_cache=Unreachable(),
+    )
+
+    assert calendar == per_position == (100000.0 + 80.0, 150, pytest.approx(10.0 / 1.5))
+
+
 def test_get_history_daily_suspension_keeps_calendar_and_zero_volume(ptrade_api):
     stock = "600000.SH"
     dates = pd.date_range("2024-01-02", periods=3)
@@ -8,6 +8,7 @@ from simtradelab.backtest.backtest_stats import StatsCollector
 from simtradelab.backtest.config import BacktestConfig
 from simtradelab.backtest.runner import BacktestRunner
 from simtradelab.ptrade.market_profile import get_market_profile
+from simtradelab.ptrade.minute_window import MinuteWindowDict
 from simtradelab.ptrade.strategy_engine import StrategyExecutionEngine
 
 
@@ -179,6 +180,8 @@ def test_run_forwards_data_loading_options(tmp_path):
         "enable_multiprocessing": False,
         "num_workers": 3,
         "use_data_server": False,
+        "columns": None,
+        "date_range": None,
     }
 
 
@@ -199,7 +202,7 @@ def test_load_data_applies_performance_config_and_disables_caches(monkeypatch, t
         _initialized = True
         calls: ClassVar[list] = []
 
-        def __init__(self, required_data, frequency, data_path, market="CN"):
+        def __init__(self, required_data, frequency, data_path, market="CN", columns=None, date_range=None):
             self.calls.append((required_data, frequency, data_path, market))
             self.stock_data_dict = {}
             self.stock_data_dict_1m = {}
@@ -255,3 +258,52 @@ def test_load_data_applies_performance_config_and_disables_caches(monkeypatch, t
     assert performance_config.num_workers == 3
     assert existing_server.clear_count == 1
     assert FakeDataServer.calls == [({"price"}, "1d", str(tmp_path), "CN")]
+
+
+def test_minute_backtest_over_sliding_window_reindexes_after_month_change(tmp_path):
+    stock = "600000.SH"
+    trade_days = pd.DatetimeIndex(["2024-01-31", "2024-02-01"])
+    minute_index = pd.DatetimeIndex([])
+    for day in trade_days:
+        minute_index = minute_index.append(
+            pd.date_range(day + pd.Timedelta("09:31:00"), day + pd.Timedelta("11:30:00"), freq="min")
+        ).append(pd.date_range(day + pd.Timedelta("13:01:00"), day + pd.Timedelta("15:00:00"), freq="min"))
+    closes = pd.Series(range(len(minute_index)), dtype=float) + 10
+    (tmp_path / "stocks_1m").mkdir()
+    pd.DataFrame(
+        {"datetime": minute_index, "open": closes, "high": closes, "low": closes, "close": closes, "volume": 1_000}
+    ).to_parquet(tmp_path / "stocks_1m" / f"{stock}.parquet", index=False)
+    minute_data = MinuteWindowDict(tmp_path, [stock], trade_days=trade_days, lookback_days=1)
+
+    runner = BacktestRunner()
+    runner.stock_data_dict = {}
+    runner.stock_data_dict_1m = minute_data
+    runner.valuation_dict = {}
+    runner.fundamentals_dict = {}
+    runner.exrights_dict = {}
+    runner.benchmark_data = {}
+    runner.stock_metadata = pd.DataFrame()
+    runner.trade_days = trade_days
+    runner._profile = get_market_profile("CN")
+    config = SimpleNamespace(initial_capital=100_000, frequency="1m", t_plus_1=None, broker_profile="auto")
+    context, api = runner._initialize_context(config, trade_days[0], _NullLog())
+    stats_collector = StatsCollector()
+    api.stats_collector = stats_collector
+    engine = StrategyExecutionEngine(
+        context=context, api=api, stats_collector=stats_collector, log=_NullLog(), frequency="1m"
+    )
+    observed_prices = []
+    history_lengths = []
+
+    def handle_data(strategy_context, data):
+        observed_prices.append(data[stock].close)
+        history_lengths.append(len(api.get_history(300, "1m", "close", stock)))
+
+    engine.register_initialize(lambda strategy_context: None)
+    engine.register_handle_data(handle_data)
+
+    assert engine.run_backtest(trade_days) is True
+    assert observed_prices == closes.tolist()
+    assert list(minute_data._chunks) == [202401, 202402]
+    assert history_lengths[239] == 239
+    assert history_lengths[-1] == 300
@@ -0,0 +1,105 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simtradelab.ptrade import minute_window, storage
+from simtradelab.ptrade.minute_window import MinuteWindowDict
+
+SYMBOLS = ("000001.SZ", "600000.SH")
+TRADE_DAYS = pd.bdate_range("2024-01-25", "2024-03-08")
+
+
+def _minute_bars(days):
+    times = [day + pd.Timedelta(hours=9, minutes=31 + i) for day in days for i in range(3)]
+    return pd.DataFrame({"datetime": times, "close": np.arange(len(times), dtype=float), "volume": 100})
+
+
+@pytest.fixture
+def market_dir(tmp_path):
+    (tmp_path / "stocks_1m").mkdir()
+    for symbol in SYMBOLS:
+        _minute_bars(TRADE_DAYS).to_parquet(tmp_path / "stocks_1m" / f"{symbol}.parquet", index=False)
+    return tmp_path
+
+
+def _full(market_dir, symbol):
+    return storage.load_stock_1m(market_dir, symbol)
+
+
+def test_monthly_partitions_are_read_only_for_the_requested_window(market_dir, monkeypatch):
+    full = _full(market_dir, "000001.SZ")
+
+    assert storage.build_minute_partitions(market_dir) == len(SYMBOLS)
+    assert sorted(p.stem for p in (market_dir / storage.MINUTE_PARTITION_DIR / "000001.SZ").iterdir()) == [
+        "202401", "202402", "202403",
+    ]
+    reads = []
+    original = storage._read_parquet
+    monkeypatch.setattr(storage, "_read_parquet", lambda path, *args: reads.append(path.name) or original(path, *args))
+
+    window = (pd.Timestamp("2024-02-05"), pd.Timestamp("2024-02-10"))
+    part = storage.load_stock_1m(market_dir, "000001.SZ", date_range=window)
+
+    assert reads == ["202402.parquet"]
+    pd.testing.assert_frame_equal(part, full.loc["2024-02-05":"2024-02-09"])
+    pd.testing.assert_frame_equal(storage.load_stock_1m(market_dir, "000001.SZ"), full)
+
+
+def test_stale_partitions_fall_back_to_the_source_file(market_dir):
+    storage.build_minute_partitions(market_dir, ["000001.SZ"])
+    source = market_dir / "stocks_1m" / "000001.SZ.parquet"
+    _minute_bars(TRADE_DAYS[:2]).to_parquet(source, index=False)
+    partition_mtime = (market_dir / storage.MINUTE_PARTITION_DIR / "000001.SZ").stat().st_mtime_ns
+    os.utime(source, ns=(partition_mtime + 1, partition_mtime + 1))
+
+    assert len(storage.load_stock_1m(market_dir, "000001.SZ")) == 6
+
+
+def test_window_keeps_only_months_covering_the_lookback(market_dir):
+    window = MinuteWindowDict(market_dir, list(SYMBOLS), trade_days=TRADE_DAYS, lookback_days=3)
+    full = _full(market_dir, "600000.SH")
+
+    window.advance("2024-02-01")
+    assert window._months == (202401, 202402)
+    pd.testing.assert_frame_equal(window["600000.SH"], full.loc["2024-01-01":"2024-02-29"])
+
+    window.advance("2024-02-02")
+    window.advance("2024-02-05")
+    assert list(window._chunks) == [202402]
+    assert window["600000.SH"].index.min() == pd.Timestamp("2024-02-01 09:31")
+    assert "INVALID.XX" not in window and window.get("INVALID.XX") is None
+
+
+def test_next_month_is_prefetched_for_the_working_set(market_dir, monkeypatch):
+    window = MinuteWindowDict(market_dir, list(SYMBOLS), trade_days=TRADE_DAYS, lookback_days=1)
+    window.advance("2024-02-28")
+    window["000001.SZ"]
+    window.advance("2024-02-29")
+
+    assert window._prefetch[0] == 202403
+    assert set(window._prefetch[1]) == {"000001.SZ"}
+    for future in window._prefetch[1].values():
+        future.result()
+    monkeypatch.setattr(storage, "load_stock_1m", lambda *args, **kwargs: pytest.fail("synchronous read"))
+
+    generation = window.generation
+    window.advance("2024-03-01")
+
+    assert window.generation == generation + 1
+    assert window["000001.SZ"].index.min() == pd.Timestamp("2024-03-01 09:31")
+
+
+def test_history_extends_lookback_without_moving_window_rows(market_dir):
+    window = MinuteWindowDict(market_dir, list(SYMBOLS), trade_days=TRADE_DAYS, lookback_days=1)
+    full = _full(market_dir, "000001.SZ")
+    window.advance("2024-03-05")
+    generation, frame = window.generation, window["000001.SZ"]
+
+    deep = window.history("000001.SZ", bars=minute_window.BARS_PER_DAY * 25)
+
+    assert window.generation == generation
+    assert window["000001.SZ"] is frame
+    assert deep.index.min() == pd.Timestamp("2024-01-25 09:31")
+    pd.testing.assert_frame_equal(window.history("000001.SZ", since="2024-01-01"), full.loc[:"2024-03-31"])
@@ -0,0 +1,144 @@
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simtradelab.ptrade.columnar_store import ColumnarFrameMap, ColumnarStore
+from simtradelab.ptrade.object import LazyDataDict
+from simtradelab.service.data_server import DataServer
+from simtradelab.service.shared_panel import attach_shared_panel, publish_shared_panel
+
+
+def _price_frames():
+    dates = pd.date_range("2024-01-01", periods=5, freq="D", name="date")
+    return {
+        "600000.SH": pd.DataFrame({"close": np.arange(5.0) + 10, "volume": np.arange(5, dtype=np.int64)}, index=dates),
+        "000001.SZ": pd.DataFrame({"close": np.arange(3.0) + 20, "volume": np.ones(3, dtype=np.int64)}, index=dates[2:]),
+    }
+
+
+def _adj_frames():
+    dates = pd.date_range("2024-01-01", periods=5, freq="D", name="date")
+    return {"600000.SH": pd.DataFrame({"adj_a": np.full(5, 0.5), "adj_b": np.zeros(5)}, index=dates)}
+
+
+@pytest.fixture
+def market_dir(tmp_path):
+    (tmp_path / "stocks").mkdir()
+    return tmp_path
+
+
+def _server(market_dir):
+    price = LazyDataDict.from_columnar(str(market_dir), "stock", ColumnarStore.from_frames(_price_frames()))
+    return SimpleNamespace(
+        data_path=str(market_dir),
+        stock_data_dict=price,
+        valuation_dict=SimpleNamespace(_preload=True, _cache={}),
+        adj_pre_cache=_adj_frames(),
+        adj_post_cache=_adj_frames(),
+    )
+
+
+def test_columnar_store_open_is_read_only_and_zero_copy(tmp_path):
+    ColumnarStore.from_frames(_price_frames()).save(tmp_path / "price")
+
+    store = ColumnarStore.open(tmp_path / "price")
+    frame = store.frame("600000.SH", copy=False)
+
+    assert store.read_only
+    assert isinstance(store._buffers["close"], np.memmap)
+    assert np.shares_memory(frame["close"].values, store._buffers["close"])
+    with pytest.raises(ValueError):
+        frame["close"].values[0] = 0.0
+    pd.testing.assert_frame_equal(store.frame("000001.SZ"), _price_frames()["000001.SZ"], check_freq=False)
+
+
+def test_columnar_store_saves_objects_and_passthrough_without_pickle(tmp_path):
+    frames = _price_frames()
+    frames["600000.SH"]["status"] = ["正常", None, "停牌", "正常", "正常"]
+    frames["000001.SZ"]["status"] = ["正常"] * 3
+    odd = pd.DataFrame({"close": [1.0, 2.0]})
+    expected = {symbol: df.copy() for symbol, df in frames.items()}
+    ColumnarStore.from_frames({**frames, "BAD": odd, "EMPTY": pd.DataFrame()}).save(tmp_path / "price")
+
+    store = ColumnarStore.open(tmp_path / "price")
+
+    assert not list(tmp_path.joinpath("price").glob("*.pkl"))
+    assert store._buffers["status"].dtype == object
+    assert store.frame("600000.SH")["status"].tolist() == ["正常", None, "停牌", "正常", "正常"]
+    pd.testing.assert_frame_equal(store.frame("000001.SZ"), expected["000001.SZ"], check_freq=False)
+    pd.testing.assert_frame_equal(store._passthrough["BAD"], odd)
+    assert store._passthrough["EMPTY"].empty
+
+
+def test_publish_rejects_partially_cached_lazy_dict(market_dir):
+    server = _server(market_dir)
+    server.stock_data_dict = LazyDataDict(str(market_dir), "stock", ["600000.SH"], preload=False)
+
+    with pytest.raises(ValueError):
+        publish_shared_panel(server)
+
+
+def test_publish_and_attach_shared_panel(market_dir):
+    path = publish_shared_panel(_server(market_dir))
+
+    panel = attach_shared_panel(market_dir)
+
+    assert path == market_dir / "shared_panel"
+    assert sorted(panel.stores) == ["adj_post", "adj_pre", "price"]
+    adj = ColumnarFrameMap(panel.get("adj_pre"))
+    assert "600000.SH" in adj and len(adj) == 1
+    np.testing.assert_array_equal(adj["600000.SH"]["adj_a"].values, np.full(5, 0.5))
+    attached = LazyDataDict.from_columnar(str(market_dir), "stock", panel.get("price"))
+    np.testing.assert_array_equal(attached.get_arrays("000001.SZ")["close"], [20.0, 21.0, 22.0])
+    assert attached["600000.SH"]["close"].iloc[-1] == 14.0
+
+
+def test_shared_panel_is_ignored_after_source_changes(market_dir):
+    publish_shared_panel(_server(market_dir))
+    assert attach_shared_panel(market_dir) is not None
+
+    (market_dir / "stocks" / "600001.SH.parquet").write_bytes(b"")
+
+    assert attach_shared_panel(market_dir) is None
+
+
+def test_shared_panel_attaches_from_another_process(market_dir):
+    publish_shared_panel(_server(market_dir))
+    code = (
+        "import sys\n"
+        "from simtradelab.service.shared_panel import attach_shared_panel\n"
+        "panel = attach_shared_panel(sys.argv[1])\n"
+        "print(panel.get('price').arrays('600000.SH')['close'].sum())\n"
+    )
+
+    out = subprocess.run(
+        [sys.executable, "-c", code, str(market_dir)], capture_output=True, text=True, check=True
+    ).stdout
+
+    assert float(out) == 60.0
+
+
+def test_data_server_uses_attached_panel(market_dir, monkeypatch):
+    publish_shared_panel(_server(market_dir))
+    server = object.__new__(DataServer)
+    server.data_path = str(market_dir)
+    server._shared_panel = attach_shared_panel(market_dir)
+    for name in ("stock_data_dict", "valuation_dict", "fundamentals_dict", "exrights_dict", "trade_days"):
+        setattr(server, name, None)
+    server.benchmark_data = {}
+    server.stock_metadata = pd.DataFrame()
+    server.index_constituents = {}
+    server.stock_status_history = {}
+    monkeypatch.setattr("simtradelab.ptrade.adj_cache.create_dividend_cache", lambda context: {})
+
+    assert server._attached_dict("valuation", "valuation") is None
+    server.stock_data_dict = server._attached_dict("price", "stock")
+    server._initialize_adjustment_caches()
+
+    assert server.stock_data_dict._columnar.read_only
+    assert isinstance(server.adj_pre_cache, ColumnarFrameMap)
+    assert server.adj_post_cache["600000.SH"]["adj_b"].sum() == 0.0
@@ -0,0 +1,116 @@
+import pickle
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from simtradelab.ptrade.api import PtradeAPI
+from simtradelab.ptrade.stock_status import StockStatusStore
+
+RECORDS = [
+    ("20240102", "ST", ["000001.SZ"]),
+    ("20240102", "HALT", []),
+    ("20240102", "DELISTING", []),
+    ("20240103", "ST", ["000001.SZ"]),
+    ("20240103", "HALT", ["600000.SH"]),
+    ("20240105", "ST", []),
+    ("20240105", "HALT", ["600000.SH", "000002.SZ"]),
+    ("20240105", "DELISTING", ["000002.SZ"]),
+]
+
+
+def _store():
+    dates, types, symbols = zip(*RECORDS, strict=True)
+    return StockStatusStore.from_records(list(dates), list(types), list(symbols))
+
+
+def _reference(date, status_type):
+    """旧格式：不晚于查询日的最近快照日中处于该状态的股票"""
+    snapshots = sorted({d for d, _, _ in RECORDS if d <= date})
+    if not snapshots:
+        return None
+    return {s for d, t, syms in RECORDS if d == snapshots[-1] and t == status_type for s in syms}
+
+
+@pytest.mark.parametrize("date", ["20240101", "20240102", "20240103", "20240104", "20240105", "20240110"])
+@pytest.mark.parametrize("status_type", ["ST", "HALT", "DELISTING"])
+def test_flags_match_snapshot_lookup(date, status_type):
+    stocks = ["000001.SZ", "600000.SH", "000002.SZ", "999999.SH"]
+
+    flags = _store().flags(stocks, status_type, int(date))
+
+    expected = _reference(date, status_type)
+    if expected is None:
+        assert flags is None
+    else:
+        assert flags.tolist() == [stock in expected for stock in stocks]
+
+
+def test_only_changed_rows_are_stored_and_store_pickles():
+    store = _store()
+
+    assert store._dates["ST"].tolist() == [20240102, 20240105]
+    assert store._dates["DELISTING"].tolist() == [20240102, 20240105]
+    assert store._bits["HALT"].shape == (3, 1)
+    restored = pickle.loads(pickle.dumps(store))
+    assert restored.flags(["600000.SH"], "HALT", 20240104).tolist() == [True]
+    assert restored.flags(["600000.SH"], "UNKNOWN", 20240104) is None
+
+
+def test_legacy_snapshot_dict_is_converted():
+    history = {
+        "20240102": {"ST": {"000001.SZ": True}, "HALT": {}, "DELISTING": {}},
+        "20240104": {"ST": {}, "HALT": {"000001.SZ": True}, "DELISTING": {}},
+    }
+
+    store = StockStatusStore.coerce(history)
+
+    assert store.flags(["000001.SZ"], "ST", 20240103).tolist() == [True]
+    assert store.flags(["000001.SZ"], "ST", 20240104).tolist() == [False]
+    assert StockStatusStore.coerce({}) is None
+
+
+def _api(stock_status_history, stock_data):
+    data_context = SimpleNamespace(
+        stock_data_dict=stock_data,
+        stock_metadata=pd.DataFrame({"stock_name": ["B"]}, index=["000002.SZ"]),
+        stock_status_history=stock_status_history,
+    )
+    context = SimpleNamespace(current_dt=pd.Timestamp("2024-01-05"))
+    api = object.__new__(PtradeAPI)
+    api.data_context = data_context
+    api.context = context
+    api._stock_status = None
+    api._stock_status_cache = {}
+    return api
+
+
+def test_api_answers_whole_stock_list_from_store():
+    api = _api(_store(), {"000001.SZ": None, "600000.SH": None})
+    stocks = ["000001.SZ", "600000.SH", "000002.SZ", "INVALID.XX"]
+
+    assert api.get_stock_status(stocks, query_type="HALT") == {
+        "000001.SZ": False, "600000.SH": True, "000002.SZ": True, "INVALID.XX": None,
+    }
+    assert api.get_stock_status(stocks, query_type="ST", query_date="2024-01-03") == {
+        "000001.SZ": True, "600000.SH": False, "000002.SZ": False, "INVALID.XX": None,
+    }
+    assert PtradeAPI.filter_stock_by_status.__wrapped__(api, stocks) == ["000001.SZ", "INVALID.XX"]
+    assert PtradeAPI.filter_stock_by_status.__wrapped__(api, stocks, ["ST"], "2024-01-03") == [
+        "600000.SH", "000002.SZ", "INVALID.XX",
+    ]
+
+
+def test_halt_falls_back_to_zero_volume_without_snapshots():
+    day = pd.Timestamp("2024-01-05")
+    stock_data = {
+        "000001.SZ": pd.DataFrame({"volume": [0]}, index=[day]),
+        "600000.SH": pd.DataFrame({"volume": [100]}, index=[day]),
+    }
+    api = _api({}, stock_data)
+
+    assert api.get_stock_status(["000001.SZ", "600000.SH", "X"], query_type="HALT") == {
+        "000001.SZ": True, "600000.SH": False, "X": None,
+    }
+    assert PtradeAPI.filter_stock_by_status.__wrapped__(api, ["000001.SZ", "600000.SH"]) == ["600000.SH"]
+    assert api.get_stock_status("600000.SH", query_type="ST") == {"600000.SH": False}
@@ -0,0 +1,193 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simtradelab.cli import main
+from simtradelab.ptrade import storage
+from simtradelab.ptrade.compact import restore_frame
+from simtradelab.ptrade.object import LazyDataDict
+
+
+def _write_stock(data_dir, symbol, periods=5, start="2024-01-01", with_amount=True, volume_dtype=np.int64):
+    dates = pd.date_range(start, periods=periods, freq="D")
+    df = pd.DataFrame(
+        {
+            "date": dates,
+            "open": np.linspace(10.0, 11.0, periods),
+            "close": np.linspace(10.5, 11.5, periods),
+            "volume": np.arange(periods, dtype=volume_dtype) * 100,
+        }
+    )
+    if with_amount:
+        df["amount"] = df["close"] * df["volume"]
+    path = data_dir / "stocks"
+    path.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(path / f"{symbol}.parquet", index=False)
+
+
+@pytest.fixture
+def market_dir(tmp_path):
+    _write_stock(tmp_path, "000001.SZ", periods=6)
+    _write_stock(tmp_path, "600000.SH", periods=3, start="2024-02-01")
+    _write_stock(tmp_path, "000002.SZ", periods=4, with_amount=False)
+    yield tmp_path
+    storage._consolidated_stores.clear()
+    storage.refresh_source_stamps()
+
+
+def test_consolidated_store_matches_per_file_loader(market_dir):
+    expected = {
+        symbol: storage.load_stock(market_dir, symbol)
+        for symbol in ["000001.SZ", "000002.SZ", "600000.SH"]
+    }
+
+    count = storage.build_consolidated_store(market_dir, "stocks", row_group_size=4)
+    store = storage.open_consolidated_store(market_dir, "stocks")
+
+    assert count == 3
+    assert sorted(store.symbols()) == sorted(expected)
+    loaded = store.load(["600000.SH", "000002.SZ", "missing"])
+    assert set(loaded) == {"600000.SH", "000002.SZ"}
+    for symbol, df in loaded.items():
+        pd.testing.assert_frame_equal(df, expected[symbol])
+        assert df.dtypes.to_dict() == expected[symbol].dtypes.to_dict()
+
+
+def test_consolidated_store_is_ignored_after_source_changes(market_dir):
+    storage.build_consolidated_store(market_dir, "stocks")
+    assert storage.open_consolidated_store(market_dir, "stocks") is not None
+
+    _write_stock(market_dir, "300001.SZ")
+
+    assert storage.open_consolidated_store(market_dir, "stocks") is None
+    assert "300001.SZ" in storage.list_stocks(market_dir)
+
+
+def test_source_stamp_is_memoized_per_directory_mtime(market_dir, monkeypatch):
+    storage.build_consolidated_store(market_dir, "stocks")
+    storage.list_stocks(market_dir)
+    first = storage.source_stamp(market_dir, "stocks")
+    monkeypatch.setattr(storage.os, "scandir", lambda path: pytest.fail("re-scanned unchanged directory"))
+
+    assert storage.source_stamp(market_dir, "stocks") == first
+    for _ in range(3):
+        storage.list_stocks(market_dir)
+
+
+def test_consolidated_store_is_ignored_after_in_place_rewrite(market_dir):
+    storage.build_consolidated_store(market_dir, "stocks")
+    stocks_dir = market_dir / "stocks"
+    dir_stat = stocks_dir.stat()
+
+    # 原地改写单个文件：目录 mtime 不变
+    _write_stock(market_dir, "000001.SZ", periods=7)
+    os.utime(stocks_dir, ns=(dir_stat.st_atime_ns, dir_stat.st_mtime_ns))
+
+    # 逐文件状态按目录 mtime 缓存，显式刷新（如 append_data）后才重新 stat
+    assert storage.open_consolidated_store(market_dir, "stocks") is not None
+    storage.refresh_source_stamps(market_dir)
+    assert storage.open_consolidated_store(market_dir, "stocks") is None
+    assert len(storage.load_stock(market_dir, "000001.SZ")) == 7
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_consolidated_store_keeps_per_symbol_dtypes(market_dir, compact):
+    _write_stock(market_dir, "300001.SZ", volume_dtype=np.float64)
+    expected = {
+        symbol: storage.load_stock(market_dir, symbol, compact=compact)
+        for symbol in ["000001.SZ", "000002.SZ", "300001.SZ"]
+    }
+    storage.build_consolidated_store(market_dir, "stocks", row_group_size=4)
+    store = storage.open_consolidated_store(market_dir, "stocks")
+
+    loaded = store.load(list(expected), compact=compact)
+
+    # 统一 schema 中 volume 提升为 float64，各代码读取时还原源文件 dtype
+    assert loaded["000001.SZ"]["volume"].dtype == (np.int32 if compact else np.int64)
+    assert loaded["300001.SZ"]["volume"].dtype == (np.float32 if compact else np.float64)
+    for symbol, df in expected.items():
+        pd.testing.assert_frame_equal(restore_frame(loaded[symbol]), restore_frame(df))
+
+
+def test_loaders_fall_back_to_consolidated_store_without_source_files(market_dir):
+    expected = storage.load_stock(market_dir, "000001.SZ")
+    storage.build_consolidated_store(market_dir, "stocks")
+    shutil.rmtree(market_dir / "stocks")
+
+    assert sorted(storage.list_stocks(market_dir)) == ["000001.SZ", "000002.SZ", "600000.SH"]
+    pd.testing.assert_frame_equal(storage.load_stock(market_dir, "000001.SZ"), expected)
+    assert storage.load_stock(market_dir, "999999.SZ").empty
+
+
+@pytest.mark.parametrize("preload", [True, False])
+def test_lazy_data_dict_reads_from_consolidated_store(market_dir, preload):
+    expected = storage.load_stock(market_dir, "600000.SH")
+    storage.build_consolidated_store(market_dir, "stocks")
+    keys = storage.list_stocks(market_dir)
+
+    data = LazyDataDict(str(market_dir), "stock", keys, preload=preload)
+
+    assert data._store is not None
+    pd.testing.assert_frame_equal(data["600000.SH"], expected)
+
+
+def test_cli_consolidate_builds_present_datasets(market_dir, capsys):
+    assert main(["consolidate", str(market_dir)]) == 0
+
+    assert "stocks: 3" in capsys.readouterr().out
+    assert (market_dir / storage.CONSOLIDATED_DIR / "stocks.parquet").exists()
+    assert storage.open_consolidated_store(market_dir, "stocks") is not None
+
+
+def test_loaders_project_requested_columns(market_dir):
+    projected = storage.load_stock(market_dir, "000001.SZ", columns={"close", "missing"})
+    storage.build_consolidated_store(market_dir, "stocks", row_group_size=4)
+    store = storage.open_consolidated_store(market_dir, "stocks")
+
+    assert list(projected.columns) == ["close"]
+    assert isinstance(projected.index, pd.DatetimeIndex)
+    loaded = store.load(["000001.SZ", "000002.SZ"], columns={"close", "amount"})
+    assert list(loaded["000001.SZ"].columns) == ["close", "amount"]
+    assert list(loaded["000002.SZ"].columns) == ["close"]
+    pd.testing.assert_frame_equal(loaded["000001.SZ"][["close"]], projected)
+
+
+@pytest.mark.parametrize("preload", [True, False])
+def test_lazy_data_dict_passes_columns_to_loader(market_dir, preload):
+    data = LazyDataDict(
+        str(market_dir), "stock", storage.list_stocks(market_dir),
+        preload=preload, use_multiprocessing=False, columns={"open", "volume"},
+    )
+
+    assert list(data["600000.SH"].columns) == ["open", "volume"]
+
+
+def test_date_range_is_pushed_down_to_row_groups(market_dir):
+    window = (pd.Timestamp("2024-01-03"), pd.Timestamp("2024-01-05"))
+    expected = storage.load_stock(market_dir, "000001.SZ").loc["2024-01-03":"2024-01-04"]
+
+    clipped = storage.load_stock(market_dir, "000001.SZ", date_range=window)
+    storage.build_consolidated_store(market_dir, "stocks", row_group_size=2)
+    store = storage.open_consolidated_store(market_dir, "stocks")
+    loaded = store.load(["000001.SZ", "600000.SH", "000002.SZ"], date_range=window)
+
+    pd.testing.assert_frame_equal(clipped, expected)
+    pd.testing.assert_frame_equal(loaded["000001.SZ"], expected)
+    assert loaded["600000.SH"].empty
+    assert list(loaded["000002.SZ"].index) == list(pd.to_datetime(["2024-01-03", "2024-01-04"]))
+    assert not store._overlaps(0, window)
+    assert sum(store._overlaps(rg, window) for rg in range(len(store._rg_rows))) < len(store._rg_rows)
+
+
+def test_date_range_on_string_dates_is_clipped_after_parsing(tmp_path):
+    (tmp_path / "stocks").mkdir()
+    pd.DataFrame(
+        {"date": ["2024-01-01", "2024-01-02", "2024-01-03"], "close": [1.0, 2.0, 3.0]}
+    ).to_parquet(tmp_path / "stocks" / "000001.SZ.parquet", index=False)
+
+    df = storage.load_stock(tmp_path, "000001.SZ", date_range=(pd.Timestamp("2024-01-02"), None))
+
+    assert df["close"].tolist() == [2.0, 3.0]